@@ -0,0 +1,63 @@
+"""contracts item name summary
+
+Contract-level copies of the ship_name sort key — min/max type_name over the contract's
+items — so the list sorts by item name without joining and grouping contract_items.
+Backfilled here from the stored items and stamped at ITEM_SUMMARY_VERSION 1; from then on
+ingestion keeps them current (ContractAggregationService._refresh_item_summaries). A row
+left at version 0 is still sorted correctly: the list derives its key from the items.
+
+Revision ID: 3b7d9e2f6a14
+Revises: 8f3c1e5a2b90
+Create Date: 2026-10-19 00:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d9e2f6a14'
+down_revision: Union[str, None] = '8f3c1e5a2b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Pre-deploy command on a live database; fail fast rather than queue behind
+    # the outgoing instance's ingestion transaction.
+    op.execute("SET lock_timeout = '30s'")
+    op.add_column('contracts', sa.Column('item_name_first', sa.String(), nullable=True))
+    op.add_column('contracts', sa.Column('item_name_last', sa.String(), nullable=True))
+    op.add_column(
+        'contracts',
+        sa.Column('item_summary_version', sa.Integer(), server_default='0', nullable=False),
+    )
+    # One pass over contract_items (~50k contracts' worth). The literal 1 is the
+    # ITEM_SUMMARY_VERSION this revision ships with; a later bump does not edit it —
+    # ingestion rewrites stale rows itself.
+    op.execute("""
+        UPDATE contracts AS c
+           SET item_name_first = names.first_name,
+               item_name_last = names.last_name,
+               item_summary_version = 1
+          FROM (
+                SELECT contracts.contract_id,
+                       min(contract_items.type_name) AS first_name,
+                       max(contract_items.type_name) AS last_name
+                  FROM contracts
+                  LEFT JOIN contract_items
+                    ON contract_items.contract_id = contracts.contract_id
+                 GROUP BY contracts.contract_id
+               ) AS names
+         WHERE c.contract_id = names.contract_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('contracts', 'item_summary_version')
+    op.drop_column('contracts', 'item_name_last')
+    op.drop_column('contracts', 'item_name_first')
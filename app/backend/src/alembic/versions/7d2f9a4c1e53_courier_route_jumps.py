@@ -0,0 +1,46 @@
+"""courier route jumps
+
+Adds contracts.route_jumps, route_highsec and reward_per_jump, stamped on courier
+contracts by ingestion from the stargate graph (services/route_graph.py), and the two
+indexes the jumps and reward-per-jump sorts and filters read.
+
+No backfill: the columns are derived from the SDE the ingest process loads, so every
+live courier is stamped on its next sighting — within one ingestion interval.
+
+Revision ID: 7d2f9a4c1e53
+Revises: e4b8c2d61f07
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2f9a4c1e53'
+down_revision: Union[str, None] = 'e4b8c2d61f07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Pre-deploy command on a live database; fail fast rather than queue behind
+    # the outgoing instance's ingestion transaction.
+    op.execute("SET lock_timeout = '30s'")
+    op.add_column('contracts', sa.Column('route_jumps', sa.Integer(), nullable=True))
+    op.add_column('contracts', sa.Column('route_highsec', sa.Boolean(), nullable=True))
+    op.add_column('contracts', sa.Column('reward_per_jump', sa.Float(), nullable=True))
+    op.create_index('ix_contracts_route_jumps', 'contracts', ['route_jumps'], unique=False)
+    op.create_index('ix_contracts_reward_per_jump', 'contracts', ['reward_per_jump'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contracts_reward_per_jump', table_name='contracts')
+    op.drop_index('ix_contracts_route_jumps', table_name='contracts')
+    op.drop_column('contracts', 'reward_per_jump')
+    op.drop_column('contracts', 'route_highsec')
+    op.drop_column('contracts', 'route_jumps')
@@ -0,0 +1,46 @@
+"""trigram search indexes
+
+Free-text search is `ILIKE '%term%'` over contracts.title and contract_items.type_name.
+A leading wildcard defeats every btree, so each search scanned the live corpus; pg_trgm's
+GIN operator class serves the same predicate from an index. pg_trgm is a trusted
+extension (PostgreSQL 13+), so the application role can install it.
+
+Revision ID: 8f3c1e5a2b90
+Revises: 685dab7d6df5
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3c1e5a2b90'
+down_revision: Union[str, None] = '685dab7d6df5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Pre-deploy command on a live database; fail fast rather than queue behind
+    # the outgoing instance's ingestion transaction.
+    op.execute("SET lock_timeout = '30s'")
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_contracts_title_trgm', 'contracts', ['title'], unique=False,
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_contract_items_type_name_trgm', 'contract_items', ['type_name'], unique=False,
+        postgresql_using='gin', postgresql_ops={'type_name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contract_items_type_name_trgm', table_name='contract_items')
+    op.drop_index('ix_contracts_title_trgm', table_name='contracts')
+    # The extension stays: other objects may have come to depend on it, and leaving
+    # an unused extension installed costs nothing.
@@ -0,0 +1,40 @@
+"""contracts items_last_fetched_at index
+
+Indexes contracts.items_last_fetched_at, which ingestion now stamps whenever it writes
+a contract's items. The watchlist matcher keeps a high-water mark over it and matches
+only the contracts past the mark, so each run reads an index range instead of the
+whole corpus (services/watchlist_matcher.py).
+
+No backfill: the column exists and is NULL on every row so far. The matcher's first run
+after deploy has no mark and does a full rematch, which covers those rows.
+
+Revision ID: b3e6f18a2c94
+Revises: 7d2f9a4c1e53
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e6f18a2c94'
+down_revision: Union[str, None] = '7d2f9a4c1e53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Pre-deploy command on a live database; fail fast rather than queue behind
+    # the outgoing instance's ingestion transaction.
+    op.execute("SET lock_timeout = '30s'")
+    op.create_index(
+        'ix_contracts_items_last_fetched_at', 'contracts', ['items_last_fetched_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contracts_items_last_fetched_at', table_name='contracts')
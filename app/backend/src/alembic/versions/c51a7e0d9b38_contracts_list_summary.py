@@ -0,0 +1,38 @@
+"""contracts list summary
+
+The item-derived half of a contract list row — headline item name, per-category item row
+counts, blueprint terms — stored on the contract so a list page is served without
+loading every row's items. No backfill: ITEM_SUMMARY_VERSION moves to 2 with this
+revision, so every existing row reads as stale, the list summarizes it from its items
+until then, and the next ingestion run rewrites it
+(ContractAggregationService._refresh_item_summaries).
+
+Revision ID: c51a7e0d9b38
+Revises: 3b7d9e2f6a14
+Create Date: 2026-10-19 00:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c51a7e0d9b38'
+down_revision: Union[str, None] = '3b7d9e2f6a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Pre-deploy command on a live database; fail fast rather than queue behind
+    # the outgoing instance's ingestion transaction.
+    op.execute("SET lock_timeout = '30s'")
+    op.add_column('contracts', sa.Column('list_summary', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('contracts', 'list_summary')
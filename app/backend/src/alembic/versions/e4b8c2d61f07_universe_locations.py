@@ -0,0 +1,78 @@
+"""universe locations
+
+A dimension table for static universe geography: NPC stations (name, solar system,
+region, security status) and the systems they sit in. Ingestion reads a batch's
+locations from it in one SELECT instead of rediscovering station->system pairs from
+the contracts table, and stops re-resolving station names through /universe/names.
+Also adds contracts.end_location_region_id, filled from the destination's row.
+
+Backfilled from the station->system pairs the contracts table already holds, start
+and end, with the station names stored beside them. Region and security are left
+NULL: the first run after this revision completes each row from its system
+(_resolve_locations), which costs one lookup per system rather than one per station.
+A lookup that fails on that run cannot blank a stored system — the system columns
+upsert with preserve_on_null (background_aggregation.LOCATION_COLUMNS_PRESERVED_ON_NULL).
+
+Revision ID: e4b8c2d61f07
+Revises: c51a7e0d9b38
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b8c2d61f07'
+down_revision: Union[str, None] = 'c51a7e0d9b38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Pre-deploy command on a live database; fail fast rather than queue behind
+    # the outgoing instance's ingestion transaction.
+    op.execute("SET lock_timeout = '30s'")
+    op.create_table(
+        'universe_locations',
+        sa.Column('location_id', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('system_id', sa.Integer(), nullable=False),
+        sa.Column('region_id', sa.Integer(), nullable=True),
+        sa.Column('security_status', sa.Float(), nullable=True),
+        sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('location_id'),
+    )
+    op.create_index(
+        'ix_universe_locations_system_id', 'universe_locations', ['system_id'], unique=False
+    )
+    op.add_column('contracts', sa.Column('end_location_region_id', sa.Integer(), nullable=True))
+    # NPC stations only (background_aggregation.NPC_STATION_ID_MIN/MAX): a structure
+    # keeps no row. Grouped so a station seen with two systems cannot fail the insert.
+    op.execute("""
+        INSERT INTO universe_locations (location_id, name, system_id, fetched_at)
+        SELECT pairs.location_id, max(pairs.name), min(pairs.system_id), now()
+          FROM (
+                SELECT start_location_id AS location_id,
+                       start_location_name AS name,
+                       start_location_system_id AS system_id
+                  FROM contracts
+                UNION ALL
+                SELECT end_location_id, end_location_name, end_location_system_id
+                  FROM contracts
+               ) AS pairs
+         WHERE pairs.system_id IS NOT NULL
+           AND pairs.location_id >= 60000000
+           AND pairs.location_id < 64000000
+         GROUP BY pairs.location_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('contracts', 'end_location_region_id')
+    op.drop_index('ix_universe_locations_system_id', table_name='universe_locations')
+    op.drop_table('universe_locations')
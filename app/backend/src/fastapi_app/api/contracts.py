@@ -1,24 +1,50 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from ..db import get_db
-from ..models.contracts import Contract
+from ..core.conditional_get import (
+    RenderedJSONResponse,
+    etag_matches,
+    generation_committed_at,
+    not_modified,
+    seconds_until_next_ingest,
+    strong_etag,
+    unmodified_since,
+    validator_headers,
+)
+from ..core.config import get_settings
+from ..core.dependencies import (
+    get_optional_cache,
+    get_optional_dataset_snapshot,
+    get_optional_read_models,
+    get_read_db,
+)
 from ..schemas.contracts import (
+    MAX_BATCH_CONTRACT_IDS,
+    ContractBatchResponse,
     ContractDetailSchema,
+    ContractFacetsResponse,
     ContractFilters,
     ContractListResponse,
+    ExportFormat,
     TaxonomyResponse,
 )
 from ..services.contract_service import (
-    _category_names,
-    _detail_item,
-    get_contracts,
+    get_contract_details,
+    get_contract_facets,
     get_taxonomy,
+    stream_contracts,
+)
+from ..services.contract_export import MEDIA_TYPES, encode_export
+from ..services.contract_list_cache import (
+    current_generation,
+    get_contracts_cached,
 )
+from ..services.contract_read_model import ContractReadModelCache
+from ..services.dataset_snapshot import DatasetSnapshot
 
 router = APIRouter(
     prefix="/contracts",
@@ -26,6 +52,32 @@ router = APIRouter(
 )
 
 
+def _generation_validators(generation: int, *identity) -> dict[str, str] | None:
+    """Validators for a body the ingestion generation and `identity` pin exactly.
+
+    Contracts change only when an ingestion run commits, so for the by-id routes the
+    tag is known before any query. With the generation unknown (no Valkey, or no
+    commit since it came up) nothing can be vouched for: None, and the response goes
+    out without validators.
+    """
+    if generation <= 0:
+        return None
+    return validator_headers(
+        strong_etag(*identity, generation),
+        seconds_until_next_ingest(
+            generation, get_settings().AGGREGATION_SCHEDULER_INTERVAL_SECONDS
+        ),
+        last_modified=generation_committed_at(generation),
+    )
+
+
+def _still_valid(request: Request, headers: dict[str, str], generation: int) -> bool:
+    """Does the client's copy match, by If-None-Match or else by If-Modified-Since?"""
+    return etag_matches(request, headers["ETag"]) or unmodified_since(
+        request, generation_committed_at(generation)
+    )
+
+
 # This route must be defined BEFORE the /{contract_id} route.
 # FastAPI matches routes in order, so a request to /ships would otherwise
 # be incorrectly captured by the /{contract_id} route, leading to a
@@ -33,49 +85,219 @@ router = APIRouter(
 @router.get("/", response_model=ContractListResponse)
 async def list_public_contracts(
     filters: Annotated[ContractFilters, Query()],
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    cache: Redis | None = Depends(get_optional_cache),
+    snapshot: DatasetSnapshot | None = Depends(get_optional_dataset_snapshot),
+    read_models: ContractReadModelCache | None = Depends(get_optional_read_models),
 ):
     """
     Retrieves a paginated list of contracts based on specified filters.
 
     This endpoint uses a service layer to apply advanced filtering, sorting,
-    and pagination to public contracts.
+    and pagination to public contracts. Responses are cached per ingestion
+    generation; the data only changes when an ingestion run commits. Carries an
+    ETag, and answers a matching If-None-Match with 304.
+    """
+    page, generation = await get_contracts_cached(
+        db=db, redis=cache, filters=filters, snapshot=snapshot, read_models=read_models
+    )
+    # Tagged by content rather than by generation: within one generation a page
+    # still changes when the list cache recomputes it after its soonest row expires,
+    # and a generation tag would keep vouching for the row that dropped out. The tag
+    # is stored with the page, so a cache hit settles it without hashing the body or
+    # touching the database.
+    max_age = seconds_until_next_ingest(
+        generation, get_settings().AGGREGATION_SCHEDULER_INTERVAL_SECONDS
+    )
+    headers = validator_headers(
+        page.etag,
+        # Held no longer than the page's soonest expiry, for the list cache's reason.
+        page.fresh_for(max_age),
+    )
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    # Already JSON: rendered once, from trusted rows, by the list cache.
+    return RenderedJSONResponse(content=page.body, headers=headers)
+
+
+# Defined BEFORE /{contract_id} for the same reason as the routes around it.
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {media_type: {} for media_type in MEDIA_TYPES.values()},
+            "description": "Every matching contract as a list row, streamed.",
+        }
+    },
+)
+async def export_contracts(
+    filters: Annotated[ContractFilters, Query()],
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.ndjson,
+    db: AsyncSession = Depends(get_read_db),
+    snapshot: DatasetSnapshot | None = Depends(get_optional_dataset_snapshot),
+):
+    """
+    Streams every contract matching the filters, in the requested sort order, as
+    NDJSON (one list row per line) or CSV. page, size and cursor do not apply: the
+    export is the whole result, read in one query without a count.
     """
-    return await get_contracts(db=db, filters=filters)
+    rows = stream_contracts(
+        db,
+        filters,
+        category_names=snapshot.category_names if snapshot is not None else None,
+    )
+    return StreamingResponse(
+        encode_export(rows, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="contracts.{export_format.value}"'
+        },
+    )
+
+
+# Defined BEFORE /{contract_id}, like every fixed path in this router.
+@router.get("/batch", response_model=ContractBatchResponse)
+async def get_contracts_batch(
+    request: Request,
+    response: Response,
+    contract_ids: Annotated[
+        list[int], Query(min_length=1, max_length=MAX_BATCH_CONTRACT_IDS)
+    ],
+    db: AsyncSession = Depends(get_read_db),
+    cache: Redis | None = Depends(get_optional_cache),
+    snapshot: DatasetSnapshot | None = Depends(get_optional_dataset_snapshot),
+):
+    """
+    Retrieves several contracts by ID, each with its items, in one request: the same
+    body GET /contracts/{id} serves for each, keyed by contract id. Ids with no
+    contract are listed under `missing` rather than failing the batch. Carries an
+    ETag and Last-Modified, and answers any matching validator with 304 before any
+    query — "*" and If-Modified-Since included, since unknown ids do not make the
+    batch 404: it has a current representation whatever ids it names.
+    """
+    # Tagged over the de-duplicated, sorted ids: order and repeats select nothing
+    # different, so they do not earn a different tag.
+    requested = sorted(set(contract_ids))
+    generation = await current_generation(cache)
+    headers = _generation_validators(generation, "contracts", *requested)
+    if headers is not None and _still_valid(request, headers, generation):
+        return not_modified(headers)
+
+    contracts = await get_contract_details(
+        db,
+        requested,
+        category_names=snapshot.category_names if snapshot is not None else None,
+    )
+    if headers is not None:
+        response.headers.update(headers)
+    return ContractBatchResponse(
+        contracts=contracts,
+        missing=[contract_id for contract_id in requested if contract_id not in contracts],
+    )
+
+
+# Defined BEFORE /{contract_id}, like the routes above it.
+@router.get("/facets", response_model=ContractFacetsResponse)
+async def list_contract_facets(
+    filters: Annotated[ContractFilters, Query()],
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    cache: Redis | None = Depends(get_optional_cache),
+    read_models: ContractReadModelCache | None = Depends(get_optional_read_models),
+):
+    """
+    Counts per region, category, group, ship flag and BPC flag under the given
+    filters, for labelling the filter rail. Takes the list's filters; page, size,
+    cursor and sort are ignored. Carries an ETag, and answers a matching
+    If-None-Match with 304.
+    """
+    generation = await current_generation(cache)
+    facets = await get_contract_facets(
+        db=db,
+        filters=filters,
+        read_model=read_models.current(generation) if read_models is not None else None,
+    )
+    # Content-tagged, as the list is: counts change between commits as contracts expire.
+    headers = validator_headers(
+        strong_etag(facets.model_dump_json()),
+        seconds_until_next_ingest(
+            generation, get_settings().AGGREGATION_SCHEDULER_INTERVAL_SECONDS
+        ),
+    )
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    response.headers.update(headers)
+    return facets
 
 
 # Subject to the same ordering rule as the route above: defined BEFORE
 # /{contract_id}, or "taxonomy" is parsed as a contract id and the request 422s.
 @router.get("/taxonomy", response_model=TaxonomyResponse)
 async def list_contract_taxonomy(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    cache: Redis | None = Depends(get_optional_cache),
+    snapshot: DatasetSnapshot | None = Depends(get_optional_dataset_snapshot),
 ):
     """
     Retrieves the dogma category and group option lists for the item-level filters,
-    with a readiness signal saying whether those filters can be trusted yet.
+    with a readiness signal saying whether those filters can be trusted yet. Carries
+    an ETag, and answers a matching If-None-Match with 304.
     """
-    return await get_taxonomy(db=db)
+    taxonomy = snapshot.taxonomy if snapshot is not None else await get_taxonomy(db=db)
+    # Content-tagged like the list: the readiness signal can flip between commits as
+    # live contracts expire, so the generation alone does not pin this body.
+    headers = validator_headers(
+        strong_etag(taxonomy.model_dump_json()),
+        seconds_until_next_ingest(
+            await current_generation(cache),
+            get_settings().AGGREGATION_SCHEDULER_INTERVAL_SECONDS,
+        ),
+    )
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    response.headers.update(headers)
+    return taxonomy
 
 
 @router.get("/{contract_id}", response_model=ContractDetailSchema)
 async def get_contract(
     contract_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    cache: Redis | None = Depends(get_optional_cache),
+    snapshot: DatasetSnapshot | None = Depends(get_optional_dataset_snapshot),
 ):
     """
-    Retrieves a single contract by its ID, including its items.
+    Retrieves a single contract by its ID, including its items. Carries an ETag
+    and Last-Modified, and answers a matching ETag with 304 before the contract is
+    read; "*" and If-Modified-Since only once it has been found.
     """
-    query = (
-        select(Contract)
-        .where(Contract.contract_id == contract_id)
-        .options(selectinload(Contract.items))
-    )
-    result = await db.execute(query)
-    contract = result.scalar_one_or_none()
+    generation = await current_generation(cache)
+    headers = _generation_validators(generation, "contract", contract_id)
+    # Only the exact tag is settled before the read: it is issued with a 200 and so
+    # vouches that the contract exists. "*" and a date vouch for nothing, and an
+    # unknown id must 404 (RFC 9110 §13.1.2: "*" needs a current representation).
+    if headers is not None and etag_matches(request, headers["ETag"], wildcard=False):
+        return not_modified(headers)
 
-    if not contract:
+    # The batch route's loader with a batch of one: the same two queries and the
+    # same builder, so a contract reads identically through either route.
+    contracts = await get_contract_details(
+        db,
+        [contract_id],
+        category_names=snapshot.category_names if snapshot is not None else None,
+    )
+    if contract_id not in contracts:
         raise HTTPException(status_code=404, detail="Contract not found")
 
-    # The same category-name lookup the list path uses: composition is derived here
-    # too, and without the names every category on the detail page reads as null.
-    return _detail_item(contract, await _category_names(db))
+    if headers is not None:
+        if _still_valid(request, headers, generation):
+            return not_modified(headers)
+        response.headers.update(headers)
+    return contracts[contract_id]
@@ -1,15 +1,16 @@
-# ABOUTME: Operational endpoints — /ready (dependency + freshness readiness; deploy health gate).
+# ABOUTME: Operational endpoints — /ready (dependency + freshness readiness; deploy health gate), /ops/slow-queries.
 # ABOUTME: /health (in main.py) stays the dependency-free liveness stub per observability-spec §2.5.
 import asyncio
 import json
 import os
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Request, Response
+from fastapi import APIRouter, HTTPException, Request, Response
 from sqlalchemy import text
 
 from ..core.cache import init_cache
 from ..core.config import get_settings
+from ..core.query_metrics import slow_query_logs
 from ..db import async_engine
 from ..services.background_aggregation import INGEST_LAST_RUN_KEY
 
@@ -99,3 +100,23 @@ async def ready(request: Request, response: Response):
     if not (db_ok and cache_ok):
         response.status_code = 503
     return checks
+
+
+@router.get("/ops/slow-queries", include_in_schema=False)
+async def slow_queries(request: Request):
+    """This process's recent slow SQL statements with their captured plans, newest first,
+    across every instrumented engine (each entry names its own).
+
+    Gated like /metrics (METRICS_TOKEN): the plans are scrubbed of bound values, but
+    they still describe the schema and its indexes. Per process — each worker holds
+    the statements it ran.
+    """
+    token = get_settings().METRICS_TOKEN.get_secret_value()
+    if token and request.headers.get("authorization") != f"Bearer {token}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    statements = [entry for log in slow_query_logs.values() for entry in log.entries()]
+    statements.sort(key=lambda entry: entry["observed_at"], reverse=True)
+    return {
+        "threshold_ms": get_settings().SLOW_QUERY_THRESHOLD_MS,
+        "statements": statements,
+    }
@@ -0,0 +1,108 @@
+# ABOUTME: Conditional GET for the read endpoints — strong ETags, If-None-Match / If-Modified-Since,
+# ABOUTME: and a Cache-Control max-age that runs out when the next ingestion run is due.
+import hashlib
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+
+def strong_etag(*parts: object) -> str:
+    """A quoted strong entity tag over `parts`.
+
+    Strong because every part is either the representation itself or something that
+    pins it byte for byte, so two responses sharing a tag are interchangeable — which
+    is what lets a 304 stand in for the body. A rendered body is hashed as the bytes
+    it is.
+    """
+    digest = hashlib.sha256(
+        b"\x1f".join(
+            part if isinstance(part, bytes) else str(part).encode() for part in parts
+        )
+    ).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(request: Request, etag: str, wildcard: bool = True) -> bool:
+    """Does If-None-Match name `etag`?
+
+    If-None-Match uses the weak comparison (RFC 9110 §13.1.2), so a W/ prefix a proxy
+    put on our tag still matches it. "*" matches any current representation — pass
+    wildcard=False while it is not yet known that one exists.
+    """
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return wildcard
+    return etag in (candidate.strip().removeprefix("W/") for candidate in header.split(","))
+
+
+def unmodified_since(request: Request, last_modified: datetime) -> bool:
+    """Is `last_modified` no later than If-Modified-Since?
+
+    Ignored whenever If-None-Match is present, as RFC 9110 §13.1.3 requires — the tag
+    is the more precise validator. HTTP dates carry whole seconds, so the comparison
+    drops sub-second precision; an unparseable date answers False and serves the body.
+    """
+    if "if-none-match" in request.headers:
+        return False
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def generation_committed_at(generation: int) -> datetime:
+    """When the run that published `generation` committed: generations are seeded from
+    the commit clock in epoch milliseconds (ContractAggregationService._publish_generation)."""
+    return datetime.fromtimestamp(generation / 1000, tz=timezone.utc)
+
+
+def seconds_until_next_ingest(generation: int, interval_seconds: int) -> int:
+    """How long a response built on `generation` can be reused without asking again.
+
+    The next run is due one scheduler interval after the last commit. Clamped to that
+    interval, and to 0 once the run is overdue — a run that committed nothing leaves
+    the generation where it was, and from then on clients revalidate every time, which
+    costs them a 304.
+    """
+    if generation <= 0:
+        return 0
+    due = generation / 1000 + interval_seconds
+    return max(0, min(interval_seconds, int(due - time.time())))
+
+
+def validator_headers(
+    etag: str, max_age: int, last_modified: datetime | None = None
+) -> dict[str, str]:
+    """The headers a 200 and its 304 both carry, so a revalidation refreshes freshness.
+
+    public: the data is the same for every caller and carries nothing per-user.
+    """
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def not_modified(headers: dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+class RenderedJSONResponse(Response):
+    """A JSON body that is already bytes, sent as is.
+
+    Returned in place of the model, so FastAPI neither validates it against the
+    route's response_model (which stays declared, for the OpenAPI document) nor
+    re-encodes it.
+    """
+
+    media_type = "application/json"
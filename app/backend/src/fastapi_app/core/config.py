@@ -73,21 +73,124 @@ class Settings(BaseSettings):
         default=100,
         description="For dev, limit the number of contracts processed. Set to None or 0 to disable.",
     )
+    # Directory holding an extracted copy of CCP's JSONL SDE; ingestion reads the
+    # stargate graph from its mapSolarSystems.jsonl and mapStargates.jsonl at startup
+    # and stamps every courier's route jumps from it (services/route_graph.py). Empty:
+    # couriers keep NULL jumps and reward-per-jump.
+    SDE_DIR: str = ""
+    # Route couriers along the shortest all-high-sec path where one exists, falling back
+    # to the shortest path (Contract.route_highsec says which). False: always shortest.
+    COURIER_ROUTE_PREFER_HIGHSEC: bool = True
+
+    # Cache-aside for GET /contracts (services/contract_list_cache.py). Entries are keyed
+    # by the ingestion generation, so a committed run invalidates them all at once; this
+    # TTL is only the safety net for a lost generation bump. One scheduler interval by
+    # default, so the default landing query is computed once per ingest. 0 disables.
+    CONTRACT_LIST_CACHE_TTL_SECONDS: int = 3600
+
+    # Cross-process single flight for list cache misses (contract_list_cache._fill): the
+    # first process to miss a page holds a Valkey lock this long while it computes, and
+    # the others wait up to this long for its entry before computing their own. Well
+    # past a normal list computation; 0 turns the lock off (concurrent identical
+    # requests within one process still share one computation).
+    CONTRACT_LIST_FILL_LOCK_SECONDS: int = 10
+
+    # Post-ingest warming (contract_list_cache.warm_popular_pages): after a commit, the
+    # aggregation job computes this many of the most requested list pages under the new
+    # generation before announcing it, so the first readers after an ingest hit instead
+    # of all missing at once. Popularity is a per-generation tally of filter sets with
+    # no search text or cursor in them. 0 disables warming and the tally.
+    CONTRACT_LIST_WARM_TOP_N: int = 20
+
+    # Process-local snapshot of dataset metadata — category names, coverage, taxonomy,
+    # per-segment totals (services/dataset_snapshot.py). Dropped when an ingest commit
+    # is announced over Valkey pub/sub; this age is the backstop for an announcement
+    # the process missed (listener reconnecting, or no Valkey at all), and also bounds
+    # how long the totals can count contracts that expired since. 0 disables the snapshot.
+    DATASET_SNAPSHOT_MAX_AGE_SECONDS: int = 300
+
+    # How many pooled connections one GET /contracts may run its independent queries
+    # on at once (counts, page, residual count, coverage), all reading one exported
+    # snapshot. 1 runs them in order on the request's session. They come out of the
+    # request's own pool (API or replica) beside the connection its session holds, so
+    # a request takes only as many as that pool has spare at the time and runs in
+    # order when fewer than two are; keep it well under the pool size all the same.
+    CONTRACT_LIST_QUERY_FANOUT: int = 1
+
+    # Ceiling for counting a broad ad-hoc list request (contract_service._capped_counts).
+    # When the planner expects the filtered corpus to hold at least this many contracts,
+    # each figure is counted only up to it and reported as "N+" — nobody pages through
+    # ten thousand results, and stopping there spares the scan of the rest. Requests
+    # the planner expects to be narrower are counted exactly. 0 always counts exactly.
+    CONTRACT_COUNT_CAP: int = 10_000
+
+    # In-process read model of the live corpus (services/contract_read_model.py): list
+    # pages, counts and facets are computed in memory, and only a page's rows and a
+    # search term's matches are read from Postgres. Rebuilt per ingestion generation,
+    # so it needs Valkey; without it the setting has no effect. Costs each API process
+    # the corpus in memory (tens of MB at 50k contracts) and one full read per commit.
+    CONTRACT_READ_MODEL_ENABLED: bool = False
+
+    # SQL statement instrumentation (core/query_metrics.py). A statement slower than
+    # this is counted and logged, and a slow SELECT has its EXPLAIN (ANALYZE, BUFFERS)
+    # plan captured — at most once per statement family per interval, since the
+    # capture runs the statement again. 0 disables slow-statement handling; the
+    # latency histograms are always recorded.
+    SLOW_QUERY_THRESHOLD_MS: int = 500
+    SLOW_QUERY_PLAN_INTERVAL_SECONDS: int = 300
+    # Every statement family, fast or slow, has its planning time sampled with a plain
+    # EXPLAIN (SUMMARY) — planned, never executed — at most once per interval, into
+    # hangar_bay_db_statement_planning_seconds. 0 leaves only the slow captures'.
+    PLANNING_SAMPLE_INTERVAL_SECONDS: int = 300
 
     # --- M3 account features ---
     # Per-user soft caps (best-effort count-checks, design §3.5).
     MAX_SAVED_SEARCHES_PER_USER: int = 100
     MAX_WATCHLIST_ITEMS_PER_USER: int = 200
     WATCHLIST_MATCH_INTERVAL_SECONDS: int = 900        # 15 min; also derives the matcher lock TTL
+    WATCHLIST_FULL_MATCH_INTERVAL_SECONDS: int = 21600  # 6 h between full reconciling rematches
     NOTIFICATION_RETENTION_DAYS: int = 90              # prune window (matcher §4.4 step 5)
 
     # Database + cache
     DATABASE_URL: str = Field(..., description="SQLAlchemy database connection string.")
+    # Optional streaming replica for the public read routes (contracts, taxonomy). A
+    # request goes to it only once it has replayed the latest ingest commit, and to the
+    # primary otherwise (core/read_replica.py). Empty: everything reads the primary.
+    DATABASE_READ_URL: str = ""
+    # How long an ingest run waits for the replica to replay its commit before it
+    # announces the new generation anyway (readers then use the primary until it has).
+    READ_REPLICA_CATCHUP_TIMEOUT_SECONDS: int = 30
+    # Connection pools, one per workload (db.py): requests, the ingest run, the
+    # watchlist matcher, and the API process's background reads — read model rebuilds
+    # and every primary pool's slow-statement plan captures. A background job can then
+    # only exhaust its own pool, never the one requests check out of. Per process, the
+    # primary sees at most the sum of all eight; keep that under the server's
+    # max_connections less the slots taken by other processes and the reserved
+    # superuser ones (render.yaml's database plan sets it). The defaults total 10 —
+    # API 5+2, ingest 1+0, matcher 1+0, background 1+0 — the budget of the single 5+5
+    # pool the four used to share, since Render Basic's is small. Ingest and the
+    # matcher each hold one session at a time, so a base connection covers them.
+    #
+    # Worst case on the API pool is 7 checkouts: one per request in flight, with an
+    # export holding its one for the whole download and a dataset snapshot rebuild
+    # running on the request's own session, plus CONTRACT_LIST_QUERY_FANOUT extras
+    # taken only from connections spare at the time. Nothing in the background takes
+    # an API connection, so all 7 serve requests; an eighth concurrent request waits
+    # for a checkout. The replica pool is sized like the API pool, on the replica's
+    # own budget.
+    DB_POOL_API_SIZE: int = 5
+    DB_POOL_API_MAX_OVERFLOW: int = 2
+    DB_POOL_INGEST_SIZE: int = 1
+    DB_POOL_INGEST_MAX_OVERFLOW: int = 0
+    DB_POOL_MATCHER_SIZE: int = 1
+    DB_POOL_MATCHER_MAX_OVERFLOW: int = 0
+    DB_POOL_BACKGROUND_SIZE: int = 1
+    DB_POOL_BACKGROUND_MAX_OVERFLOW: int = 0
     CACHE_URL: str = Field(..., description="Redis/Valkey cache connection string.")
     DATABASE_URL_TESTS: Optional[PostgresDsn] = None   # conftest requires this
     CACHE_URL_TESTS: Optional[AnyUrl] = None
 
-    @field_validator("DATABASE_URL", mode="before")
+    @field_validator("DATABASE_URL", "DATABASE_READ_URL", mode="before")
     @classmethod
     def normalize_database_url_driver(cls, value: Any) -> Any:
         """Render/most managed platforms inject postgresql:// URLs; the async engine and
@@ -1,11 +1,17 @@
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 import httpx
 from fastapi import Depends, HTTPException, Request, status
 from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .config import Settings, get_settings
 from .esi_client_class import ESIClient
+from .read_replica import ReplicaLagGuard
+from .. import db as database
+from ..db import get_db
+from ..services.contract_read_model import ContractReadModelCache
+from ..services.dataset_snapshot import DatasetSnapshot
 
 
 async def get_cache(request: Request) -> Redis:
@@ -22,6 +28,63 @@ async def get_cache(request: Request) -> Redis:
     return redis_client
 
 
+async def get_optional_cache(request: Request) -> Optional[Redis]:
+    """
+    FastAPI dependency for callers that treat the cache as an optimization: the
+    initialized Redis client, or None when startup could not connect. Unlike
+    get_cache it never raises, so a Valkey outage degrades these routes to their
+    uncached path instead of failing them with a 503.
+    """
+    return getattr(request.app.state, "redis", None)
+
+
+# One per process: what it remembers is which commit position the replica has replayed.
+_replica_guard = ReplicaLagGuard()
+
+
+async def get_read_db(
+    request: Request, db: AsyncSession = Depends(get_db)
+) -> AsyncIterator[AsyncSession]:
+    """
+    FastAPI dependency for read-only routes over ingested data: a replica session when
+    a replica is configured and has replayed the latest ingest commit, otherwise the
+    primary session `db` — which costs nothing unless used, since a session takes its
+    connection on first query. Nothing is committed through it; a route that writes
+    takes get_db instead.
+    """
+    if database.ReadSessionLocal is not None:
+        async with database.ReadSessionLocal() as replica:
+            if await _replica_guard.replica_is_current(
+                replica, getattr(request.app.state, "redis", None)
+            ):
+                yield replica
+                return
+    yield db
+
+
+async def get_optional_dataset_snapshot(
+    request: Request, db: AsyncSession = Depends(get_read_db)
+) -> Optional[DatasetSnapshot]:
+    """
+    FastAPI dependency for the process's dataset metadata snapshot (category names,
+    coverage, taxonomy), or None when startup did not set one up — disabled, or an
+    app run without its lifespan. Callers then query the metadata themselves.
+    """
+    snapshots = getattr(request.app.state, "dataset_snapshot", None)
+    if snapshots is None:
+        return None
+    return await snapshots.get(db)
+
+
+async def get_optional_read_models(request: Request) -> Optional[ContractReadModelCache]:
+    """
+    FastAPI dependency for the process's contract read model holder, or None when it
+    is disabled (CONTRACT_READ_MODEL_ENABLED) or Valkey was unavailable at startup.
+    Callers resolve the model for their generation and otherwise query SQL.
+    """
+    return getattr(request.app.state, "contract_read_model", None)
+
+
 async def get_http_client(request: Request) -> httpx.AsyncClient:
     """
     FastAPI dependency to get the shared httpx.AsyncClient from the app state.
@@ -479,6 +479,17 @@ class ESIClient:
         """
         return await self._get_esi_object(f"/v2/universe/stations/{station_id}/")
 
+    async def get_universe_system(self, system_id: int) -> dict[str, Any]:
+        """Fetches static solar-system info (name, security_status, constellation_id).
+
+        The payload names no region; that is one level up, on the constellation.
+        """
+        return await self._get_esi_object(f"/v4/universe/systems/{system_id}/")
+
+    async def get_universe_constellation(self, constellation_id: int) -> dict[str, Any]:
+        """Fetches static constellation info (name, region_id, systems)."""
+        return await self._get_esi_object(f"/v1/universe/constellations/{constellation_id}/")
+
     async def resolve_ids_to_names(self, ids: list[int]) -> dict[int, str]:
         """Resolves a list of EVE Online IDs to their names."""
         if not ids:
@@ -1,8 +1,95 @@
 # ABOUTME: Process-global Prometheus instruments that are not per-request (the
-# ABOUTME: instrumentator owns HTTP metrics; this module owns job/ingestion gauges).
-from prometheus_client import Gauge
+# ABOUTME: instrumentator owns HTTP metrics; this module owns job/ingestion/cache/SQL instruments).
+from prometheus_client import Counter, Gauge, Histogram
 
 last_ingest_success_timestamp = Gauge(
     "hangar_bay_last_ingest_success_timestamp",
     "Unix time of the last aggregation run that committed data (success or partial).",
 )
+
+# hit / miss / coalesced / error. "coalesced" is a miss answered by another request's
+# computation of the same page (contract_list_cache._single_flight / _fill); "miss" counts
+# the computations. "error" is a cache round-trip that failed and fell through to the
+# database — the request still succeeds, so only this counter shows a degraded cache.
+contract_list_cache_lookups = Counter(
+    "hangar_bay_contract_list_cache_lookups_total",
+    "GET /contracts response-cache lookups by outcome.",
+    ["outcome"],
+)
+
+# Why each API process rebuilt its dataset snapshot (services/dataset_snapshot.py):
+# cold / invalidated / expired. Steady state is one "invalidated" per process per
+# ingest commit; a climbing "expired" means commit announcements are not arriving.
+dataset_snapshot_rebuilds = Counter(
+    "hangar_bay_dataset_snapshot_rebuilds_total",
+    "Dataset metadata snapshot rebuilds by reason.",
+    ["reason"],
+)
+
+# Contract read model rebuilds (services/contract_read_model.py): built / failed. Steady
+# state is one "built" per process per ingest commit; until a build lands, list and
+# facet requests are answered by SQL.
+contract_read_model_builds = Counter(
+    "hangar_bay_contract_read_model_builds_total",
+    "In-memory contract read model rebuilds by outcome.",
+    ["outcome"],
+)
+
+# Cursor execution time per engine and statement family (core/query_metrics.py). The
+# family is a literal the calling code names, or verb:table for untagged statements,
+# so the label set is bounded by the code. Buckets run from a primary-key lookup to a corpus count.
+db_statement_duration_seconds = Histogram(
+    "hangar_bay_db_statement_duration_seconds",
+    "SQL statement execution time by engine and statement family.",
+    ["engine", "family"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+# Statement reuse per engine (core/query_metrics.py). cache="compiled" is SQLAlchemy's
+# compiled cache (hit / miss / uncached — text() and driver SQL have no cache key);
+# cache="prepared" is asyncpg's per-connection prepared-statement cache (hit / miss). A
+# prepared hit skips Postgres' parse, and once the plan goes generic its planning too,
+# so a falling hit rate means statement text has started to vary per request.
+db_statement_cache_lookups = Counter(
+    "hangar_bay_db_statement_cache_lookups_total",
+    "SQL statement cache lookups by engine, cache and outcome.",
+    ["engine", "cache", "outcome"],
+)
+
+# Planning time Postgres reported for a family's statements: a periodic EXPLAIN
+# (SUMMARY) sample of every family (PLANNING_SAMPLE_INTERVAL_SECONDS), plus the
+# "Planning Time" of each slow statement's captured EXPLAIN ANALYZE.
+db_statement_planning_seconds = Histogram(
+    "hangar_bay_db_statement_planning_seconds",
+    "Postgres planning time of sampled statements, by engine and statement family.",
+    ["engine", "family"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+
+# Statements over SLOW_QUERY_THRESHOLD_MS, whether or not their plan was captured.
+db_slow_statements = Counter(
+    "hangar_bay_db_slow_statements_total",
+    "SQL statements slower than the slow-query threshold, by engine and statement family.",
+    ["engine", "family"],
+)
+
+# Connection-pool occupancy per workload pool — api / ingest / matcher / replica
+# (db.py, core/pool_metrics.py). Each workload has its own pool so background jobs
+# cannot take the connections requests are waiting on; these show whether each
+# pool's size fits its workload.
+db_pool_checked_out = Gauge(
+    "hangar_bay_db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    ["pool"],
+)
+db_pool_overflow = Gauge(
+    "hangar_bay_db_pool_overflow",
+    "Connections open beyond the pool's base size.",
+    ["pool"],
+)
+db_pool_checkout_seconds = Histogram(
+    "hangar_bay_db_pool_checkout_seconds",
+    "Time to check a connection out of the pool, including any wait for a free one.",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
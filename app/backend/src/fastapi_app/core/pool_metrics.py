@@ -0,0 +1,52 @@
+# ABOUTME: Connection-pool instrumentation — a queue pool that times checkouts, and gauges reading each
+# ABOUTME: named pool's checked-out and overflow connections at scrape time.
+import time
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .metrics import db_pool_checked_out, db_pool_checkout_seconds, db_pool_overflow
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """The async engine's default pool, timing how long each checkout takes.
+
+    Wraps _do_get — the one place a checkout waits for a free connection — so the
+    figure covers the wait plus, when the pool opens a new connection, the connect.
+    A pool spending real time here is too small for its workload. `metrics_name` is
+    assigned once the engine exists (instrument_pool) and carried across recreate(),
+    which engine.dispose() calls to replace the pool.
+    """
+
+    metrics_name = "unnamed"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_seconds.labels(pool=self.metrics_name).observe(
+                time.perf_counter() - started
+            )
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def instrument_pool(name: str, engine: AsyncEngine) -> None:
+    """Label `engine`'s pool `name` and publish its occupancy.
+
+    The gauges read engine.sync_engine.pool when scraped rather than holding the pool,
+    so they follow the replacement a dispose() installs.
+    """
+    engine.sync_engine.pool.metrics_name = name
+    db_pool_checked_out.labels(pool=name).set_function(
+        lambda: engine.sync_engine.pool.checkedout()
+    )
+    # QueuePool.overflow() counts from -pool_size up; below zero the pool is still
+    # inside its base size, so only the positive part is overflow in use.
+    db_pool_overflow.labels(pool=name).set_function(
+        lambda: max(0, engine.sync_engine.pool.overflow())
+    )
@@ -0,0 +1,388 @@
+# ABOUTME: SQL statement instrumentation on each engine — latency histograms and statement-cache reuse per
+# ABOUTME: family, planning time sampled per family, and slow SELECTs' plans captured into a scrubbed in-memory ring.
+import asyncio
+import re
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import MetaData, event
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .logging import get_logger
+from .metrics import (
+    db_slow_statements,
+    db_statement_cache_lookups,
+    db_statement_duration_seconds,
+    db_statement_planning_seconds,
+)
+
+logger = get_logger(__name__)
+
+# Execution option naming a statement's family: `select(...).execution_options(
+# query_family="contracts.page")`. Families are literals written at the call site, so
+# the label set is fixed by the code, never by the data.
+QUERY_FAMILY_OPTION = "query_family"
+
+# The family of the capture's own EXPLAIN, which must never trigger another capture.
+EXPLAIN_FAMILY = "ops.explain"
+
+SLOW_QUERY_RING_SIZE = 50
+# The capture re-runs the statement, so it gets a hard ceiling of its own: a statement
+# slow enough to be captured must not hold a pool connection indefinitely a second time.
+PLAN_CAPTURE_TIMEOUT_MS = 30_000
+# Statement text is placeholders only, but the page query with every filter applied
+# runs to a few kilobytes; the ring holds fifty of them. Caps the stored and logged
+# copy only — the capture EXPLAINs the whole statement.
+MAX_STATEMENT_CHARS = 4000
+
+# Every instrumented engine's slow-statement log, by engine name, for /ops/slow-queries.
+slow_query_logs: dict[str, "SlowQueryLog"] = {}
+
+_VERBS = frozenset({"select", "insert", "update", "delete", "with"})
+_LEADING_WORD = re.compile(r"\s*(\w+)")
+_TARGET_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+\"?(\w+)", re.IGNORECASE)
+
+# Plan lines that print a predicate, where a bound value reappears as a literal.
+_CONDITION_LINE = re.compile(
+    r"^(\s*(?:Filter|Index Cond|Recheck Cond|Join Filter|Hash Cond|Merge Cond"
+    r"|One-Time Filter|TID Cond):)(.*)$"
+)
+_QUOTED_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_PLANNING_TIME = re.compile(r"^\s*Planning Time: ([\d.]+) ms")
+_NUMERIC_LITERAL = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?(?![\w.])")
+
+
+def statement_family(statement: str, execution_options, metadata: MetaData) -> str:
+    """The histogram label for one statement.
+
+    The caller's query_family option when it set one. Otherwise the verb and the first
+    table the statement reads or writes, e.g. "select:watchlist_items" — accepted only
+    when it is one of the application's own tables, so a statement the regex misreads
+    lands in "other" instead of minting a label.
+    """
+    family = execution_options.get(QUERY_FAMILY_OPTION)
+    if family:
+        return family
+    verb = _LEADING_WORD.match(statement)
+    verb = verb.group(1).lower() if verb else ""
+    if verb not in _VERBS:
+        return "other"
+    target = _TARGET_TABLE.search(statement)
+    if target is None or target.group(1).lower() not in metadata.tables:
+        return f"{verb}:other"
+    return f"{verb}:{target.group(1).lower()}"
+
+
+def scrub_plan(lines: list[str]) -> list[str]:
+    """A plan with the bound values taken back out, to the standard hide_parameters sets.
+
+    Postgres plans with the actual values for the first executions of a prepared
+    statement, so a predicate line reads `Filter: (title ~~* '%user text%')`. Every
+    quoted literal goes, and so does every number on a predicate line; the costs, row
+    counts and buffer figures live on other lines and are kept.
+    """
+    scrubbed = []
+    for line in lines:
+        line = _QUOTED_LITERAL.sub("'?'", line)
+        condition = _CONDITION_LINE.match(line)
+        if condition is not None:
+            line = condition.group(1) + _NUMERIC_LITERAL.sub("?", condition.group(2))
+        scrubbed.append(line)
+    return scrubbed
+
+
+def planning_seconds(plan: list[str]) -> float | None:
+    """The planning time an EXPLAIN printed (ANALYZE or SUMMARY), in seconds; None when
+    it printed none."""
+    for line in plan:
+        match = _PLANNING_TIME.match(line)
+        if match is not None:
+            return float(match.group(1)) / 1000
+    return None
+
+
+def _count_statement_reuse(engine_name: str, conn, statement: str, context) -> None:
+    """Count whether this execution reused a compiled and a prepared statement.
+
+    The prepared-statement cache is the asyncpg adapter's own, keyed by statement text
+    per connection; SQLAlchemy keeps it on a private attribute, so under another driver
+    or a version without it only the compiled cache is counted. Looked up before the
+    execution, which is what fills it.
+    """
+    compiled = getattr(context, "cache_hit", None)
+    db_statement_cache_lookups.labels(
+        engine=engine_name,
+        cache="compiled",
+        outcome=(
+            "hit" if compiled is CacheStats.CACHE_HIT
+            else "miss" if compiled is CacheStats.CACHE_MISS
+            else "uncached"
+        ),
+    ).inc()
+    prepared = getattr(conn.connection.dbapi_connection, "_prepared_statement_cache", None)
+    if prepared is not None:
+        db_statement_cache_lookups.labels(
+            engine=engine_name,
+            cache="prepared",
+            outcome="hit" if statement in prepared else "miss",
+        ).inc()
+
+
+def _explainable(statement: str) -> bool:
+    """Only a read can be EXPLAIN ANALYZEd: ANALYZE executes the statement, so a write
+    would be applied twice."""
+    head = statement.lstrip()[:6].lower()
+    if head == "select":
+        return True
+    if head.startswith("with"):
+        return not re.search(r"\b(insert|update|delete)\b", statement, re.IGNORECASE)
+    return False
+
+
+def _plannable(statement: str) -> bool:
+    """Can the statement be EXPLAINed without ANALYZE? Plain EXPLAIN only plans, so a
+    write is as safe as a read; what it cannot take is anything but a DML statement."""
+    verb = _LEADING_WORD.match(statement)
+    return verb is not None and verb.group(1).lower() in _VERBS
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    """The loop a capture or sample can run on; None under a synchronous caller."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+@dataclass(frozen=True)
+class SlowStatement:
+    engine: str
+    family: str
+    duration_ms: float
+    observed_at: str
+    statement: str
+    plan: list[str] | None  # None when not captured (a write, or sampled out)
+
+
+class SlowQueryLog:
+    """Decides which slow statements get a plan captured, and holds the recent ones.
+
+    A statement over the threshold is always counted and logged. Its plan is captured
+    when it is a read and its family has had no capture within `interval_seconds` — a
+    plan flip shows up within one interval, and a statement that is slow on every
+    request is not re-analyzed on every request. The capture runs as its own task on
+    a connection from `capture_engine`, after the request's statement has already
+    returned, so it costs the request nothing but does cost the database the
+    statement once more. A capture engine with a pool of its own keeps that second
+    run from holding a connection the instrumented workload needs.
+
+    Independently of speed, each family's planning time is sampled at most once per
+    `planning_interval_seconds` with a plain EXPLAIN (SUMMARY) on the same engine:
+    planning only, nothing executed, so it costs the database one plan, and a family
+    whose planning grows shows up long before it is slow enough to be captured.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capture_engine: AsyncEngine,
+        threshold_ms: int,
+        interval_seconds: int,
+        planning_interval_seconds: int = 0,
+    ):
+        self.name = name
+        self._engine = capture_engine
+        self.threshold_ms = threshold_ms
+        self._interval_seconds = interval_seconds
+        self._planning_interval_seconds = planning_interval_seconds
+        self._last_capture: dict[str, float] = {}
+        self._last_planning_sample: dict[str, float] = {}
+        self._entries: deque[SlowStatement] = deque(maxlen=SLOW_QUERY_RING_SIZE)
+        self._captures: set[asyncio.Task] = set()
+
+    def entries(self) -> list[dict]:
+        """The ring, newest first."""
+        return [asdict(entry) for entry in reversed(self._entries)]
+
+    def observe(
+        self, family: str, statement: str, parameters, duration: float, executemany: bool
+    ) -> None:
+        if family == EXPLAIN_FAMILY:
+            return
+        duration_ms = duration * 1000
+        if 0 < self.threshold_ms <= duration_ms:
+            self._slow(family, statement, parameters, duration_ms, executemany)
+        if not executemany:
+            self._sample_planning(family, statement, parameters)
+
+    def _slow(
+        self, family: str, statement: str, parameters, duration_ms: float, executemany: bool
+    ) -> None:
+        db_slow_statements.labels(engine=self.name, family=family).inc()
+
+        now = time.monotonic()
+        last = self._last_capture.get(family)
+        loop = None
+        if (
+            not executemany
+            and _explainable(statement)
+            and (last is None or now - last >= self._interval_seconds)
+        ):
+            loop = _running_loop()
+        if loop is None:
+            self._record(family, duration_ms, statement, plan=None)
+            return
+        self._last_capture[family] = now
+        # The capture's EXPLAIN ANALYZE reports planning time too: it stands in for
+        # this interval's sample.
+        self._last_planning_sample[family] = now
+        self._spawn(loop, self._capture(family, duration_ms, statement, parameters))
+
+    def _sample_planning(self, family: str, statement: str, parameters) -> None:
+        if self._planning_interval_seconds <= 0 or not _plannable(statement):
+            return
+        now = time.monotonic()
+        last = self._last_planning_sample.get(family)
+        if last is not None and now - last < self._planning_interval_seconds:
+            return
+        loop = _running_loop()
+        if loop is None:
+            return
+        self._last_planning_sample[family] = now
+        self._spawn(loop, self._sample(family, statement, parameters))
+
+    def _spawn(self, loop: asyncio.AbstractEventLoop, coro) -> None:
+        task = loop.create_task(coro)
+        self._captures.add(task)
+        task.add_done_callback(self._captures.discard)
+
+    async def drain(self) -> None:
+        """Wait for the captures and samples in flight. Tests use it; nothing else needs to."""
+        if self._captures:
+            await asyncio.gather(*self._captures, return_exceptions=True)
+
+    async def _capture(self, family: str, duration_ms: float, statement: str, parameters) -> None:
+        plan = None
+        try:
+            async with self._engine.connect() as conn:
+                options = {QUERY_FAMILY_OPTION: EXPLAIN_FAMILY}
+                # SET LOCAL lasts for the connection's transaction, which the context
+                # rolls back on exit, so the pooled connection goes back unchanged.
+                await conn.exec_driver_sql(
+                    f"SET LOCAL statement_timeout = {PLAN_CAPTURE_TIMEOUT_MS}",
+                    execution_options=options,
+                )
+                result = await conn.exec_driver_sql(
+                    "EXPLAIN (ANALYZE, BUFFERS) " + statement,
+                    parameters,
+                    execution_options=options,
+                )
+                plan = scrub_plan([row[0] for row in result.all()])
+            self._observe_planning(family, plan)
+        except Exception as exc:
+            # The exception text can quote the statement's values; its type cannot.
+            logger.warning(
+                "Slow query plan capture failed",
+                engine=self.name,
+                family=family,
+                error=type(exc).__name__,
+            )
+        self._record(family, duration_ms, statement, plan)
+
+    async def _sample(self, family: str, statement: str, parameters) -> None:
+        try:
+            async with self._engine.connect() as conn:
+                result = await conn.exec_driver_sql(
+                    "EXPLAIN (SUMMARY) " + statement,
+                    parameters,
+                    execution_options={QUERY_FAMILY_OPTION: EXPLAIN_FAMILY},
+                )
+                self._observe_planning(family, [row[0] for row in result.all()])
+        except Exception as exc:
+            logger.warning(
+                "Planning time sample failed",
+                engine=self.name,
+                family=family,
+                error=type(exc).__name__,
+            )
+
+    def _observe_planning(self, family: str, plan: list[str]) -> None:
+        planning = planning_seconds(plan)
+        if planning is not None:
+            db_statement_planning_seconds.labels(engine=self.name, family=family).observe(
+                planning
+            )
+
+    def _record(
+        self, family: str, duration_ms: float, statement: str, plan: list[str] | None
+    ) -> None:
+        statement = statement[:MAX_STATEMENT_CHARS]
+        entry = SlowStatement(
+            engine=self.name,
+            family=family,
+            duration_ms=round(duration_ms, 1),
+            observed_at=datetime.now(timezone.utc).isoformat(),
+            statement=statement,
+            plan=plan,
+        )
+        self._entries.append(entry)
+        logger.warning(
+            "Slow SQL statement",
+            engine=self.name,
+            family=family,
+            duration_ms=entry.duration_ms,
+            statement=statement,
+            plan=plan,
+        )
+
+
+def instrument_engine(
+    name: str,
+    engine: AsyncEngine,
+    metadata: MetaData,
+    *,
+    threshold_ms: int,
+    interval_seconds: int,
+    planning_interval_seconds: int = 0,
+    capture_engine: AsyncEngine | None = None,
+) -> SlowQueryLog:
+    """Attach the timing hooks to `engine` and return its slow-statement log, which is
+    also registered in slow_query_logs under `name` (the metrics' engine label).
+    Plans are captured, and planning time sampled every `planning_interval_seconds`
+    per family (0: only from captures), on `capture_engine`, by default `engine`
+    itself; it must reach the same database.
+
+    Times the cursor execution alone — the round trip to Postgres — not the ORM's
+    work on either side of it, which is what a plan change moves. Labels come from
+    statement_family, so the series count is bounded by the code. Also counts each
+    execution's compiled- and prepared-statement cache outcome (_count_statement_reuse).
+    """
+    slow_queries = SlowQueryLog(
+        name,
+        capture_engine or engine,
+        threshold_ms,
+        interval_seconds,
+        planning_interval_seconds=planning_interval_seconds,
+    )
+    slow_query_logs[name] = slow_queries
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _started(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._hangar_bay_started = time.perf_counter()
+            _count_statement_reuse(name, conn, statement, context)
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _finished(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_hangar_bay_started", None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        family = statement_family(statement, context.execution_options, metadata)
+        db_statement_duration_seconds.labels(engine=name, family=family).observe(duration)
+        slow_queries.observe(family, statement, parameters, duration, executemany)
+
+    return slow_queries
@@ -0,0 +1,89 @@
+# ABOUTME: Replica-lag guard for read routing — a read goes to the replica only once it has replayed
+# ABOUTME: the WAL position of the latest ingest commit, which ingestion records in Valkey.
+import asyncio
+import time
+
+from redis.asyncio import Redis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# The primary's WAL position just after the latest ingest commit, as pg_lsn text
+# ("16/B374D848"). Written before the generation is bumped, so any reader that sees a
+# generation also sees a position at least as new as that generation's commit.
+INGEST_COMMIT_LSN_KEY = "hangar-bay:ingest:commit-lsn"
+
+# On a standby pg_last_wal_replay_lsn() is the replayed position. On a server that is
+# not in recovery it is NULL, and that server has everything it wrote: COALESCE only
+# evaluates pg_current_wal_lsn() there, where it is allowed.
+_REPLAYED_THROUGH_SQL = text(
+    "SELECT COALESCE(pg_last_wal_replay_lsn(), pg_current_wal_lsn()) >= CAST(:lsn AS pg_lsn)"
+)
+
+REPLAY_POLL_SECONDS = 0.5
+
+
+async def replayed_through(db: AsyncSession | AsyncEngine, lsn: str) -> bool:
+    """Has the server behind `db` replayed the WAL up to `lsn`?"""
+    if isinstance(db, AsyncEngine):
+        async with db.connect() as conn:
+            return bool((await conn.execute(_REPLAYED_THROUGH_SQL, {"lsn": lsn})).scalar_one())
+    return bool((await db.execute(_REPLAYED_THROUGH_SQL, {"lsn": lsn})).scalar_one())
+
+
+class ReplicaLagGuard:
+    """Decides, per request, whether the replica is current enough to serve it.
+
+    Current means replayed through INGEST_COMMIT_LSN_KEY. Ingestion is the only
+    writer of what the read routes serve, so a replica past the latest ingest commit
+    holds exactly what the primary does. Every doubt resolves to the primary: no
+    Valkey client, no recorded position (before the first ingest, or evicted), or a
+    failed check.
+
+    A replica that has replayed a position has replayed it for good, so the check
+    runs once per recorded position per process; every request after that costs one
+    Valkey GET.
+    """
+
+    def __init__(self):
+        self._replayed_lsn: str | None = None
+
+    async def replica_is_current(self, replica: AsyncSession, redis: Redis | None) -> bool:
+        if redis is None:
+            return False
+        try:
+            lsn = await redis.get(INGEST_COMMIT_LSN_KEY)
+            if lsn is None:
+                return False
+            if lsn == self._replayed_lsn:
+                return True
+            if not await replayed_through(replica, lsn):
+                return False
+        except Exception:
+            logger.warning("Replica lag check failed; reading from the primary", exc_info=True)
+            return False
+        self._replayed_lsn = lsn
+        return True
+
+
+async def wait_for_replay(engine: AsyncEngine, lsn: str, timeout_seconds: float) -> bool:
+    """Poll the replica until it has replayed `lsn`, for at most `timeout_seconds`.
+
+    Ingestion calls this between its commit and the generation bump: a reader that
+    sees the new generation may then assume the replica holds it, and a page built
+    on the replica is never cached under a generation it predates. Returns False on
+    timeout — the bump goes ahead, and the guard keeps readers on the primary.
+    """
+    deadline = time.monotonic() + timeout_seconds
+    while True:
+        try:
+            if await replayed_through(engine, lsn):
+                return True
+        except Exception:
+            logger.warning("Replica replay check failed", exc_info=True)
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(REPLAY_POLL_SECONDS)
@@ -1,33 +1,138 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import declarative_base
 from typing import Callable
 from contextlib import AbstractAsyncContextManager
 
 from .core.config import get_settings
+from .core.pool_metrics import TimedQueuePool, instrument_pool
+from .core.query_metrics import instrument_engine
 
 Base = declarative_base()
 settings = get_settings()
 
-async_engine = create_async_engine(
+# The max_overflow each workload pool was configured with (DB_POOL_*), by pool name —
+# the name instrument_pool gives the pool as metrics_name. Read by code that budgets
+# a pool's capacity (contract_service._fanout_grant) instead of the pool's internals.
+pool_max_overflow: dict[str, int] = {}
+
+
+def _workload_engine(
+    name: str,
+    url: str,
+    *,
+    pool_size: int,
+    max_overflow: int,
+    capture_engine: AsyncEngine | None = None,
+) -> AsyncEngine:
+    """One workload's engine, with a pool of its own.
+
+    Requests, ingestion, the watchlist matcher and the API process's background reads
+    each get one (DB_POOL_* settings), so a long aggregation run, matcher pass or read
+    model build holds only its own connections and a list request never queues behind
+    them for a checkout. The sizes together are the
+    process's connection budget against the server's max_connections.
+
+    Slow-statement plans are captured on `capture_engine` when given, so re-running a
+    slow statement does not take a second connection from the workload's own pool.
+    """
+    engine = create_async_engine(
+        url,
+        echo=settings.ENVIRONMENT == "development",  # Log SQL queries in development
+        future=True,  # Use SQLAlchemy 2.0 style
+        pool_pre_ping=True,   # managed-PG restarts/pooler idle-kills must not surface as request 500s
+        poolclass=TimedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        # Bind values carry user-typed search text. Without this, every error wrapping a
+        # failed statement renders `[parameters: {...}]` into its str(), and that string
+        # reaches logs from several places at once — a service's own failure log, and
+        # main.py's generic_exception_handler, which logs str(exc) and the traceback.
+        hide_parameters=True,
+    )
+    instrument_pool(name, engine)
+    pool_max_overflow[name] = max_overflow
+    # Per-family statement latency, and plans for the slow ones (/ops/slow-queries).
+    instrument_engine(
+        name,
+        engine,
+        Base.metadata,
+        threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+        interval_seconds=settings.SLOW_QUERY_PLAN_INTERVAL_SECONDS,
+        planning_interval_seconds=settings.PLANNING_SAMPLE_INTERVAL_SECONDS,
+        capture_engine=capture_engine,
+    )
+    return engine
+
+
+def _session_factory(engine: AsyncEngine | None) -> async_sessionmaker[AsyncSession] | None:
+    if engine is None:
+        return None
+    return async_sessionmaker(
+        bind=engine,
+        class_=AsyncSession,
+        expire_on_commit=False,  # Good default for FastAPI dependencies
+        autoflush=False,
+    )
+
+
+# The API process's own background reads: the contract read model's rebuild per
+# generation (services/contract_read_model.py), a full-corpus read that would otherwise
+# hold a request connection for the whole build, and the slow-statement plan captures
+# of every primary pool below, each of which re-runs a statement for up to
+# PLAN_CAPTURE_TIMEOUT_MS.
+background_engine = _workload_engine(
+    "background",
+    settings.DATABASE_URL,
+    pool_size=settings.DB_POOL_BACKGROUND_SIZE,
+    max_overflow=settings.DB_POOL_BACKGROUND_MAX_OVERFLOW,
+)
+BackgroundSessionLocal = _session_factory(background_engine)
+
+# User requests (get_db), plus the app's own startup work and the /ready probe.
+async_engine = _workload_engine(
+    "api",
+    settings.DATABASE_URL,
+    pool_size=settings.DB_POOL_API_SIZE,
+    max_overflow=settings.DB_POOL_API_MAX_OVERFLOW,
+    capture_engine=background_engine,
+)
+AsyncSessionLocal = _session_factory(async_engine)
+
+# ContractAggregationService: one session per run, and the cache warming after it.
+ingest_engine = _workload_engine(
+    "ingest",
+    settings.DATABASE_URL,
+    pool_size=settings.DB_POOL_INGEST_SIZE,
+    max_overflow=settings.DB_POOL_INGEST_MAX_OVERFLOW,
+    capture_engine=background_engine,
+)
+IngestSessionLocal = _session_factory(ingest_engine)
+
+# WatchlistMatcherService: one session per pass, sized like ingestion.
+matcher_engine = _workload_engine(
+    "matcher",
     settings.DATABASE_URL,
-    echo=settings.ENVIRONMENT == "development",  # Log SQL queries in development
-    future=True,  # Use SQLAlchemy 2.0 style
-    pool_pre_ping=True,   # managed-PG restarts/pooler idle-kills must not surface as request 500s
-    pool_size=5,          # Render Basic's connection budget is small; scheduler + API share it
-    max_overflow=5,
-    # Bind values carry user-typed search text. Without this, every error wrapping a
-    # failed statement renders `[parameters: {...}]` into its str(), and that string
-    # reaches logs from several places at once — a service's own failure log, and
-    # main.py's generic_exception_handler, which logs str(exc) and the traceback.
-    hide_parameters=True,
+    pool_size=settings.DB_POOL_MATCHER_SIZE,
+    max_overflow=settings.DB_POOL_MATCHER_MAX_OVERFLOW,
+    capture_engine=background_engine,
 )
+MatcherSessionLocal = _session_factory(matcher_engine)
 
-AsyncSessionLocal = async_sessionmaker(
-    bind=async_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,  # Good default for FastAPI dependencies
-    autoflush=False,
+# Optional streaming replica for read-only routes (core/dependencies.get_read_db).
+# None when DATABASE_READ_URL is unset, and every read goes to the primary. Sized like
+# the API pool, whose traffic it takes; its connection budget is the replica's own, so
+# it captures its plans on itself, against the database that ran the statement.
+read_async_engine = (
+    _workload_engine(
+        "replica",
+        settings.DATABASE_READ_URL,
+        pool_size=settings.DB_POOL_API_SIZE,
+        max_overflow=settings.DB_POOL_API_MAX_OVERFLOW,
+    )
+    if settings.DATABASE_READ_URL
+    else None
 )
+ReadSessionLocal = _session_factory(read_async_engine)
 
 
 async def get_db_session_factory() -> Callable[..., AbstractAsyncContextManager[AsyncSession]]:
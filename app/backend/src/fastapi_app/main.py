@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import math
 import structlog
@@ -6,7 +7,7 @@ from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from prometheus_fastapi_instrumentator import Instrumentator
 
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import PlainTextResponse
@@ -17,9 +18,18 @@ from .core.http_client import init_http_client, close_http_client
 from .core.scheduler import add_aggregation_job, add_watchlist_matcher_job, create_scheduler
 from .core.logging import setup_logging, RequestIDMiddleware
 from .core.token_cipher import is_token_cipher_configured
-from .db import async_engine, Base
+from .db import AsyncSessionLocal, BackgroundSessionLocal, async_engine, Base
 from .core.esi_client_class import ESIClient  # For manual ESI client creation
 from .services.background_aggregation import ContractAggregationService  # For manual service creation
+from .services.contract_list_cache import current_generation, warm_popular_pages
+from .services.contract_read_model import ContractReadModelCache
+from .services.dataset_snapshot import DatasetSnapshotCache
+from .services.route_graph import (
+    StargateGraph,
+    StargateGraphUnavailableError,
+    install_stargate_graph,
+    load_stargate_graph,
+)
 from .services.watchlist_matcher import WatchlistMatcherService
 from .api import contracts as contracts_router
 from .api import auth as auth_router
@@ -48,13 +58,20 @@ async def lifespan(app: FastAPI):
     await create_db_tables()
     init_http_client(app)
     await init_cache(app)
+    snapshot_listener = await start_dataset_snapshot(app)
+    read_models = await start_contract_read_model(app)
 
     # Initialize and start the scheduler
     scheduler = create_scheduler(app, settings)
     esi_client = ESIClient(settings=settings)
+    # One graph serves both ingestion's courier routes and the list's proximity filter.
+    route_graph = load_route_graph()
+    install_stargate_graph(route_graph)
     aggregation_service = ContractAggregationService(
         esi_client=esi_client,
         settings=settings,
+        cache_warmer=warm_popular_pages,
+        route_graph=route_graph,
     )
     add_aggregation_job(scheduler, aggregation_service, settings)
     matcher_service = WatchlistMatcherService(settings=settings)
@@ -68,11 +85,70 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, "scheduler") and app.state.scheduler.running:
         app.state.scheduler.shutdown()
         logging.info("Scheduler has been shut down.")
+    if snapshot_listener is not None:
+        snapshot_listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await snapshot_listener
+    if read_models is not None:
+        await read_models.close()
     await close_http_client(app)
     await close_cache(app)
     logging.info("Application shutdown complete.")
 
 
+async def start_dataset_snapshot(app: FastAPI) -> asyncio.Task | None:
+    """Set up this process's dataset snapshot: warm it, and subscribe to commit
+    announcements when Valkey is up. Returns the listener task, for shutdown to cancel.
+
+    Without Valkey the snapshot still serves, expiring on its max age alone. With the
+    max age set to 0 there is no snapshot, and the routes query the metadata per request.
+    """
+    max_age = settings.DATASET_SNAPSHOT_MAX_AGE_SECONDS
+    if max_age <= 0:
+        return None
+    snapshots = DatasetSnapshotCache(max_age_seconds=max_age)
+    app.state.dataset_snapshot = snapshots
+    listener = None
+    if app.state.redis is not None:
+        # Started before warming: an announcement arriving mid-warm discards a warm-up
+        # that read the pre-commit corpus (DatasetSnapshotCache._epoch).
+        listener = asyncio.create_task(snapshots.listen(app.state.redis))
+    await snapshots.warm(AsyncSessionLocal)
+    return listener
+
+
+async def start_contract_read_model(app: FastAPI) -> ContractReadModelCache | None:
+    """Set up this process's contract read model when enabled, and start building it
+    for the current generation. Returns the holder, for shutdown to close.
+
+    Only with Valkey: a model is served per ingestion generation, and without the
+    generation there is nothing to tell a current model from a stale one.
+    """
+    if not settings.CONTRACT_READ_MODEL_ENABLED or app.state.redis is None:
+        return None
+    # Built on the background pool: a full-corpus read must not hold a request's
+    # connection for the length of the build.
+    read_models = ContractReadModelCache(BackgroundSessionLocal)
+    app.state.contract_read_model = read_models
+    # Schedules the build in the background; startup does not wait for it.
+    read_models.current(await current_generation(app.state.redis))
+    return read_models
+
+
+def load_route_graph() -> StargateGraph | None:
+    """The stargate graph ingestion routes couriers with and proximity filters are
+    resolved on, or None when SDE_DIR is unset or unreadable. Routes are an enrichment:
+    without them couriers are still ingested, with NULL jumps, and only the proximity
+    filter is refused (503), so a bad path is logged rather than failing startup."""
+    if not settings.SDE_DIR:
+        return None
+    try:
+        return load_stargate_graph(settings.SDE_DIR)
+    except Exception:
+        logger.exception(f"Could not load the stargate graph from {settings.SDE_DIR!r}.")
+        return None
+
+
 app = FastAPI(
     title="Hangar Bay API",
     description="API for the Hangar Bay application, providing access to EVE Online public contract data and related services.",
@@ -104,6 +180,15 @@ async def generic_exception_handler(request: Request, exc: Exception):
     )
 
 
+@app.exception_handler(StargateGraphUnavailableError)
+async def stargate_graph_unavailable_handler(
+    request: Request, exc: StargateGraphUnavailableError
+) -> JSONResponse:
+    """503 for a proximity filter this process cannot resolve: the request is valid, and
+    answering it without the filter would pass off every contract as nearby."""
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
 def _json_safe(value):
     """Coerce non-finite floats (inf/-inf/nan) to their string form, recursing through dict/list
     containers, so a payload is renderable by Starlette's allow_nan=False JSON encoder."""
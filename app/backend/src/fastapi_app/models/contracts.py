@@ -1,4 +1,5 @@
 from sqlalchemy import (
+    DDL,
     BigInteger,
     Column,
     DateTime,
@@ -11,7 +12,7 @@ from sqlalchemy import (
     Numeric,
 )
 from sqlalchemy.orm import relationship
-from sqlalchemy import JSON
+from sqlalchemy import JSON, event
 from sqlalchemy.orm import Mapped, mapped_column
 
 from ..db import Base
@@ -52,6 +53,30 @@ class EsiTaxonomyCache(Base):
     fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
 
 
+class UniverseLocation(Base):
+    """Static universe geography — NPC stations and the solar systems they sit in —
+    keyed by ESI id. Station and system ids occupy disjoint ranges, so one key space
+    holds both; a system row's system_id is its own id.
+
+    A station row copies its system's region and security status down once the system
+    has resolved, so ingestion reads everything it needs about a batch's locations in
+    one SELECT. Filled from ESI's public universe routes by ingestion
+    (ContractAggregationService._resolve_locations) and never expired: a station does
+    not move. A row exists only once its system is known; region_id stays NULL while
+    the system's own lookup is still failing, and is retried each run until it lands.
+    """
+    __tablename__ = 'universe_locations'
+
+    location_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    system_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    region_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    security_status: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (Index('ix_universe_locations_system_id', 'system_id'),)
+
+
 class Contract(Base):
     __tablename__ = 'contracts'
 
@@ -72,10 +97,14 @@ class Contract(Base):
     start_location_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
     start_location_system_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     # NULL where the destination is a player structure (no tokenless resolution
-    # route) — measured ~5% of Forge couriers. Written by ingestion for the
-    # reward-per-jump follow-on; nothing in F008 reads it.
+    # route) — measured ~5% of Forge couriers. Ingestion routes couriers from it
+    # (route_jumps below).
     end_location_system_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     start_location_region_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # From the destination station's universe_locations row. Unlike the start region,
+    # which is the region the contract was fetched from, nothing in the payload says
+    # where a courier is going; NULL for structures, like end_location_system_id.
+    end_location_region_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     end_location_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)  # Optional for courier contracts
     for_corporation: Mapped[bool] = mapped_column(Boolean, nullable=False)
     date_issued: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -89,6 +118,15 @@ class Contract(Base):
     buyout: Mapped[Optional[float]] = mapped_column(Numeric, nullable=True)
     # Courier-only: contracted days to deliver once accepted.
     days_to_complete: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # Courier-only, stamped by ingestion from the stargate graph (services/route_graph.py):
+    # jumps from the start system to the end system along the shortest all-high-sec
+    # route where one exists, else the shortest route, and which of the two it is.
+    # NULL wherever either end is unresolved (a player structure) or no path exists.
+    route_jumps: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    route_highsec: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+    # reward / route_jumps, stored so the sort and filter read an index instead of a
+    # division per row. NULL for a same-system courier: 0 jumps gives nothing to divide by.
+    reward_per_jump: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     # Denormalized data for search performance
     start_location_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
@@ -103,6 +141,21 @@ class Contract(Base):
     # Only meaningful while item_processing_status = 'COMPLETED': an ENRICHMENT_INCOMPLETE
     # row keeps whatever version it last stamped, which says nothing about its items.
     enrichment_version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    # Contract-level copies of the item-name sort key: min/max type_name over every
+    # item, so the ship_name sort reads one column instead of joining and grouping the
+    # items table. Written by ingestion after items land; item_summary_version says
+    # whether they are current (see background_aggregation.ITEM_SUMMARY_VERSION), and
+    # the list falls back to deriving the key from the items for a row where not.
+    item_name_first: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    item_name_last: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    item_summary_version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    # The rest of what a list row derives from the items — headline item name, per-
+    # category row counts, blueprint terms (services.contract_summary) — stored under
+    # the same item_summary_version, so a list page is served without loading items.
+    list_summary: Mapped[Optional[Any]] = mapped_column(JSON, nullable=True)
+    # Stamped with the run's timestamp whenever ingestion writes the contract's items —
+    # the moment it becomes matchable against watchlists, and the high-water mark the
+    # watchlist matcher advances over (services/watchlist_matcher.py).
     items_last_fetched_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     contract_esi_etag: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
@@ -118,6 +171,12 @@ class Contract(Base):
         Index('ix_contracts_type_status', 'type', 'status'),
         Index('ix_contracts_start_location_name', 'start_location_name'),
         Index('ix_contracts_title', 'title'),
+        # Free-text search is a leading-wildcard ILIKE, which no btree serves; the
+        # trigram GIN index does (services/contract_search.py).
+        Index(
+            'ix_contracts_title_trgm', 'title',
+            postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+        ),
         Index('ix_contracts_is_ship_contract', 'is_ship_contract'),
         # Indexes for sorting and filtering performance
         Index('ix_contracts_price', 'price'),
@@ -131,6 +190,9 @@ class Contract(Base):
         Index('ix_contracts_volume', 'volume'),
         Index('ix_contracts_buyout', 'buyout'),
         Index('ix_contracts_days_to_complete', 'days_to_complete'),
+        Index('ix_contracts_route_jumps', 'route_jumps'),
+        Index('ix_contracts_reward_per_jump', 'reward_per_jump'),
+        Index('ix_contracts_items_last_fetched_at', 'items_last_fetched_at'),
     )
 
     def __repr__(self):
@@ -180,6 +242,11 @@ class ContractItem(Base):
     __table_args__ = (
         Index('ix_contract_items_contract_id', 'contract_id'),
         Index('ix_contract_items_type_id', 'type_id'),
+        # The item-name half of free-text search; see ix_contracts_title_trgm.
+        Index(
+            'ix_contract_items_type_name_trgm', 'type_name',
+            postgresql_using='gin', postgresql_ops={'type_name': 'gin_trgm_ops'},
+        ),
         # Indexes for BPC filtering
         Index('ix_contract_items_is_blueprint_copy', 'is_blueprint_copy'),
         Index('ix_contract_items_raw_quantity', 'raw_quantity'),
@@ -194,3 +261,14 @@ class ContractItem(Base):
 
     def __repr__(self):
         return f"<ContractItem(record_id={self.record_id}, type_id={self.type_id}, quantity={self.quantity})>"
+
+
+# The trigram indexes above need pg_trgm. Migrations install it (8f3c1e5a2b90); this
+# covers schemas built straight from metadata — the test fixtures' create_all and the
+# development-only table recreation in main.py. pg_trgm is a trusted extension, so the
+# application role can create it without superuser.
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
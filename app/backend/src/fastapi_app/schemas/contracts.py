@@ -1,8 +1,10 @@
+import base64
 from datetime import datetime
+from decimal import Decimal
 from enum import Enum
 from typing import Dict, List, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from .common import PaginatedResponse
 
@@ -128,6 +130,13 @@ class ContractListItemSchema(BaseModel):
     # reward / volume, the figure haulers compare offers on. NULL when either side
     # is absent or the volume is zero — 0.0 would read as free hauling (§9).
     reward_per_volume: Optional[float] = None
+    # Courier-only: stargate jumps from the start system to the end system, along the
+    # shortest all-high-sec route where one exists (route_highsec true), else the
+    # shortest route. NULL when either end is a player structure or no path exists.
+    route_jumps: Optional[int] = None
+    route_highsec: Optional[bool] = None
+    # reward / route_jumps. NULL also for a same-system courier (0 jumps).
+    reward_per_jump: Optional[float] = None
     start_location_name: Optional[str] = None
     end_location_name: Optional[str] = None
     issuer_name: Optional[str] = None
@@ -154,6 +163,30 @@ class ContractDetailSchema(ContractListItemSchema):
     items: List[ContractItemSchema] = []
 
 
+# Ids one GET /contracts/batch may ask for: a notification feed or watchlist screen in
+# one request, while the query string and the item load stay bounded.
+MAX_BATCH_CONTRACT_IDS = 250
+
+# Largest radius the proximity filter accepts. 20 jumps around a hub already spans a
+# good part of empire space — a region filter's territory, not a neighbourhood's.
+MAX_PROXIMITY_JUMPS = 20
+
+
+class ContractBatchResponse(BaseModel):
+    """Several contracts' detail responses in one, keyed by contract id."""
+
+    contracts: Dict[int, ContractDetailSchema] = Field(
+        ..., description="The detail response for every requested id that exists."
+    )
+    missing: List[int] = Field(
+        ...,
+        description=(
+            "Requested ids with no contract, ascending — never ingested, or an id the "
+            "client got wrong. Listed rather than failing the batch."
+        ),
+    )
+
+
 class CoverageInfo(BaseModel):
     """Which regions the corpus actually holds, and how fresh the newest of them is.
 
@@ -182,6 +215,21 @@ class CoverageInfo(BaseModel):
     )
 
 
+class CountMode(str, Enum):
+    """How `total` and the segment counts of a list response were arrived at.
+
+    exact: counted for this request. precomputed: read from per-generation totals,
+    because the request filtered on nothing those totals do not already split by —
+    exact as of the snapshot they were built with, so a contract expiring since can
+    still be in them. capped: the request matched too much to count cheaply, and a
+    figure at count_cap means that many or more.
+    """
+
+    exact = "exact"
+    precomputed = "precomputed"
+    capped = "capped"
+
+
 class ContractListResponse(PaginatedResponse[ContractListItemSchema]):
     """A page of contracts plus the figures that make the page readable in context.
 
@@ -198,8 +246,8 @@ class ContractListResponse(PaginatedResponse[ContractListItemSchema]):
         description=(
             "How many contracts matched every other filter but were excluded because "
             "their start location has no known solar system (player-owned structures, "
-            "which need an ACL-scoped token to resolve). Null when system_ids was not "
-            "applied — no results were dropped for that reason, which is different from "
+            "which need an ACL-scoped token to resolve). Null when neither system_ids "
+            "nor the proximity filter was applied — no results were dropped for that reason, which is different from "
             "none having been."
         ),
     )
@@ -214,6 +262,17 @@ class ContractListResponse(PaginatedResponse[ContractListItemSchema]):
             "type outside the enum is counted under 'unknown'."
         ),
     )
+    count_mode: CountMode = Field(
+        default=CountMode.exact,
+        description=(
+            "How total and segment_counts were computed. Under 'capped', any figure "
+            "equal to count_cap is a lower bound and reads as that many or more."
+        ),
+    )
+    count_cap: Optional[int] = Field(
+        default=None,
+        description="The ceiling figures were counted up to. Set only under 'capped'.",
+    )
     coverage: CoverageInfo = Field(
         ...,
         description=(
@@ -223,6 +282,15 @@ class ContractListResponse(PaginatedResponse[ContractListItemSchema]):
             "nothing."
         ),
     )
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description=(
+            "Opaque token resuming the list after the last row of this page under the "
+            "same filters and sort: pass it back as `cursor`. Null when this page is the "
+            "last. Issued on offset pages too, so a client can switch to cursor paging "
+            "from any page."
+        ),
+    )
 
 
 class TaxonomyCoverage(str, Enum):
@@ -287,6 +355,49 @@ class TaxonomyResponse(BaseModel):
     )
 
 
+class BooleanFacet(BaseModel):
+    """How many contracts a yes/no filter would leave under each answer."""
+
+    yes: int
+    no: int
+
+
+class ContractFacetsResponse(BaseModel):
+    """Contract counts per filter option, for labelling the filter rail.
+
+    Each facet is counted the way segment_counts is: with its own filter lifted and
+    every other filter applied, so an option the reader has not picked still says
+    what picking it would show. The category and group facets lift their filters
+    one at a time and keep the other on the same offered item, matching the list's
+    rule that a category and a group describe a single item.
+    """
+
+    regions: Dict[int, int] = Field(
+        ..., description="Matching contracts per start region (region_ids)."
+    )
+    categories: Dict[int, int] = Field(
+        ...,
+        description=(
+            "Matching contracts offering an item of each dogma category (category_id). "
+            "A bundle counts under every category it offers."
+        ),
+    )
+    groups: Dict[int, int] = Field(
+        ...,
+        description=(
+            "Matching contracts offering an item of each dogma group (group_id), "
+            "within the selected categories."
+        ),
+    )
+    is_ship_contract: BooleanFacet = Field(
+        ..., description="Matching ship and non-ship contracts (is_ship_contract)."
+    )
+    is_bpc: BooleanFacet = Field(
+        ...,
+        description="Matching contracts offering a blueprint copy, and the rest (is_bpc).",
+    )
+
+
 class ContractType(str, Enum):
     """Every contract type ESI can emit (confirmed against the committed spec
     snapshot). Typed as an enum so an unknown value 422s instead of silently
@@ -309,6 +420,8 @@ class SortableContractFields(str, Enum):
     ship_name = "ship_name"
     volume = "volume"
     reward_per_volume = "reward_per_volume"
+    route_jumps = "route_jumps"
+    reward_per_jump = "reward_per_jump"
     days_to_complete = "days_to_complete"
     buyout = "buyout"
 
@@ -318,6 +431,93 @@ class SortDirection(str, Enum):
     desc = "desc"
 
 
+class ExportFormat(str, Enum):
+    """Encodings GET /contracts/export streams: one JSON object per line, or CSV."""
+
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+# How each sort key's text form in a cursor is read back. Typed per sort rather than
+# left to the driver: asyncpg binds by Python type, and the value has to compare
+# EXACTLY equal to the stored one for the contract_id tiebreak to resume on the right
+# row — a Numeric price read back as a float would not.
+_CURSOR_VALUE_PARSERS = {
+    SortableContractFields.date_issued: datetime.fromisoformat,
+    SortableContractFields.date_expired: datetime.fromisoformat,
+    SortableContractFields.price: Decimal,
+    SortableContractFields.collateral: Decimal,
+    SortableContractFields.buyout: Decimal,
+    SortableContractFields.volume: float,
+    SortableContractFields.reward_per_volume: float,
+    SortableContractFields.route_jumps: int,
+    SortableContractFields.reward_per_jump: float,
+    SortableContractFields.days_to_complete: int,
+    SortableContractFields.ship_name: str,
+}
+
+
+class ContractCursor(BaseModel):
+    """Where a keyset page ended: the last row's sort key and contract id.
+
+    Carries the sort it was issued under so a cursor replayed against a different
+    sort is rejected rather than silently resuming at a meaningless position. The
+    token is base64url JSON — opaque by contract, not by secrecy: nothing in it is
+    more than the row the client was just shown.
+    """
+
+    sort_by: SortableContractFields
+    sort_direction: SortDirection
+    # Text rather than a union type, so pydantic cannot coerce a timestamp or a
+    # Decimal into something that compares differently; see _CURSOR_VALUE_PARSERS.
+    # NULL when the page ended inside a nullable sort's NULL tail.
+    value: Optional[str] = None
+    contract_id: int
+
+    @classmethod
+    def after(
+        cls,
+        sort_by: SortableContractFields,
+        sort_direction: SortDirection,
+        value,
+        contract_id: int,
+    ) -> "ContractCursor":
+        if value is None:
+            text = None
+        elif isinstance(value, datetime):
+            text = value.isoformat()
+        else:
+            # str() of a Decimal or float round-trips exactly through its parser.
+            text = str(value)
+        return cls(
+            sort_by=sort_by,
+            sort_direction=sort_direction,
+            value=text,
+            contract_id=contract_id,
+        )
+
+    def sort_value(self):
+        """The sort key as the type its column binds as."""
+        if self.value is None:
+            return None
+        return _CURSOR_VALUE_PARSERS[self.sort_by](self.value)
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(self.model_dump_json().encode()).rstrip(b"=").decode()
+
+    @classmethod
+    def decode(cls, token: str) -> "ContractCursor":
+        """Parse a token, raising ValueError for anything this server did not issue."""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            cursor = cls.model_validate_json(raw)
+            cursor.sort_value()
+        # binascii.Error and pydantic's ValidationError are both ValueErrors.
+        except (ValueError, ArithmeticError) as exc:
+            raise ValueError("cursor is malformed") from exc
+        return cursor
+
+
 class ContractFilters(BaseModel):
     """
     Represents the available filters for the contracts endpoint.
@@ -343,6 +543,14 @@ class ContractFilters(BaseModel):
     max_collateral: Optional[float] = Field(
         default=None, ge=0, description="Maximum collateral."
     )
+    # Courier route bounds. A contract without a route (a player-structure end, or
+    # no route graph loaded) has no jumps to compare, so either bound excludes it.
+    max_jumps: Optional[int] = Field(
+        default=None, ge=0, description="Maximum stargate jumps between a courier's start and end."
+    )
+    min_reward_per_jump: Optional[float] = Field(
+        default=None, ge=0, description="Minimum courier reward per stargate jump."
+    )
     # Blueprint attribute ranges. Each of the three families (runs, ME, TE) is one
     # correlated EXISTS over the contract's OFFERED items, so the bounds of a family
     # land on the same item while separate families may be satisfied by different
@@ -420,6 +628,25 @@ class ContractFilters(BaseModel):
     station_ids: Optional[List[int]] = Field(
         default=None, description="List of station IDs to filter by."
     )
+    # "Within N jumps of X", resolved server-side into the systems that lie that close
+    # (services/route_graph.py), so a client does not enumerate hundreds of system_ids.
+    # Same partial coverage as system_ids: it matches on start_location_system_id.
+    near_system_id: Optional[int] = Field(
+        default=None,
+        description=(
+            "Solar system ID the proximity filter measures from; requires within_jumps. "
+            "Partial coverage, like system_ids."
+        ),
+    )
+    within_jumps: Optional[int] = Field(
+        default=None,
+        ge=0,
+        le=MAX_PROXIMITY_JUMPS,
+        description=(
+            "Keep contracts starting at most this many stargate jumps from "
+            "near_system_id (shortest path); requires near_system_id."
+        ),
+    )
     type_ids: Optional[List[int]] = Field(
         default=None, description="List of ship type IDs to filter by."
     )
@@ -454,6 +681,17 @@ class ContractFilters(BaseModel):
     # Pagination
     page: int = Field(default=1, ge=1, description="Page number.")
     size: int = Field(default=50, ge=1, le=100, description="Number of items per page.")
+    # Keyset pagination. OFFSET makes PostgreSQL produce and discard every earlier
+    # row, so a deep page of a price or expiry sort costs the whole prefix; a cursor
+    # seeks straight past the previous page's last row instead.
+    cursor: Optional[str] = Field(
+        default=None,
+        max_length=1024,
+        description=(
+            "Resume after the row a previous response's next_cursor points at. Must "
+            "be replayed with the same sort_by and sort_direction, and replaces page."
+        ),
+    )
     # Sorting
     sort_by: SortableContractFields = Field(
         default=SortableContractFields.date_issued, description="Field to sort by."
@@ -461,3 +699,30 @@ class ContractFilters(BaseModel):
     sort_direction: SortDirection = Field(
         default=SortDirection.desc, description="Sort direction."
     )
+
+    @model_validator(mode="after")
+    def _proximity_is_complete(self):
+        """Half a proximity filter has no meaning, and ignoring it would serve the
+        whole corpus to a client that believes it asked for a neighbourhood."""
+        if (self.near_system_id is None) != (self.within_jumps is None):
+            raise ValueError("near_system_id and within_jumps must be given together")
+        return self
+
+    @model_validator(mode="after")
+    def _cursor_fits_the_request(self):
+        """A cursor names a position in ONE ordering, so it 422s under any other.
+
+        Checked at the boundary so a stale or hand-edited cursor is a client error,
+        not a 500 from the seek predicate.
+        """
+        if self.cursor is None:
+            return self
+        if self.page != 1:
+            raise ValueError("cursor and page cannot be combined")
+        position = ContractCursor.decode(self.cursor)
+        if (position.sort_by, position.sort_direction) != (
+            self.sort_by,
+            self.sort_direction,
+        ):
+            raise ValueError("cursor was issued for a different sort")
+        return self
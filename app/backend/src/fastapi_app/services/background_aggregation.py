@@ -3,22 +3,32 @@ import json
 import logging
 import uuid
 from contextlib import asynccontextmanager, AbstractAsyncContextManager
-from typing import Iterable, Iterator, List, Callable  # Added Callable
+from dataclasses import dataclass, replace
+from typing import AbstractSet, Any, Awaitable, Iterable, List, Callable  # Added Callable
 from datetime import datetime, timezone
 
 import redis.asyncio as aioredis  # For on-demand client creation
-from sqlalchemy import select, text, update
+from sqlalchemy import func, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.config import Settings  # Settings type for hinting
 from ..core.esi_client_class import ESIClient  # ESIClient class for type hint
 from ..core.exceptions import ESINotModifiedError  # Restored ESINotModifiedError
 from ..core.metrics import last_ingest_success_timestamp
-
-from ..db import AsyncSessionLocal
-from ..models.contracts import Contract, ContractItem, EsiTaxonomyCache  # Models
+from ..core.read_replica import INGEST_COMMIT_LSN_KEY, wait_for_replay
+
+from ..db import IngestSessionLocal, read_async_engine
+from ..models.contracts import (  # Models
+    Contract,
+    ContractItem,
+    EsiTaxonomyCache,
+    UniverseLocation,
+)
 # Removed incorrect import: from ..services.esi_client import ESIClient as ESIClientService
+from .contract_summary import build_list_summary
 from .db_upsert import bulk_upsert  # Upsert utility
+from .route_graph import CourierRoute, StargateGraph
+from .sql_arrays import any_of
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +43,13 @@ AGGREGATION_LOCK_TTL_MARGIN_SECONDS = 300
 # {finished_at, outcome, regions_ok, regions_failed, last_success_at}, no TTL —
 # overwritten each run; lost on cache restart, which self-heals within one tick.
 INGEST_LAST_RUN_KEY = "hangar-bay:ingest:last_run"
+# Ingestion generation: advanced after every run whose transaction COMMITTED, and the
+# invalidation signal for everything the read side derives from the corpus (the
+# GET /contracts response cache keys its entries by it). No TTL, like the record above.
+INGEST_GENERATION_KEY = "hangar-bay:ingest:generation"
+# Pub/sub channel the new generation is announced on, for readers holding derived state
+# in process memory (services/dataset_snapshot.py) rather than keyed in Valkey.
+INGEST_GENERATION_CHANNEL = "hangar-bay:ingest:generation-changed"
 
 # Atomic compare-and-delete: only release the lock if THIS runner still holds it
 # (the stored value equals our token). Guards against the TTL expiring mid-run
@@ -43,11 +60,13 @@ _RELEASE_LOCK_LUA = (
     "return redis.call('del', KEYS[1]) else return 0 end"
 )
 
-# asyncpg caps a statement at 32767 bind parameters; a single UPDATE ... WHERE
-# contract_id IN (<all ids>) over a whole run (production scale ~35k contracts)
-# blows that ceiling and rolls back the entire aggregation transaction. Chunk the
-# id-list UPDATEs so no statement ever exceeds the cap.
-UPDATE_ID_CHUNK_SIZE = 1000
+# Ceiling on the post-commit cache warming stage (_warm_caches). Warming holds back the
+# generation announcement, so a slow database must not hold it back indefinitely.
+CACHE_WARM_TIMEOUT_SECONDS = 120
+
+# (redis_client, generation, session_factory) -> anything: fills read-side caches under
+# a generation that is about to be published (contract_list_cache.warm_popular_pages).
+CacheWarmer = Callable[[Any, int, Any], Awaitable[Any]]
 
 # Bounded concurrency for the cold-cache type/group enrichment fan-out: without
 # it, thousands of unique types resolve as strictly sequential ESI round-trips,
@@ -72,12 +91,23 @@ NPC_STATION_ID_MAX = 64_000_000
 # AGGREGATION_SCHEDULER_INTERVAL_SECONDS.
 ENRICHMENT_VERSION = 2
 
+# Bump when the contract-level item summary (Contract.item_name_first/_last and
+# Contract.list_summary) changes shape or meaning. A bump needs no resweep of its own:
+# the list derives the values from the items for any row not at this version, and each
+# run rewrites the stale rows it sees (_refresh_item_summaries), so the corpus
+# converges within one run. 2: list_summary added.
+ITEM_SUMMARY_VERSION = 2
+
 
-def _chunk_ids(ids: Iterable[int]) -> Iterator[list[int]]:
-    """Yield id-list slices capped at UPDATE_ID_CHUNK_SIZE (asyncpg bind limit)."""
-    id_list = list(ids)
-    for start in range(0, len(id_list), UPDATE_ID_CHUNK_SIZE):
-        yield id_list[start : start + UPDATE_ID_CHUNK_SIZE]
+# Rows per INSERT when _resolve_locations stores what it fetched. A first run against an
+# empty universe_locations table writes every station the market touches — thousands,
+# at 6 binds each — and asyncpg caps one statement at 32767 binds.
+LOCATION_UPSERT_BATCH_SIZE = 1000
+
+
+# Rows per fetch when _refresh_item_summaries streams the items it summarizes: a first
+# run summarizes the whole corpus, which is too many ORM objects to hold at once.
+SUMMARY_ITEM_BATCH_SIZE = 2000
 
 
 def _parse_esi_datetime(date_string: str | None) -> datetime | None:
@@ -89,15 +119,24 @@ def _parse_esi_datetime(date_string: str | None) -> datetime | None:
     return datetime.fromisoformat(date_string.replace("Z", "+00:00"))
 
 
-def _collect_resolvable_ids(contracts: List[dict]) -> list[int]:
-    """Collect the unique issuer/corporation/location IDs resolvable to names."""
+def _collect_resolvable_ids(
+    contracts: List[dict], named_location_ids: AbstractSet[int] = frozenset()
+) -> list[int]:
+    """Collect the unique issuer/corporation/location IDs resolvable to names.
+
+    Locations in named_location_ids already carry a name in universe_locations and are
+    left out: a station's name is as static as its system, so only characters and
+    corporations need /universe/names on every run.
+    """
     issuer_ids = {c['issuer_id'] for c in contracts}
     corporation_ids = {c['issuer_corporation_id'] for c in contracts}
     start_location_ids = {c.get('start_location_id') for c in contracts if c.get('start_location_id')}
     end_location_ids = {c.get('end_location_id') for c in contracts if c.get('end_location_id')}
 
     all_ids_to_resolve = list(
-        issuer_ids.union(corporation_ids).union(start_location_ids).union(end_location_ids)
+        issuer_ids.union(corporation_ids).union(
+            (start_location_ids | end_location_ids) - named_location_ids
+        )
     )
 
     # Player-owned structures have IDs > 10^11 and are not resolvable
@@ -210,6 +249,63 @@ def _npc_station_ids(contracts: List[dict]) -> set[int]:
     }
 
 
+@dataclass(frozen=True)
+class _Location:
+    """One universe_locations row as ingestion uses it: an NPC station or a solar system."""
+
+    name: str | None
+    system_id: int
+    region_id: int | None
+    security_status: float | None
+
+
+async def _select_locations(
+    db_session: AsyncSession, location_ids: AbstractSet[int]
+) -> dict[int, _Location]:
+    """The stored universe_locations rows among location_ids, in one statement."""
+    rows = await db_session.execute(
+        select(
+            UniverseLocation.location_id,
+            UniverseLocation.name,
+            UniverseLocation.system_id,
+            UniverseLocation.region_id,
+            UniverseLocation.security_status,
+        ).where(any_of(UniverseLocation.location_id, location_ids))
+    )
+    return {
+        location_id: _Location(name, system_id, region_id, security_status)
+        for location_id, name, system_id, region_id, security_status in rows
+    }
+
+
+async def _upsert_locations(
+    db_session: AsyncSession, locations: dict[int, _Location]
+) -> None:
+    """Store resolved locations. Every field is supplied on every row, so a row stored
+    while its system was still unresolved is completed in place by a later run."""
+    fetched_at = datetime.now(timezone.utc)
+    rows = [
+        {
+            "location_id": location_id,
+            "name": location.name,
+            "system_id": location.system_id,
+            "region_id": location.region_id,
+            "security_status": location.security_status,
+            "fetched_at": fetched_at,
+        }
+        for location_id, location in locations.items()
+    ]
+    for i in range(0, len(rows), LOCATION_UPSERT_BATCH_SIZE):
+        # preserve_on_null: a NULL here only ever means "not resolved yet", never a
+        # value that was cleared, so it must not blank what an earlier run stored.
+        await bulk_upsert(
+            db_session,
+            UniverseLocation,
+            rows[i:i + LOCATION_UPSERT_BATCH_SIZE],
+            preserve_on_null=frozenset({"name", "region_id", "security_status"}),
+        )
+
+
 # Denormalized display names re-resolve from /universe/names on every sighting,
 # and the ESI client swallows per-chunk failures into a partial map — so a
 # degraded run supplies NULL for anything it couldn't resolve. These columns
@@ -222,21 +318,83 @@ NAME_COLUMNS_PRESERVED_ON_NULL = frozenset({
     "issuer_corporation_name",
 })
 
+# The location columns come from universe_locations, which only ever gains rows, so a
+# NULL here means the lookup failed this run (the station fetch, or its system's) and
+# must not blank a system or region a previous run wrote. The route columns are derived
+# from those systems, so a failed lookup leaves them NULL for the same reason.
+LOCATION_COLUMNS_PRESERVED_ON_NULL = frozenset({
+    "start_location_system_id",
+    "end_location_system_id",
+    "end_location_region_id",
+    "route_jumps",
+    "route_highsec",
+    "reward_per_jump",
+})
+
+
+def _courier_routes(
+    contracts: List[dict],
+    locations: dict[int, _Location],
+    graph: StargateGraph | None,
+    prefer_highsec: bool,
+) -> dict[int, CourierRoute]:
+    """Each courier's route between its start and end systems, keyed by contract id.
+
+    Only couriers with both ends resolved to a system are routed; the graph search is
+    cached per origin system, and couriers leave from a handful of hubs.
+    """
+    if graph is None:
+        return {}
+    routes = {}
+    for contract in contracts:
+        if contract.get("type") != "courier":
+            continue
+        start = locations.get(contract.get("start_location_id"))
+        end = locations.get(contract.get("end_location_id"))
+        if start is None or end is None:
+            continue
+        route = graph.courier_route(start.system_id, end.system_id, prefer_highsec)
+        if route is not None:
+            routes[contract["contract_id"]] = route
+    return routes
+
+
+def _reward_per_jump(reward: float | None, route: CourierRoute | None) -> float | None:
+    """NULL without a reward or a route, and for a same-system courier: 0 jumps gives
+    nothing to divide by, and treating it as 1 would rank it against real hauls."""
+    if reward is None or route is None or route.jumps == 0:
+        return None
+    return reward / route.jumps
+
 
 def _build_contract_rows(
     contracts: List[dict],
     id_to_name_map: dict,
-    station_to_system: dict[int, int] | None = None,
+    locations: dict[int, _Location] | None = None,
     seen_at: datetime | None = None,
+    routes: dict[int, CourierRoute] | None = None,
 ) -> list[dict]:
-    """Transform ESI contract payloads into Contract upsert rows, enriched with names.
+    """Transform ESI contract payloads into Contract upsert rows, enriched with names
+    and, from the location dimension, systems; couriers also carry their routes.
 
     Every row carries the SAME seen_at for the whole run: a contract is judged present
     by matching the newest stamp in its region, which only works if one run writes one
     value. The upsert copies mapped columns on conflict, so re-sighting restamps.
     """
     seen_at = seen_at or datetime.now(timezone.utc)
-    station_to_system = station_to_system or {}
+    locations = locations or {}
+    routes = routes or {}
+
+    def _system_of(location_id):
+        location = locations.get(location_id)
+        return location.system_id if location is not None else None
+
+    def _name_of(location_id):
+        location = locations.get(location_id)
+        if location is not None and location.name is not None:
+            return location.name
+        return id_to_name_map.get(location_id)
+
     return [
         {
             "contract_id": c["contract_id"],
@@ -247,10 +405,19 @@ def _build_contract_rows(
             # player-owned structures. The system_ids filter is honest about that
             # gap rather than silent: the list response publishes how many rows it
             # excluded for want of a system.
-            "start_location_system_id": station_to_system.get(c.get("start_location_id")),
+            "start_location_system_id": _system_of(c.get("start_location_id")),
+            # The region the contract was FETCHED from, not the dimension's: the
+            # presence watermark is per fetched region, and the two only differ if
+            # ESI ever lists a contract outside its own region.
             "start_location_region_id": c.get("_hb_region_id"),
             "end_location_id": c.get("end_location_id"),
-            "end_location_system_id": station_to_system.get(c.get("end_location_id")),
+            "end_location_system_id": _system_of(c.get("end_location_id")),
+            # Nothing in the payload says where a courier is going; the dimension does.
+            "end_location_region_id": (
+                locations[c["end_location_id"]].region_id
+                if c.get("end_location_id") in locations
+                else None
+            ),
             "type": c["type"],  # Direct mapping - field names now match
             "status": c.get("status", "unknown"),
             "title": c.get("title"),
@@ -265,9 +432,16 @@ def _build_contract_rows(
             "volume": c.get("volume"),
             "buyout": c.get("buyout"),
             "days_to_complete": c.get("days_to_complete"),
+            "route_jumps": (
+                routes[c["contract_id"]].jumps if c["contract_id"] in routes else None
+            ),
+            "route_highsec": (
+                routes[c["contract_id"]].highsec if c["contract_id"] in routes else None
+            ),
+            "reward_per_jump": _reward_per_jump(c.get("reward"), routes.get(c["contract_id"])),
             # Denormalized data for search performance
-            "start_location_name": id_to_name_map.get(c.get("start_location_id")),
-            "end_location_name": id_to_name_map.get(c.get("end_location_id")),
+            "start_location_name": _name_of(c.get("start_location_id")),
+            "end_location_name": _name_of(c.get("end_location_id")),
             "issuer_name": id_to_name_map.get(c.get('issuer_id')),
             "issuer_corporation_name": id_to_name_map.get(c.get('issuer_corporation_id')),
             # is_ship_contract, item_processing_status and enrichment_version are
@@ -299,11 +473,19 @@ class ContractAggregationService:
         # cache: Redis, # Removed cache client from constructor
         esi_client: ESIClient,
         settings: Settings,  # Settings will now be injected
+        cache_warmer: CacheWarmer | None = None,
+        route_graph: StargateGraph | None = None,
     ):
         # self.session_factory = session_factory # Removed
         # self.cache = cache # Removed cache client attribute
         self.esi_client = esi_client
         self.settings = settings  # Assign the injected settings
+        # Injected rather than imported: the read-side caches import this module for
+        # the generation keys, so calling into them from here would be circular.
+        self.cache_warmer = cache_warmer
+        # Loaded once per process from the SDE (main.load_route_graph); None leaves
+        # every courier's route columns NULL.
+        self.route_graph = route_graph
 
     def _lock_ttl_seconds(self) -> int:
         """Mutual-exclusion window for one aggregation run: the scheduler interval
@@ -437,11 +619,13 @@ class ContractAggregationService:
                 regions_ok = 0
                 regions_failed = 0
                 try:
+                    committed = False
+                    commit_lsn = None
                     # Use the ESIClient as a context manager to ensure its http_client is initialized.
                     async with self.esi_client:
                         logger.info("Concurrency lock acquired. Starting public contract aggregation run.")
 
-                        async with AsyncSessionLocal() as db_session:  # Obtain a new session for this run
+                        async with IngestSessionLocal() as db_session:  # Obtain a new session for this run
                             logger.info(f"Processing contracts for region IDs: {current_region_ids}")
 
                             all_contracts_data, regions_ok, regions_failed = await self._fetch_regions(
@@ -457,8 +641,19 @@ class ContractAggregationService:
                                 await self._process_contracts(db_session, all_contracts_data)
 
                                 await db_session.commit()
+                                committed = True
+                                commit_lsn = await self._commit_lsn(db_session)
                                 logger.info("Public contract aggregation run finished successfully and changes committed.")
 
+                    # Only a commit changes what readers can see; the all-304 no-op keeps
+                    # every cached view valid, so it leaves the generation where it is.
+                    if committed:
+                        await self._hold_reads_for_replica(redis_client, commit_lsn)
+                        generation = await self._next_generation(redis_client)
+                        if generation is not None:
+                            await self._warm_caches(redis_client, generation)
+                            await self._publish_generation(redis_client, generation)
+
                     # The shared transaction committed (or completed as a valid
                     # no-op — the all-304 path); outcome derives from the counters.
                     await self._record_run_outcome(redis_client, regions_ok, regions_failed)
@@ -484,6 +679,122 @@ class ContractAggregationService:
             # If the error was in _concurrency_lock, no db_session was active yet.
             return
 
+    async def _commit_lsn(self, db_session: AsyncSession) -> str | None:
+        """The primary's WAL position just after this run's commit, when a read replica
+        is configured; None without one, or when the read fails."""
+        if read_async_engine is None:
+            return None
+        try:
+            return (
+                await db_session.execute(text("SELECT pg_current_wal_lsn()::text"))
+            ).scalar_one()
+        except Exception:
+            logger.warning("failed to read the commit's WAL position", exc_info=True)
+            return None
+
+    async def _hold_reads_for_replica(self, redis_client, commit_lsn: str | None) -> None:
+        """Point the read guard at this commit, then give the replica time to replay it.
+
+        Runs before the generation bump, in that order: the guard (core/read_replica.py)
+        keeps readers on the primary until the replica has replayed INGEST_COMMIT_LSN_KEY,
+        and the wait means that by the time the new generation is announced the replica
+        normally has, so a page built there is never cached under a generation it
+        predates. A position that could not be read clears the key instead — the guard
+        then reads from the primary until the next run records one.
+        """
+        if read_async_engine is None:
+            return
+        try:
+            if commit_lsn is None:
+                await redis_client.delete(INGEST_COMMIT_LSN_KEY)
+                return
+            await redis_client.set(INGEST_COMMIT_LSN_KEY, commit_lsn)
+        except Exception:
+            logger.warning("failed to record the commit's WAL position", exc_info=True)
+            return
+        if not await wait_for_replay(
+            read_async_engine, commit_lsn, self.settings.READ_REPLICA_CATCHUP_TIMEOUT_SECONDS
+        ):
+            logger.warning(
+                "Read replica had not replayed the ingest commit %s after %ss; reads stay "
+                "on the primary until it has",
+                commit_lsn,
+                self.settings.READ_REPLICA_CATCHUP_TIMEOUT_SECONDS,
+            )
+
+    async def _next_generation(self, redis_client) -> int | None:
+        """The generation this run will publish, or None when the current one cannot
+        be read (logged, like a failed publish).
+
+        The larger of "previous + 1" and the commit time in epoch milliseconds, not a
+        bare INCR. The cache runs allkeys-lru, so the key can be
+        evicted; an INCR would then restart at 1 and hand out generation numbers whose
+        cache entries may still be alive, serving a pre-commit page as current. Seeding
+        from the clock keeps every generation unique across an eviction, and doubles
+        as the commit time for anything that needs one.
+
+        Read-then-write rather than a script: runs are serialized by the aggregation
+        lock, so nothing else writes this key between this read and _publish_generation.
+        """
+        try:
+            prior = await redis_client.get(INGEST_GENERATION_KEY)
+        except Exception:
+            logger.warning("failed to read ingestion generation", exc_info=True)
+            return None
+        try:
+            prior_generation = int(prior) if prior is not None else 0
+        except (TypeError, ValueError):
+            prior_generation = 0
+        now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+        return max(prior_generation + 1, now_ms)
+
+    async def _warm_caches(self, redis_client, generation: int) -> None:
+        """Fill the read-side caches under `generation` before it is published.
+
+        Runs between the commit and the announcement, so readers are still on the
+        previous generation throughout and the first of them on the new one find it
+        already cached. Bounded by CACHE_WARM_TIMEOUT_SECONDS and never fatal:
+        warming only moves work the first readers would otherwise do, so a failure
+        or timeout is logged and the generation published regardless.
+        """
+        if self.cache_warmer is None:
+            return
+        try:
+            await asyncio.wait_for(
+                self.cache_warmer(redis_client, generation, IngestSessionLocal),
+                timeout=CACHE_WARM_TIMEOUT_SECONDS,
+            )
+        except Exception:
+            logger.warning("failed to warm caches for generation %s", generation, exc_info=True)
+
+    async def _publish_generation(self, redis_client, generation: int | None = None) -> int | None:
+        """Advance INGEST_GENERATION_KEY to `generation` (by default _next_generation);
+        returns the generation published.
+
+        A failure is logged and swallowed, like the freshness record — readers then
+        keep serving the previous generation until the per-entry TTL, which is the
+        bounded staleness that TTL exists for.
+
+        The new value is then announced on INGEST_GENERATION_CHANNEL. Pub/sub is
+        fire-and-forget, so the announcement is a prompt rather than the record: a
+        failed PUBLISH still returns the generation, and a listener that missed it
+        falls back on its own max age.
+        """
+        if generation is None:
+            generation = await self._next_generation(redis_client)
+            if generation is None:
+                return None
+        try:
+            await redis_client.set(INGEST_GENERATION_KEY, str(generation))
+        except Exception:
+            logger.warning("failed to publish ingestion generation", exc_info=True)
+            return None
+        try:
+            await redis_client.publish(INGEST_GENERATION_CHANNEL, str(generation))
+        except Exception:
+            logger.warning("failed to announce ingestion generation", exc_info=True)
+        return generation
+
     async def _record_run_outcome(self, redis_client, ok: int, failed: int, *, forced_failure: bool = False) -> None:
         """Write the freshness record (INGEST_LAST_RUN_KEY) and advance the success gauge.
 
@@ -526,8 +837,14 @@ class ContractAggregationService:
         """
         Processes a list of contracts, fetches their items, and upserts them using the provided db_session.
         """
-        # Step 1: Collect all unique IDs from the current batch of contracts.
-        all_ids_to_resolve = _collect_resolvable_ids(contracts)
+        # Step 1: Resolve the batch's NPC stations from the location dimension — one
+        # SELECT, ESI only for stations it has never seen — then collect the ids that
+        # still need names; stations the dimension names are not asked again.
+        locations = await self._resolve_locations(db_session, contracts)
+        all_ids_to_resolve = _collect_resolvable_ids(
+            contracts,
+            {location_id for location_id, location in locations.items() if location.name},
+        )
 
         # Step 2: Resolve all IDs to names in a single batch operation.
         id_to_name_map = {}
@@ -536,10 +853,20 @@ class ContractAggregationService:
             id_to_name_map = await self.esi_client.resolve_ids_to_names(all_ids_to_resolve)
             logger.info(f"Successfully resolved {len(id_to_name_map)} names.")
 
-        # Step 3: Resolve start locations to solar systems, then transform contracts
-        # into the format for the database model, enriching with names and systems.
-        station_to_system = await self._resolve_station_systems(db_session, contracts)
-        contract_values = _build_contract_rows(contracts, id_to_name_map, station_to_system)
+        # Step 3: Route couriers between their resolved systems, then transform
+        # contracts into the format for the database model, enriching with names,
+        # locations and routes.
+        routes = _courier_routes(
+            contracts,
+            locations,
+            self.route_graph,
+            self.settings.COURIER_ROUTE_PREFER_HIGHSEC,
+        )
+        # One stamp for the run: last_seen_at on every row, items_last_fetched_at below.
+        seen_at = datetime.now(timezone.utc)
+        contract_values = _build_contract_rows(
+            contracts, id_to_name_map, locations, seen_at=seen_at, routes=routes
+        )
 
         batch_size = 500  # Number of contracts to process in each batch
         total_contracts = len(contract_values)
@@ -550,7 +877,7 @@ class ContractAggregationService:
             logger.info(f"Processing batch {i // batch_size + 1}/{(total_contracts + batch_size - 1) // batch_size} ({len(batch)} contracts)")
             await bulk_upsert(
                 db_session, Contract, batch,
-                preserve_on_null=NAME_COLUMNS_PRESERVED_ON_NULL,
+                preserve_on_null=NAME_COLUMNS_PRESERVED_ON_NULL | LOCATION_COLUMNS_PRESERVED_ON_NULL,
             )
             logger.info(f"Successfully upserted batch {i // batch_size + 1}.")
 
@@ -590,13 +917,25 @@ class ContractAggregationService:
         else:
             logger.info("No new contract items to process.")
 
-        for chunk in _chunk_ids(ship_contract_ids):
+        # Marks the contracts that just became matchable. The watchlist matcher keeps a
+        # high-water mark over this stamp and joins watchlists only against contracts
+        # past it; the run commits as one transaction, so its contracts become visible
+        # to the matcher together, all carrying this one value.
+        if processed_contract_ids:
             await db_session.execute(
                 update(Contract)
-                .where(Contract.contract_id.in_(chunk))
-                .values(is_ship_contract=True)
+                .where(any_of(Contract.contract_id, processed_contract_ids))
+                .values(items_last_fetched_at=seen_at)
             )
+
+        await self._refresh_item_summaries(db_session, contracts, processed_contract_ids)
+
         if ship_contract_ids:
+            await db_session.execute(
+                update(Contract)
+                .where(any_of(Contract.contract_id, ship_contract_ids))
+                .values(is_ship_contract=True)
+            )
             logger.info(f"Flagged {len(ship_contract_ids)} contracts as ship contracts.")
 
         await self._update_item_processing_status(
@@ -607,75 +946,131 @@ class ContractAggregationService:
             unresolved_category_contract_ids,
         )
 
-    async def _resolve_station_systems(
+    async def _resolve_locations(
         self, db_session: AsyncSession, contracts: List[dict]
-    ) -> dict[int, int]:
-        """Map the batch's NPC stations — start and end alike — to their solar system ids.
+    ) -> dict[int, _Location]:
+        """The batch's NPC stations, start and end alike, with their names, solar
+        systems, regions and security, read from universe_locations.
 
-        ESI's public contract payload carries a location id and no system id, so
-        without this the system_ids filter has nothing to match. Station→system is
-        static universe data: a pair resolved once is correct forever, which is why
-        pairs already stored on contract rows are read back instead of re-fetched.
+        ESI's public contract payload carries a location id and nothing else about the
+        place, so without this the system_ids filter has nothing to match and a
+        courier's destination has no region. All of it is static universe data: a
+        station is fetched once, ever, and from then on costs one row in a single
+        SELECT per run. A station fetched but whose system has not resolved yet is
+        stored without a region and completed by a later run.
 
         Structures are absent from the result and their contracts keep a NULL system
-        (see NPC_STATION_ID_MIN/MAX). A station whose lookup fails is likewise absent
-        and gets retried next run, since no pair for it lands in the table.
+        (see NPC_STATION_ID_MIN/MAX). A station whose own lookup fails is likewise
+        absent and gets retried next run, since no row for it was stored; the contract
+        upsert preserves its previously written system (LOCATION_COLUMNS_PRESERVED_ON_NULL).
         """
         station_ids = _npc_station_ids(contracts)
         if not station_ids:
             return {}
 
-        station_to_system = await self._select_known_station_systems(db_session, station_ids)
-        unresolved = station_ids - station_to_system.keys()
-        if not unresolved:
-            return station_to_system
-
-        payloads = await _resolve_esi_objects(
-            self.esi_client.get_universe_station, unresolved, "Station"
-        )
-        for station_id, payload in payloads.items():
-            # ESI omits fields rather than sending falsy ones (pitfall ESI-3), so an
-            # absent system_id means unresolved — not system 0.
-            system_id = payload.get("system_id")
-            if system_id is not None:
-                station_to_system[station_id] = system_id
+        locations = await _select_locations(db_session, station_ids)
+        unresolved = station_ids - locations.keys()
+        changed: dict[int, _Location] = {}
+        if unresolved:
+            payloads = await _resolve_esi_objects(
+                self.esi_client.get_universe_station, unresolved, "Station"
+            )
+            for station_id, payload in payloads.items():
+                # ESI omits fields rather than sending falsy ones (pitfall ESI-3), so an
+                # absent system_id means unresolved — not system 0.
+                system_id = payload.get("system_id")
+                if system_id is not None:
+                    changed[station_id] = _Location(payload.get("name"), system_id, None, None)
+
+        regionless = {
+            station_id: location
+            for station_id, location in {**locations, **changed}.items()
+            if location.region_id is None
+        }
+        if regionless:
+            systems = await self._resolve_systems(
+                db_session, {location.system_id for location in regionless.values()}
+            )
+            for station_id, location in regionless.items():
+                system = systems.get(location.system_id)
+                if system is not None:
+                    changed[station_id] = replace(
+                        location,
+                        region_id=system.region_id,
+                        security_status=system.security_status,
+                    )
 
+        await _upsert_locations(db_session, changed)
+        locations.update(changed)
         logger.info(
-            f"Resolved {len(payloads)} new station→system pairs "
-            f"({len(station_ids) - len(unresolved)} already known)."
+            f"Resolved {len(changed)} stations from ESI "
+            f"({len(station_ids) - len(unresolved)} already in the location dimension)."
         )
-        return station_to_system
-
-    async def _select_known_station_systems(
-        self, db_session: AsyncSession, station_ids: set[int]
-    ) -> dict[int, int]:
-        """Station→system pairs already recorded on stored contracts, in either role.
-
-        Makes the contracts table its own durable cache for a lookup whose answer never
-        changes, so steady state costs zero station requests. It is also what keeps an
-        ESI outage from blanking the filter: the upsert copies every supplied column on
-        conflict, so a run that re-resolved from scratch and came back empty would write
-        NULL over every system the site already knew — the same decay that ETag-304s once
-        inflicted on is_ship_contract. Both the start and the end column pair are read
-        back for exactly that reason: a station known only as some contract's destination
-        would otherwise be re-fetched forever, and blanked whenever the fetch failed.
+        return locations
+
+    async def _resolve_systems(
+        self, db_session: AsyncSession, system_ids: set[int]
+    ) -> dict[int, _Location]:
+        """Solar systems with their regions, from universe_locations, else from the SDE
+        the route graph was loaded from, else from ESI.
+
+        The SDE answers a new system with no request, from the same rows its routes
+        are judged high-sec by. Without it (SDE_DIR unset) a system costs two ESI
+        lookups (_esi_systems). Only systems whose region resolved are returned and
+        stored — a system row always has one — so a failure is retried next run.
         """
-        known: dict[int, int] = {}
-        for chunk in _chunk_ids(station_ids):
-            for location_column, system_column in (
-                (Contract.start_location_id, Contract.start_location_system_id),
-                (Contract.end_location_id, Contract.end_location_system_id),
-            ):
-                rows = await db_session.execute(
-                    select(location_column, system_column)
-                    .where(
-                        location_column.in_(chunk),
-                        system_column.is_not(None),
-                    )
-                    .distinct()
+        systems = {
+            system_id: location
+            for system_id, location in (await _select_locations(db_session, system_ids)).items()
+            if location.region_id is not None
+        }
+        missing = system_ids - systems.keys()
+        if not missing:
+            return systems
+
+        resolved = self._sde_systems(missing)
+        if missing - resolved.keys():
+            resolved.update(await self._esi_systems(missing - resolved.keys()))
+
+        await _upsert_locations(db_session, resolved)
+        systems.update(resolved)
+        return systems
+
+    def _sde_systems(self, system_ids: set[int]) -> dict[int, _Location]:
+        """The systems among system_ids the loaded SDE places in a region."""
+        known = self.route_graph.solar_systems if self.route_graph is not None else {}
+        return {
+            system_id: _Location(
+                system.name, system_id, system.region_id, system.security_status
+            )
+            for system_id in system_ids
+            if (system := known.get(system_id)) is not None and system.region_id is not None
+        }
+
+    async def _esi_systems(self, system_ids: set[int]) -> dict[int, _Location]:
+        """Systems from ESI. A system's payload names its constellation, not its
+        region, so each costs two lookups; the constellations are deduplicated across
+        the set first."""
+        payloads = await _resolve_esi_objects(
+            self.esi_client.get_universe_system, system_ids, "System"
+        )
+        constellations = await _resolve_esi_objects(
+            self.esi_client.get_universe_constellation,
+            {
+                payload["constellation_id"]
+                for payload in payloads.values()
+                if payload.get("constellation_id") is not None
+            },
+            "Constellation",
+        )
+        resolved = {}
+        for system_id, payload in payloads.items():
+            region_id = constellations.get(payload.get("constellation_id"), {}).get("region_id")
+            if region_id is not None:
+                resolved[system_id] = _Location(
+                    payload.get("name"), system_id, region_id, payload.get("security_status")
                 )
-                known.update({station_id: system_id for station_id, system_id in rows})
-        return known
+        return resolved
 
     async def _select_already_enriched(
         self, db_session: AsyncSession, contracts: List[dict]
@@ -689,17 +1084,92 @@ class ContractAggregationService:
         ENRICHMENT_INCOMPLETE from degraded type resolution) is still re-fetched, so
         transient failures keep recovering on the next run.
         """
-        already_enriched: set[int] = set()
-        for chunk in _chunk_ids(c["contract_id"] for c in contracts):
-            rows = await db_session.execute(
-                select(Contract.contract_id).where(
-                    Contract.contract_id.in_(chunk),
-                    Contract.item_processing_status == "COMPLETED",
-                    Contract.enrichment_version == ENRICHMENT_VERSION,
-                )
+        rows = await db_session.execute(
+            select(Contract.contract_id).where(
+                any_of(Contract.contract_id, (c["contract_id"] for c in contracts)),
+                Contract.item_processing_status == "COMPLETED",
+                Contract.enrichment_version == ENRICHMENT_VERSION,
+            )
+        )
+        return set(rows.scalars())
+
+    async def _refresh_item_summaries(
+        self,
+        db_session: AsyncSession,
+        contracts: List[dict],
+        processed_contract_ids: set[int],
+    ) -> None:
+        """Rewrite the contract-level item summary from the stored items.
+
+        Covers the contracts whose items this run wrote, plus any contract in the run
+        whose summary is not at ITEM_SUMMARY_VERSION — so rows that predate the
+        summary, or a version bump, heal without re-fetching items from ESI. Derived
+        in SQL from contract_items rather than from this run's item dicts: an
+        already-enriched contract has no item dicts this run, and the stored rows are
+        what the list reads anyway. A contract with no items gets NULLs, which the
+        ship_name sort places last exactly as the join did.
+
+        The names stay a SQL min/max so they collate exactly like the list's fallback
+        for stale rows; list_summary is computed in Python by the same function the
+        list's fallback calls (contract_summary.build_list_summary), from the items
+        streamed in contract order by one query. Four statements whatever the run's
+        size: the stale read, the name UPDATE, the item read and one executemany.
+        """
+        stale_rows = await db_session.execute(
+            select(Contract.contract_id).where(
+                any_of(Contract.contract_id, (c["contract_id"] for c in contracts)),
+                Contract.item_summary_version != ITEM_SUMMARY_VERSION,
+            )
+        )
+        refreshed = processed_contract_ids | set(stale_rows.scalars())
+        if not refreshed:
+            return
+
+        def _item_names(aggregate):
+            return (
+                select(aggregate(ContractItem.type_name))
+                .where(ContractItem.contract_id == Contract.contract_id)
+                .scalar_subquery()
+            )
+
+        await db_session.execute(
+            update(Contract)
+            .where(any_of(Contract.contract_id, refreshed))
+            .values(
+                item_name_first=_item_names(func.min),
+                item_name_last=_item_names(func.max),
+                item_summary_version=ITEM_SUMMARY_VERSION,
             )
-            already_enriched.update(rows.scalars())
-        return already_enriched
+        )
+
+        # Summarized a contract at a time as the ordered stream passes it, so only the
+        # summaries are held, not the items.
+        summaries: dict[int, dict] = {}
+        contract_id, items = None, []
+        item_rows = await db_session.stream_scalars(
+            select(ContractItem)
+            .where(any_of(ContractItem.contract_id, refreshed))
+            .order_by(ContractItem.contract_id)
+            .execution_options(yield_per=SUMMARY_ITEM_BATCH_SIZE)
+        )
+        async for item in item_rows:
+            if item.contract_id != contract_id:
+                if contract_id is not None:
+                    summaries[contract_id] = build_list_summary(items)
+                contract_id, items = item.contract_id, []
+            items.append(item)
+        if contract_id is not None:
+            summaries[contract_id] = build_list_summary(items)
+
+        # Bulk UPDATE by primary key: one executemany for the run.
+        no_items = build_list_summary([])
+        await db_session.execute(
+            update(Contract),
+            [
+                {"contract_id": contract_id, "list_summary": summaries.get(contract_id, no_items)}
+                for contract_id in refreshed
+            ],
+        )
 
     async def _fetch_item_rows(
         self, contracts: List[dict], already_enriched: set[int]
@@ -787,10 +1257,10 @@ class ContractAggregationService:
         completed_contract_ids = (
             processed_contract_ids - incomplete_contract_ids - empty_contract_ids
         )
-        for chunk in _chunk_ids(completed_contract_ids):
+        if completed_contract_ids:
             await db_session.execute(
                 update(Contract)
-                .where(Contract.contract_id.in_(chunk))
+                .where(any_of(Contract.contract_id, completed_contract_ids))
                 .values(
                     item_processing_status="COMPLETED",
                     enrichment_version=ENRICHMENT_VERSION,
@@ -806,19 +1276,18 @@ class ContractAggregationService:
         # type_name still resolves — from stripping correct flags off the ships-only
         # default view during an ESI blip.
         non_ship_completed = completed_contract_ids - ship_contract_ids
-        for chunk in _chunk_ids(non_ship_completed):
+        if non_ship_completed:
             await db_session.execute(
                 update(Contract)
-                .where(Contract.contract_id.in_(chunk))
+                .where(any_of(Contract.contract_id, non_ship_completed))
                 .values(is_ship_contract=False)
             )
-        for chunk in _chunk_ids(incomplete_contract_ids):
+        if incomplete_contract_ids:
             await db_session.execute(
                 update(Contract)
-                .where(Contract.contract_id.in_(chunk))
+                .where(any_of(Contract.contract_id, incomplete_contract_ids))
                 .values(item_processing_status="ENRICHMENT_INCOMPLETE")
             )
-        if incomplete_contract_ids:
             logger.info(
                 f"{len(incomplete_contract_ids)} contracts left ENRICHMENT_INCOMPLETE "
                 "(item type or category resolution degraded)."
@@ -864,7 +1333,7 @@ class ContractAggregationService:
             cached_groups = set((await db_session.execute(
                 select(EsiTaxonomyCache.esi_id).where(
                     EsiTaxonomyCache.kind == "group",
-                    EsiTaxonomyCache.esi_id.in_(sorted(observed_groups)),
+                    any_of(EsiTaxonomyCache.esi_id, observed_groups),
                 )
             )).scalars())
             missing_groups = observed_groups - cached_groups
@@ -896,7 +1365,7 @@ class ContractAggregationService:
         cached = set((await db_session.execute(
             select(EsiTaxonomyCache.esi_id).where(
                 EsiTaxonomyCache.kind == "category",
-                EsiTaxonomyCache.esi_id.in_(sorted(category_ids)),
+                any_of(EsiTaxonomyCache.esi_id, category_ids),
             )
         )).scalars())
         missing = category_ids - cached
@@ -0,0 +1,442 @@
+# ABOUTME: Cache-aside for GET /contracts — responses keyed by ingestion generation plus a
+# ABOUTME: canonical hash of ContractFilters, so one ingest commit invalidates every entry.
+import asyncio
+import hashlib
+import json
+import math
+import time
+import uuid
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+from pydantic import TypeAdapter, ValidationError
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..core.conditional_get import strong_etag
+from ..core.config import get_settings
+from ..core.logging import get_logger
+from ..core.metrics import contract_list_cache_lookups
+from ..schemas.contracts import ContractFilters, ContractListResponse
+from .background_aggregation import INGEST_GENERATION_KEY
+from .contract_read_model import ContractReadModelCache
+from .contract_service import get_contracts
+from .dataset_snapshot import DatasetSnapshot, build_dataset_snapshot
+
+logger = get_logger(__name__)
+
+# v3: entries carry the page's ETag beside its bytes (_encode_entry).
+CONTRACT_LIST_CACHE_PREFIX = "hangar-bay:contracts:list:v3"
+
+
+def _canonical_filters(filters: ContractFilters) -> str:
+    """Everything that decides a list response, as compact JSON that is equal for equal
+    requests. Every id list is an IN-style predicate, so its order and repeats select
+    nothing different: region_ids=[2,1] and [1,1,2] are the same request."""
+    canonical = filters.model_dump(mode="json")
+    for field, value in canonical.items():
+        if isinstance(value, list):
+            canonical[field] = sorted(set(value))
+    return json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+
+
+def filters_fingerprint(filters: ContractFilters) -> str:
+    """A stable digest of everything that decides a list response, so requests that
+    differ only in list order or repeats share an entry. Hashed rather than spelled
+    out, which also keeps the user's search text out of the key namespace anyone with
+    cache access can list.
+    """
+    return hashlib.sha256(_canonical_filters(filters).encode()).hexdigest()
+
+
+async def read_generation(redis: Redis) -> int:
+    """The generation readers are on. 0 until the first run commits after the cache
+    came up — entries written under it are invalidated by that first bump."""
+    raw = await redis.get(INGEST_GENERATION_KEY)
+    try:
+        return int(raw) if raw is not None else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+async def current_generation(redis: Redis | None) -> int:
+    """read_generation for callers that only optimize with it: 0 — "unknown" — without
+    a client or when the read fails, rather than an error."""
+    if redis is None:
+        return 0
+    try:
+        return await read_generation(redis)
+    except Exception:
+        logger.warning("Ingestion generation read failed", exc_info=True)
+        return 0
+
+
+def list_cache_key(generation: int, filters: ContractFilters) -> str:
+    return f"{CONTRACT_LIST_CACHE_PREFIX}:{generation}:{filters_fingerprint(filters)}"
+
+
+# How many distinct filter sets one generation's popularity tally keeps, lowest counts
+# trimmed first, and how long an idle tally outlives its last request. The tally may
+# grow to twice the limit between trims.
+POPULAR_FILTERS_LIMIT = 500
+POPULAR_FILTERS_TTL_SECONDS = 86400
+
+
+def _popularity_key(generation: int) -> str:
+    return f"{CONTRACT_LIST_CACHE_PREFIX}:popular:{generation}"
+
+
+def _tally_member(filters: ContractFilters) -> str | None:
+    """The request as a popularity tally entry, or None for one that is never tallied.
+
+    Unlike a cache key the entry is stored readable — warming has to rebuild the
+    filters from it — so a request carrying search text is left out: that text is
+    whatever a user typed. So is one with a cursor, a position in one generation's
+    result that no later generation can serve. What remains is ids, bounds, flags,
+    sort and page: nothing that identifies who asked.
+    """
+    if filters.search is not None or filters.cursor is not None:
+        return None
+    return _canonical_filters(filters)
+
+
+async def _tally_request(redis: Redis, generation: int, filters: ContractFilters) -> None:
+    """Count one request towards its filter set's popularity under `generation`.
+
+    One pipelined round trip: the ZINCRBY, the tally's size and the TTL. Only once the
+    tally holds twice POPULAR_FILTERS_LIMIT is it trimmed back to the limit, in a
+    second round trip, so a long tail of one-off filter sets costs a bounded amount of
+    memory while a newcomer has the slack to build a count before it can be trimmed —
+    trimming on every request would evict each new filter set as it arrived.
+    Fails open: a lost count only makes the next warming slightly less well aimed.
+    """
+    member = _tally_member(filters)
+    if member is None:
+        return
+    key = _popularity_key(generation)
+    try:
+        _, size, _ = await (
+            redis.pipeline(transaction=False)
+            .zincrby(key, 1, member)
+            .zcard(key)
+            .expire(key, POPULAR_FILTERS_TTL_SECONDS)
+            .execute()
+        )
+        if size > 2 * POPULAR_FILTERS_LIMIT:
+            await redis.zremrangebyrank(key, 0, -(POPULAR_FILTERS_LIMIT + 1))
+    except Exception:
+        logger.warning("Contract list popularity tally failed", exc_info=True)
+
+
+# Tallies in flight (_tally_in_background), held so none is collected mid-flight; each
+# removes itself when done.
+_tallies: set[asyncio.Task] = set()
+
+
+def _tally_in_background(redis: Redis, generation: int, filters: ContractFilters) -> None:
+    """_tally_request without the response waiting on it: a cache hit stays one GET."""
+    task = asyncio.get_running_loop().create_task(_tally_request(redis, generation, filters))
+    _tallies.add(task)
+    task.add_done_callback(_tallies.discard)
+
+
+async def drain_tallies() -> None:
+    """Wait for the tallies in flight. Tests use it; nothing else needs to."""
+    if _tallies:
+        await asyncio.gather(*_tallies, return_exceptions=True)
+
+
+@dataclass(frozen=True)
+class RenderedPage:
+    """A list response as the bytes that go on the wire, their ETag, and how long they
+    hold.
+
+    `etag` is the strong tag over `body`, computed once when the page is rendered and
+    stored with it, so a cache hit answers If-None-Match without hashing the body.
+    `fresh_until` is the soonest date_expired on the page (None when it is empty). The
+    list hides contracts past date_expired and stored bytes cannot re-evaluate that, so
+    nothing that keeps these bytes — the cache entry, or a client's HTTP cache — may
+    keep them past that moment.
+    """
+
+    body: bytes
+    fresh_until: datetime | None
+    etag: str
+
+    def fresh_for(self, ceiling: int) -> int:
+        """Seconds these bytes can be reused: `ceiling`, cut short by fresh_until.
+
+        `total` and the segment counts can still run a few contracts high until then —
+        those expire off-page, and chasing them would cost the count a cache exists to
+        skip.
+        """
+        if self.fresh_until is None or ceiling <= 0:
+            return max(0, ceiling)
+        remaining = (self.fresh_until - datetime.now(timezone.utc)).total_seconds()
+        return max(1, min(ceiling, math.ceil(remaining)))
+
+
+# Serializes in pydantic-core straight to JSON bytes, with no validation pass and no
+# second encoder: the rows were built trusted (contract_service._list_item), and this
+# is the only serialization a list response goes through.
+_LIST_RESPONSE_JSON = TypeAdapter(ContractListResponse)
+
+
+def render_list_page(response: ContractListResponse) -> RenderedPage:
+    body = _LIST_RESPONSE_JSON.dump_json(response)
+    return RenderedPage(
+        body=body,
+        fresh_until=min((item.date_expired for item in response.items), default=None),
+        etag=strong_etag(body),
+    )
+
+
+def _encode_entry(page: RenderedPage) -> str:
+    """fresh_until, the ETag and the body, a newline after each of the first two: the
+    page is stored exactly as served, so a hit goes back on the wire without being
+    parsed or hashed. Neither the tag nor compact JSON holds a newline."""
+    fresh_until = page.fresh_until.isoformat() if page.fresh_until is not None else ""
+    return f"{fresh_until}\n{page.etag}\n{page.body.decode()}"
+
+
+def _decode_entry(entry: str) -> RenderedPage:
+    fresh_until, etag, body = entry.split("\n", 2)
+    return RenderedPage(
+        body=body.encode(),
+        fresh_until=datetime.fromisoformat(fresh_until) if fresh_until else None,
+        etag=etag,
+    )
+
+
+def _dataset_kwargs(snapshot: DatasetSnapshot | None) -> dict:
+    """get_contracts' dataset metadata arguments, from `snapshot` when there is one."""
+    if snapshot is None:
+        return {}
+    return {
+        "category_names": snapshot.category_names,
+        "coverage": snapshot.coverage,
+        "segment_totals": snapshot.segment_totals,
+    }
+
+
+async def warm_popular_pages(
+    redis: Redis, generation: int, session_factory: async_sessionmaker[AsyncSession]
+) -> int:
+    """Compute and store the most requested list pages under `generation`; returns how
+    many were stored.
+
+    Called by the aggregation job after its commit and BEFORE it publishes `generation`
+    (ContractAggregationService._warm_caches): the tally read here is the one kept under
+    the generation readers are still on, and once the new one is announced its first
+    readers find these pages already cached instead of all missing at once. The
+    dataset metadata is read once for every page, as an API process's snapshot would.
+    A tally entry the current ContractFilters no longer accepts is skipped.
+    """
+    settings = get_settings()
+    top_n = settings.CONTRACT_LIST_WARM_TOP_N
+    ttl = settings.CONTRACT_LIST_CACHE_TTL_SECONDS
+    if top_n <= 0 or ttl <= 0:
+        return 0
+    popular = await redis.zrevrange(_popularity_key(await read_generation(redis)), 0, top_n - 1)
+    if not popular:
+        return 0
+
+    warmed = 0
+    async with session_factory() as db:
+        dataset = _dataset_kwargs(await build_dataset_snapshot(db))
+        for member in popular:
+            try:
+                filters = ContractFilters.model_validate_json(member)
+            except ValidationError:
+                continue
+            page = render_list_page(await get_contracts(db=db, filters=filters, **dataset))
+            await redis.set(
+                list_cache_key(generation, filters), _encode_entry(page), ex=page.fresh_for(ttl)
+            )
+            warmed += 1
+    logger.info("Warmed contract list pages", pages=warmed, generation=generation)
+    return warmed
+
+
+# Compare-and-delete: release the fill lock only if THIS request still holds the token.
+_RELEASE_LOCK_LUA = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) else return 0 end"
+)
+
+# How often a process waiting on another's fill (_filled_elsewhere) looks for the entry.
+FILL_POLL_SECONDS = 0.05
+
+# Pages being computed in this process, by cache key. Event-loop state, so no lock:
+# nothing between the lookup and the insert awaits.
+_in_flight: dict[str, asyncio.Future] = {}
+
+
+async def _single_flight(key: str, compute: Callable[[], Awaitable[RenderedPage]]) -> RenderedPage:
+    """Run `compute` once for every concurrent request for `key` in this process.
+
+    The first request computes on its own session; the rest await its result and touch
+    no connection at all, so a burst for one page costs the pool one connection.
+    Shielded, so a waiter that disconnects does not cancel the computation the others
+    are waiting on. If the computing request is itself cancelled, a waiter takes over;
+    if it fails, the waiters fail with it, as they would have running the same queries.
+    """
+    while (flight := _in_flight.get(key)) is not None:
+        try:
+            page = await asyncio.shield(flight)
+        except asyncio.CancelledError:
+            if not flight.cancelled():
+                raise  # this request was cancelled, not the one computing
+            continue
+        contract_list_cache_lookups.labels(outcome="coalesced").inc()
+        return page
+
+    flight = asyncio.get_running_loop().create_future()
+    _in_flight[key] = flight
+    try:
+        page = await compute()
+    except asyncio.CancelledError:
+        flight.cancel()
+        raise
+    except Exception as exc:
+        flight.set_exception(exc)
+        flight.exception()  # retrieved here, so a flight nobody waited on is not logged
+        raise
+    else:
+        flight.set_result(page)
+        return page
+    finally:
+        del _in_flight[key]
+
+
+def _fill_lock_key(key: str) -> str:
+    return f"{key}:fill"
+
+
+async def _filled_elsewhere(redis: Redis, key: str, wait_seconds: int) -> RenderedPage | None:
+    """The entry another process is computing under the fill lock, once it lands.
+
+    None when the holder lets go of the lock without writing (it failed) or the wait
+    runs out. The lock is read before the entry: a holder writes, then releases, so
+    a lock seen gone means the entry read after it is final.
+    """
+    deadline = time.monotonic() + wait_seconds
+    while time.monotonic() < deadline:
+        await asyncio.sleep(FILL_POLL_SECONDS)
+        held = await redis.exists(_fill_lock_key(key))
+        cached = await redis.get(key)
+        if cached is not None:
+            return _decode_entry(cached)
+        if not held:
+            return None
+    return None
+
+
+async def _fill(
+    redis: Redis, key: str, ttl: int, compute: Callable[[], Awaitable[RenderedPage]]
+) -> RenderedPage:
+    """Compute a missed page and store it — unless another process already is, in which
+    case wait for its entry instead.
+
+    Which process computes is settled by a short SET NX lock beside the entry
+    (CONTRACT_LIST_FILL_LOCK_SECONDS), so a burst across every API process costs
+    Postgres one computation. The lock is only a coordination hint: when it cannot be
+    taken or read, or its holder produces nothing in time, the request computes the
+    page itself, exactly as it would without the lock.
+    """
+    lock_seconds = get_settings().CONTRACT_LIST_FILL_LOCK_SECONDS
+    token = uuid.uuid4().hex
+    holding = False
+    if lock_seconds > 0:
+        try:
+            holding = bool(
+                await redis.set(_fill_lock_key(key), token, nx=True, ex=lock_seconds)
+            )
+            if not holding:
+                page = await _filled_elsewhere(redis, key, lock_seconds)
+                if page is not None:
+                    contract_list_cache_lookups.labels(outcome="coalesced").inc()
+                    return page
+        except Exception:
+            contract_list_cache_lookups.labels(outcome="error").inc()
+            logger.warning("Contract list fill lock failed", exc_info=True)
+
+    contract_list_cache_lookups.labels(outcome="miss").inc()
+    try:
+        page = await compute()
+        try:
+            await redis.set(key, _encode_entry(page), ex=page.fresh_for(ttl))
+        except Exception:
+            contract_list_cache_lookups.labels(outcome="error").inc()
+            logger.warning("Contract list cache write failed", exc_info=True)
+        return page
+    finally:
+        if holding:
+            # Compare-and-delete: past the TTL, the lock may be another process's now.
+            with suppress(Exception):
+                await redis.eval(_RELEASE_LOCK_LUA, 1, _fill_lock_key(key), token)
+
+
+async def get_contracts_cached(
+    db: AsyncSession,
+    redis: Redis | None,
+    filters: ContractFilters,
+    snapshot: DatasetSnapshot | None = None,
+    read_models: ContractReadModelCache | None = None,
+) -> tuple[RenderedPage, int]:
+    """get_contracts behind a generation-keyed cache-aside, rendered for the wire, with
+    the ingestion generation the page was looked up under (0 when unknown).
+
+    Fails open in every direction: no client, a disabled TTL, or a cache round-trip
+    that raises all fall through to the database. A list page that is slower because
+    Valkey is down is a degraded site; one that 500s is an outage. Concurrent misses
+    for one page share one computation, within the process (_single_flight) and
+    across processes (_fill). Each cached lookup also counts towards its filter set's
+    popularity (_tally_request, off the response path), which decides what the next
+    ingest warms. A miss takes its dataset metadata from `snapshot` when the caller
+    has one, and its page from the read model when `read_models` holds one for the
+    generation the request read. The generation is returned so the caller's freshness
+    headers are settled by this lookup's one GET rather than a second.
+    """
+    dataset = _dataset_kwargs(snapshot)
+
+    async def computed(generation: int) -> RenderedPage:
+        # Only a model of the generation read here may answer, so a page is never
+        # cached under a generation other than the one its data came from.
+        read_model = (
+            read_models.current(generation) if read_models is not None else None
+        )
+        return render_list_page(
+            await get_contracts(db=db, filters=filters, read_model=read_model, **dataset)
+        )
+
+    ttl = get_settings().CONTRACT_LIST_CACHE_TTL_SECONDS
+    if redis is None or ttl <= 0:
+        generation = await current_generation(redis)
+        page = await _single_flight(
+            list_cache_key(generation, filters), lambda: computed(generation)
+        )
+        return page, generation
+
+    try:
+        generation = await read_generation(redis)
+        key = list_cache_key(generation, filters)
+        cached = await redis.get(key)
+    except Exception:
+        contract_list_cache_lookups.labels(outcome="error").inc()
+        logger.warning("Contract list cache lookup failed", exc_info=True)
+        return await computed(0), 0
+
+    if get_settings().CONTRACT_LIST_WARM_TOP_N > 0:
+        _tally_in_background(redis, generation, filters)
+
+    if cached is not None:
+        contract_list_cache_lookups.labels(outcome="hit").inc()
+        return _decode_entry(cached), generation
+
+    page = await _single_flight(
+        key, lambda: _fill(redis, key, ttl, lambda: computed(generation))
+    )
+    return page, generation
@@ -0,0 +1,788 @@
+# ABOUTME: In-process columnar read model of the live contract corpus — bitsets per filter value and
+# ABOUTME: Postgres-ranked sort orders — answering list counts, pages and facets without SQL scans.
+import asyncio
+import bisect
+import time
+from contextlib import AbstractAsyncContextManager, suppress
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Callable, Iterable
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..core.logging import get_logger
+from ..core.metrics import contract_read_model_builds
+from ..models.contracts import Contract, ContractItem
+from ..schemas.contracts import (
+    BooleanFacet,
+    ContractCursor,
+    ContractFacetsResponse,
+    ContractFilters,
+    SortDirection,
+    SortableContractFields,
+)
+from .contract_search import matching_contract_ids
+from .route_graph import systems_within
+from .contract_service import (
+    _apply_contract_filters,
+    _fold_segment_rows,
+    _next_cursor,
+    _ordering,
+    _segment_of,
+    _sort_key,
+)
+
+logger = get_logger(__name__)
+
+# Rows per fetch while the model streams the corpus in. Each fetch is an await, so a
+# build hands the event loop back between batches instead of holding it for the lot.
+BUILD_BATCH_SIZE = 5000
+
+# A page is cut from the matches by walking the sort order from the start, unless the
+# matches are this sparse (one row in this many or fewer): then they are ranked and
+# sorted instead, which costs what the matches cost rather than what the order does.
+_SPARSE_RATIO = 64
+
+
+def _bits(rows: Iterable[int], width: int) -> int:
+    """A bitset over `width` rows with each of `rows` set. Built as bytes, so setting a
+    bit costs a byte write rather than a new integer the size of the corpus."""
+    mask = bytearray((width + 7) >> 3)
+    for row in rows:
+        mask[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(mask, "little")
+
+
+def _rows(bits: int) -> list[int]:
+    """The rows set in `bits`, ascending."""
+    rows = []
+    for index, byte in enumerate(bits.to_bytes((bits.bit_length() + 7) >> 3, "little")):
+        while byte:
+            lowest = byte & -byte
+            rows.append((index << 3) + lowest.bit_length() - 1)
+            byte ^= lowest
+    return rows
+
+
+def _within(value, minimum, maximum) -> bool:
+    """One blueprint family's bounds on one item; NULL satisfies neither direction."""
+    return (
+        value is not None
+        and (minimum is None or value >= minimum)
+        and (maximum is None or value <= maximum)
+    )
+
+
+@dataclass(frozen=True)
+class _SortOrder:
+    """One (sort_by, sort_direction) as the database orders it.
+
+    `order` lists the rows first to last, `rank` is each row's position in it, and
+    `keys` each row's sort key as the page query reads it — the value a cursor carries.
+    """
+
+    order: list[int]
+    rank: list[int]
+    keys: list
+
+
+@dataclass(frozen=True)
+class Selection:
+    """What a list request needs from the model: the page's contract ids in order, and
+    the figures the response envelope carries."""
+
+    contract_ids: list[int]
+    next_cursor: str | None
+    segment_counts: dict[str, int]
+    total: int
+    unknown_system_excluded: int | None
+
+
+@dataclass(frozen=True)
+class ContractReadModel:
+    """The live corpus of one ingestion generation, held column by column.
+
+    Every contract is a row number. A filter value with few distinct values — stored
+    type, region, the ships and copies flags, an offered item's category and group —
+    keeps a bitset (a Python int) of its rows, so a filter is an OR of bitsets and a
+    count is bit_count(). Values with thousands of distinct members — systems,
+    stations, item types — keep row lists instead, turned into a bitset only when a
+    request names them: a bitset apiece would cost more memory than the corpus.
+
+    Sort orders are ranked by Postgres itself (_rank_columns), so collation, NULL
+    placement and the contract_id tiebreak are the page query's by construction.
+
+    Frozen, and never patched: a generation's model is replaced whole by the next
+    one's. Between the two, only time changes what is live — the one predicate
+    re-evaluated per request (_live).
+    """
+
+    generation: int
+    contract_ids: list[int]
+    row_of: dict[int, int]
+    everything: int
+    # Expiry ascending, for the per-request liveness cut.
+    expiry_dates: list[datetime]
+    expiry_rows: list[int]
+    # Bounds arrive as floats, so the columns are compared as floats.
+    price_sorted: list[float]
+    price_rows: list[int]
+    collateral_sorted: list[float]
+    collateral_rows: list[int]
+    # Couriers with a route only: a bound on either excludes a NULL in SQL too.
+    jumps_sorted: list[float]
+    jumps_rows: list[int]
+    reward_per_jump_sorted: list[float]
+    reward_per_jump_rows: list[int]
+    by_stored_type: dict[str, int]
+    by_region: dict[int | None, int]
+    unknown_system: int
+    ships: int
+    copies: int  # an offered blueprint copy (_has_blueprint_copy_item)
+    by_taxonomy: dict[tuple[int | None, int | None], int]  # offered items, per (category, group)
+    systems: dict[int, list[int]]
+    stations: dict[int, list[int]]
+    by_item_type: dict[int, list[int]]  # items on either side of the trade
+    blueprint_items: list[tuple[int, int | None, int | None, int | None]]  # row, runs, ME, TE
+    sort_orders: dict[tuple[SortableContractFields, SortDirection], _SortOrder]
+
+    def _of(self, rows: Iterable[int]) -> int:
+        return _bits(rows, len(self.contract_ids))
+
+    def _live(self) -> int:
+        """Every row but those whose date_expired has passed since the build.
+
+        On the application clock, where the SQL path reads the database's: the two can
+        disagree about a contract for as long as the clocks do.
+        """
+        expired = bisect.bisect_right(self.expiry_dates, datetime.now(timezone.utc))
+        if expired == 0:
+            return self.everything
+        return self.everything & ~self._of(self.expiry_rows[:expired])
+
+    def _in_range(self, values: list[float], rows: list[int], minimum, maximum) -> int:
+        low = 0 if minimum is None else bisect.bisect_left(values, minimum)
+        high = len(values) if maximum is None else bisect.bisect_right(values, maximum)
+        return self._of(rows[low:high])
+
+    def _taxonomy(self, categories, groups) -> int:
+        """Rows offering one item inside both lists; a list left out matches anything."""
+        matched = 0
+        for (category_id, group_id), bits in self.by_taxonomy.items():
+            if (not categories or category_id in categories) and (
+                not groups or group_id in groups
+            ):
+                matched |= bits
+        return matched
+
+    def _criteria(self, filters: ContractFilters, searched: set[int] | None) -> dict[str, int]:
+        """Each filter the request applies, as the bitset of rows it keeps.
+
+        Mirrors _apply_contract_filters and _apply_item_filters predicate for
+        predicate, including which values count as "not applied" (an empty list is
+        falsy there too). Keyed by name so callers can lift a filter the way the
+        segment counts and facets do.
+        """
+        applied = {"live": self._live()}
+        if filters.search:
+            applied["search"] = self._of(
+                self.row_of[contract_id] for contract_id in searched if contract_id in self.row_of
+            )
+        for name, applies, kept in _CRITERIA:
+            if applies(filters):
+                applied[name] = kept(self, filters)
+        return applied
+
+    def _all_of(self, applied: dict[str, int], *lifting: str) -> int:
+        matched = self.everything
+        for name, bits in applied.items():
+            if name not in lifting:
+                matched &= bits
+        return matched
+
+    def _window(self, order: _SortOrder, matched: int, start: int, skip: int, take: int) -> list[int]:
+        """Up to `take` matched rows in sort order, from position `start`, after `skip`."""
+        if matched.bit_count() * _SPARSE_RATIO <= len(order.order):
+            ranked = sorted(order.rank[row] for row in _rows(matched))
+            ranked = ranked[bisect.bisect_left(ranked, start):]
+            return [order.order[position] for position in ranked[skip: skip + take]]
+
+        mask = matched.to_bytes((len(self.contract_ids) + 7) >> 3, "little")
+        picked = []
+        for row in islice(order.order, start, None):
+            if mask[row >> 3] >> (row & 7) & 1:
+                if skip:
+                    skip -= 1
+                    continue
+                picked.append(row)
+                if len(picked) == take:
+                    break
+        return picked
+
+    async def list_page(self, db: AsyncSession, filters: ContractFilters) -> Selection | None:
+        """The page, counts and residual get_contracts would compute, or None to leave
+        the request to SQL.
+
+        Declines a cursor the model cannot place exactly: one naming a contract it
+        does not hold, or carrying a key other than the one it holds for that
+        contract. The SQL seek resumes from the key itself, so it still answers those.
+        """
+        order = self.sort_orders[(filters.sort_by, filters.sort_direction)]
+        start = 0
+        if filters.cursor is not None:
+            position = ContractCursor.decode(filters.cursor)
+            row = self.row_of.get(position.contract_id)
+            if row is None:
+                return None
+            held = ContractCursor.after(
+                filters.sort_by, filters.sort_direction, order.keys[row], position.contract_id
+            )
+            if held.value != position.value:
+                return None
+            start = order.rank[row] + 1
+
+        applied = self._criteria(filters, await _searched(db, filters))
+
+        # The segment counts' rows, as _segment_counts_and_total's grouped count
+        # returns them: contract_type and the ships flag lifted.
+        lifted = self._all_of(applied, "contract_type", "ship")
+        segment_counts, total = _fold_segment_rows(
+            [
+                (stored_type, (lifted & bits).bit_count(), (lifted & bits & self.ships).bit_count())
+                for stored_type, bits in self.by_stored_type.items()
+            ],
+            filters,
+        )
+        unknown_system_excluded = None
+        if filters.system_ids or filters.near_system_id is not None:
+            unknown_system_excluded = (
+                self._all_of(applied, "system", "proximity") & self.unknown_system
+            ).bit_count()
+
+        skip = (filters.page - 1) * filters.size if filters.cursor is None else 0
+        rows = self._window(order, self._all_of(applied), start, skip, filters.size + 1)
+        keyed_rows = [(self.contract_ids[row], order.keys[row]) for row in rows]
+        return Selection(
+            contract_ids=[contract_id for contract_id, _ in keyed_rows[: filters.size]],
+            next_cursor=_next_cursor(filters, keyed_rows),
+            segment_counts=segment_counts,
+            total=total,
+            unknown_system_excluded=unknown_system_excluded,
+        )
+
+    async def facets(self, db: AsyncSession, filters: ContractFilters) -> ContractFacetsResponse:
+        """get_contract_facets' figures, by the same rules: each facet applies every
+        filter but its own, and a region, category or group is listed when any
+        contract matching the non-facet filters has it, even at a count of 0."""
+        applied = self._criteria(filters, await _searched(db, filters))
+        facet_names = ("region", "ship", "bpc", "taxonomy")
+        matched = self._all_of(applied, *facet_names)
+
+        def counted_without(lifting: str) -> int:
+            kept = matched
+            for name in facet_names:
+                if name != lifting:
+                    kept &= applied.get(name, self.everything)
+            return kept
+
+        in_regions = counted_without("region")
+        regions = {
+            region_id: (in_regions & bits).bit_count()
+            for region_id, bits in self.by_region.items()
+            if region_id is not None and bits & matched
+        }
+
+        # The item facets keep the OTHER taxonomy filter, on the same item.
+        in_taxonomy = counted_without("taxonomy")
+        category_filter = set(filters.category_id or ())
+        group_filter = set(filters.group_id or ())
+        by_category: dict[int, int] = {}
+        by_group: dict[int, int] = {}
+        for (category_id, group_id), bits in self.by_taxonomy.items():
+            present = bits & matched
+            if not present:
+                continue
+            if category_id is not None:
+                by_category.setdefault(category_id, 0)
+                if not group_filter or group_id in group_filter:
+                    by_category[category_id] |= present
+            if group_id is not None:
+                by_group.setdefault(group_id, 0)
+                if not category_filter or category_id in category_filter:
+                    by_group[group_id] |= present
+
+        ships = counted_without("ship")
+        copies = counted_without("bpc")
+        return ContractFacetsResponse(
+            regions=regions,
+            categories={
+                category_id: (in_taxonomy & bits).bit_count()
+                for category_id, bits in by_category.items()
+            },
+            groups={group_id: (in_taxonomy & bits).bit_count() for group_id, bits in by_group.items()},
+            is_ship_contract=BooleanFacet(
+                yes=(ships & self.ships).bit_count(),
+                no=(ships & ~self.ships).bit_count(),
+            ),
+            is_bpc=BooleanFacet(
+                yes=(copies & self.copies).bit_count(),
+                no=(copies & ~self.copies).bit_count(),
+            ),
+        )
+
+
+# The filters _criteria applies beside liveness and search: the name it keys each
+# by, whether a request applies it, and the rows it keeps.
+def _kept_by_price(model: ContractReadModel, filters: ContractFilters) -> int:
+    return model._in_range(
+        model.price_sorted, model.price_rows, filters.min_price, filters.max_price
+    )
+
+
+def _kept_by_collateral(model: ContractReadModel, filters: ContractFilters) -> int:
+    return model._in_range(
+        model.collateral_sorted,
+        model.collateral_rows,
+        filters.min_collateral,
+        filters.max_collateral,
+    )
+
+
+def _kept_by_jumps(model: ContractReadModel, filters: ContractFilters) -> int:
+    return model._in_range(model.jumps_sorted, model.jumps_rows, None, filters.max_jumps)
+
+
+def _kept_by_reward_per_jump(model: ContractReadModel, filters: ContractFilters) -> int:
+    return model._in_range(
+        model.reward_per_jump_sorted,
+        model.reward_per_jump_rows,
+        filters.min_reward_per_jump,
+        None,
+    )
+
+
+def _kept_by_ship(model: ContractReadModel, filters: ContractFilters) -> int:
+    return model.ships if filters.is_ship_contract else model.everything & ~model.ships
+
+
+def _kept_by_contract_type(model: ContractReadModel, filters: ContractFilters) -> int:
+    selected = {contract_type.value for contract_type in filters.contract_type}
+    kept = 0
+    for stored_type, bits in model.by_stored_type.items():
+        if _segment_of(stored_type) in selected:
+            kept |= bits
+    return kept
+
+
+def _kept_by_bpc(model: ContractReadModel, filters: ContractFilters) -> int:
+    return model.copies if filters.is_bpc else model.everything & ~model.copies
+
+
+def _kept_by_region(model: ContractReadModel, filters: ContractFilters) -> int:
+    kept = 0
+    for region_id in filters.region_ids:
+        kept |= model.by_region.get(region_id, 0)
+    return kept
+
+
+def _kept_by_system(model: ContractReadModel, filters: ContractFilters) -> int:
+    return model._of(
+        row for system_id in filters.system_ids for row in model.systems.get(system_id, ())
+    )
+
+
+def _kept_by_proximity(model: ContractReadModel, filters: ContractFilters) -> int:
+    return model._of(
+        row
+        for system_id in systems_within(filters.near_system_id, filters.within_jumps)
+        for row in model.systems.get(system_id, ())
+    )
+
+
+def _kept_by_station(model: ContractReadModel, filters: ContractFilters) -> int:
+    return model._of(
+        row for station_id in filters.station_ids for row in model.stations.get(station_id, ())
+    )
+
+
+def _kept_by_type(model: ContractReadModel, filters: ContractFilters) -> int:
+    return model._of(
+        row for type_id in filters.type_ids for row in model.by_item_type.get(type_id, ())
+    )
+
+
+def _blueprint_bound(
+    column: int, minimum: str, maximum: str
+) -> tuple[Callable[[ContractFilters], bool], Callable[[ContractReadModel, ContractFilters], int]]:
+    """The applies/kept pair for one blueprint family's bounds, read from the
+    ContractFilters fields named `minimum` and `maximum`."""
+
+    def applies(filters: ContractFilters) -> bool:
+        return getattr(filters, minimum) is not None or getattr(filters, maximum) is not None
+
+    def kept(model: ContractReadModel, filters: ContractFilters) -> int:
+        low, high = getattr(filters, minimum), getattr(filters, maximum)
+        return model._of(
+            item[0] for item in model.blueprint_items if _within(item[column], low, high)
+        )
+
+    return applies, kept
+
+
+def _kept_by_taxonomy(model: ContractReadModel, filters: ContractFilters) -> int:
+    return model._taxonomy(set(filters.category_id or ()), set(filters.group_id or ()))
+
+
+_CRITERIA: tuple[
+    tuple[
+        str,
+        Callable[[ContractFilters], bool],
+        Callable[[ContractReadModel, ContractFilters], int],
+    ],
+    ...,
+] = (
+    (
+        "price",
+        lambda filters: filters.min_price is not None or filters.max_price is not None,
+        _kept_by_price,
+    ),
+    (
+        "collateral",
+        lambda filters: (
+            filters.min_collateral is not None or filters.max_collateral is not None
+        ),
+        _kept_by_collateral,
+    ),
+    ("jumps", lambda filters: filters.max_jumps is not None, _kept_by_jumps),
+    (
+        "reward_per_jump",
+        lambda filters: filters.min_reward_per_jump is not None,
+        _kept_by_reward_per_jump,
+    ),
+    ("ship", lambda filters: filters.is_ship_contract is not None, _kept_by_ship),
+    ("contract_type", lambda filters: bool(filters.contract_type), _kept_by_contract_type),
+    ("bpc", lambda filters: filters.is_bpc is not None, _kept_by_bpc),
+    ("region", lambda filters: bool(filters.region_ids), _kept_by_region),
+    ("system", lambda filters: bool(filters.system_ids), _kept_by_system),
+    ("proximity", lambda filters: filters.near_system_id is not None, _kept_by_proximity),
+    ("station", lambda filters: bool(filters.station_ids), _kept_by_station),
+    ("type", lambda filters: bool(filters.type_ids), _kept_by_type),
+    ("runs", *_blueprint_bound(1, "min_runs", "max_runs")),
+    ("me", *_blueprint_bound(2, "min_me", "max_me")),
+    ("te", *_blueprint_bound(3, "min_te", "max_te")),
+    (
+        "taxonomy",
+        lambda filters: bool(filters.category_id or filters.group_id),
+        _kept_by_taxonomy,
+    ),
+)
+
+
+async def _searched(db: AsyncSession, filters: ContractFilters) -> set[int] | None:
+    """The contract ids the search term matches, from the same trigram-indexed SQL the
+    list uses: ILIKE semantics stay in Postgres, and only the ids cross the wire."""
+    if not filters.search:
+        return None
+    result = await db.execute(
+        matching_contract_ids(filters.search).execution_options(
+            query_family="contracts.read_model_search"
+        )
+    )
+    return set(result.scalars())
+
+
+def _sorts() -> list[tuple[SortableContractFields, SortDirection]]:
+    return [(field, direction) for field in SortableContractFields for direction in SortDirection]
+
+
+def _rank_columns() -> tuple[list, list, dict[tuple, int]]:
+    """The key and row_number() columns ranking the corpus under every sort.
+
+    Each sort's key is selected once however many sorts share it (only ship_name reads
+    a different key per direction), and ranked by the ORDER BY the page query uses,
+    so the model's order is the database's order.
+    """
+    keys: list = []
+    ranks: list = []
+    key_index: dict[tuple, int] = {}
+    seen: dict[int, int] = {}
+    for sort_field, direction in _sorts():
+        stub = ContractFilters(sort_by=sort_field, sort_direction=direction)
+        sort_column, descending = _sort_key(stub)
+        if id(sort_column) not in seen:
+            seen[id(sort_column)] = len(keys)
+            keys.append(sort_column)
+        key_index[(sort_field, direction)] = seen[id(sort_column)]
+        ranks.append(func.row_number().over(order_by=_ordering(sort_column, stub, descending)))
+    return keys, ranks, key_index
+
+
+# Columns the build reads per contract ahead of the sort keys and ranks.
+_LEADING_COLUMNS = 11
+
+
+@dataclass
+class _ContractColumns:
+    """The contract pass of a build, as read: row lists per filter value and
+    (value, row) pairs per range column, not yet sorted or turned into bitsets."""
+
+    keys: list[list]
+    ranks: list[list[int]]
+    contract_ids: list[int] = field(default_factory=list)
+    rows_by: dict[str, dict] = field(
+        default_factory=lambda: {"type": {}, "region": {}, "system": {}, "station": {}}
+    )
+    unknown_system: list[int] = field(default_factory=list)
+    ship_rows: list[int] = field(default_factory=list)
+    expiries: list[tuple] = field(default_factory=list)
+    prices: list[tuple] = field(default_factory=list)
+    collaterals: list[tuple] = field(default_factory=list)
+    jumps: list[tuple] = field(default_factory=list)
+    rewards_per_jump: list[tuple] = field(default_factory=list)
+
+    def add(self, record) -> None:
+        (
+            contract_id, stored_type, region_id, system_id, station_id,
+            price, collateral, is_ship, date_expired, route_jumps, reward_per_jump,
+        ) = record[:_LEADING_COLUMNS]
+        row = len(self.contract_ids)
+        self.contract_ids.append(contract_id)
+        self.rows_by["type"].setdefault(stored_type, []).append(row)
+        self.rows_by["region"].setdefault(region_id, []).append(row)
+        if system_id is None:
+            self.unknown_system.append(row)
+        else:
+            self.rows_by["system"].setdefault(system_id, []).append(row)
+        if station_id is not None:
+            self.rows_by["station"].setdefault(station_id, []).append(row)
+        if is_ship:
+            self.ship_rows.append(row)
+        self.expiries.append((date_expired, row))
+        self.prices.append((float(price), row))
+        self.collaterals.append((float(collateral), row))
+        if route_jumps is not None:
+            self.jumps.append((float(route_jumps), row))
+        if reward_per_jump is not None:
+            self.rewards_per_jump.append((reward_per_jump, row))
+        keys_end = _LEADING_COLUMNS + len(self.keys)
+        for column, value in zip(self.keys, record[_LEADING_COLUMNS:keys_end]):
+            column.append(value)
+        for column, value in zip(self.ranks, record[keys_end:]):
+            column.append(value - 1)  # row_number() counts from 1
+
+
+@dataclass
+class _ItemColumns:
+    """The item pass of a build: what each row's items contribute to its filters."""
+
+    copy_rows: list[int] = field(default_factory=list)
+    taxonomy_rows: dict[tuple, list[int]] = field(default_factory=dict)
+    by_item_type: dict[int, list[int]] = field(default_factory=dict)
+    blueprint_items: list[tuple] = field(default_factory=list)
+
+
+async def _read_contracts(
+    db: AsyncSession, key_columns: list, rank_columns: list
+) -> _ContractColumns:
+    """Every live contract with every sort ranked, in contract_id order."""
+    live = (
+        _apply_contract_filters(select(Contract), ContractFilters())
+        .with_only_columns(
+            Contract.contract_id,
+            Contract.type,
+            Contract.start_location_region_id,
+            Contract.start_location_system_id,
+            Contract.start_location_id,
+            Contract.price,
+            Contract.collateral,
+            Contract.is_ship_contract,
+            Contract.date_expired,
+            Contract.route_jumps,
+            Contract.reward_per_jump,
+            *key_columns,
+            *rank_columns,
+        )
+        .order_by(Contract.contract_id)
+        .execution_options(yield_per=BUILD_BATCH_SIZE, query_family="contracts.read_model")
+    )
+    read = _ContractColumns(
+        keys=[[] for _ in key_columns], ranks=[[] for _ in rank_columns]
+    )
+    result = await db.stream(live)
+    async for batch in result.partitions():
+        for record in batch:
+            read.add(record)
+    return read
+
+
+async def _read_items(db: AsyncSession, row_of: dict[int, int]) -> _ItemColumns:
+    """The items of the live contracts, by the row each contract was read into. Items
+    of a contract `row_of` does not hold are skipped."""
+    items = (
+        select(
+            ContractItem.contract_id,
+            ContractItem.type_id,
+            ContractItem.is_included,
+            ContractItem.is_blueprint_copy,
+            ContractItem.category_id,
+            ContractItem.group_id,
+            ContractItem.runs,
+            ContractItem.material_efficiency,
+            ContractItem.time_efficiency,
+        )
+        .where(
+            ContractItem.contract_id.in_(
+                _apply_contract_filters(select(Contract.contract_id), ContractFilters())
+            )
+        )
+        .execution_options(yield_per=BUILD_BATCH_SIZE, query_family="contracts.read_model_items")
+    )
+    read = _ItemColumns()
+    result = await db.stream(items)
+    async for batch in result.partitions():
+        for (
+            contract_id, type_id, is_included, is_copy, category_id, group_id, runs, me, te,
+        ) in batch:
+            row = row_of.get(contract_id)
+            if row is None:
+                continue
+            read.by_item_type.setdefault(type_id, []).append(row)
+            # Everything below classifies OFFERED items only (§3.1).
+            if not is_included:
+                continue
+            if is_copy:
+                read.copy_rows.append(row)
+            read.taxonomy_rows.setdefault((category_id, group_id), []).append(row)
+            if runs is not None or me is not None or te is not None:
+                read.blueprint_items.append((row, runs, me, te))
+    return read
+
+
+async def build_contract_read_model(db: AsyncSession, generation: int) -> ContractReadModel:
+    """Read the live corpus into a model for `generation`: one pass over the contracts
+    with every sort ranked (_read_contracts), and one over their items (_read_items).
+
+    Two statements, so a caller wanting them to agree runs them in one REPEATABLE
+    READ transaction (ContractReadModelCache does). Items of contracts the first
+    statement did not return are skipped either way.
+    """
+    key_columns, rank_columns, key_index = _rank_columns()
+    contracts = await _read_contracts(db, key_columns, rank_columns)
+    contract_ids, width = contracts.contract_ids, len(contracts.contract_ids)
+    row_of = {contract_id: row for row, contract_id in enumerate(contract_ids)}
+    items = await _read_items(db, row_of)
+
+    sort_orders = {}
+    for (sort_field, direction), rank in zip(_sorts(), contracts.ranks):
+        order = [0] * width
+        for row, position in enumerate(rank):
+            order[position] = row
+        sort_orders[(sort_field, direction)] = _SortOrder(
+            order=order, rank=rank, keys=contracts.keys[key_index[(sort_field, direction)]]
+        )
+
+    for pairs in (
+        contracts.expiries,
+        contracts.prices,
+        contracts.collaterals,
+        contracts.jumps,
+        contracts.rewards_per_jump,
+    ):
+        pairs.sort()
+    rows_by = contracts.rows_by
+    return ContractReadModel(
+        generation=generation,
+        contract_ids=contract_ids,
+        row_of=row_of,
+        everything=(1 << width) - 1,
+        expiry_dates=[date_expired for date_expired, _ in contracts.expiries],
+        expiry_rows=[row for _, row in contracts.expiries],
+        price_sorted=[price for price, _ in contracts.prices],
+        price_rows=[row for _, row in contracts.prices],
+        collateral_sorted=[collateral for collateral, _ in contracts.collaterals],
+        collateral_rows=[row for _, row in contracts.collaterals],
+        jumps_sorted=[value for value, _ in contracts.jumps],
+        jumps_rows=[row for _, row in contracts.jumps],
+        reward_per_jump_sorted=[value for value, _ in contracts.rewards_per_jump],
+        reward_per_jump_rows=[row for _, row in contracts.rewards_per_jump],
+        by_stored_type={key: _bits(rows, width) for key, rows in rows_by["type"].items()},
+        by_region={key: _bits(rows, width) for key, rows in rows_by["region"].items()},
+        unknown_system=_bits(contracts.unknown_system, width),
+        ships=_bits(contracts.ship_rows, width),
+        copies=_bits(items.copy_rows, width),
+        by_taxonomy={key: _bits(rows, width) for key, rows in items.taxonomy_rows.items()},
+        systems=rows_by["system"],
+        stations=rows_by["station"],
+        by_item_type=items.by_item_type,
+        blueprint_items=items.blueprint_items,
+        sort_orders=sort_orders,
+    )
+
+
+class ContractReadModelCache:
+    """Holds this process's ContractReadModel and rebuilds it for each generation.
+
+    A model is served only to a request that read the same generation it was built
+    for, so nothing computed from it is cached under a generation whose data it does
+    not hold. The first request to see a new generation starts a rebuild in the
+    background and is answered by SQL, as is every request until the rebuild
+    finishes; one rebuild runs at a time.
+
+    The rebuild reads the primary through its own pool (db.BackgroundSessionLocal in
+    production), never the one requests check out of: a build is a full-corpus
+    REPEATABLE READ that holds its connection for as long as it runs. It starts after
+    the generation was bumped, and the bump follows the commit, so the model holds
+    at least that generation's data.
+    """
+
+    def __init__(
+        self, session_factory: Callable[..., AbstractAsyncContextManager[AsyncSession]]
+    ):
+        self._session_factory = session_factory
+        self._model: ContractReadModel | None = None
+        self._rebuild: asyncio.Task | None = None
+
+    def current(self, generation: int) -> ContractReadModel | None:
+        """The model for `generation`, or None — scheduling its build when it is newer
+        than the model held and no build is running."""
+        model = self._model
+        if model is not None and model.generation == generation:
+            return model
+        if (
+            generation > 0
+            and (model is None or generation > model.generation)
+            and (self._rebuild is None or self._rebuild.done())
+        ):
+            self._rebuild = asyncio.create_task(self._build(generation))
+        return None
+
+    async def _build(self, generation: int) -> None:
+        started = time.perf_counter()
+        try:
+            async with self._session_factory() as db:
+                # Both build statements read one snapshot.
+                await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+                model = await build_contract_read_model(db, generation)
+        except Exception:
+            contract_read_model_builds.labels(outcome="failed").inc()
+            logger.warning("Contract read model build failed", generation=generation, exc_info=True)
+            return
+        if self._model is None or model.generation > self._model.generation:
+            self._model = model
+        contract_read_model_builds.labels(outcome="built").inc()
+        logger.info(
+            "Contract read model built",
+            generation=generation,
+            contracts=len(model.contract_ids),
+            duration_ms=round((time.perf_counter() - started) * 1000, 1),
+        )
+
+    async def close(self) -> None:
+        """Cancel a rebuild in flight, for shutdown."""
+        if self._rebuild is not None:
+            self._rebuild.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._rebuild
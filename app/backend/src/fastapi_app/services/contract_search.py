@@ -0,0 +1,35 @@
+# ABOUTME: Free-text contract search — resolves a term to the ids of matching contracts through
+# ABOUTME: the pg_trgm GIN indexes, as a semi-join the list's filter pipeline consumes.
+from sqlalchemy import union
+from sqlalchemy.future import select
+
+from ..models.contracts import Contract, ContractItem
+
+
+def matching_contract_ids(term: str):
+    """Ids of contracts whose title, or any item's type name, contains `term`.
+
+    Two narrow SELECTs unioned, rather than one ILIKE pair across an outer join: each
+    branch touches a single indexed column, so PostgreSQL answers it from that
+    column's gin_trgm_ops index (ix_contracts_title_trgm, ix_contract_items_type_name_trgm)
+    — a leading-wildcard ILIKE no btree can serve. The OR form over the join could use
+    neither, scanned and joined the whole corpus, and fanned each contract out into one
+    row per item that every count then had to DISTINCT away.
+
+    The union also de-duplicates, so a contract matching on its title and on three of
+    its items is one id. Consumed as `contract_id IN (...)`, a semi-join: the outer
+    query keeps one row per contract and never needs the item join for search.
+
+    ContractFilters.search has min_length=3 — also the trigram width, so every accepted
+    term extracts at least one trigram and the index always applies. Wildcards in the
+    term keep their LIKE meaning, as they did before the index existed.
+
+    Matches both sides of a trade, deliberately unchanged: searching "Rifter" finds the
+    want-to-buy ad asking for one too.
+    """
+    pattern = f"%{term}%"
+    by_title = select(Contract.contract_id).where(Contract.title.ilike(pattern))
+    by_item_name = select(ContractItem.contract_id).where(
+        ContractItem.type_name.ilike(pattern)
+    )
+    return union(by_title, by_item_name)
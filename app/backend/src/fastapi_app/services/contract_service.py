@@ -1,24 +1,36 @@
 import asyncio
+import json
 import time
-from sqlalchemy import and_, case, func, or_, text
+from collections import Counter, OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Iterator
+from sqlalchemy import and_, case, func, or_, text, true
 from sqlalchemy.exc import StatementError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.future import select
 from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.expression import ClauseElement, Executable
 
 from ..core.config import get_settings
 from ..core.logging import get_logger, log_key_event
+from ..db import pool_max_overflow
 from ..models.contracts import Contract, ContractItem, EsiTaxonomyCache
 from ..schemas.contracts import (
     BlueprintSummary,
+    BooleanFacet,
     CompositionCategory,
     CompositionSummary,
+    ContractCursor,
     ContractDetailSchema,
+    ContractFacetsResponse,
     ContractFilters,
     ContractItemSchema,
     ContractListItemSchema,
     ContractListResponse,
     ContractType,
+    CountMode,
     CoverageInfo,
     SortDirection,
     SortableContractFields,
@@ -27,7 +39,14 @@ from ..schemas.contracts import (
     TaxonomyGroup,
     TaxonomyResponse,
 )
-from .background_aggregation import ENRICHMENT_VERSION
+from .background_aggregation import ENRICHMENT_VERSION, ITEM_SUMMARY_VERSION
+from .contract_search import matching_contract_ids
+from .contract_summary import build_list_summary
+from .route_graph import systems_within
+from .sql_arrays import any_of
+
+if TYPE_CHECKING:  # the read model is built on this module's helpers
+    from .contract_read_model import ContractReadModel, Selection
 
 # Initialize logger for this module
 logger = get_logger(__name__)
@@ -36,6 +55,33 @@ logger = get_logger(__name__)
 # without colliding with the outer query's own reference to it.
 _ContractWatermark = aliased(Contract)
 
+
+def _item_name_key(aggregate, stored_column):
+    """The ship_name sort key: one end of the contract's item names, alphabetically.
+
+    min() for an ascending sort and max() for a descending one, so a bundle sorts by
+    whichever of its names the reader would reach first in that direction. Read from
+    the contract-level copy ingestion maintains, so the sort touches one table: the
+    item join it replaces multiplied every contract into one row per item, and the
+    page then had to GROUP BY and the counts DISTINCT their way back to contracts.
+
+    A row whose copy is not at ITEM_SUMMARY_VERSION — written before the summary
+    existed, across a version bump, or by anything other than ingestion — derives the
+    key from its items instead, so the sort is correct whatever state the summary is
+    in; the CASE keeps that per-row subquery off every current row.
+    """
+    derived = (
+        select(aggregate(ContractItem.type_name))
+        .where(ContractItem.contract_id == Contract.contract_id)
+        .correlate(Contract)
+        .scalar_subquery()
+    )
+    return case(
+        (Contract.item_summary_version == ITEM_SUMMARY_VERSION, stored_column),
+        else_=derived,
+    )
+
+
 # This SORT_MAP is a critical security feature. It prevents arbitrary column sorting
 # by mapping API-facing sort keys to the actual, safe SQLAlchemy model columns.
 SORT_MAP = {
@@ -44,8 +90,8 @@ SORT_MAP = {
     SortableContractFields.price: Contract.price,
     SortableContractFields.collateral: Contract.collateral,
     SortableContractFields.volume: Contract.volume,
-    # Note: Sorting by ship_name joins the items table.
-    SortableContractFields.ship_name: ContractItem.type_name,
+    # The ascending key; descending reads the other end (_DESCENDING_SORT_MAP).
+    SortableContractFields.ship_name: _item_name_key(func.min, Contract.item_name_first),
     SortableContractFields.buyout: Contract.buyout,
     SortableContractFields.days_to_complete: Contract.days_to_complete,
     # Computed in SQL so the ratio sorts without loading the corpus into the
@@ -53,12 +99,16 @@ SORT_MAP = {
     SortableContractFields.reward_per_volume: (
         Contract.reward / func.nullif(Contract.volume, 0.0)
     ),
+    # Stored by ingestion, unlike reward_per_volume, because it comes from the
+    # stargate graph; both are indexed (services/route_graph.py).
+    SortableContractFields.route_jumps: Contract.route_jumps,
+    SortableContractFields.reward_per_jump: Contract.reward_per_jump,
 }
 
 # Sorts whose column can be NULL: buyout belongs to auctions, days_to_complete
-# to couriers, the ratio needs both a reward and a volume, volume is a nullable
-# column, and ship_name resolves to ContractItem.type_name across an outer join,
-# so an item-less contract has no name at all. A missing value is not a low one —
+# and the route columns to couriers, the ratio needs both a reward and a volume,
+# volume is a nullable column, and ship_name is an aggregate over the contract's
+# item names, so an item-less contract has no name at all. A missing value is not a low one —
 # a contract with no reward per m3 must not lead the best-value sort — so NULL
 # goes to the end whichever way the sort runs. The remaining four sorts
 # (date_issued, date_expired, price, collateral) are non-null columns and keep
@@ -67,27 +117,18 @@ NULLABLE_SORTS = frozenset({
     SortableContractFields.buyout,
     SortableContractFields.days_to_complete,
     SortableContractFields.reward_per_volume,
+    SortableContractFields.route_jumps,
+    SortableContractFields.reward_per_jump,
     SortableContractFields.volume,
     SortableContractFields.ship_name,
 })
 
 
-def _needs_item_join(filters: ContractFilters) -> bool:
-    """
-    Determine if a JOIN on the ContractItem table is necessary. A join is
-    required if we need to filter or sort on item attributes.
-    """
-    return bool(
-        filters.search
-        or filters.type_ids
-        # Add sorting by ship name to the condition
-        or filters.sort_by == SortableContractFields.ship_name
-    )
-    # is_bpc, the runs/ME/TE ranges, and the category/group family are deliberately
-    # absent: each asks a question about the contract as a whole ("does it hold an
-    # item like this?"), which a correlated EXISTS answers without multiplying rows.
-    # See _has_blueprint_copy_item, _offered_item_range_exists, and the taxonomy
-    # clause in _apply_item_filters.
+# Sorts whose key depends on the direction. Every other sort reads the same
+# expression both ways round.
+_DESCENDING_SORT_MAP = {
+    SortableContractFields.ship_name: _item_name_key(func.max, Contract.item_name_last),
+}
 
 
 def still_listed_by_esi():
@@ -157,7 +198,7 @@ def still_listed_by_esi():
         Contract.last_seen_at.is_(None),
         case(
             (
-                Contract.start_location_region_id.in_(ingested_region_ids),
+                any_of(Contract.start_location_region_id, ingested_region_ids),
                 at_a_known_regions_watermark,
             ),
             else_=Contract.last_seen_at >= newest_in_region,
@@ -264,26 +305,15 @@ def _apply_contract_filters(query, filters: ContractFilters):
     # watermark and why it is per-region.
     query = query.filter(still_listed_by_esi())
 
-    # 1. Text search (on contract title or item name)
+    # 1. Text search (on contract title or item name). A semi-join on matching ids,
+    # so it needs no item join and costs what the matches cost, not the corpus.
     if filters.search:
-        search_term = f"%{filters.search}%"
-        # This OR condition requires the join to be present.
         query = query.filter(
-            or_(
-                Contract.title.ilike(search_term),
-                ContractItem.type_name.ilike(search_term),
-            )
+            Contract.contract_id.in_(matching_contract_ids(filters.search))
         )
 
-    # 2. Price and Collateral filters
-    if filters.min_price is not None:
-        query = query.filter(Contract.price >= filters.min_price)
-    if filters.max_price is not None:
-        query = query.filter(Contract.price <= filters.max_price)
-    if filters.min_collateral is not None:
-        query = query.filter(Contract.collateral >= filters.min_collateral)
-    if filters.max_collateral is not None:
-        query = query.filter(Contract.collateral <= filters.max_collateral)
+    # 2. Price, collateral and courier route bounds
+    query = _apply_range_filters(query, filters)
 
     # 2b. Contract-level flags (indexed column; no item join required)
     if filters.is_ship_contract is not None:
@@ -293,7 +323,7 @@ def _apply_contract_filters(query, filters: ContractFilters):
     # type-only predicate as a prefix; no companion index is needed.
     if filters.contract_type:
         selected = [t.value for t in filters.contract_type]
-        type_predicate = Contract.type.in_(selected)
+        type_predicate = any_of(Contract.type, selected)
         if ContractType.unknown.value in selected:
             # The unknown segment owns every stored value outside the enum, so
             # its count (which folds those in) and its rows agree — a segment
@@ -317,6 +347,28 @@ def _apply_contract_filters(query, filters: ContractFilters):
     return query
 
 
+def _apply_range_filters(query, filters: ContractFilters):
+    """Bound price, collateral, route length and reward per jump.
+
+    route_jumps and reward_per_jump are NULL off the courier routes ingestion could
+    resolve, so a bound on either drops those contracts rather than guessing.
+    """
+    if filters.min_price is not None:
+        query = query.filter(Contract.price >= filters.min_price)
+    if filters.max_price is not None:
+        query = query.filter(Contract.price <= filters.max_price)
+    if filters.min_collateral is not None:
+        query = query.filter(Contract.collateral >= filters.min_collateral)
+    if filters.max_collateral is not None:
+        query = query.filter(Contract.collateral <= filters.max_collateral)
+    if filters.max_jumps is not None:
+        query = query.filter(Contract.route_jumps <= filters.max_jumps)
+    if filters.min_reward_per_jump is not None:
+        query = query.filter(Contract.reward_per_jump >= filters.min_reward_per_jump)
+
+    return query
+
+
 def _apply_location_filters(query, filters: ContractFilters):
     """Narrow to the requested regions, solar systems, and stations.
 
@@ -324,22 +376,49 @@ def _apply_location_filters(query, filters: ContractFilters):
     NPC stations through the public /universe/stations/ route, but player-owned
     structures have no tokenless location→system route and keep a NULL system, so
     their contracts can never match. _count_unknown_system_excluded measures exactly
-    that shortfall per query, so callers can report it rather than absorb it.
+    that shortfall per query, so callers can report it rather than absorb it. The
+    proximity filter matches the same column and shares both the gap and the figure.
+
+    Proximity compiles to the same one-array-bind predicate as system_ids: the
+    neighbourhood is resolved in the application from a cached index over the stargate
+    graph, so the database sees a system set, however many systems it holds.
     """
     if filters.region_ids:
-        query = query.filter(Contract.start_location_region_id.in_(filters.region_ids))
+        query = query.filter(any_of(Contract.start_location_region_id, filters.region_ids))
     if filters.system_ids:
-        query = query.filter(Contract.start_location_system_id.in_(filters.system_ids))
+        query = query.filter(any_of(Contract.start_location_system_id, filters.system_ids))
+    if filters.near_system_id is not None:
+        query = query.filter(
+            any_of(
+                Contract.start_location_system_id,
+                systems_within(filters.near_system_id, filters.within_jumps),
+            )
+        )
     if filters.station_ids:
-        query = query.filter(Contract.start_location_id.in_(filters.station_ids))
+        query = query.filter(any_of(Contract.start_location_id, filters.station_ids))
 
     return query
 
 
 def _apply_item_filters(query, filters: ContractFilters):
-    """Apply the Contract Item specific filters."""
+    """Apply the Contract Item specific filters.
+
+    Every predicate here is a correlated EXISTS, so each asks a question about the
+    CONTRACT ("does it hold an item like this?") and the query keeps one row per
+    contract — no join, no DISTINCT, no grouping to undo a fan-out (SQLA-1).
+    """
+    # Either side of the trade, as the join this replaces matched: a want-to-buy ad
+    # for a Rifter is a Rifter contract to someone filtering on the type.
     if filters.type_ids:
-        query = query.filter(ContractItem.type_id.in_(filters.type_ids))
+        query = query.filter(
+            select(ContractItem.record_id)
+            .where(
+                ContractItem.contract_id == Contract.contract_id,
+                any_of(ContractItem.type_id, filters.type_ids),
+            )
+            .correlate(Contract)
+            .exists()
+        )
     # Blueprint attribute ranges. Each family is one correlated EXISTS over the
     # contract's offered items, so it asks a question about the CONTRACT and its
     # own bounds land on a single item (§3.1, SQLA-3).
@@ -369,35 +448,33 @@ def _apply_item_filters(query, filters: ContractFilters):
     # unrelated afterburner. It is also the only pairing the cascading
     # category -> group rail can send.
     if filters.category_id or filters.group_id:
-        conditions = [
-            ContractItem.contract_id == Contract.contract_id,
-            ContractItem.is_included.is_(True),
-        ]
-        if filters.category_id:
-            conditions.append(ContractItem.category_id.in_(filters.category_id))
-        if filters.group_id:
-            conditions.append(ContractItem.group_id.in_(filters.group_id))
-        query = query.filter(
-            select(ContractItem.record_id)
-            .where(*conditions)
-            .correlate(Contract)
-            .exists()
-        )
+        query = query.filter(_offered_taxonomy_match(filters))
 
     return query
 
 
-async def _count_distinct_contracts(db: AsyncSession, query) -> int:
-    """
-    To get an accurate total count of matching *contracts* (not items),
-    we must count the distinct contract_ids from our filtered query.
-    This is crucial because the join can create duplicate contract rows.
-    """
-    count_subquery = select(query.subquery().c.contract_id).distinct().subquery()
-    count_query = select(func.count()).select_from(count_subquery)
+def _taxonomy_conditions(filters: ContractFilters) -> list:
+    """The category and group predicates on one item row, for whichever are set."""
+    conditions = []
+    if filters.category_id:
+        conditions.append(any_of(ContractItem.category_id, filters.category_id))
+    if filters.group_id:
+        conditions.append(any_of(ContractItem.group_id, filters.group_id))
+    return conditions
 
-    total_result = await db.execute(count_query)
-    return total_result.scalar_one()
+
+def _offered_taxonomy_match(filters: ContractFilters):
+    """Correlated EXISTS: an offered item satisfying the category and group filters."""
+    return (
+        select(ContractItem.record_id)
+        .where(
+            ContractItem.contract_id == Contract.contract_id,
+            ContractItem.is_included.is_(True),
+            *_taxonomy_conditions(filters),
+        )
+        .correlate(Contract)
+        .exists()
+    )
 
 
 # Contract types ESI never returns items for. The ship flag is derived from items,
@@ -439,7 +516,7 @@ def _count_under_ships_filter(
 
 
 async def _segment_counts_and_total(
-    db: AsyncSession, filters: ContractFilters, needs_item_join: bool
+    db: AsyncSession, filters: ContractFilters
 ) -> tuple[dict[str, int], int]:
     """Per-type contract counts and the page total, from one grouped statement.
 
@@ -461,43 +538,60 @@ async def _segment_counts_and_total(
     The query is rebuilt from scratch the way _count_unknown_system_excluded rebuilds
     its residual, so every filter reaches it through _apply_contract_filters /
     _apply_item_filters and a filter added to neither cannot silently desynchronize
-    the counts from the page. The join need is computed from the ORIGINAL filters;
-    lifting two contract-level predicates cannot change it.
+    the counts from the page.
+
+    A plain count: every item predicate is an EXISTS, so the query holds one row
+    per contract and there is nothing for a DISTINCT to collapse (SQLA-1).
     """
+    matched = func.count(Contract.contract_id)
+    grouped = _segment_query(filters).with_only_columns(
+        Contract.type,
+        matched,
+        matched.filter(Contract.is_ship_contract.is_(True)),
+    ).group_by(Contract.type).execution_options(query_family="contracts.segment_counts")
+
+    return _fold_segment_rows((await db.execute(grouped)).all(), filters)
+
+
+def _segment_query(filters: ContractFilters):
+    """The rows the segment counts are taken over: every filter but contract_type and
+    the ships-only flag (see _segment_counts_and_total for why those two are lifted)."""
     lifted = filters.model_copy(
         update={"contract_type": None, "is_ship_contract": None}
     )
     query = select(Contract)
-    if needs_item_join:
-        query = query.outerjoin(ContractItem)
     query = _apply_contract_filters(query, lifted)
-    query = _apply_item_filters(query, lifted)
+    return _apply_item_filters(query, lifted)
 
-    # DISTINCT only where the join can spread one contract over several rows
-    # (SQLA-1). Without it the primary key already gives one row per contract, and
-    # the DISTINCT sort is pure cost on the unjoined path every default request takes.
-    matched = (
-        func.count(func.distinct(Contract.contract_id))
-        if needs_item_join
-        else func.count(Contract.contract_id)
-    )
-    grouped = query.with_only_columns(
-        Contract.type,
-        matched,
-        matched.filter(Contract.is_ship_contract.is_(True)),
-    ).group_by(Contract.type)
 
-    rows = (await db.execute(grouped)).all()
+def _segment_of(stored_type: str) -> str:
+    """The segment a stored contract type is counted and filtered under.
+
+    Contract.type is an unconstrained string written straight from ESI, so a type
+    added after this enum was written is storable. It folds into "unknown" rather
+    than dropping out: Criterion 1.1 requires such a contract to stay counted and
+    reachable, and a total short of the corpus would also fire the empty-page
+    short-circuit while rows exist.
+    """
+    return stored_type if stored_type in _SEGMENTS else ContractType.unknown.value
+
+
+_SEGMENTS = frozenset(contract_type.value for contract_type in ContractType)
+
 
+def _fold_segment_rows(
+    rows, filters: ContractFilters
+) -> tuple[dict[str, int], int]:
+    """Segment counts and the page total from (stored type, all, ships) rows.
+
+    Shared by every way the rows are obtained — counted for the request, or summed
+    from the snapshot's per-generation totals — so each one labels the segments and
+    derives the total by exactly the same rules.
+    """
     all_by_segment = {contract_type.value: 0 for contract_type in ContractType}
     ships_by_segment = dict.fromkeys(all_by_segment, 0)
     for stored_type, all_matching, ships_matching in rows:
-        # Contract.type is an unconstrained string written straight from ESI, so a
-        # type added after this enum was written is storable. It folds into
-        # "unknown" rather than dropping out of the sum: Criterion 1.1 requires such
-        # a contract to stay counted and reachable, and a total short of the corpus
-        # would also fire the empty-page short-circuit while rows exist.
-        segment = stored_type if stored_type in all_by_segment else ContractType.unknown.value
+        segment = _segment_of(stored_type)
         all_by_segment[segment] += all_matching
         ships_by_segment[segment] += ships_matching
 
@@ -522,15 +616,216 @@ async def _segment_counts_and_total(
     total = sum(
         _count_under_ships_filter(all_matching, ships_matching, filters.is_ship_contract)
         for stored_type, all_matching, ships_matching in rows
-        if selected is None
-        or (
-            stored_type if stored_type in all_by_segment else ContractType.unknown.value
-        ) in selected
+        if selected is None or _segment_of(stored_type) in selected
     )
 
     return segment_counts, total
 
 
+# Live contracts and the ships among them, per (region, stored contract type). Built
+# once per generation into the dataset snapshot (_live_segment_totals) and summed by
+# _precomputed_counts.
+SegmentTotals = dict[tuple[int | None, str], tuple[int, int]]
+
+# The ContractFilters fields SegmentTotals splits by, and the ones that choose a page
+# rather than narrow the result. A request setting nothing else can be counted from
+# the totals alone.
+_PRECOMPUTED_DIMENSIONS = frozenset({"region_ids", "contract_type", "is_ship_contract"})
+_PAGING_FIELDS = frozenset({"page", "size", "cursor", "sort_by", "sort_direction"})
+
+
+async def _live_segment_totals(db: AsyncSession) -> SegmentTotals:
+    """Every live contract counted by region and stored type.
+
+    The grouped count _segment_counts_and_total runs, with no filter but liveness and
+    the region as a second grouping column. Once per generation it costs what one
+    unfiltered list request did; after that the landing page and every region,
+    segment or ships switch from it is counted by summing a few dozen rows.
+    """
+    matched = func.count(Contract.contract_id)
+    grouped = (
+        _apply_contract_filters(select(Contract), ContractFilters())
+        .with_only_columns(
+            Contract.start_location_region_id,
+            Contract.type,
+            matched,
+            matched.filter(Contract.is_ship_contract.is_(True)),
+        )
+        .group_by(Contract.start_location_region_id, Contract.type)
+        .execution_options(query_family="contracts.segment_totals")
+    )
+    return {
+        (region_id, stored_type): (all_matching, ships_matching)
+        for region_id, stored_type, all_matching, ships_matching in (
+            await db.execute(grouped)
+        ).all()
+    }
+
+
+def _precomputed_counts(
+    filters: ContractFilters, segment_totals: SegmentTotals | None
+) -> tuple[dict[str, int], int] | None:
+    """The segment counts and total summed from `segment_totals`, or None when the
+    request filters on anything they are not split by.
+
+    Eligibility is judged by what is left over rather than by a list of what is
+    allowed, so a filter added to ContractFilters later makes its requests counted,
+    never silently dropped from their counts.
+
+    As current as the snapshot: a contract that expired since it was built is still
+    in these figures, up to DATASET_SNAPSHOT_MAX_AGE_SECONDS. That is the drift a
+    cached page already carries (RenderedPage.fresh_for), and the envelope says
+    "precomputed" so a client knows.
+    """
+    if segment_totals is None:
+        return None
+    narrowing = filters.model_dump(exclude=_PRECOMPUTED_DIMENSIONS | _PAGING_FIELDS)
+    if any(value is not None for value in narrowing.values()):
+        return None
+
+    regions = set(filters.region_ids) if filters.region_ids else None
+    by_type: dict[str, tuple[int, int]] = {}
+    for (region_id, stored_type), (all_matching, ships_matching) in segment_totals.items():
+        if regions is not None and region_id not in regions:
+            continue
+        summed_all, summed_ships = by_type.get(stored_type, (0, 0))
+        by_type[stored_type] = (summed_all + all_matching, summed_ships + ships_matching)
+    return _fold_segment_rows(
+        [(stored_type, *counts) for stored_type, counts in by_type.items()], filters
+    )
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) over a select, with the select's binds left as binds.
+
+    SQLAlchemy has no EXPLAIN construct, and rendering the statement with literal
+    binds instead would put the user's search text into the SQL — and from there into
+    every log the statement reaches.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def _estimated_rows(db: AsyncSession, query) -> float:
+    """The planner's row estimate for `query`. Plans it without running it."""
+    plan = (
+        await db.execute(
+            _Explain(query.with_only_columns(Contract.contract_id)),
+            execution_options={"query_family": "contracts.count_estimate"},
+        )
+    ).scalar_one()
+    if isinstance(plan, str):  # json arrives undecoded when the column is untyped
+        plan = json.loads(plan)
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+# Planner estimates by the lifted filters they were taken for (_estimated_segment_rows).
+# The estimate only picks a counting strategy, so one a few minutes stale costs a
+# request time at worst, never a wrong figure.
+_COUNT_ESTIMATE_ENTRIES = 1024
+_COUNT_ESTIMATE_MAX_AGE_SECONDS = 300.0
+_count_estimates: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+
+async def _estimated_segment_rows(db: AsyncSession, filters: ContractFilters) -> float:
+    """_estimated_rows over _segment_query(filters), remembered per filter set.
+
+    Without this every counted request paid an EXPLAIN round trip before its count,
+    the narrow ones included. Keyed by the filters the segment query is built from,
+    so the segments, the ships flag and paging of one filter set share an entry.
+    """
+    key = filters.model_dump_json(
+        exclude=_PAGING_FIELDS | {"contract_type", "is_ship_contract"}
+    )
+    now = time.monotonic()
+    cached = _count_estimates.get(key)
+    if cached is not None and now - cached[0] < _COUNT_ESTIMATE_MAX_AGE_SECONDS:
+        _count_estimates.move_to_end(key)
+        return cached[1]
+    estimate = await _estimated_rows(db, _segment_query(filters))
+    _count_estimates[key] = (now, estimate)
+    _count_estimates.move_to_end(key)
+    if len(_count_estimates) > _COUNT_ESTIMATE_ENTRIES:
+        _count_estimates.popitem(last=False)
+    return estimate
+
+
+async def _capped_counts(
+    db: AsyncSession, filters: ContractFilters, query, cap: int
+) -> tuple[dict[str, int], int, bool]:
+    """Segment counts and the page total, each counted no further than `cap`.
+
+    One bounded count per segment and one for the page, as scalar subqueries of a
+    single statement: each stops reading at cap + 1 rows, where the grouped count
+    would read every match. A segment is the same population _fold_segment_rows
+    labels it with — an unknown segment owns the stored types outside the enum, and
+    the ships-only flag is lifted for the itemless types.
+
+    Returns whether any figure reached the cap. When none did, every figure was
+    counted to the end and is exact.
+    """
+
+    def up_to_cap(counted):
+        bounded = counted.with_only_columns(Contract.contract_id).limit(cap + 1).subquery()
+        return select(func.count()).select_from(bounded).scalar_subquery()
+
+    lifted = _segment_query(filters)
+    known = [t.value for t in ContractType if t is not ContractType.unknown]
+    figures = []
+    for segment in ContractType:
+        in_segment = Contract.type == segment.value
+        if segment is ContractType.unknown:
+            in_segment = or_(in_segment, Contract.type.not_in(known))
+        counted = lifted.filter(in_segment)
+        if (
+            segment.value not in _ITEMLESS_CONTRACT_TYPES
+            and filters.is_ship_contract is not None
+        ):
+            counted = counted.filter(Contract.is_ship_contract == filters.is_ship_contract)
+        figures.append(up_to_cap(counted))
+    figures.append(up_to_cap(query))
+
+    row = (
+        await db.execute(
+            select(*figures).execution_options(query_family="contracts.capped_counts")
+        )
+    ).one()
+    *segment_figures, total = row
+    reached = any(figure > cap for figure in row)
+    segment_counts = {
+        segment.value: min(figure, cap)
+        for segment, figure in zip(ContractType, segment_figures)
+    }
+    return segment_counts, min(total, cap), reached
+
+
+async def _counted(
+    db: AsyncSession, filters: ContractFilters, query
+) -> tuple[dict[str, int], int, CountMode]:
+    """Count a request the snapshot's totals cannot answer.
+
+    Exactly, unless the planner expects the segment rows to number at least
+    CONTRACT_COUNT_CAP (_estimated_segment_rows): then capped (_capped_counts). The
+    estimate only picks the strategy, so a wrong one costs time, never correctness —
+    a capped count that reaches no cap is reported as the exact count it turned out
+    to be.
+    """
+    cap = get_settings().CONTRACT_COUNT_CAP
+    if cap > 0 and await _estimated_segment_rows(db, filters) >= cap:
+        segment_counts, total, reached = await _capped_counts(db, filters, query, cap)
+        return segment_counts, total, CountMode.capped if reached else CountMode.exact
+    segment_counts, total = await _segment_counts_and_total(db, filters)
+    return segment_counts, total, CountMode.exact
+
+
 # Loose index scan: SELECT DISTINCT over start_location_region_id is a 600ms
 # full index scan on the production corpus (perf audit 2026-08-02 §4 — PG18's
 # btree skip scan does not engage). The recursive CTE walks one index probe per
@@ -547,7 +842,7 @@ _OBSERVED_REGIONS_SQL = text("""
            (SELECT max(c.last_seen_at) FROM contracts c
              WHERE c.start_location_region_id = r.region_id) AS newest
     FROM regions r WHERE r.region_id IS NOT NULL
-""")
+""").execution_options(query_family="contracts.coverage")
 
 
 async def _observed_coverage(db: AsyncSession) -> CoverageInfo:
@@ -569,90 +864,157 @@ async def _observed_coverage(db: AsyncSession) -> CoverageInfo:
     )
 
 
+def _filters_by_system(filters: ContractFilters) -> bool:
+    """Whether a filter on start_location_system_id applies — the rows for which
+    unknown_system_excluded is reported."""
+    return bool(filters.system_ids) or filters.near_system_id is not None
+
+
 async def _count_unknown_system_excluded(
-    db: AsyncSession, filters: ContractFilters, needs_item_join: bool
+    db: AsyncSession, filters: ContractFilters
 ) -> int:
-    """How many contracts the system_ids filter dropped for want of a known system.
+    """How many contracts the system filters (system_ids, proximity) dropped for want
+    of a known system.
 
     The same query the caller ran, minus the system predicate and plus "the system is
     unknown" — so the figure counts exactly the rows the user's OTHER criteria selected
     and only the system filter removed. Counting every system-less contract in the
     corpus instead would answer a question nobody asked.
 
-    Costs one additional COUNT, and only when system_ids is applied. It reuses
-    _count_distinct_contracts, so the joined path counts contracts rather than
-    duplicated joined rows (SQLA-1).
+    Costs one additional COUNT, and only when a system filter is applied.
     """
-    residual_filters = filters.model_copy(update={"system_ids": None})
+    residual_filters = filters.model_copy(
+        update={"system_ids": None, "near_system_id": None, "within_jumps": None}
+    )
     query = select(Contract)
-    if needs_item_join:
-        query = query.outerjoin(ContractItem)
     query = _apply_contract_filters(query, residual_filters)
     query = _apply_item_filters(query, residual_filters)
     query = query.filter(Contract.start_location_system_id.is_(None))
-    return await _count_distinct_contracts(db, query)
+    return (
+        await db.execute(
+            query.with_only_columns(func.count(Contract.contract_id)).execution_options(
+                query_family="contracts.unknown_system_count"
+            )
+        )
+    ).scalar_one()
 
 
-async def _fetch_page_joined(
-    db: AsyncSession,
-    query,
-    filters: ContractFilters,
-    sort_column,
-    descending: bool,
-) -> list[Contract]:
-    # Paginating the joined query directly would offset/limit over
-    # joined (duplicated) rows, producing short pages and contracts
-    # skipped or repeated across page boundaries. Paginate over
-    # distinct contract IDs first, then load that page's contracts.
-    # Ordering uses an aggregate of the sort column (min/max picks
-    # the sort-direction-appropriate representative when a contract
-    # has multiple items) with contract_id as a deterministic
-    # tiebreaker.
-    sort_aggregate = func.max(sort_column) if descending else func.min(sort_column)
-    order_expr = sort_aggregate.desc() if descending else sort_aggregate.asc()
-    if filters.sort_by in NULLABLE_SORTS:
-        order_expr = order_expr.nulls_last()
-    id_query = (
-        query.with_only_columns(Contract.contract_id)
-        .group_by(Contract.contract_id)
-        .order_by(order_expr, Contract.contract_id.asc())
-        .offset((filters.page - 1) * filters.size)
-        .limit(filters.size)
-    )
-    id_result = await db.execute(id_query)
-    page_ids = [row[0] for row in id_result.all()]
+def _seek_past(sort_key, filters: ContractFilters, descending: bool, position: ContractCursor):
+    """Rows strictly after `position` in the order the page query sorts by.
 
-    data_query = (
-        select(Contract)
-        .where(Contract.contract_id.in_(page_ids))
-        .options(selectinload(Contract.items))
+    Spelled out as an OR rather than a row-value comparison: the order mixes
+    directions (the sort key either way, contract_id always ascending) and puts NULL
+    last under both, and `(a, b) > (x, y)` can express neither. Reaching the NULL
+    tail is its own branch — once the previous page ended on a NULL key, only NULL
+    keys with a higher contract_id remain; before that, every NULL key still lies
+    ahead.
+
+    On the non-nullable sorts the redundant `<=`/`>=` bound is what lets the planner
+    turn the OR into an index range scan starting at the cursor, which is the point:
+    page 500 reads the same few rows page 1 does.
+    """
+    value = position.sort_value()
+    if value is None:
+        return and_(sort_key.is_(None), Contract.contract_id > position.contract_id)
+
+    beyond = sort_key < value if descending else sort_key > value
+    resumed = or_(
+        beyond,
+        and_(sort_key == value, Contract.contract_id > position.contract_id),
     )
-    result = await db.execute(data_query)
-    contracts = list(result.scalars().unique().all())
-    # Restore the page order computed by id_query.
-    position = {cid: index for index, cid in enumerate(page_ids)}
-    contracts.sort(key=lambda contract: position[contract.contract_id])
-    return contracts
+    if filters.sort_by in NULLABLE_SORTS:
+        return or_(resumed, sort_key.is_(None))
+    return and_(sort_key <= value if descending else sort_key >= value, resumed)
+
+
+def _page_window(query, filters: ContractFilters):
+    """Offset into the result for page mode; a cursor has already seeked past it.
+
+    One row beyond the page is fetched so the response can say whether another page
+    exists without a second query — the total cannot, since a cursor's position in
+    the result is unknown.
+    """
+    if filters.cursor is None:
+        query = query.offset((filters.page - 1) * filters.size)
+    return query.limit(filters.size + 1)
+
+
+def _next_cursor(
+    filters: ContractFilters, keyed_rows: list[tuple[int, object]]
+) -> str | None:
+    """The cursor resuming after this page, or None when nothing follows it."""
+    if len(keyed_rows) <= filters.size:
+        return None
+    contract_id, sort_value = keyed_rows[filters.size - 1]
+    return ContractCursor.after(
+        filters.sort_by, filters.sort_direction, sort_value, contract_id
+    ).encode()
 
 
-async def _fetch_page_simple(
+def _sort_key(filters: ContractFilters) -> tuple[object, bool]:
+    """The expression the request sorts by, and whether it runs descending."""
+    sort_column = SORT_MAP.get(filters.sort_by)
+    if sort_column is None:
+        # Fallback to default or raise an error for an unsupported sort key
+        sort_column = Contract.date_issued
+
+    descending = filters.sort_direction == SortDirection.desc
+    if descending:
+        sort_column = _DESCENDING_SORT_MAP.get(filters.sort_by, sort_column)
+    return sort_column, descending
+
+
+def _ordering(sort_column, filters: ContractFilters, descending: bool) -> tuple:
+    """ORDER BY for a sort key: NULL keys last either way, contract_id breaking ties
+    so the order is total — the property both cursors and exports depend on."""
+    order_expr = sort_column.desc() if descending else sort_column.asc()
+    if filters.sort_by in NULLABLE_SORTS:
+        order_expr = order_expr.nulls_last()
+    return order_expr, Contract.contract_id.asc()
+
+
+async def _fetch_page(
     db: AsyncSession,
     query,
     filters: ContractFilters,
     sort_column,
     descending: bool,
-) -> list[Contract]:
-    order_expr = sort_column.desc() if descending else sort_column.asc()
-    if filters.sort_by in NULLABLE_SORTS:
-        order_expr = order_expr.nulls_last()
-    data_query = (
-        query.order_by(order_expr, Contract.contract_id.asc())
-        .offset((filters.page - 1) * filters.size)
-        .limit(filters.size)
-        .options(selectinload(Contract.items))
-    )
+) -> tuple[list[Contract], str | None]:
+    if filters.cursor is not None:
+        query = query.filter(
+            _seek_past(
+                sort_column, filters, descending, ContractCursor.decode(filters.cursor)
+            )
+        )
+    # The sort key rides along with each row so the next cursor carries the value the
+    # database compared on — a computed key like reward_per_volume re-derived in
+    # Python could differ in the last bit and resume on the wrong row. Items are not
+    # loaded: a row is served from its stored summary (_list_summaries).
+    data_query = _page_window(
+        query.add_columns(sort_column).order_by(*_ordering(sort_column, filters, descending)),
+        filters,
+    ).execution_options(query_family="contracts.page")
     result = await db.execute(data_query)
-    return result.scalars().unique().all()
+    rows = result.all()
+    keyed_rows = [(contract.contract_id, sort_value) for contract, sort_value in rows]
+    return (
+        [contract for contract, _ in rows[: filters.size]],
+        _next_cursor(filters, keyed_rows),
+    )
+
+
+async def _contracts_by_id(db: AsyncSession, contract_ids: list[int]) -> list[Contract]:
+    """The rows for a page the read model chose, in its order, by primary key. An id
+    whose row has gone since the model was built is skipped."""
+    if not contract_ids:
+        return []
+    result = await db.execute(
+        select(Contract)
+        .where(any_of(Contract.contract_id, contract_ids))
+        .execution_options(query_family="contracts.page_by_id")
+    )
+    by_id = {contract.contract_id: contract for contract in result.scalars()}
+    return [by_id[contract_id] for contract_id in contract_ids if contract_id in by_id]
 
 
 async def _category_names(db: AsyncSession) -> dict[int, str]:
@@ -664,26 +1026,13 @@ async def _category_names(db: AsyncSession) -> dict[int, str]:
     the list row beside it shows them.
     """
     result = await db.execute(
-        select(EsiTaxonomyCache.esi_id, EsiTaxonomyCache.name).where(
-            EsiTaxonomyCache.kind == "category"
-        )
+        select(EsiTaxonomyCache.esi_id, EsiTaxonomyCache.name)
+        .where(EsiTaxonomyCache.kind == "category")
+        .execution_options(query_family="contracts.category_names")
     )
     return {esi_id: name for esi_id, name in result.all()}
 
 
-def _offered_items(contract: Contract) -> list[ContractItem]:
-    """The items the contract puts up, oldest record first.
-
-    is_included=False marks the items the issuer is ASKING FOR, so every derived
-    figure counts only the offered side (§3.1). Ordering by record_id makes "the
-    first item" a fact about the data rather than about row-return order.
-    """
-    return sorted(
-        (item for item in contract.items if item.is_included),
-        key=lambda item: item.record_id,
-    )
-
-
 def _reward_per_volume(contract: Contract) -> float | None:
     """Reward per m3, the figure haulers compare offers on.
 
@@ -695,20 +1044,16 @@ def _reward_per_volume(contract: Contract) -> float | None:
     return float(contract.reward) / float(contract.volume)
 
 
-def _primary_label(contract: Contract, offered: list[ContractItem]) -> str:
+def _primary_label(contract: Contract, headline_item_name: str | None) -> str:
     """The row's headline.
 
-    The hull is the headline on a ship marketplace, so an offered ship outranks
-    whatever module happens to come first in a fitted-hull contract. Real ESI titles
-    are frequently "" rather than NULL, so blank counts as absent. Computed here
-    rather than per client so the list row, the detail page, and any future consumer
-    name a contract the same way.
+    An offered item's name wins (see contract_summary.headline_item_name for which
+    one). Real ESI titles are frequently "" rather than NULL, so blank counts as
+    absent. Computed here rather than per client so the list row, the detail page,
+    and any future consumer name a contract the same way.
     """
-    named = [item for item in offered if item.type_name]
-    ship = next((item for item in named if item.category == "ship"), None)
-    headline = ship or (named[0] if named else None)
-    if headline is not None:
-        return headline.type_name
+    if headline_item_name is not None:
+        return headline_item_name
 
     if contract.title and contract.title.strip():
         return contract.title.strip()
@@ -722,7 +1067,7 @@ def _primary_label(contract: Contract, offered: list[ContractItem]) -> str:
 
 
 def _composition(
-    contract: Contract, offered: list[ContractItem], names: dict[int, str]
+    contract: Contract, summary: dict, names: dict[int, str]
 ) -> CompositionSummary | None:
     """What a multi-item contract is made of, by category.
 
@@ -731,22 +1076,18 @@ def _composition(
     6.1). total_volume is the contract's own volume: the model holds no per-item
     volume, so there is nothing to sum.
     """
-    if len(offered) < 2:
+    if summary["item_rows"] < 2:
         return None
 
-    row_counts: dict[int | None, int] = {}
-    for item in offered:
-        row_counts[item.category_id] = row_counts.get(item.category_id, 0) + 1
-
     categories = [
-        CompositionCategory(
+        CompositionCategory.model_construct(
             category_id=category_id,
             # A category the name cache has not resolved serves NULL rather than a
             # fabricated string — the client can say "unnamed", we cannot invent.
             name=names.get(category_id) if category_id is not None else None,
             item_row_count=count,
         )
-        for category_id, count in row_counts.items()
+        for category_id, count in summary["categories"]
     ]
     # Share governs the order for every entry — including the NULL-category
     # bucket, which must not hide at the end when it dominates the lot (§17.2:
@@ -760,42 +1101,31 @@ def _composition(
         )
     )
 
-    return CompositionSummary(
+    return CompositionSummary.model_construct(
         categories=categories,
-        total_item_rows=len(offered),
+        total_item_rows=summary["item_rows"],
         total_volume=float(contract.volume) if contract.volume is not None else None,
     )
 
 
-def _blueprint_summary(offered: list[ContractItem]) -> BlueprintSummary | None:
-    """The blueprint terms of a contract offering copies.
-
-    With more than one copy the terms belong to individual copies, so reporting one
-    copy's runs would misdescribe the others: the count goes out alone and the client
-    sends the reader to the detail page for the rest (§17.3).
-    """
-    copies = [item for item in offered if item.is_blueprint_copy is True]
-    if not copies:
-        return None
-    if len(copies) > 1:
-        return BlueprintSummary(copy_count=len(copies))
-
-    copy = copies[0]
-    return BlueprintSummary(
-        runs=copy.runs,
-        material_efficiency=copy.material_efficiency,
-        time_efficiency=copy.time_efficiency,
-        copy_count=1,
-    )
+def _blueprint_summary(summary: dict) -> BlueprintSummary | None:
+    """The blueprint terms of a contract offering copies; the client sends the reader
+    to the detail page for the rest when there is more than one (§17.3)."""
+    terms = summary["blueprint"]
+    return BlueprintSummary.model_construct(**terms) if terms is not None else None
 
 
-def _contract_fields(contract: Contract, names: dict[int, str]) -> dict:
+def _contract_fields(contract: Contract, names: dict[int, str], summary: dict) -> dict:
     """The fields shared by the list row and the detail response.
 
     Written out rather than validated off the ORM object, so a column added to the
-    model does not silently become a wire field.
+    model does not silently become a wire field. The item-derived fields come from
+    `summary` (contract_summary.build_list_summary's shape), so a list row can be
+    built without the contract's items in memory.
+
+    Every value already has its wire type — the Numeric columns arrive as Decimal
+    and are converted here — which is what lets _list_item skip validation.
     """
-    offered = _offered_items(contract)
     return {
         "contract_id": contract.contract_id,
         "issuer_id": contract.issuer_id,
@@ -808,31 +1138,83 @@ def _contract_fields(contract: Contract, names: dict[int, str]) -> dict:
         "for_corporation": contract.for_corporation,
         "date_issued": contract.date_issued,
         "date_expired": contract.date_expired,
-        "price": contract.price,
-        "collateral": contract.collateral,
+        "price": _as_float(contract.price),
+        "collateral": _as_float(contract.collateral),
         "reward": contract.reward,
         "volume": contract.volume,
-        "buyout": contract.buyout,
+        "buyout": _as_float(contract.buyout),
         "days_to_complete": contract.days_to_complete,
         "reward_per_volume": _reward_per_volume(contract),
+        "route_jumps": contract.route_jumps,
+        "route_highsec": contract.route_highsec,
+        "reward_per_jump": contract.reward_per_jump,
         "start_location_name": contract.start_location_name,
         "end_location_name": contract.end_location_name,
         "issuer_name": contract.issuer_name,
         "issuer_corporation_name": contract.issuer_corporation_name,
         "last_seen_at": contract.last_seen_at,
         "is_ship_contract": contract.is_ship_contract,
-        "is_blueprint_copy_contract": any(
-            item.is_blueprint_copy is True for item in offered
-        ),
-        "primary_label": _primary_label(contract, offered),
-        "composition": _composition(contract, offered, names),
-        "blueprint_summary": _blueprint_summary(offered),
+        # Offered copies only, the same rule the is_bpc filter applies.
+        "is_blueprint_copy_contract": summary["blueprint"] is not None,
+        "primary_label": _primary_label(contract, summary["headline"]),
+        "composition": _composition(contract, summary, names),
+        "blueprint_summary": _blueprint_summary(summary),
     }
 
 
-def _list_item(contract: Contract, names: dict[int, str]) -> ContractListItemSchema:
-    """Build one list row."""
-    return ContractListItemSchema(**_contract_fields(contract, names))
+def _as_float(value) -> float | None:
+    return float(value) if value is not None else None
+
+
+def _list_item(
+    contract: Contract, names: dict[int, str], summary: dict
+) -> ContractListItemSchema:
+    """Build one list row, trusted rather than validated.
+
+    Every field comes from a typed column or a value computed here, so validating the
+    row — and its nested composition and blueprint models, built the same way —
+    re-checks what is already known, once per row on every page. model_construct
+    skips that; the detail path still validates, being one contract per request.
+    """
+    return ContractListItemSchema.model_construct(
+        **_contract_fields(contract, names, summary)
+    )
+
+
+async def _list_summaries(
+    db: AsyncSession, contracts: list[Contract]
+) -> dict[int, dict]:
+    """The item-derived summary for each row of a page, keyed by contract id.
+
+    Read off the contract row where ingestion stored one at the current
+    ITEM_SUMMARY_VERSION — the common case, costing no query at all. The rest (rows
+    ingested before the summary existed, across a version bump, or written by
+    anything other than ingestion) have their items loaded in ONE query for the
+    whole page and are summarized the same way ingestion would have.
+    """
+    summaries = {
+        contract.contract_id: contract.list_summary
+        for contract in contracts
+        if contract.item_summary_version == ITEM_SUMMARY_VERSION
+        and contract.list_summary is not None
+    }
+    missing = [
+        contract.contract_id
+        for contract in contracts
+        if contract.contract_id not in summaries
+    ]
+    if missing:
+        items_by_contract: dict[int, list[ContractItem]] = {cid: [] for cid in missing}
+        rows = await db.execute(
+            select(ContractItem)
+            .where(any_of(ContractItem.contract_id, missing))
+            .execution_options(query_family="contracts.summary_fallback")
+        )
+        for item in rows.scalars():
+            items_by_contract[item.contract_id].append(item)
+        for contract_id, items in items_by_contract.items():
+            summaries[contract_id] = build_list_summary(items)
+    return summaries
 
 
 def _detail_item(contract: Contract, names: dict[int, str]) -> ContractDetailSchema:
@@ -842,7 +1224,7 @@ def _detail_item(contract: Contract, names: dict[int, str]) -> ContractDetailSch
     the item table renders identically on every request.
     """
     return ContractDetailSchema(
-        **_contract_fields(contract, names),
+        **_contract_fields(contract, names, build_list_summary(contract.items)),
         items=[
             ContractItemSchema.model_validate(item)
             for item in sorted(contract.items, key=lambda item: item.record_id)
@@ -850,6 +1232,31 @@ def _detail_item(contract: Contract, names: dict[int, str]) -> ContractDetailSch
     )
 
 
+async def get_contract_details(
+    db: AsyncSession,
+    contract_ids: list[int],
+    *,
+    category_names: dict[int, str] | None = None,
+) -> dict[int, ContractDetailSchema]:
+    """Detail responses for every id in `contract_ids` that exists, keyed by id.
+
+    Two queries whatever the count — the contracts, then every one of their items
+    through one selectinload IN — where a client fetching them one by one costs two
+    per contract plus the category-name lookup each time. Built by _detail_item, so a
+    batched contract is byte-for-byte the one GET /contracts/{id} serves.
+    """
+    result = await db.execute(
+        select(Contract)
+        .where(any_of(Contract.contract_id, set(contract_ids)))
+        .options(selectinload(Contract.items))
+    )
+    names = category_names if category_names is not None else await _category_names(db)
+    return {
+        contract.contract_id: _detail_item(contract, names)
+        for contract in result.scalars()
+    }
+
+
 def _live_item_bearing_contracts():
     """The population the readiness signal measures, as filter criteria.
 
@@ -979,6 +1386,158 @@ async def get_taxonomy(db: AsyncSession) -> TaxonomyResponse:
     )
 
 
+def _folded_facets(rows) -> ContractFacetsResponse:
+    """The facets from get_contract_facets' grouped rows, one grouping set apiece."""
+    regions: dict[int, int] = {}
+    categories: dict[int, int] = {}
+    groups: dict[int, int] = {}
+    ships = {True: 0, False: 0}
+    copies = {True: 0, False: 0}
+    for row in rows:
+        (
+            by_region, by_ship, by_bpc, by_category,
+            region_id, is_ship, is_bpc, category_id, group_id,
+            region_n, ship_n, bpc_n, category_n, group_n,
+        ) = row
+        # GROUPING() is 0 for the column a row is grouped by. A NULL key is a
+        # contract with no known region, or the item-less contracts' joined row.
+        if by_region == 0:
+            if region_id is not None:
+                regions[region_id] = region_n
+        elif by_ship == 0:
+            ships[is_ship] = ship_n
+        elif by_bpc == 0:
+            copies[is_bpc] = bpc_n
+        elif by_category == 0:
+            if category_id is not None:
+                categories[category_id] = category_n
+        elif group_id is not None:
+            groups[group_id] = group_n
+
+    return ContractFacetsResponse(
+        regions=regions,
+        categories=categories,
+        groups=groups,
+        is_ship_contract=BooleanFacet(yes=ships[True], no=ships[False]),
+        is_bpc=BooleanFacet(yes=copies[True], no=copies[False]),
+    )
+
+
+async def get_contract_facets(
+    db: AsyncSession,
+    filters: ContractFilters,
+    *,
+    read_model: "ContractReadModel | None" = None,
+) -> ContractFacetsResponse:
+    """Per-option counts for the region, category, group, ship and BPC filters, from
+    one statement.
+
+    The facet filters are lifted from the WHERE clause and come back as FILTER
+    clauses on each facet's count, so each facet applies every filter but its own.
+    Everything else goes through _apply_contract_filters / _apply_item_filters like
+    the page does, so the facets and the page cannot disagree about a filter.
+
+    One pass: the matching contracts are read once, left-joined to their offered
+    items, and grouped by GROUPING SETS — one set per facet. The join repeats a
+    contract once per item, so every count is DISTINCT. An item-less contract keeps
+    its one row and counts in the contract-level facets. Paging and sort are ignored.
+
+    With `read_model` (services/contract_read_model.py) the same figures are counted
+    in memory instead; only a search term still costs a query.
+    """
+    if read_model is not None:
+        return await read_model.facets(db, filters)
+
+    lifted = filters.model_copy(
+        update={
+            "region_ids": None,
+            "is_ship_contract": None,
+            "is_bpc": None,
+            "category_id": None,
+            "group_id": None,
+        }
+    )
+    taxonomy_filtered = bool(filters.category_id or filters.group_id)
+    matched = (
+        _apply_item_filters(_apply_contract_filters(select(Contract), lifted), lifted)
+        .with_only_columns(
+            Contract.contract_id.label("contract_id"),
+            Contract.start_location_region_id.label("region_id"),
+            Contract.is_ship_contract.label("is_ship"),
+            _has_blueprint_copy_item().label("is_bpc"),
+            (_offered_taxonomy_match(filters) if taxonomy_filtered else true()).label(
+                "in_taxonomy"
+            ),
+        )
+        .cte("facet_matches")
+        # Materialized, so each contract's BPC and taxonomy EXISTS run once. Inlined,
+        # the planner would evaluate them after the item join, once per item row.
+        .prefix_with("MATERIALIZED")
+    )
+
+    # Each facet filter as a predicate on the matched rows; true when not applied.
+    applied = {
+        "region": (
+            any_of(matched.c.region_id, filters.region_ids) if filters.region_ids else true()
+        ),
+        "ship": (
+            matched.c.is_ship == filters.is_ship_contract
+            if filters.is_ship_contract is not None
+            else true()
+        ),
+        "bpc": (
+            matched.c.is_bpc == filters.is_bpc if filters.is_bpc is not None else true()
+        ),
+        "taxonomy": matched.c.in_taxonomy,
+    }
+
+    def counted(lifting: str, *also):
+        kept = [predicate for name, predicate in applied.items() if name != lifting]
+        return func.count(matched.c.contract_id.distinct()).filter(and_(*kept, *also))
+
+    # The item facets keep the OTHER taxonomy filter, on the joined item itself.
+    category_row = filters.model_copy(update={"category_id": None})
+    group_row = filters.model_copy(update={"group_id": None})
+    grouped = (
+        select(
+            func.grouping(matched.c.region_id),
+            func.grouping(matched.c.is_ship),
+            func.grouping(matched.c.is_bpc),
+            func.grouping(ContractItem.category_id),
+            matched.c.region_id,
+            matched.c.is_ship,
+            matched.c.is_bpc,
+            ContractItem.category_id,
+            ContractItem.group_id,
+            counted("region"),
+            counted("ship"),
+            counted("bpc"),
+            counted("taxonomy", *_taxonomy_conditions(category_row)),
+            counted("taxonomy", *_taxonomy_conditions(group_row)),
+        )
+        .select_from(matched)
+        .outerjoin(
+            ContractItem,
+            and_(
+                ContractItem.contract_id == matched.c.contract_id,
+                ContractItem.is_included.is_(True),
+            ),
+        )
+        .group_by(
+            func.grouping_sets(
+                matched.c.region_id,
+                matched.c.is_ship,
+                matched.c.is_bpc,
+                ContractItem.category_id,
+                ContractItem.group_id,
+            )
+        )
+        .execution_options(query_family="contracts.facets")
+    )
+
+    return _folded_facets((await db.execute(grouped)).all())
+
+
 def _error_without_bound_parameters(exc: BaseException) -> str:
     """Render `exc` for a log line without the bind values of the statement that failed.
 
@@ -1002,16 +1561,197 @@ def _error_without_bound_parameters(exc: BaseException) -> str:
         exc.hide_parameters = previously_hidden
 
 
+# Connections granted to fanned-out list requests and not yet handed back, per pool.
+# Kept apart from pool.checkedout() because a grant is made before its connections are
+# checked out; a connection counted by both only makes later grants smaller.
+_fanout_grants: Counter = Counter()
+
+
+@contextmanager
+def _fanout_grant(engine: AsyncEngine, wanted: int) -> Iterator[int]:
+    """How many connections a fanned-out request may check out of `engine`'s pool:
+    `wanted`, or what the pool has spare — and 0, run in order, below two.
+
+    A fanned-out request holds its connections while it waits for more, so requests
+    taking them from a busy pool can all end up holding some and waiting on each
+    other's until the checkout timeout. Decided without awaiting, and recorded before
+    any connection is taken, so concurrent requests never grant the same spare ones.
+    The pool's ceiling is its size plus the max_overflow its workload was configured
+    with (db.pool_max_overflow, by the pool's metrics_name).
+    """
+    pool = engine.pool
+    granted = wanted
+    max_overflow = pool_max_overflow.get(getattr(pool, "metrics_name", None))
+    # An unbounded, unnamed or non-queue pool (max_overflow -1, NullPool) is not capped.
+    if isinstance(pool, QueuePool) and max_overflow is not None and max_overflow >= 0:
+        spare = pool.size() + max_overflow - pool.checkedout() - _fanout_grants[pool]
+        granted = min(wanted, spare)
+    if granted <= 1:
+        yield 0
+        return
+    _fanout_grants[pool] += granted
+    try:
+        yield granted
+    finally:
+        _fanout_grants[pool] -= granted
+
+
+@asynccontextmanager
+async def _snapshot_sessions(engine: AsyncEngine, count: int) -> AsyncIterator[list[AsyncSession]]:
+    """`count` sessions, each on its own pooled connection, all reading ONE snapshot.
+
+    The first connection opens a REPEATABLE READ transaction and exports its snapshot;
+    the others import it (SET TRANSACTION SNAPSHOT) before running anything. So the
+    total, the segment counts and the page all describe the same corpus even when an
+    ingest run commits between them — which separate READ COMMITTED statements on one
+    session never promised, and concurrent ones on separate connections would make
+    routine. Read-only: every transaction is rolled back on exit.
+    """
+    async with AsyncExitStack() as stack:
+
+        async def connect() -> AsyncConnection:
+            conn = await stack.enter_async_context(engine.connect())
+            await conn.execution_options(isolation_level="REPEATABLE READ")
+            return conn
+
+        leader = await connect()
+        snapshot_id = (await leader.execute(text("SELECT pg_export_snapshot()"))).scalar_one()
+        followers = await asyncio.gather(*(connect() for _ in range(count - 1)))
+        for conn in followers:
+            # SET cannot take a bind parameter; the id is the server's own string.
+            await conn.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot_id}'"))
+        sessions = []
+        for conn in [leader, *followers]:
+            session = AsyncSession(bind=conn, expire_on_commit=False, autoflush=False)
+            stack.push_async_callback(session.close)
+            sessions.append(session)
+        yield sessions
+
+
+async def _run_list_queries(
+    db: AsyncSession,
+    queries: dict[str, Callable[[AsyncSession], Awaitable]],
+    fanout: int,
+) -> dict[str, object]:
+    """Run a list request's independent queries and return their results by name.
+
+    With `fanout` 1 (the default) they run in order on the request's session. Above
+    that, on up to `fanout` connections sharing one snapshot (_snapshot_sessions),
+    each connection taking the next query as it finishes its last — so the request
+    costs roughly its slowest query rather than their sum, plus the snapshot export.
+    The connections are the pool's, which is why the cap exists: a request holds
+    `fanout` of them for its duration, and takes only those the pool has spare
+    (_fanout_grant). A failing query cancels the rest.
+    """
+    with _fanout_grant(db.bind, min(fanout, len(queries))) as connections:
+        if connections <= 1:
+            return {name: await query(db) for name, query in queries.items()}
+        return await _run_fanned_out(db, queries, connections)
+
+
+async def _run_fanned_out(
+    db: AsyncSession,
+    queries: dict[str, Callable[[AsyncSession], Awaitable]],
+    connections: int,
+) -> dict[str, object]:
+    async with _snapshot_sessions(db.bind, connections) as sessions:
+        idle: asyncio.Queue[AsyncSession] = asyncio.Queue()
+        for session in sessions:
+            idle.put_nowait(session)
+
+        async def run(query):
+            session = await idle.get()
+            try:
+                return await query(session)
+            finally:
+                idle.put_nowait(session)
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = {
+                    name: group.create_task(run(query)) for name, query in queries.items()
+                }
+        except ExceptionGroup as failed:
+            # Surface the query's own error, as the sequential path would: callers
+            # (and the route's error mapping) handle a StatementError, not a group.
+            raise failed.exceptions[0] from None
+    return {name: task.result() for name, task in tasks.items()}
+
+
+def _list_queries(
+    filters: ContractFilters, query, *, counted: bool, system_residual: bool, coverage: bool
+) -> dict[str, Callable[[AsyncSession], Awaitable]]:
+    """The queries a list request runs beside its page (_run_list_queries), by the
+    key get_contracts reads each result under."""
+    queries = {}
+    if counted:
+        queries["counts"] = lambda session: _counted(session, filters, query)
+
+    # Measured before the empty-result short-circuit: an empty page is where the
+    # figure matters most, since a system holding only structure-hosted contracts
+    # is otherwise indistinguishable from an empty one.
+    if system_residual and _filters_by_system(filters):
+        queries["unknown_system_excluded"] = (
+            lambda session: _count_unknown_system_excluded(session, filters)
+        )
+
+    # Describes the dataset rather than the page, so it is computed once per
+    # request beside the counts and is the same figure whatever was filtered.
+    if coverage:
+        queries["coverage"] = _observed_coverage
+    return queries
+
+
+def _list_counts(
+    selection: "Selection | None",
+    precomputed: tuple[dict[str, int], int] | None,
+    results: dict,
+) -> tuple[dict[str, int], int, CountMode, int | None]:
+    """The segment counts, total, count mode and unknown-system figure of a list
+    request, from whichever of its three sources answered: the read model's
+    selection, the snapshot's totals, or the queries get_contracts ran."""
+    if selection is not None:
+        return (
+            selection.segment_counts,
+            selection.total,
+            CountMode.exact,
+            selection.unknown_system_excluded,
+        )
+    unknown_system_excluded = results.get("unknown_system_excluded")
+    if precomputed is not None:
+        segment_counts, total = precomputed
+        return segment_counts, total, CountMode.precomputed, unknown_system_excluded
+    segment_counts, total, count_mode = results["counts"]
+    return segment_counts, total, count_mode, unknown_system_excluded
+
+
 async def get_contracts(
-    db: AsyncSession, filters: ContractFilters
+    db: AsyncSession,
+    filters: ContractFilters,
+    *,
+    category_names: dict[int, str] | None = None,
+    coverage: CoverageInfo | None = None,
+    segment_totals: SegmentTotals | None = None,
+    read_model: "ContractReadModel | None" = None,
 ) -> ContractListResponse:
     """
     Retrieves a paginated list of contracts based on specified filters.
 
     This function constructs a single, dynamic query to handle searching,
-    filtering, sorting, and pagination. It addresses the complexity of
-    conditionally joining the ContractItem table and ensuring correct counts
-    when one-to-many relationships are involved.
+    filtering, sorting, and pagination. Item-level criteria reach it as
+    semi-joins (EXISTS, or IN over matching ids), never as a join, so the query
+    holds one row per contract and counts need no DISTINCT.
+
+    `category_names` and `coverage` describe the dataset rather than the request;
+    a caller holding them already (services/dataset_snapshot.py) passes them in,
+    and either one left out is queried here. `segment_totals`, from the same place,
+    lets a request filtering only on region, type and the ships flag skip its count
+    (_precomputed_counts); without it every request is counted.
+
+    `read_model`, when the caller holds one for the current generation, chooses the
+    page and counts every figure in memory (ContractReadModel.list_page); only the
+    page's rows are then read, by primary key. A cursor the model cannot place falls
+    back to the queries below.
     """
     start_time = time.time()
 
@@ -1041,37 +1781,58 @@ async def get_contracts(
         # Start with the base query for the Contract model.
         query = select(Contract)
 
-        needs_item_join = _needs_item_join(filters)
-
-        if needs_item_join:
-            # Use an outer join to ensure contracts without items are not excluded
-            # unless specifically filtered out.
-            query = query.outerjoin(ContractItem)
-
         # --- Apply Filters ---
         # Each filter is applied to the query object, narrowing the results.
         query = _apply_contract_filters(query, filters)
         query = _apply_item_filters(query, filters)
 
-        # --- Count Query ---
-        # One grouped aggregate serves both the segment labels and the page total,
-        # so a request costs the same one corpus-scale count it always did.
-        segment_counts, total = await _segment_counts_and_total(
-            db, filters, needs_item_join
+        sort_column, descending = _sort_key(filters)
+
+        selection = (
+            await read_model.list_page(db, filters) if read_model is not None else None
         )
 
-        # Measured before the empty-result short-circuit: an empty page is where the
-        # figure matters most, since a system holding only structure-hosted contracts
-        # is otherwise indistinguishable from an empty one.
-        unknown_system_excluded = (
-            await _count_unknown_system_excluded(db, filters, needs_item_join)
-            if filters.system_ids
-            else None
+        async def page(session: AsyncSession):
+            if selection is not None:
+                contracts = await _contracts_by_id(session, selection.contract_ids)
+                next_cursor = selection.next_cursor
+            else:
+                contracts, next_cursor = await _fetch_page(
+                    session, query, filters, sort_column, descending
+                )
+            return contracts, next_cursor, await _list_summaries(session, contracts)
+
+        # --- Count Query ---
+        # One grouped aggregate serves both the segment labels and the page total —
+        # or none at all, when the snapshot's per-generation totals already hold the
+        # answer; or a capped one, when the request is too broad to count exactly for
+        # what the exact figure is worth (_counted).
+        precomputed = (
+            _precomputed_counts(filters, segment_totals) if selection is None else None
+        )
+        queries = _list_queries(
+            filters,
+            query,
+            counted=selection is None and precomputed is None,
+            system_residual=selection is None,
+            coverage=coverage is None,
         )
 
-        # Describes the dataset rather than the page, so it is computed once per
-        # request beside the counts and is the same figure whatever was filtered.
-        coverage = await _observed_coverage(db)
+        fanout = get_settings().CONTRACT_LIST_QUERY_FANOUT
+        if fanout > 1:
+            # Run side by side, the page cannot wait to learn the total is zero; it
+            # runs regardless, and the empty-result short-circuit below only saves
+            # the work after the queries.
+            queries["page"] = page
+            if category_names is None:
+                queries["names"] = _category_names
+
+        results = await _run_list_queries(db, queries, fanout)
+        segment_counts, total, count_mode, unknown_system_excluded = _list_counts(
+            selection, precomputed, results
+        )
+        count_cap = get_settings().CONTRACT_COUNT_CAP if count_mode is CountMode.capped else None
+        coverage = results.get("coverage", coverage)
 
         if total == 0:
             duration_ms = (time.time() - start_time) * 1000
@@ -1101,23 +1862,18 @@ async def get_contracts(
                 # Likewise: an empty page is precisely where a reader needs to know
                 # whether the region they picked is ingested at all.
                 coverage=coverage,
+                count_mode=count_mode,
+                count_cap=count_cap,
             )
 
         # --- Data Query ---
-        # Apply sorting and pagination to get the specific page of results.
-        sort_column = SORT_MAP.get(filters.sort_by)
-        if sort_column is None:
-            # Fallback to default or raise an error for an unsupported sort key
-            sort_column = Contract.date_issued
-
-        descending = filters.sort_direction == SortDirection.desc
-
-        if needs_item_join:
-            contracts = await _fetch_page_joined(db, query, filters, sort_column, descending)
-        else:
-            contracts = await _fetch_page_simple(db, query, filters, sort_column, descending)
-
-        names = await _category_names(db)
+        # Sorting and pagination get the specific page of results.
+        contracts, next_cursor, summaries = (
+            results["page"] if "page" in results else await page(db)
+        )
+        names = results.get("names", category_names)
+        if names is None:
+            names = await _category_names(db)
 
         # Calculate duration and log successful completion
         duration_ms = (time.time() - start_time) * 1000
@@ -1126,10 +1882,13 @@ async def get_contracts(
             total=total,
             page=filters.page,
             size=filters.size,
-            items=[_list_item(c, names) for c in contracts],
+            items=[_list_item(c, names, summaries[c.contract_id]) for c in contracts],
             unknown_system_excluded=unknown_system_excluded,
             segment_counts=segment_counts,
             coverage=coverage,
+            count_mode=count_mode,
+            count_cap=count_cap,
+            next_cursor=next_cursor,
         )
 
         # Log successful contract search with key event schema
@@ -1180,3 +1939,64 @@ async def get_contracts(
 
         # Re-raise the exception to maintain existing error handling behavior
         raise
+
+
+# Rows per fetch from the export's server-side cursor. Bounds what the export holds at
+# once — one partition of contracts plus their fallback items — whatever the result size.
+EXPORT_BATCH_SIZE = 1000
+
+
+def stream_contracts(
+    db: AsyncSession,
+    filters: ContractFilters,
+    *,
+    category_names: dict[int, str] | None = None,
+) -> AsyncIterator[ContractListItemSchema]:
+    """Every contract the filters select, as list rows, in the list's order.
+
+    The export path: the same filter pipeline as get_contracts, but one query read
+    through a server-side cursor (yield_per) instead of a counted, windowed page — so
+    memory stays flat at EXPORT_BATCH_SIZE rows and a full-corpus export costs one
+    scan. No count, no segment counts, no coverage: a stream has nowhere to put them.
+    page, size and cursor are ignored; the export is the whole result.
+
+    The query is built here, not when the first row is asked for: a filter that cannot
+    be applied — proximity with no stargate graph loaded — raises to the caller while
+    it can still answer with an error status, rather than after a streamed response
+    has sent its 200.
+    """
+    query = _apply_item_filters(_apply_contract_filters(select(Contract), filters), filters)
+    sort_column, descending = _sort_key(filters)
+    query = query.order_by(*_ordering(sort_column, filters, descending)).execution_options(
+        yield_per=EXPORT_BATCH_SIZE, query_family="contracts.export"
+    )
+    return _streamed_rows(db, query, category_names)
+
+
+async def _streamed_rows(
+    db: AsyncSession, query, category_names: dict[int, str] | None
+) -> AsyncIterator[ContractListItemSchema]:
+    start_time = time.time()
+    names = category_names if category_names is not None else await _category_names(db)
+
+    exported = 0
+    success = False
+    try:
+        result = await db.stream_scalars(query)
+        async for batch in result.partitions():
+            # One fallback item query per batch at most, run between cursor fetches.
+            summaries = await _list_summaries(db, batch)
+            for contract in batch:
+                yield _list_item(contract, names, summaries[contract.contract_id])
+            exported += len(batch)
+        success = True
+    finally:
+        # A client that disconnects mid-stream lands here too (GeneratorExit), and is
+        # logged as the unfinished export it was.
+        log_key_event(
+            logger=logger,
+            event="contract_export_streamed",
+            success=success,
+            duration_ms=(time.time() - start_time) * 1000,
+            results_count=exported,
+        )
@@ -0,0 +1,81 @@
+# ABOUTME: The item-derived half of a contract list row, computed from its items in one place
+# ABOUTME: so ingestion can store it (Contract.list_summary) and the list can serve it unchanged.
+from typing import Iterable
+
+from ..models.contracts import ContractItem
+
+
+def offered_items(items: Iterable[ContractItem]) -> list[ContractItem]:
+    """The items the contract puts up, oldest record first.
+
+    is_included=False marks the items the issuer is ASKING FOR, so every derived
+    figure counts only the offered side (§3.1). Ordering by record_id makes "the
+    first item" a fact about the data rather than about row-return order.
+    """
+    return sorted(
+        (item for item in items if item.is_included),
+        key=lambda item: item.record_id,
+    )
+
+
+def headline_item_name(offered: list[ContractItem]) -> str | None:
+    """The item name that heads the row, when the items name one.
+
+    The hull is the headline on a ship marketplace, so an offered ship outranks
+    whatever module happens to come first in a fitted-hull contract.
+    """
+    named = [item for item in offered if item.type_name]
+    ship = next((item for item in named if item.category == "ship"), None)
+    headline = ship or (named[0] if named else None)
+    return headline.type_name if headline is not None else None
+
+
+def category_row_counts(offered: list[ContractItem]) -> list[list]:
+    """[category_id, item_row_count] pairs, in first-seen order.
+
+    Counts are item ROWS rather than summed quantities (Criterion 6.1). The NULL
+    category is a bucket like any other; ordering is the server's job at serve time,
+    where the names it orders by are known.
+    """
+    row_counts: dict[int | None, int] = {}
+    for item in offered:
+        row_counts[item.category_id] = row_counts.get(item.category_id, 0) + 1
+    return [[category_id, count] for category_id, count in row_counts.items()]
+
+
+def blueprint_terms(offered: list[ContractItem]) -> dict | None:
+    """The blueprint terms of a contract offering copies, or None when it offers none.
+
+    With more than one copy the terms belong to individual copies, so reporting one
+    copy's runs would misdescribe the others: the count goes out alone (§17.3).
+    """
+    copies = [item for item in offered if item.is_blueprint_copy is True]
+    if not copies:
+        return None
+    if len(copies) > 1:
+        return {"copy_count": len(copies)}
+
+    copy = copies[0]
+    return {
+        "runs": copy.runs,
+        "material_efficiency": copy.material_efficiency,
+        "time_efficiency": copy.time_efficiency,
+        "copy_count": 1,
+    }
+
+
+def build_list_summary(items: Iterable[ContractItem]) -> dict:
+    """Everything a list row derives from the contract's items, as plain JSON.
+
+    Category NAMES are deliberately absent: the name cache fills in after enrichment
+    and can change without the items changing, so names are joined on when the row
+    is served. Everything else here is a pure function of the items, which public
+    contracts never change — so one computation at enrichment serves every request.
+    """
+    offered = offered_items(items)
+    return {
+        "headline": headline_item_name(offered),
+        "item_rows": len(offered),
+        "categories": category_row_counts(offered),
+        "blueprint": blueprint_terms(offered),
+    }
@@ -0,0 +1,162 @@
+# ABOUTME: Process-local snapshot of dataset-level metadata (category names, coverage, taxonomy),
+# ABOUTME: rebuilt once per ingestion generation and dropped when Valkey pub/sub announces a commit.
+import asyncio
+import time
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from typing import Callable
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.logging import get_logger
+from ..core.metrics import dataset_snapshot_rebuilds
+from ..schemas.contracts import CoverageInfo, TaxonomyResponse
+from .background_aggregation import INGEST_GENERATION_CHANNEL
+from .contract_service import (
+    SegmentTotals,
+    _live_segment_totals,
+    _observed_coverage,
+    get_taxonomy,
+)
+
+logger = get_logger(__name__)
+
+# Pause before resubscribing after the listener's connection drops, so a Valkey outage
+# costs one warning per interval rather than a tight reconnect loop.
+LISTENER_RETRY_SECONDS = 5
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    """What the read side derives from the corpus as a whole rather than from a request.
+
+    All of it changes only when an ingestion run commits, so one copy per process
+    serves every request in between. Frozen: requests share the instance.
+    """
+
+    category_names: dict[int, str]
+    coverage: CoverageInfo
+    taxonomy: TaxonomyResponse
+    segment_totals: SegmentTotals  # counts the broadest list requests (_precomputed_counts)
+    built_at: float  # time.monotonic() at build, for the max-age backstop
+
+
+async def build_dataset_snapshot(db: AsyncSession) -> DatasetSnapshot:
+    """Compute the snapshot from the database: the coverage CTE, the taxonomy, and
+    the live corpus counted by region and contract type.
+
+    Category names are read off the taxonomy's category list instead of a second
+    SELECT over esi_taxonomy_cache — the same rows, already loaded.
+    """
+    taxonomy = await get_taxonomy(db)
+    return DatasetSnapshot(
+        category_names={entry.category_id: entry.name for entry in taxonomy.categories},
+        coverage=await _observed_coverage(db),
+        taxonomy=taxonomy,
+        segment_totals=await _live_segment_totals(db),
+        built_at=time.monotonic(),
+    )
+
+
+class DatasetSnapshotCache:
+    """Holds this process's DatasetSnapshot and decides when it is rebuilt.
+
+    The snapshot is dropped on three signals: an ingest commit announced on
+    INGEST_GENERATION_CHANNEL (the normal case — see listen), a resubscription after
+    the listener lost its connection (announcements made meanwhile were missed), and
+    max age (the backstop when there is no listener at all). The next request after a
+    drop rebuilds it; concurrent requests wait on that one rebuild rather than each
+    running their own.
+
+    Not a correctness boundary: a request served from a snapshot a commit has just
+    outdated sees the previous run's metadata, exactly as it would have a moment
+    earlier. The figures that drift BETWEEN commits are the taxonomy readiness ratio
+    and the segment totals, whose live set shrinks as contracts expire — the max age
+    bounds both.
+    """
+
+    def __init__(self, max_age_seconds: int):
+        self._max_age_seconds = max_age_seconds
+        self._snapshot: DatasetSnapshot | None = None
+        # Bumped by every invalidation. A rebuild that started before an invalidation
+        # read the pre-commit corpus, so it serves its own request but is not kept.
+        self._epoch = 0
+        self._drop_reason = "cold"
+        self._rebuild_lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """Drop the snapshot; the next get rebuilds it."""
+        self._epoch += 1
+        self._snapshot = None
+        self._drop_reason = "invalidated"
+
+    def _fresh(self) -> DatasetSnapshot | None:
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.built_at >= self._max_age_seconds:
+            return None
+        return snapshot
+
+    async def get(self, db: AsyncSession) -> DatasetSnapshot:
+        """The current snapshot, rebuilt on `db` first if there is none.
+
+        Costs no I/O at all while the snapshot is fresh, which is every request but
+        the first after a commit.
+        """
+        snapshot = self._fresh()
+        if snapshot is not None:
+            return snapshot
+
+        async with self._rebuild_lock:
+            # Whoever held the lock before us may have rebuilt it already.
+            snapshot = self._fresh()
+            if snapshot is not None:
+                return snapshot
+
+            reason = self._drop_reason if self._snapshot is None else "expired"
+            epoch = self._epoch
+            snapshot = await build_dataset_snapshot(db)
+            dataset_snapshot_rebuilds.labels(reason=reason).inc()
+            if epoch == self._epoch:
+                self._snapshot = snapshot
+            return snapshot
+
+    async def warm(
+        self, session_factory: Callable[..., AbstractAsyncContextManager[AsyncSession]]
+    ) -> None:
+        """Build the snapshot at startup, so a cold process's first request does not
+        pay for it. Fails open: a process that cannot warm rebuilds on first use."""
+        try:
+            async with session_factory() as db:
+                await self.get(db)
+        except Exception:
+            logger.warning("Dataset snapshot warm-up failed", exc_info=True)
+
+    async def listen(self, redis: Redis) -> None:
+        """Drop the snapshot on every generation announcement, until cancelled.
+
+        Runs for the life of the process. A lost connection is retried after
+        LISTENER_RETRY_SECONDS; once resubscribed the snapshot is dropped, because an
+        announcement made while unsubscribed is gone for good.
+        """
+        subscribed_before = False
+        while True:
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.subscribe(INGEST_GENERATION_CHANNEL)
+                if subscribed_before:
+                    self.invalidate()
+                subscribed_before = True
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning(
+                    "Dataset snapshot listener lost its subscription; retrying",
+                    exc_info=True,
+                )
+                await asyncio.sleep(LISTENER_RETRY_SECONDS)
+            finally:
+                await pubsub.aclose()
@@ -0,0 +1,294 @@
+# ABOUTME: The stargate graph from a local SDE dump: the courier jump counts ingestion stamps
+# ABOUTME: from it, and the per-origin neighbourhood index behind the list's proximity filter.
+import json
+import logging
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+# EVE shows security rounded to one decimal and calls 0.5 and above high-sec, so a
+# system is high-sec from a true status of 0.45 (Ahbazon, 0.421, shows as 0.4).
+HIGHSEC_MIN_SECURITY = 0.45
+
+# Origins whose distance arrays are kept. One array costs 2 bytes per system (~17 KB
+# for New Eden's ~8,500), so this bounds the cache near 9 MB per routing mode. Courier
+# origins cluster onto a few trade hubs, so a run re-searches almost nothing; an
+# all-pairs matrix would cost ~144 MB for pairs no contract asks about.
+BFS_CACHE_SOURCES = 512
+
+# Origins whose neighbourhoods (the proximity filter's index) are kept. One lists every
+# system reachable from its origin at 4 bytes each, ~34 KB; proximity questions are
+# asked about a few hubs, so a few MB cover them.
+NEIGHBOURHOOD_CACHE_ORIGINS = 128
+
+# The two files of CCP's JSONL SDE the graph is read from.
+SDE_STARGATES_FILE = "mapStargates.jsonl"
+SDE_SOLAR_SYSTEMS_FILE = "mapSolarSystems.jsonl"
+
+_UNREACHABLE = -1
+
+
+class StargateGraphUnavailableError(Exception):
+    """A request needs the stargate graph and this process has none loaded (SDE_DIR
+    unset or unreadable). main.py answers it with a 503: the filter cannot be applied,
+    and ignoring it would serve every contract as if it were nearby."""
+
+
+@dataclass(frozen=True)
+class _Neighbourhood:
+    """Every system reachable from one origin, nearest first, with how many of them
+    lie within each jump count — so any radius is a prefix of one array."""
+
+    systems: array
+    # within[d] = len(systems within d jumps); the last entry covers everything.
+    within: tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class CourierRoute:
+    """The route a courier contract is ranked by."""
+
+    jumps: int
+    # Whether the route stays inside high-sec. Shown per row rather than left to a
+    # label on the column: where no all-high-sec path exists the route falls back to
+    # the shortest one, which a hauler has to be able to tell apart.
+    highsec: bool
+
+
+@dataclass(frozen=True)
+class SolarSystem:
+    """One system's row in the SDE, as the location dimension stores it."""
+
+    name: str | None
+    region_id: int | None
+    security_status: float | None
+
+
+class StargateGraph:
+    """Solar systems joined by stargates, in compressed sparse row form.
+
+    The graph has several components (New Eden proper, Pochven, the Jove pockets), so
+    "no path" is an ordinary answer, not an error. Distances come from a breadth-first
+    search over the whole graph from one origin, kept per origin (BFS_CACHE_SOURCES):
+    every destination of a cached origin then costs an array read.
+
+    `solar_systems` carries the SDE's own row per system when the graph was loaded
+    from one (load_stargate_graph), so ingestion can store a system's region and
+    security from the same file its routes are judged high-sec by.
+    """
+
+    def __init__(
+        self,
+        edges: Iterable[tuple[int, int]],
+        security: dict[int, float],
+        solar_systems: dict[int, SolarSystem] | None = None,
+    ):
+        self.solar_systems = solar_systems or {}
+        adjacent: dict[int, set[int]] = {system_id: set() for system_id in security}
+        for origin, destination in edges:
+            # Stargates come in pairs, but a half-pair in a partial dump must not make
+            # a one-way road.
+            adjacent.setdefault(origin, set()).add(destination)
+            adjacent.setdefault(destination, set()).add(origin)
+        self._system_ids = sorted(adjacent)
+        self._index = {system_id: index for index, system_id in enumerate(self._system_ids)}
+        self._offsets = array("i", [0])
+        self._targets = array("i")
+        for system_id in self._system_ids:
+            self._targets.extend(sorted(self._index[other] for other in adjacent[system_id]))
+            self._offsets.append(len(self._targets))
+        # A system the dump gives no status for is treated as not high-sec: a route
+        # described as high-sec must be one.
+        self._highsec = bytes(
+            security.get(system_id, -1.0) >= HIGHSEC_MIN_SECURITY
+            for system_id in self._system_ids
+        )
+        self._distances: dict[bool, OrderedDict[int, array]] = {
+            False: OrderedDict(),
+            True: OrderedDict(),
+        }
+        self._neighbourhoods: OrderedDict[int, _Neighbourhood] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._system_ids)
+
+    def _search(self, source: int, highsec_only: bool) -> array:
+        """Jumps from `source` to every system, _UNREACHABLE where there is no path."""
+        distances = array("h", [_UNREACHABLE]) * len(self._system_ids)
+        distances[source] = 0
+        frontier = [source]
+        depth = 0
+        while frontier:
+            depth += 1
+            reached = []
+            for node in frontier:
+                for position in range(self._offsets[node], self._offsets[node + 1]):
+                    neighbour = self._targets[position]
+                    if distances[neighbour] != _UNREACHABLE:
+                        continue
+                    if highsec_only and not self._highsec[neighbour]:
+                        continue
+                    distances[neighbour] = depth
+                    reached.append(neighbour)
+            frontier = reached
+        return distances
+
+    def _distances_from(self, source: int, highsec_only: bool) -> array:
+        cache = self._distances[highsec_only]
+        distances = cache.get(source)
+        if distances is None:
+            distances = cache[source] = self._search(source, highsec_only)
+            if len(cache) > BFS_CACHE_SOURCES:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(source)
+        return distances
+
+    def _neighbourhood(self, source: int) -> _Neighbourhood:
+        neighbourhood = self._neighbourhoods.get(source)
+        if neighbourhood is not None:
+            self._neighbourhoods.move_to_end(source)
+            return neighbourhood
+        distances = self._distances_from(source, highsec_only=False)
+        ranked = sorted(
+            (distance, self._system_ids[index])
+            for index, distance in enumerate(distances)
+            if distance != _UNREACHABLE
+        )
+        within = [0] * (ranked[-1][0] + 1)
+        for distance, _ in ranked:
+            within[distance] += 1
+        for depth in range(1, len(within)):
+            within[depth] += within[depth - 1]
+        neighbourhood = self._neighbourhoods[source] = _Neighbourhood(
+            systems=array("i", (system_id for _, system_id in ranked)), within=tuple(within)
+        )
+        if len(self._neighbourhoods) > NEIGHBOURHOOD_CACHE_ORIGINS:
+            self._neighbourhoods.popitem(last=False)
+        return neighbourhood
+
+    def systems_within(self, origin: int, max_jumps: int) -> list[int]:
+        """The systems at most max_jumps gates from origin, origin included, by the
+        shortest path whatever its security. Empty for a system the graph lacks.
+
+        Served from the origin's neighbourhood, built once by one search and cached:
+        every radius around a hub traders keep asking about is then a prefix of it.
+        """
+        source = self._index.get(origin)
+        if source is None:
+            return []
+        neighbourhood = self._neighbourhood(source)
+        depth = min(max_jumps, len(neighbourhood.within) - 1)
+        return neighbourhood.systems[: neighbourhood.within[depth]].tolist()
+
+    def jumps(self, origin: int, destination: int, highsec_only: bool = False) -> int | None:
+        """Fewest jumps between two systems, or None when no path exists.
+
+        With highsec_only the path may not leave high-sec, so both ends must be in it.
+        The count is exact — ESI's `secure` flag weights security rather than
+        constraining it, and returns up to a third more jumps on long routes.
+        """
+        source = self._index.get(origin)
+        target = self._index.get(destination)
+        if source is None or target is None:
+            return None
+        if highsec_only and not (self._highsec[source] and self._highsec[target]):
+            return None
+        distance = self._distances_from(source, highsec_only)[target]
+        return None if distance == _UNREACHABLE else distance
+
+    def courier_route(
+        self, origin: int, destination: int, prefer_highsec: bool = True
+    ) -> CourierRoute | None:
+        """The route a courier is ranked by: the shortest all-high-sec path when one
+        exists and prefer_highsec is set, otherwise the shortest path.
+
+        High-sec first because the hauler forfeits the collateral on a loss, and it is
+        how hauling is priced: "the payment should assume a fully hisec route if one is
+        available" (docs/superpowers/specs/2026-08-01-courier-route-jumps-spike.md §8).
+        """
+        if prefer_highsec:
+            jumps = self.jumps(origin, destination, highsec_only=True)
+            if jumps is not None:
+                return CourierRoute(jumps=jumps, highsec=True)
+        jumps = self.jumps(origin, destination)
+        if jumps is None:
+            return None
+        # The shortest path can still happen to stay in high-sec.
+        if not prefer_highsec:
+            highsec = self.jumps(origin, destination, highsec_only=True) == jumps
+        else:
+            highsec = False
+        return CourierRoute(jumps=jumps, highsec=highsec)
+
+
+# The graph this process serves proximity filters from, installed at startup
+# (main.load_route_graph). Module state rather than a dependency because the filter is
+# applied inside query builders shared by every list, count, facet and export path.
+_installed_graph: StargateGraph | None = None
+
+
+def install_stargate_graph(graph: StargateGraph | None) -> None:
+    global _installed_graph
+    _installed_graph = graph
+
+
+def systems_within(origin: int, max_jumps: int) -> list[int]:
+    """StargateGraph.systems_within on the installed graph; raises
+    StargateGraphUnavailableError when there is none."""
+    if _installed_graph is None:
+        raise StargateGraphUnavailableError(
+            "Proximity filters need the stargate graph, which is not loaded (SDE_DIR)."
+        )
+    return _installed_graph.systems_within(origin, max_jumps)
+
+
+def _read_jsonl(path: Path) -> Iterable[dict]:
+    with path.open(encoding="utf-8") as lines:
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _solar_system(row: dict) -> SolarSystem:
+    """A mapSolarSystems.jsonl row. The SDE localizes names as {"en": ..., ...}."""
+    name = row.get("name")
+    if isinstance(name, dict):
+        name = name.get("en")
+    security = row.get("securityStatus")
+    return SolarSystem(
+        name=name,
+        region_id=row.get("regionID"),
+        security_status=float(security) if security is not None else None,
+    )
+
+
+def load_stargate_graph(sde_dir: str | Path) -> StargateGraph:
+    """Build the graph from an extracted copy of CCP's JSONL SDE.
+
+    Reads mapSolarSystems.jsonl for each system's name, regionID and securityStatus,
+    and mapStargates.jsonl for the gates, each naming its own solarSystemID and its
+    destination's. Point this at the current SDE: the legacy single-zip URL still
+    answers 200 with a map frozen in July 2025 (courier-route-jumps spike §3).
+    """
+    sde_dir = Path(sde_dir)
+    solar_systems = {
+        row["_key"]: _solar_system(row) for row in _read_jsonl(sde_dir / SDE_SOLAR_SYSTEMS_FILE)
+    }
+    security = {
+        system_id: system.security_status
+        for system_id, system in solar_systems.items()
+        if system.security_status is not None
+    }
+    edges = [
+        (row["solarSystemID"], row["destination"]["solarSystemID"])
+        for row in _read_jsonl(sde_dir / SDE_STARGATES_FILE)
+        if row.get("destination")
+    ]
+    graph = StargateGraph(edges, security, solar_systems)
+    logger.info(f"Loaded the stargate graph: {len(graph)} systems, {len(edges)} stargates.")
+    return graph
@@ -0,0 +1,19 @@
+# ABOUTME: Id-set predicates bound as one PostgreSQL array parameter — `column = ANY(:ids)` —
+# ABOUTME: shared by the list queries and ingestion's bookkeeping, whatever the set's size.
+from typing import Iterable
+
+from sqlalchemy import ARRAY, any_, literal
+
+
+def any_of(column, values: Iterable):
+    """`column = ANY(:values)`: the whole set as ONE array bind.
+
+    in_() expands to a placeholder per value, which costs twice over. Each list length
+    is different SQL text — to asyncpg a separate prepared statement, parsed and planned
+    again — so list requests, which differ mostly in how many ids they name, rarely
+    shared one. And asyncpg caps a statement at 32767 binds, so a corpus-sized IN list
+    had to be cut into chunks, one round trip each. One array bind compiles to the same
+    statement however many ids it carries, and has no size cap. Indexable exactly like
+    the IN list it replaces.
+    """
+    return column == any_(literal(list(values), ARRAY(column.type)))
@@ -1,19 +1,21 @@
-# ABOUTME: F007 watchlist matcher — set-based match of enabled users' watchlists vs outstanding
-# ABOUTME: contracts; dedup via a partial unique index (ON CONFLICT); defensive age-based prune.
+# ABOUTME: F007 watchlist matcher — set-based match of enabled users' watchlists vs contracts new
+# ABOUTME: since its high-water mark, fully rematched now and then; ON CONFLICT dedup; age prune.
+import json
 import logging
 import time
 import uuid
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Callable, Optional
 
 import redis.asyncio as aioredis
-from sqlalchemy import delete, func, or_, select, text
+from sqlalchemy import delete, func, or_, select, text, union
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.config import Settings
-from ..db import AsyncSessionLocal
+from ..db import MatcherSessionLocal
 from ..core.logging import get_logger, log_key_event
 from ..models.account import Notification, WatchlistItem
 from ..models.contracts import Contract, ContractItem
@@ -32,6 +34,14 @@ WATCHLIST_MATCH_LOCK_KEY = "hangar-bay:watchlist-match:lock"
 # through that tick's acquisition attempt.
 WATCHLIST_MATCH_LOCK_TTL_MARGIN_SECONDS = 300
 
+# Where the last committed run got to (MatchMarks), JSON, no TTL. Lost on a cache
+# restart, which costs one full rematch: a missing mark is never read as "nothing new".
+WATCHLIST_MATCH_MARKS_KEY = "hangar-bay:watchlist-match:marks"
+# How far before the previous run's start an incremental run looks for watchlist edits.
+# An edit whose transaction began before that start but committed after it carries an
+# updated_at the previous run could not see yet; API transactions last milliseconds.
+WATCHLIST_EDIT_GRACE_SECONDS = 60
+
 # asyncpg caps a statement at 32767 bind params; ~7 params/row keeps 1000 comfortably safe.
 NOTIFICATION_INSERT_CHUNK = 1000
 
@@ -51,6 +61,58 @@ class ConcurrencyLockError(Exception):
     """Raised when the watchlist-match lock cannot be acquired (another run holds it)."""
 
 
+@dataclass(frozen=True)
+class MatchMarks:
+    """Where the last committed match run got to."""
+
+    # Newest Contract.items_last_fetched_at the run could see; None while no contract
+    # carries the stamp.
+    items_fetched_at: Optional[datetime]
+    # The database clock at the run's start, for watchlist and user edits.
+    watches_at: datetime
+    # When a run last matched everything (see _plan).
+    full_match_at: datetime
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "items_fetched_at": _isoformat(self.items_fetched_at),
+            "watches_at": _isoformat(self.watches_at),
+            "full_match_at": _isoformat(self.full_match_at),
+        })
+
+    @classmethod
+    def from_json(cls, raw) -> Optional["MatchMarks"]:
+        """None for a record this version cannot read, which sends the run to a full match."""
+        try:
+            record = json.loads(raw)
+            return cls(
+                items_fetched_at=_parse_datetime(record["items_fetched_at"]),
+                watches_at=datetime.fromisoformat(record["watches_at"]),
+                full_match_at=datetime.fromisoformat(record["full_match_at"]),
+            )
+        except (ValueError, TypeError, KeyError):
+            return None
+
+
+@dataclass(frozen=True)
+class MatchWindow:
+    """What an incremental run matches: every watchlist against the contracts whose
+    items arrived in (fetched_after, fetched_until], and every watchlist edited — or
+    whose user was — after watches_edited_after against the whole corpus."""
+
+    fetched_after: Optional[datetime]
+    fetched_until: Optional[datetime]
+    watches_edited_after: datetime
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
 def _render_message(type_name: str, contract_type: str, price, location: Optional[str]) -> str:
     # Price-honest: name the CONTRACT as the priced thing (bundle price), not the ship (design §4.4).
     label = _SHIP_TYPE_LABELS.get(contract_type, "a contract")
@@ -58,6 +120,50 @@ def _render_message(type_name: str, contract_type: str, price, location: Optiona
     return f"{type_name} available in {label} priced {price:,.0f} ISK in {where}"
 
 
+def _match_statement(*scope):
+    """Set-based match: enabled users' watchlists vs OUTSTANDING item_exchange/auction contracts
+    carrying an INCLUDED item of the watched type_id, at or under the (optional) max_price —
+    narrowed by `scope`, the incremental window's predicates."""
+    return (
+        select(
+            WatchlistItem.user_id,
+            WatchlistItem.type_id,
+            WatchlistItem.type_name,
+            Contract.contract_id,
+            Contract.price,
+            Contract.type,
+            Contract.start_location_name,
+        )
+        .join(User, User.id == WatchlistItem.user_id)
+        .join(ContractItem, ContractItem.type_id == WatchlistItem.type_id)
+        .join(Contract, Contract.contract_id == ContractItem.contract_id)
+        .where(
+            User.watchlist_alerts_enabled.is_(True),
+            ContractItem.is_included.is_(True),
+            Contract.type.in_(
+                (ContractType.item_exchange.value, ContractType.auction.value)
+            ),
+            Contract.date_expired > func.now(),
+            Contract.date_completed.is_(None),
+            # "Outstanding" is the same question the contracts list asks, so it gets
+            # the same answer: expiry catches only contracts that ran out of time,
+            # while a contract someone ACCEPTED vanishes from ESI's public list still
+            # carrying a future date_expired. Without the watermark that contract keeps
+            # generating alerts for as long as two weeks after it was bought — every
+            # one of them sending the reader to a listing that is gone. The tradeoff we
+            # take in exchange is stated in still_listed_by_esi: a contract that
+            # momentarily drops out of an ESI page reads as gone, so an alert for it can
+            # be missed. One missed opportunity beats a fortnight of alerts nobody can act
+            # on, which is what teaches a reader to ignore the feature entirely.
+            # date_completed above is inert against public-route data (ESI never sends
+            # it) and is kept for character/corp contracts, which do carry it.
+            still_listed_by_esi(),
+            or_(WatchlistItem.max_price.is_(None), Contract.price <= WatchlistItem.max_price),
+            *scope,
+        )
+    )
+
+
 class WatchlistMatcherService:
     """Holds no live clients at rest — Redis/DB connections are created per run — mirroring
     ContractAggregationService. `now_fn` stays None in production;
@@ -94,7 +200,7 @@ class WatchlistMatcherService:
             )
             if not lock_acquired:
                 raise ConcurrencyLockError("Could not acquire watchlist-match lock.")
-            yield
+            yield redis_client
         finally:
             if lock_acquired:
                 released = await redis_client.eval(
@@ -111,12 +217,18 @@ class WatchlistMatcherService:
     async def run_matching(self) -> None:
         started = time.monotonic()
         matched = created = pruned = 0
+        window = None
         try:
-            async with self._concurrency_lock():
-                async with AsyncSessionLocal() as db_session:
-                    matched, created = await self._match_and_notify(db_session)
+            async with self._concurrency_lock() as redis_client:
+                previous = await self._read_marks(redis_client)
+                async with MatcherSessionLocal() as db_session:
+                    window, marks = await self._plan(db_session, previous)
+                    matched, created = await self._match_and_notify(db_session, window)
                     pruned = await self._prune(db_session)
                     await db_session.commit()
+                # Only once committed: a mark advanced past a run that rolled back would
+                # skip the contracts it never got to notify about.
+                await self._write_marks(redis_client, marks)
         except ConcurrencyLockError:
             logger.info("Watchlist matcher skipped: lock held by another run.")
             return
@@ -130,50 +242,90 @@ class WatchlistMatcherService:
         log_key_event(
             slog, "watchlist_match_run", success=True,
             duration_ms=(time.monotonic() - started) * 1000,
-            matches=matched, created=created, pruned=pruned,
+            matches=matched, created=created, pruned=pruned, full_match=window is None,
         )
 
-    async def _match_and_notify(self, db_session: AsyncSession) -> tuple[int, int]:
-        # Set-based match: enabled users' watchlists vs OUTSTANDING item_exchange/auction contracts
-        # carrying an INCLUDED item of the watched type_id, at or under the (optional) max_price.
-        stmt = (
-            select(
-                WatchlistItem.user_id,
-                WatchlistItem.type_id,
-                WatchlistItem.type_name,
-                Contract.contract_id,
-                Contract.price,
-                Contract.type,
-                Contract.start_location_name,
-            )
-            .join(User, User.id == WatchlistItem.user_id)
-            .join(ContractItem, ContractItem.type_id == WatchlistItem.type_id)
-            .join(Contract, Contract.contract_id == ContractItem.contract_id)
-            .where(
-                User.watchlist_alerts_enabled.is_(True),
-                ContractItem.is_included.is_(True),
-                Contract.type.in_(
-                    (ContractType.item_exchange.value, ContractType.auction.value)
-                ),
-                Contract.date_expired > func.now(),
-                Contract.date_completed.is_(None),
-                # "Outstanding" is the same question the contracts list asks, so it gets
-                # the same answer: expiry catches only contracts that ran out of time,
-                # while a contract someone ACCEPTED vanishes from ESI's public list still
-                # carrying a future date_expired. Without the watermark that contract keeps
-                # generating alerts for as long as two weeks after it was bought — every
-                # one of them sending the reader to a listing that is gone. The tradeoff we
-                # take in exchange is stated in still_listed_by_esi: a contract that
-                # momentarily drops out of an ESI page reads as gone, so an alert for it can
-                # be missed. One missed opportunity beats a fortnight of alerts nobody can act
-                # on, which is what teaches a reader to ignore the feature entirely.
-                # date_completed above is inert against public-route data (ESI never sends
-                # it) and is kept for character/corp contracts, which do carry it.
-                still_listed_by_esi(),
-                or_(WatchlistItem.max_price.is_(None), Contract.price <= WatchlistItem.max_price),
-            )
-            .distinct()
+    async def _read_marks(self, redis_client) -> Optional[MatchMarks]:
+        try:
+            raw = await redis_client.get(WATCHLIST_MATCH_MARKS_KEY)
+        except Exception:
+            logger.warning("Failed to read the watchlist-match marks.", exc_info=True)
+            return None
+        return MatchMarks.from_json(raw) if raw is not None else None
+
+    async def _write_marks(self, redis_client, marks: MatchMarks) -> None:
+        # A failed write leaves the previous marks, so the next run re-matches the same
+        # contracts again; ON CONFLICT makes that a repeat, not a duplicate alert.
+        try:
+            await redis_client.set(WATCHLIST_MATCH_MARKS_KEY, marks.to_json())
+        except Exception:
+            logger.warning("Failed to write the watchlist-match marks.", exc_info=True)
+
+    async def _plan(
+        self, db_session: AsyncSession, previous: Optional[MatchMarks]
+    ) -> tuple[Optional[MatchWindow], MatchMarks]:
+        """This run's window — None for a full match — and the marks it leaves behind.
+
+        A full match is the reconciliation pass, every WATCHLIST_FULL_MATCH_INTERVAL_SECONDS
+        or whenever there are no marks to go on. It catches what a window cannot see: a
+        contract back in ESI's list after dropping out of a page (still_listed_by_esi)
+        had its items long before, and an ingestion run outlasting its lock can commit
+        a stamp older than a mark already taken.
+
+        The newest stamp is read BEFORE matching and bounds the window from above. Read
+        committed gives each statement its own snapshot, so an ingestion commit landing
+        between the two is past this mark and falls to the next run, not between runs.
+        """
+        fetched_until, database_now = (
+            await db_session.execute(select(func.max(Contract.items_last_fetched_at), func.now()))
+        ).one()
+        now = self._now()
+        full_match_due = previous is None or now - previous.full_match_at >= timedelta(
+            seconds=self.settings.WATCHLIST_FULL_MATCH_INTERVAL_SECONDS
+        )
+        marks = MatchMarks(
+            items_fetched_at=fetched_until,
+            watches_at=database_now,
+            full_match_at=now if full_match_due else previous.full_match_at,
         )
+        if full_match_due:
+            return None, marks
+        return MatchWindow(
+            fetched_after=previous.items_fetched_at,
+            fetched_until=fetched_until,
+            watches_edited_after=previous.watches_at
+            - timedelta(seconds=WATCHLIST_EDIT_GRACE_SECONDS),
+        ), marks
+
+    async def _match_and_notify(
+        self, db_session: AsyncSession, window: Optional[MatchWindow] = None
+    ) -> tuple[int, int]:
+        """Notify every new match in `window`, or across the whole corpus without one.
+
+        A full match joins every watchlist against every outstanding contract, and all
+        but the few new matches are then discarded by ON CONFLICT: the cost grows with
+        users x corpus on every tick. A window splits the same join into two small
+        ones — new contracts against all watchlists, edited watchlists against all
+        contracts — each driven by its own index, and UNION's dedup takes DISTINCT's.
+        """
+        if window is None:
+            stmt = _match_statement().distinct()
+        else:
+            # Watchlist edits: a new watch, a raised max_price, alerts switched back on
+            # (User.updated_at, which a login bumps too — one user's watches, cheaply).
+            edited = _match_statement(
+                or_(
+                    WatchlistItem.updated_at > window.watches_edited_after,
+                    User.updated_at > window.watches_edited_after,
+                )
+            )
+            if window.fetched_until is None:
+                stmt = edited.distinct()
+            else:
+                fetched = [Contract.items_last_fetched_at <= window.fetched_until]
+                if window.fetched_after is not None:
+                    fetched.append(Contract.items_last_fetched_at > window.fetched_after)
+                stmt = union(_match_statement(*fetched), edited)
         rows = (await db_session.execute(stmt)).all()
         if not rows:
             return 0, 0
@@ -214,7 +366,7 @@ class WatchlistMatcherService:
 
     async def _prune(self, db_session: AsyncSession) -> int:
         cutoff = self._now() - timedelta(days=self.settings.NOTIFICATION_RETENTION_DAYS)
-        # "Outstanding" here MUST mean what it means in _match_and_notify, or the prune
+        # "Outstanding" here MUST mean what it means in _match_statement, or the prune
         # deletes aged notifications the very next match run recreates.
         outstanding = select(Contract.contract_id).where(
             Contract.contract_id == Notification.contract_id,
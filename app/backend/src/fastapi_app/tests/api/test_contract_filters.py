@@ -26,6 +26,9 @@
 # Do NOT use `await db_session.commit()`, as the fixture manages the
 # transaction lifecycle.
 
+import csv
+import io
+import json
 from datetime import datetime, timedelta, timezone
 
 import pytest
@@ -35,7 +38,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from fastapi_app.models import Contract, ContractItem
 from fastapi_app.models.contracts import EsiTaxonomyCache
+from fastapi_app.services import route_graph
 from fastapi_app.services.background_aggregation import ENRICHMENT_VERSION
+from fastapi_app.services.route_graph import StargateGraph
 
 # Mark all tests in this file as asyncio
 pytestmark = pytest.mark.asyncio
@@ -301,8 +306,8 @@ async def test_pagination_with_search_returns_full_distinct_pages(
 async def test_pagination_sorted_by_ship_name_no_duplicates(
     client: AsyncClient, db_session: AsyncSession
 ):
-    """ship_name sort forces the item join even without filters; same invariants,
-    with contract_id as the tiebreaker when the aggregate sort key ties."""
+    """ship_name sorts on an aggregate of the item names; same invariants, with
+    contract_id as the tiebreaker when that key ties."""
     now = datetime.now(timezone.utc)
     for cid in (301, 302, 303):
         db_session.add(
@@ -336,6 +341,78 @@ async def test_pagination_sorted_by_ship_name_no_duplicates(
     assert ids2 == [303]
 
 
+async def test_a_cursor_resumes_the_list_and_a_forged_one_is_a_client_error(
+    client: AsyncClient, db_session: AsyncSession
+):
+    """The cursor is opaque on the wire: the client replays next_cursor verbatim
+    with the same sort, and anything the server did not issue 422s rather than
+    reaching the seek predicate."""
+    now = datetime.now(timezone.utc)
+    for n, cid in enumerate((501, 502, 503)):
+        db_session.add(
+            Contract(
+                contract_id=cid, title=f"Cursor Lot {cid}", price=(n + 1) * 1_000_000,
+                collateral=0.0, status="outstanding", type="item_exchange",
+                issuer_id=1, issuer_corporation_id=1, for_corporation=False,
+                is_ship_contract=True, start_location_id=60003760,
+                start_location_region_id=99999962,
+                date_issued=now, date_expired=now + timedelta(days=7),
+            )
+        )
+    await db_session.flush()
+
+    base = "/contracts/?region_ids=99999962&size=2&sort_by=price&sort_direction=asc"
+    page1 = (await client.get(base)).json()
+    page2 = await client.get(base, params={"cursor": page1["next_cursor"]})
+
+    assert [c["contract_id"] for c in page1["items"]] == [501, 502]
+    assert page2.status_code == 200
+    assert [c["contract_id"] for c in page2.json()["items"]] == [503]
+    assert page2.json()["next_cursor"] is None
+
+    forged = await client.get(base, params={"cursor": "eyJub3QiOiJvdXJzIn0"})
+    assert forged.status_code == 422
+    resorted = await client.get(
+        "/contracts/?region_ids=99999962&sort_by=date_issued",
+        params={"cursor": page1["next_cursor"]},
+    )
+    assert resorted.status_code == 422
+
+
+async def test_export_streams_the_whole_filtered_result_as_ndjson_or_csv(
+    client: AsyncClient, db_session: AsyncSession
+):
+    """No page size applies: all three rows come back in the requested order, the
+    same rows in either encoding."""
+    now = datetime.now(timezone.utc)
+    for n, cid in enumerate((511, 512, 513)):
+        db_session.add(
+            Contract(
+                contract_id=cid, title=f"Export Lot {cid}", price=(3 - n) * 1_000_000,
+                collateral=0.0, status="outstanding", type="item_exchange",
+                issuer_id=1, issuer_corporation_id=1, for_corporation=False,
+                is_ship_contract=True, start_location_id=60003760,
+                start_location_region_id=99999981,
+                date_issued=now, date_expired=now + timedelta(days=7),
+            )
+        )
+    await db_session.flush()
+
+    base = "/contracts/export?region_ids=99999981&size=1&sort_by=price&sort_direction=asc"
+    ndjson = await client.get(base)
+    as_csv = await client.get(f"{base}&format=csv")
+
+    assert ndjson.status_code == 200
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["contract_id"] for line in ndjson.text.splitlines()] == [
+        513, 512, 511,
+    ]
+    assert as_csv.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(as_csv.text)))
+    assert [int(row["contract_id"]) for row in rows] == [513, 512, 511]
+    assert rows[0]["title"] == "Export Lot 513"
+
+
 async def test_pagination_with_is_bpc_returns_full_distinct_pages(
     client: AsyncClient, db_session: AsyncSession
 ):
@@ -854,6 +931,96 @@ async def test_the_wire_carries_the_start_location_system(
     assert filtered_body["unknown_system_excluded"] == 1
 
 
+# --- Proximity filter ("within N jumps of a system") -------------------------
+
+
+@pytest.fixture
+def stargate_graph():
+    """A small map over the fixture's systems: Jita (30000142) - Perimeter (30000144) -
+    30000145 - Amarr (30002187), so Amarr's contract sits 3 jumps out."""
+    graph = StargateGraph(
+        [(30000142, 30000144), (30000144, 30000145), (30000145, 30002187)],
+        {30000142: 0.946, 30000144: 0.946, 30000145: 0.8, 30002187: 1.0},
+    )
+    route_graph.install_stargate_graph(graph)
+    yield graph
+    route_graph.install_stargate_graph(None)
+
+
+async def test_proximity_filter_keeps_contracts_starting_within_the_radius(
+    client: AsyncClient, setup_contracts, stargate_graph
+):
+    """101/102/104 start in Jita itself, 103 in Amarr three jumps away."""
+    nearby = await client.get("/contracts/?near_system_id=30000142&within_jumps=2")
+    assert nearby.status_code == 200
+    assert sorted(item["contract_id"] for item in nearby.json()["items"]) == [101, 102, 104]
+
+    reached = await client.get("/contracts/?near_system_id=30000142&within_jumps=3")
+    assert reached.json()["total"] == 4
+
+    # Radius 0 is the system itself; an origin the graph lacks has no neighbourhood.
+    home = await client.get("/contracts/?near_system_id=30002187&within_jumps=0")
+    assert [item["contract_id"] for item in home.json()["items"]] == [103]
+    unknown = await client.get("/contracts/?near_system_id=31000005&within_jumps=5")
+    assert unknown.status_code == 200
+    assert unknown.json()["total"] == 0
+
+
+async def test_proximity_reports_the_contracts_it_cannot_place(
+    client: AsyncClient, db_session: AsyncSession, setup_contracts, stargate_graph
+):
+    """A structure contract has no resolved system, so proximity drops it exactly as
+    system_ids does — and says so through unknown_system_excluded."""
+    now = datetime.now(timezone.utc)
+    db_session.add(
+        Contract(
+            contract_id=953001, title="Structure Location", price=1_000_000, collateral=0,
+            status="outstanding", type="item_exchange", issuer_id=953,
+            issuer_corporation_id=953, start_location_id=1_035_466_617_946,
+            start_location_system_id=None, start_location_region_id=10000002,
+            for_corporation=False, date_issued=now - timedelta(days=1),
+            date_expired=now + timedelta(days=5),
+        )
+    )
+    await db_session.flush()
+
+    response = await client.get("/contracts/?near_system_id=30000142&within_jumps=1")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert 953001 not in {item["contract_id"] for item in body["items"]}
+    assert body["unknown_system_excluded"] == 1
+
+
+async def test_proximity_needs_both_halves_and_a_loaded_graph(
+    client: AsyncClient, setup_contracts
+):
+    """Half a proximity filter is a client error. Without a graph the filter cannot be
+    resolved, and serving the unfiltered list in its place would be wrong: 503."""
+    for query in (
+        "near_system_id=30000142",
+        "within_jumps=3",
+        "near_system_id=30000142&within_jumps=21",
+    ):
+        response = await client.get(f"/contracts/?{query}")
+        assert response.status_code == 422, query
+
+    unavailable = await client.get("/contracts/?near_system_id=30000142&within_jumps=3")
+    assert unavailable.status_code == 503
+
+
+async def test_an_export_near_a_system_without_a_graph_is_a_503(
+    client: AsyncClient, setup_contracts
+):
+    """The export resolves the neighbourhood before it starts streaming, so a missing
+    graph is still an error status rather than a 200 with a truncated body."""
+    for export_format in ("ndjson", "csv"):
+        response = await client.get(
+            f"/contracts/export?near_system_id=30000142&within_jumps=3&format={export_format}"
+        )
+        assert response.status_code == 503, export_format
+
+
 async def test_the_detail_endpoint_carries_the_start_location_system(
     client: AsyncClient, db_session: AsyncSession
 ):
@@ -1899,6 +2066,39 @@ async def test_a_category_absent_from_the_corpus_returns_an_empty_page(
     assert empty.json()["items"] == []
 
 
+async def test_facets_lift_their_own_filter_and_keep_the_rest(
+    client: AsyncClient, taxonomy_corpus
+):
+    """Each facet counts what choosing its option would show: its own filter lifted,
+    every other one applied — for category and group, on the same offered item."""
+    unfiltered = await client.get("/contracts/facets?region_ids=99999965")
+
+    assert unfiltered.status_code == 200
+    assert "ETag" in unfiltered.headers
+    facets = unfiltered.json()
+    assert facets["regions"] == {"99999965": 4}
+    # The requested-only frigate (965003) counts under no category or group.
+    assert facets["categories"] == {str(SHIP_CATEGORY): 2, str(MODULE_CATEGORY): 2}
+    assert facets["groups"] == {
+        str(FRIGATE_GROUP): 1, str(CRUISER_GROUP): 1, str(PROPULSION_GROUP): 2
+    }
+    assert facets["is_ship_contract"] == {"yes": 0, "no": 4}
+    assert facets["is_bpc"] == {"yes": 0, "no": 4}
+
+    ships = (
+        await client.get(f"/contracts/facets?region_ids=99999965&category_id={SHIP_CATEGORY}")
+    ).json()
+    # The category facet lifts category_id, so picking a category changes none of it.
+    assert ships["categories"] == facets["categories"]
+    # 965001's afterburner is in the mixed bundle, but it is not a ship.
+    assert ships["groups"] == {
+        str(FRIGATE_GROUP): 1, str(CRUISER_GROUP): 1, str(PROPULSION_GROUP): 0
+    }
+    assert ships["regions"] == {"99999965": 2}
+    page = await client.get(f"{TAXONOMY_BASE}&category_id={SHIP_CATEGORY}")
+    assert ships["regions"]["99999965"] == page.json()["total"]
+
+
 # --- Taxonomy options endpoint: GET /contracts/taxonomy (region 99999971) ---
 #
 # The endpoint takes no filters, so unlike every other block in this file its
@@ -2234,6 +2434,11 @@ async def sortable_field_contracts(db_session: AsyncSession):
     Every title shares the token the joined-path test searches on, and 966021 is the
     only contract with items — two of them, so its joined rows duplicate and the
     grouped-id pagination has something to collapse (SQLA-1).
+
+    The couriers' routes are stamped the way ingestion stamps them (route_jumps,
+    route_highsec, reward_per_jump = reward / jumps), and their reward-per-jump order
+    again matches neither the jumps nor the rewards. 966014 delivers within its own
+    system: 0 jumps, so no reward per jump.
     """
     now = datetime.now(timezone.utc)
 
@@ -2255,15 +2460,19 @@ async def sortable_field_contracts(db_session: AsyncSession):
         # An auction can run with no buy-it-now price at all; ESI omits the field.
         _contract(966004, type="auction"),
         # Ratios: 10k, 60k, 200k ISK per m3.
+        # Ratios: 10k, 60k, 200k ISK per m3; 200k, 300k, 2M ISK per jump.
         _contract(966011, type="courier", reward=1_000_000.0, volume=100.0,
-                  days_to_complete=1),
+                  days_to_complete=1, route_jumps=5, route_highsec=True,
+                  reward_per_jump=200_000.0),
         _contract(966012, type="courier", reward=6_000_000.0, volume=100.0,
-                  days_to_complete=3),
+                  days_to_complete=3, route_jumps=20, route_highsec=False,
+                  reward_per_jump=300_000.0),
         _contract(966013, type="courier", reward=4_000_000.0, volume=20.0,
-                  days_to_complete=7),
+                  days_to_complete=7, route_jumps=2, route_highsec=True,
+                  reward_per_jump=2_000_000.0),
         # Nothing to divide by, so no per-m3 price (§9) — but a real delivery window.
         _contract(966014, type="courier", reward=2_000_000.0, volume=0.0,
-                  days_to_complete=10),
+                  days_to_complete=10, route_jumps=0, route_highsec=True),
         # No reward, no buyout, no delivery window: NULL under all three sorts.
         _contract(966021, volume=250.0, items=[
             ContractItem(record_id=9660211, type_id=587, type_name="Rifter",
@@ -2332,6 +2541,50 @@ async def test_reward_per_volume_sorts_both_ways_and_leaves_unpriced_rows_last(
     assert ascending[0] != descending[0]
 
 
+async def test_route_jumps_and_reward_per_jump_sort_both_ways_with_unrouted_rows_last(
+    client: AsyncClient, sortable_field_contracts
+):
+    """Only a routed courier has jumps. The same-system courier has 0 jumps — the
+    shortest haul on the board — but no reward per jump to rank it by."""
+    unrouted = [966001, 966002, 966003, 966004, 966021]
+
+    assert await _sorted_ids(client, "route_jumps", "asc") == [
+        966014, 966013, 966011, 966012,
+    ] + unrouted
+    assert await _sorted_ids(client, "route_jumps", "desc") == [
+        966012, 966011, 966013, 966014,
+    ] + unrouted
+    assert await _sorted_ids(client, "reward_per_jump", "asc") == [
+        966011, 966012, 966013,
+    ] + sorted(unrouted + [966014])
+    assert await _sorted_ids(client, "reward_per_jump", "desc") == [
+        966013, 966012, 966011,
+    ] + sorted(unrouted + [966014])
+
+
+async def test_route_bounds_keep_only_couriers_inside_them(
+    client: AsyncClient, sortable_field_contracts
+):
+    """max_jumps and min_reward_per_jump compare the stored route columns, so a
+    contract without a route is outside any bound rather than inside all of them."""
+    async def _ids(query: str) -> set[int]:
+        response = await client.get(f"/contracts/?region_ids={SORTABLE_REGION}&{query}")
+        assert response.status_code == 200, response.text
+        return {row["contract_id"] for row in response.json()["items"]}
+
+    assert await _ids("max_jumps=5") == {966011, 966013, 966014}
+    assert await _ids("min_reward_per_jump=300000") == {966012, 966013}
+    assert await _ids("max_jumps=5&min_reward_per_jump=300000") == {966013}
+
+    response = await client.get(
+        f"/contracts/?region_ids={SORTABLE_REGION}&sort_by=route_jumps&sort_direction=asc"
+    )
+    first = response.json()["items"][0]
+    assert (first["route_jumps"], first["route_highsec"], first["reward_per_jump"]) == (
+        0, True, None,
+    )
+
+
 async def test_a_zero_volume_courier_sorts_as_unpriced_not_as_the_best_deal(
     client: AsyncClient, sortable_field_contracts
 ):
@@ -2462,8 +2715,8 @@ async def test_ship_name_sorts_both_ways_and_leaves_item_less_contracts_last(
     client: AsyncClient, volume_and_ship_name_sort_contracts
 ):
     """An item-less contract has no ship to alphabetize, so it must not lead the
-    Z-first sort. The sort joins the items table, so the page paginates over
-    grouped contract ids (SQLA-1) — 972013's two rows must collapse to one."""
+    Z-first sort. 972013 holds two items and must still appear exactly once,
+    placed by the direction-appropriate end of its names (SQLA-1)."""
     without_an_item = [972001, 972002, 972003, 972014]
 
     ascending = await _sorted_ids(client, "ship_name", "asc", region=NULLSORT_REGION)
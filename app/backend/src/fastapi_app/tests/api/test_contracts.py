@@ -33,6 +33,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, timezone
 
 from fastapi_app.models import Contract, ContractItem
+from fastapi_app.schemas.contracts import MAX_BATCH_CONTRACT_IDS
+from fastapi_app.services.background_aggregation import INGEST_GENERATION_KEY
+from fastapi_app.tests.fake_redis import FakeRedis
 
 # Fixture contracts must stay LIVE. The contracts list endpoint excludes anything past
 # date_expired, so a hardcoded past expiry makes a fixture invisible to the very endpoint
@@ -190,3 +193,109 @@ async def test_paginate_contracts(client: AsyncClient, db_session: AsyncSession)
     assert data["page"] == 2
     assert data["size"] == 3
     assert [c["contract_id"] for c in data["items"]] == [4, 5, 6]
+
+
+async def test_list_and_taxonomy_answer_a_matching_if_none_match_with_304(
+    client: AsyncClient, db_session: AsyncSession
+):
+    """Both carry a content ETag; sending it back gets an empty 304 carrying the same
+    validators, so the client reuses what it has."""
+    db_session.add(Contract(contract_id=2, title="Validator Probe", price=100, collateral=0.0, is_ship_contract=True, type="item_exchange", status="outstanding", issuer_id=7, issuer_corporation_id=9, for_corporation=False, date_issued=datetime.fromisoformat("2025-01-01T00:00:00Z"), date_expired=LIVE_EXPIRY, start_location_id=60003760))
+    await db_session.flush()
+
+    for path in ("/contracts/", "/contracts/taxonomy"):
+        first = await client.get(path)
+        etag = first.headers["etag"]
+        assert first.status_code == 200
+        assert first.headers["cache-control"].startswith("public, max-age=")
+
+        again = await client.get(path, headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+        assert again.headers["etag"] == etag
+
+        stale = await client.get(path, headers={"If-None-Match": '"not-this-one"'})
+        assert stale.status_code == 200
+
+
+async def test_contract_detail_validators_follow_the_ingestion_generation(
+    client: AsyncClient, db_session: AsyncSession, test_app
+):
+    """With a generation published the detail carries an ETag and Last-Modified,
+    either validator earns a 304, and a new generation retires the tag."""
+    redis = FakeRedis()
+    await redis.set(INGEST_GENERATION_KEY, "1760000000000")
+    test_app.state.redis = redis
+    try:
+        db_session.add(Contract(contract_id=3, title="Detail Probe", price=100, collateral=0.0, is_ship_contract=True, type="item_exchange", status="outstanding", issuer_id=7, issuer_corporation_id=9, for_corporation=False, date_issued=datetime.fromisoformat("2025-01-01T00:00:00Z"), date_expired=LIVE_EXPIRY, start_location_id=60003760))
+        await db_session.flush()
+
+        first = await client.get("/contracts/3")
+        etag = first.headers["etag"]
+        assert first.status_code == 200
+        assert first.headers["last-modified"] == "Thu, 09 Oct 2025 08:53:20 GMT"
+
+        assert (await client.get("/contracts/3", headers={"If-None-Match": etag})).status_code == 304
+        assert (
+            await client.get(
+                "/contracts/3", headers={"If-Modified-Since": first.headers["last-modified"]}
+            )
+        ).status_code == 304
+
+        await redis.set(INGEST_GENERATION_KEY, "1760000100000")
+        assert (await client.get("/contracts/3", headers={"If-None-Match": etag})).status_code == 200
+    finally:
+        del test_app.state.redis
+
+
+async def test_an_unknown_contract_404s_whatever_validator_it_is_sent_with(
+    client: AsyncClient, db_session: AsyncSession, test_app
+):
+    """"*" matches only a representation that exists, and a date proves nothing about
+    an id: neither may turn a missing contract into a 304. A found one still earns it."""
+    redis = FakeRedis()
+    await redis.set(INGEST_GENERATION_KEY, "1760000000000")
+    test_app.state.redis = redis
+    try:
+        db_session.add(Contract(contract_id=6, title="Wildcard Probe", price=100, collateral=0.0, is_ship_contract=True, type="item_exchange", status="outstanding", issuer_id=7, issuer_corporation_id=9, for_corporation=False, date_issued=datetime.fromisoformat("2025-01-01T00:00:00Z"), date_expired=LIVE_EXPIRY, start_location_id=60003760))
+        await db_session.flush()
+
+        for headers in (
+            {"If-None-Match": "*"},
+            {"If-Modified-Since": "Thu, 09 Oct 2025 08:53:20 GMT"},
+        ):
+            assert (await client.get("/contracts/999999", headers=headers)).status_code == 404
+            assert (await client.get("/contracts/6", headers=headers)).status_code == 304
+    finally:
+        del test_app.state.redis
+
+
+async def test_batch_detail_serves_each_contract_as_the_detail_route_does(
+    client: AsyncClient, db_session: AsyncSession
+):
+    """Keyed by id, identical to the single-contract body, with unknown ids listed
+    rather than failing the batch."""
+    for contract_id in (4, 5):
+        db_session.add_all([
+            Contract(contract_id=contract_id, title=f"Batch Probe {contract_id}", price=100, collateral=0.0, is_ship_contract=True, type="item_exchange", status="outstanding", issuer_id=7, issuer_corporation_id=9, for_corporation=False, date_issued=datetime.fromisoformat("2025-01-01T00:00:00Z"), date_expired=LIVE_EXPIRY, start_location_id=60003760),
+            ContractItem(contract_id=contract_id, type_id=101, type_name="Test Ship Alpha", quantity=1, is_included=True, is_singleton=True),
+        ])
+    await db_session.flush()
+
+    response = await client.get(
+        "/contracts/batch", params=[("contract_ids", 5), ("contract_ids", 4), ("contract_ids", 404), ("contract_ids", 5)]
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert sorted(data["contracts"]) == ["4", "5"]
+    assert data["missing"] == [404]
+    assert data["contracts"]["4"] == (await client.get("/contracts/4")).json()
+    assert len(data["contracts"]["5"]["items"]) == 1
+
+
+async def test_batch_detail_rejects_an_oversized_batch(client: AsyncClient):
+    too_many = [("contract_ids", n) for n in range(MAX_BATCH_CONTRACT_IDS + 1)]
+
+    assert (await client.get("/contracts/batch", params=too_many)).status_code == 422
+    assert (await client.get("/contracts/batch")).status_code == 422
@@ -142,7 +142,7 @@ async def test_failed_request_logs_key_event(client: AsyncClient, mocker, capsys
     # Arrange: Mock the service layer to raise an unhandled exception
     # The mock target should match how the service is imported in the API
     mocker.patch(
-        "fastapi_app.api.contracts.get_contracts",
+        "fastapi_app.api.contracts.get_contracts_cached",
         side_effect=Exception("Critical database failure"),
     )
 
@@ -7,6 +7,7 @@ from datetime import datetime, timedelta, timezone
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
+from pydantic import SecretStr
 
 from fastapi_app.api import ops
 from fastapi_app.core.config import settings
@@ -256,3 +257,16 @@ async def test_ready_treats_non_object_freshness_json_as_absent(
     assert body["last_ingest_age_seconds"] is None
     assert body["last_ingest_outcome"] is None
     assert body["data_stale"] is True
+
+
+async def test_slow_queries_are_gated_like_metrics(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", SecretStr("test-metrics-token"))
+
+    assert (await client.get("/ops/slow-queries")).status_code == 401
+    r = await client.get(
+        "/ops/slow-queries", headers={"Authorization": "Bearer test-metrics-token"}
+    )
+    assert r.status_code == 200
+    assert set(r.json()) == {"threshold_ms", "statements"}
@@ -0,0 +1,55 @@
+# ABOUTME: Pins the validator rules in core/conditional_get.py — the RFC 9110 comparison details
+# ABOUTME: the endpoint tests would not notice going wrong (weak tags, "*", If-Modified-Since precedence).
+import time
+from datetime import datetime, timezone
+
+from starlette.requests import Request
+
+from fastapi_app.core.conditional_get import (
+    etag_matches,
+    seconds_until_next_ingest,
+    strong_etag,
+    unmodified_since,
+)
+
+
+def _request(**headers: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "headers": [
+                (name.replace("_", "-").lower().encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+def test_if_none_match_uses_the_weak_comparison():
+    etag = strong_etag("contract", 1, 2)
+
+    assert etag_matches(_request(if_none_match=f'"other", W/{etag}'), etag)
+    assert etag_matches(_request(if_none_match="*"), etag)
+    assert not etag_matches(_request(if_none_match='"other"'), etag)
+    assert not etag_matches(_request(), etag)
+
+
+def test_if_modified_since_yields_to_if_none_match():
+    committed = datetime(2025, 10, 9, 8, 53, 20, 500000, tzinfo=timezone.utc)
+    same_second = "Thu, 09 Oct 2025 08:53:20 GMT"
+
+    assert unmodified_since(_request(if_modified_since=same_second), committed)
+    assert not unmodified_since(
+        _request(if_modified_since=same_second, if_none_match='"other"'), committed
+    )
+    assert not unmodified_since(_request(if_modified_since="yesterday"), committed)
+
+
+def test_max_age_runs_out_when_the_next_run_is_due():
+    now_ms = int(time.time() * 1000)
+
+    assert 3590 <= seconds_until_next_ingest(now_ms, 3600) <= 3600
+    assert seconds_until_next_ingest(now_ms - 7200 * 1000, 3600) == 0
+    # Unknown generation: nothing to count from.
+    assert seconds_until_next_ingest(0, 3600) == 0
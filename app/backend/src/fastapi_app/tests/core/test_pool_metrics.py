@@ -0,0 +1,37 @@
+# ABOUTME: Connection-pool instrumentation — a checkout is timed into its pool's histogram, the
+# ABOUTME: occupancy gauges follow connections in and out, and the pool name survives dispose().
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from fastapi_app.core.pool_metrics import TimedQueuePool, instrument_pool
+from fastapi_app.tests.conftest import TEST_DATABASE_URL
+
+
+@pytest.mark.asyncio
+async def test_checkouts_are_timed_and_occupancy_is_published():
+    engine = create_async_engine(
+        TEST_DATABASE_URL, poolclass=TimedQueuePool, pool_size=1, max_overflow=1
+    )
+    instrument_pool("test", engine)
+    labels = {"pool": "test"}
+    before = REGISTRY.get_sample_value(
+        "hangar_bay_db_pool_checkout_seconds_count", labels
+    ) or 0
+    try:
+        async with engine.connect():
+            assert REGISTRY.get_sample_value("hangar_bay_db_pool_checked_out", labels) == 1
+            assert REGISTRY.get_sample_value("hangar_bay_db_pool_overflow", labels) == 0
+            async with engine.connect():
+                # The second connection is beyond the base size of one.
+                assert REGISTRY.get_sample_value("hangar_bay_db_pool_checked_out", labels) == 2
+                assert REGISTRY.get_sample_value("hangar_bay_db_pool_overflow", labels) == 1
+        assert REGISTRY.get_sample_value("hangar_bay_db_pool_checked_out", labels) == 0
+        assert REGISTRY.get_sample_value(
+            "hangar_bay_db_pool_checkout_seconds_count", labels
+        ) == before + 2
+
+        await engine.dispose()
+        assert engine.sync_engine.pool.metrics_name == "test"
+    finally:
+        await engine.dispose()
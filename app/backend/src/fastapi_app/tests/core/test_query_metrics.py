@@ -0,0 +1,167 @@
+# ABOUTME: SQL statement instrumentation — bounded family labels, scrubbed plans, and a slow
+# ABOUTME: SELECT timed into its family's histogram with its EXPLAIN ANALYZE plan captured.
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fastapi_app.core.query_metrics import (
+    MAX_STATEMENT_CHARS,
+    instrument_engine,
+    planning_seconds,
+    scrub_plan,
+    statement_family,
+)
+from fastapi_app.db import Base
+from fastapi_app.models.contracts import Contract
+from fastapi_app.schemas.contracts import ContractFilters
+from fastapi_app.services.contract_service import _apply_contract_filters
+
+
+def test_untagged_statements_are_labelled_by_verb_and_known_table():
+    assert statement_family("SELECT 1 FROM contracts WHERE x = $1", {}, Base.metadata) == (
+        "select:contracts"
+    )
+    assert statement_family('INSERT INTO "contract_items" (a) VALUES ($1)', {}, Base.metadata) == (
+        "insert:contract_items"
+    )
+    # A table the application does not own never becomes a label.
+    assert statement_family("SELECT * FROM pg_stat_activity", {}, Base.metadata) == "select:other"
+    assert statement_family("SET LOCAL statement_timeout = 1", {}, Base.metadata) == "other"
+    assert statement_family("SELECT 1", {"query_family": "contracts.page"}, Base.metadata) == (
+        "contracts.page"
+    )
+
+
+def test_plans_lose_the_bound_values_but_keep_the_figures():
+    plan = [
+        "Seq Scan on contracts  (cost=0.00..12.50 rows=3 width=8) (actual time=0.01..0.02 rows=1 loops=1)",
+        "  Filter: ((title ~~* '%someone''s text%'::text) AND (price >= 1500000.5) AND (region_id = $3))",
+        "  Rows Removed by Filter: 42",
+        "  Buffers: shared hit=7",
+    ]
+
+    scrubbed = scrub_plan(plan)
+
+    assert scrubbed[0] == plan[0]
+    assert scrubbed[1] == "  Filter: ((title ~~* '?'::text) AND (price >= ?) AND (region_id = $3))"
+    assert scrubbed[2:] == plan[2:]
+
+
+def test_planning_time_is_read_from_the_plan():
+    assert planning_seconds(["Result  (cost=0.00..0.01 rows=1 width=4)", "Planning Time: 0.250 ms"]) == (
+        0.00025
+    )
+    assert planning_seconds(["Result  (cost=0.00..0.01 rows=1 width=4)"]) is None
+
+
+@pytest.mark.asyncio
+async def test_a_slow_select_is_timed_and_its_plan_captured(db_session: AsyncSession):
+    engine = db_session.bind
+    slow_queries = instrument_engine(
+        "test", engine, Base.metadata, threshold_ms=5, interval_seconds=300
+    )
+    labels = {"engine": "test", "family": "test.slow_select"}
+    before = REGISTRY.get_sample_value(
+        "hangar_bay_db_statement_duration_seconds_count", labels
+    ) or 0
+
+    statement = text("SELECT pg_sleep(0.02) WHERE :word <> ''").execution_options(
+        query_family="test.slow_select"
+    )
+    async with engine.connect() as conn:
+        await conn.execute(statement, {"word": "private"})
+        await conn.execute(statement, {"word": "private"})
+    await slow_queries.drain()
+
+    assert REGISTRY.get_sample_value(
+        "hangar_bay_db_statement_duration_seconds_count", labels
+    ) == before + 2
+    entries = slow_queries.entries()
+    assert [entry["family"] for entry in entries] == ["test.slow_select"] * 2
+    # One capture per family per interval: the second slow run is logged without one.
+    captured = [entry for entry in entries if entry["plan"] is not None]
+    assert len(captured) == 1
+    assert any("actual time" in line for line in captured[0]["plan"])
+    assert not any("private" in line for line in captured[0]["plan"])
+    assert REGISTRY.get_sample_value("hangar_bay_db_statement_planning_seconds_count", labels) >= 1
+
+
+@pytest.mark.asyncio
+async def test_a_fast_statement_still_has_its_planning_time_sampled(db_session: AsyncSession):
+    """Planning time is sampled per family whether or not the statement is slow, once
+    per interval, and the sample plans without executing: nothing lands in the ring."""
+    engine = db_session.bind
+    slow_queries = instrument_engine(
+        "test_planning",
+        engine,
+        Base.metadata,
+        threshold_ms=500,
+        interval_seconds=300,
+        planning_interval_seconds=300,
+    )
+    labels = {"engine": "test_planning", "family": "test.fast_select"}
+
+    statement = text("SELECT 1 WHERE :word <> ''").execution_options(
+        query_family="test.fast_select"
+    )
+    async with engine.connect() as conn:
+        await conn.execute(statement, {"word": "private"})
+        await conn.execute(statement, {"word": "private"})
+    await slow_queries.drain()
+
+    assert REGISTRY.get_sample_value(
+        "hangar_bay_db_statement_planning_seconds_count", labels
+    ) == 1
+    assert slow_queries.entries() == []
+
+
+@pytest.mark.asyncio
+async def test_a_statement_longer_than_the_stored_copy_is_explained_whole(
+    db_session: AsyncSession,
+):
+    """The ring keeps MAX_STATEMENT_CHARS of the text, but EXPLAIN must get all of it:
+    cut SQL does not parse, and the long statements are the slow ones."""
+    engine = db_session.bind
+    slow_queries = instrument_engine(
+        "test_long", engine, Base.metadata, threshold_ms=5, interval_seconds=300
+    )
+    padding = " AND 1 = 1" * (MAX_STATEMENT_CHARS // 10 + 1)
+    statement = text(f"SELECT pg_sleep(0.02) WHERE :word <> ''{padding}").execution_options(
+        query_family="test.long_select"
+    )
+    async with engine.connect() as conn:
+        await conn.execute(statement, {"word": "private"})
+    await slow_queries.drain()
+
+    (entry,) = slow_queries.entries()
+    assert len(entry["statement"]) == MAX_STATEMENT_CHARS
+    assert entry["plan"] is not None
+    assert any("actual time" in line for line in entry["plan"])
+
+
+@pytest.mark.asyncio
+async def test_list_filters_of_any_length_reuse_one_prepared_statement(db_session: AsyncSession):
+    """The id lists travel as array binds, so a request naming three regions runs the
+    statement one naming a single region already prepared on the connection."""
+    engine = db_session.bind
+    instrument_engine("test-reuse", engine, Base.metadata, threshold_ms=0, interval_seconds=300)
+
+    def hits(cache: str) -> float:
+        return REGISTRY.get_sample_value(
+            "hangar_bay_db_statement_cache_lookups_total",
+            {"engine": "test-reuse", "cache": cache, "outcome": "hit"},
+        ) or 0
+
+    def listing(region_ids: list[int]):
+        return _apply_contract_filters(
+            select(Contract.contract_id), ContractFilters(region_ids=region_ids)
+        )
+
+    async with engine.connect() as conn:
+        await conn.execute(listing([10000002]))
+        compiled_before, prepared_before = hits("compiled"), hits("prepared")
+        await conn.execute(listing([10000002, 10000043, 10000030]))
+
+    assert hits("compiled") == compiled_before + 1
+    assert hits("prepared") == prepared_before + 1
@@ -0,0 +1,57 @@
+# ABOUTME: Replica-lag guard — a read goes to the replica only once it has replayed the recorded
+# ABOUTME: ingest commit position, and every doubt (no client, no position, a failed check) means primary.
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fastapi_app.core.read_replica import (
+    INGEST_COMMIT_LSN_KEY,
+    ReplicaLagGuard,
+    wait_for_replay,
+)
+from fastapi_app.tests.fake_redis import FakeRedis
+
+pytestmark = pytest.mark.asyncio
+
+# Further along than any test server's WAL will ever be.
+UNREACHED_LSN = "FFFFFFFF/FFFFFFFF"
+
+
+async def test_a_replica_past_the_recorded_commit_serves_and_is_remembered(
+    db_session: AsyncSession,
+):
+    """The test server is not in recovery, so it counts as replayed through its own
+    writes; "0/0" is behind everything."""
+    redis = FakeRedis()
+    await redis.set(INGEST_COMMIT_LSN_KEY, "0/0")
+    guard = ReplicaLagGuard()
+
+    assert await guard.replica_is_current(db_session, redis)
+    # Replayed once, replayed for good: the same position is not checked again.
+    unusable = AsyncMock()
+    unusable.execute.side_effect = AssertionError("checked a remembered position")
+    assert await guard.replica_is_current(unusable, redis)
+
+
+async def test_every_doubt_reads_from_the_primary(db_session: AsyncSession):
+    guard = ReplicaLagGuard()
+    redis = FakeRedis()
+
+    assert not await guard.replica_is_current(db_session, None)
+    assert not await guard.replica_is_current(db_session, redis)  # nothing recorded
+
+    await redis.set(INGEST_COMMIT_LSN_KEY, UNREACHED_LSN)
+    assert not await guard.replica_is_current(db_session, redis)
+
+    failing = AsyncMock()
+    failing.execute.side_effect = ConnectionError("replica down")
+    await redis.set(INGEST_COMMIT_LSN_KEY, "0/1")
+    assert not await guard.replica_is_current(failing, redis)
+
+
+async def test_waiting_for_an_unreached_position_gives_up_at_the_timeout(
+    db_session: AsyncSession,
+):
+    assert await wait_for_replay(db_session.bind, "0/0", timeout_seconds=0)
+    assert not await wait_for_replay(db_session.bind, UNREACHED_LSN, timeout_seconds=0)
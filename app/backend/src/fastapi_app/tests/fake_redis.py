@@ -1,7 +1,7 @@
 # ABOUTME: In-memory async Valkey double for session + SSO-state tests (decode_responses=True).
-# ABOUTME: Extends the _FakeLockRedis precedent with get/set(ex)/getex/getdel/delete/exists + TTL.
+# ABOUTME: Extends the _FakeLockRedis precedent with get/set(ex)/getex/getdel/delete/exists/publish/eval/zset/pipeline + TTL.
 import time as _time_module
-from typing import Callable, Dict, Optional, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 
 class FakeRedis:
@@ -21,6 +21,7 @@ class FakeRedis:
         self.ttls: Dict[str, int] = {}   # last-set TTL per key, for test assertions
         self.expires_at: Dict[str, float] = {}  # absolute expiry (epoch seconds), honored on read
         self._clock: Callable[[], float] = clock or _time_module.time
+        self.published: List[Tuple[str, str]] = []  # (channel, message), in PUBLISH order
 
     def _now(self) -> float:
         return self._clock()
@@ -109,7 +110,73 @@ class FakeRedis:
         self._purge_if_expired(key)
         return 1 if key in self.store else 0
 
+    async def eval(self, script: str, numkeys: int, *args: str) -> int:
+        """The one script the app evaluates: compare-and-delete of a lock token
+        (background_aggregation._RELEASE_LOCK_LUA). KEYS[1] is the lock, ARGV[1] the token."""
+        key, token = args[0], args[1]
+        if await self.get(key) != token:
+            return 0
+        return await self.delete(key)
+
+    def _ranked(self, key: str) -> List[str]:
+        """A sorted set's members in rank order: ascending score, ties by member."""
+        self._purge_if_expired(key)
+        members = self.store.get(key) or {}
+        return sorted(members, key=lambda member: (members[member], member))
+
+    async def zincrby(self, key: str, amount: float, member: str) -> float:
+        """Sorted sets live in `store` as {member: score} dicts, so TTL and delete apply."""
+        self._purge_if_expired(key)
+        members = self.store.setdefault(key, {})
+        members[member] = members.get(member, 0.0) + amount
+        return members[member]
+
+    async def zcard(self, key: str) -> int:
+        self._purge_if_expired(key)
+        return len(self.store.get(key, {}))
+
+    async def zremrangebyrank(self, key: str, start: int, end: int) -> int:
+        ranked = self._ranked(key)
+        end = len(ranked) + end if end < 0 else end
+        doomed = ranked[max(0, start):end + 1]
+        for member in doomed:
+            del self.store[key][member]
+        return len(doomed)
+
+    async def zrevrange(self, key: str, start: int, end: int) -> List[str]:
+        ranked = self._ranked(key)[::-1]
+        end = len(ranked) + end if end < 0 else end
+        return ranked[start:end + 1]
+
+    async def publish(self, channel: str, message: str) -> int:
+        """Recorded rather than delivered: there are no subscribers, so 0 receivers."""
+        self.published.append((channel, message))
+        return 0
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
     def ttl_for(self, key: str) -> Optional[int]:
         """Test-only introspection of the last-applied TTL."""
         self._purge_if_expired(key)
         return self.ttls.get(key)
+
+
+class FakePipeline:
+    """Queues commands and runs them in order on execute(), returning their results.
+    Each command returns the pipeline, so calls chain as they do in redis-py."""
+
+    def __init__(self, redis: FakeRedis) -> None:
+        self._redis = redis
+        self._queued: List[Tuple[str, tuple]] = []
+
+    def __getattr__(self, command: str):
+        def queue(*args):
+            self._queued.append((command, args))
+            return self
+
+        return queue
+
+    async def execute(self) -> list:
+        queued, self._queued = self._queued, []
+        return [await getattr(self._redis, command)(*args) for command, args in queued]
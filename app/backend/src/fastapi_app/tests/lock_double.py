@@ -28,5 +28,9 @@ class FakeLockRedis:
             return 1
         return 0
 
+    async def publish(self, channel, message):
+        # A full run announces its generation through this client; nobody listens.
+        return 0
+
     async def close(self):
         pass
@@ -16,12 +16,18 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from httpx import AsyncClient
-from sqlalchemy import select, update
+from sqlalchemy import event, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import fastapi_app.services.background_aggregation as bg_agg
-from fastapi_app.models.contracts import Contract, ContractItem, EsiTaxonomyCache
+from fastapi_app.models.contracts import (
+    Contract,
+    ContractItem,
+    EsiTaxonomyCache,
+    UniverseLocation,
+)
 from fastapi_app.services.background_aggregation import ContractAggregationService
+from fastapi_app.services.route_graph import SolarSystem, StargateGraph
 from fastapi_app.tests.core.test_esi_client import _etag_client, _etag_response
 from fastapi_app.tests.lock_double import FakeLockRedis as _FakeLockRedis
 
@@ -38,6 +44,11 @@ def _make_service() -> ContractAggregationService:
     # A resolvable default keeps captured logs free of "can't be awaited" warnings
     # from the taxonomy-name fan-out; tests that exercise failure paths override it.
     esi_client.get_universe_category = AsyncMock(return_value={"name": "Ship"})
+    # Likewise for the system -> constellation -> region hops behind a resolved station.
+    esi_client.get_universe_system = AsyncMock(
+        return_value={"name": "Jita", "security_status": 0.946, "constellation_id": 20000020}
+    )
+    esi_client.get_universe_constellation = AsyncMock(return_value={"region_id": 10000002})
     settings = MagicMock()
     return ContractAggregationService(esi_client=esi_client, settings=settings)
 
@@ -165,6 +176,71 @@ async def test_process_contracts_flags_ships_and_resolves_type_names(
     assert items[0].market_group_id == 1367
 
 
+async def test_process_contracts_writes_the_item_name_summary_and_heals_stale_rows(
+    db_session: AsyncSession,
+):
+    """The list reads Contract.item_name_first/_last and list_summary, so ingestion
+    must write them from the stored items — and rewrite a summary left behind at an older
+    version even when the contract's items are not re-fetched (already enriched)."""
+    service = _make_service()
+    service.esi_client.get_contract_items = AsyncMock(
+        return_value=[
+            {"record_id": 21, "type_id": 587, "quantity": 1, "is_included": True},
+            {"record_id": 22, "type_id": 34, "quantity": 5000, "is_included": True},
+        ]
+    )
+    service.esi_client.get_universe_type = AsyncMock(
+        side_effect=lambda type_id: {
+            587: {"name": "Tristan", "group_id": 25, "market_group_id": 1367},
+            34: {"name": "Tritanium", "group_id": 18, "market_group_id": 1857},
+        }[type_id]
+    )
+    service.esi_client.get_universe_group = AsyncMock(
+        side_effect=lambda group_id: {
+            25: {"name": "Frigate", "category_id": 6},
+            18: {"name": "Mineral", "category_id": 4},
+        }[group_id]
+    )
+
+    async def _summary():
+        return (
+            await db_session.execute(
+                select(
+                    Contract.item_name_first,
+                    Contract.item_name_last,
+                    Contract.item_summary_version,
+                    Contract.list_summary,
+                ).where(Contract.contract_id == 900111)
+            )
+        ).one()
+
+    async def _assert_current():
+        first, last, version, list_summary = await _summary()
+        assert (first, last, version) == ("Tristan", "Tritanium", bg_agg.ITEM_SUMMARY_VERSION)
+        # The list row's item-derived half, served as stored (contract_summary).
+        assert list_summary["headline"] == "Tristan"
+        assert list_summary["item_rows"] == 2
+        assert sorted(count for _, count in list_summary["categories"]) == [1, 1]
+        assert list_summary["blueprint"] is None
+
+    await service._process_contracts(db_session, [_ship_contract_dict(900111)])
+    await _assert_current()
+
+    await db_session.execute(
+        update(Contract)
+        .where(Contract.contract_id == 900111)
+        .values(
+            item_name_first=None, item_name_last=None, item_summary_version=0,
+            list_summary=None,
+        )
+    )
+    fetched_before = service.esi_client.get_contract_items.await_count
+    await service._process_contracts(db_session, [_ship_contract_dict(900111)])
+
+    assert service.esi_client.get_contract_items.await_count == fetched_before
+    await _assert_current()
+
+
 async def test_process_contracts_excluded_ship_does_not_flag(db_session: AsyncSession):
     """A ship that is merely ASKED FOR (is_included=False) must not make the
     contract a ship contract — only included ships count."""
@@ -271,16 +347,13 @@ async def test_reingestion_with_unmodified_items_keeps_ship_flag(
     )
 
 
-async def test_id_list_updates_batch_across_the_chunk_boundary(
-    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+async def test_bookkeeping_statements_do_not_multiply_with_the_batch(
+    db_session: AsyncSession,
 ):
-    """The post-enrichment is_ship_contract / item_processing_status UPDATEs must
-    chunk their id lists (asyncpg 32767 bind-param cap). With the chunk size
-    forced to 2 and THREE ship contracts, every contract must still be flagged
-    and completed — i.e. the loop crosses the batch boundary (TEST-4 spirit).
-    Before batching, one oversized IN() would have rolled back the whole run."""
-    monkeypatch.setattr(bg_agg, "UPDATE_ID_CHUNK_SIZE", 2)
-
+    """The post-enrichment reads and UPDATEs pass their id sets as one array bind
+    (sql_arrays.any_of), so a batch twice the size runs exactly as many statements —
+    no per-chunk round trips, and no asyncpg bind cap to chunk around. Every
+    contract must still be flagged and completed."""
     service = _make_service()
     service.esi_client.get_contract_items = AsyncMock(
         side_effect=lambda cid: [{"record_id": cid, "type_id": 587, "quantity": 1, "is_included": True}]
@@ -292,15 +365,32 @@ async def test_id_list_updates_batch_across_the_chunk_boundary(
         return_value={"name": "Frigate", "category_id": 6}
     )
 
-    cids = [900301, 900302, 900303]
-    await service._process_contracts(db_session, [_ship_contract_dict(c) for c in cids])
+    # A first batch caches the taxonomy, so the measured ones differ only in size.
+    await service._process_contracts(db_session, [_ship_contract_dict(900300)])
+    statements: list[str] = []
 
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sync_engine = db_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _count)
+    try:
+        statement_counts = []
+        for cids in ([900301, 900302, 900303], [900311, 900312, 900313, 900314, 900315, 900316]):
+            statements.clear()
+            await service._process_contracts(db_session, [_ship_contract_dict(c) for c in cids])
+            statement_counts.append(len(statements))
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", _count)
+
+    assert statement_counts[0] == statement_counts[1]
+    cids = [900301, 900302, 900303, 900311, 900312, 900313, 900314, 900315, 900316]
     rows = (
         (await db_session.execute(select(Contract).where(Contract.contract_id.in_(cids))))
         .scalars()
         .all()
     )
-    assert len(rows) == 3
+    assert len(rows) == 9
     assert all(r.is_ship_contract is True for r in rows)
     assert all(r.item_processing_status == "COMPLETED" for r in rows)
 
@@ -450,6 +540,44 @@ async def test_item_fetch_failure_for_one_contract_does_not_abort_batch(db_sessi
     assert healthy_row.item_processing_status == "COMPLETED"
 
 
+async def test_items_last_fetched_at_marks_the_contracts_whose_items_landed(
+    db_session: AsyncSession,
+):
+    """The watchlist matcher's high-water mark: a contract whose items were written is
+    stamped with the run's timestamp, one whose fetch failed is not — it becomes
+    matchable only on the run that finally fetches its items."""
+    service = _make_service()
+
+    async def items_side_effect(contract_id):
+        if contract_id == 910101:
+            raise RuntimeError("simulated ESI items failure")
+        return [{"record_id": 22, "type_id": 587, "quantity": 1, "is_included": True}]
+
+    service.esi_client.get_contract_items = AsyncMock(side_effect=items_side_effect)
+    service.esi_client.get_universe_type = AsyncMock(
+        return_value={"name": "Rifter", "group_id": 25, "market_group_id": 64}
+    )
+    service.esi_client.get_universe_group = AsyncMock(
+        return_value={"name": "Frigate", "category_id": 6}
+    )
+
+    await service._process_contracts(
+        db_session, [_ship_contract_dict(910101), _ship_contract_dict(910102)]
+    )
+
+    rows = {
+        row.contract_id: row
+        for row in (
+            await db_session.execute(
+                select(Contract.contract_id, Contract.items_last_fetched_at, Contract.last_seen_at)
+                .where(Contract.contract_id.in_((910101, 910102)))
+            )
+        ).all()
+    }
+    assert rows[910101].items_last_fetched_at is None
+    assert rows[910102].items_last_fetched_at == rows[910102].last_seen_at
+
+
 async def test_contract_returning_no_items_is_not_marked_completed(
     db_session: AsyncSession, caplog
 ):
@@ -892,16 +1020,11 @@ async def test_a_category_less_group_payload_leaves_the_contract_retryable(
     assert row.enrichment_version == 0
 
 
-async def test_skip_select_reads_across_the_chunk_boundary(
-    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch, caplog
-):
-    """The already-enriched SELECT chunks its id list for the same reason the UPDATEs
-    do (asyncpg's 32767 bind-param cap; a corpus-scale IN() rolls the run back), and
-    a read that stops after the first chunk silently re-fetches the rest — cheaper to
-    miss than a crash, so it needs its own boundary crossing. With the chunk size
-    forced to 2 and THREE enriched contracts, all three must be skipped."""
-    monkeypatch.setattr(bg_agg, "UPDATE_ID_CHUNK_SIZE", 2)
-
+async def test_skip_select_reads_the_whole_batch(db_session: AsyncSession, caplog):
+    """The already-enriched SELECT reads the batch's whole id set in one statement,
+    and a read that missed part of it would silently re-fetch the rest — cheaper to
+    miss than a crash, so it is pinned on its own. THREE enriched contracts, all three
+    must be skipped."""
     service = _make_service()
     service.esi_client.get_contract_items = AsyncMock(
         side_effect=lambda cid: [
@@ -925,8 +1048,8 @@ async def test_skip_select_reads_across_the_chunk_boundary(
         await service._process_contracts(db_session, [_ship_contract_dict(c) for c in cids])
 
     assert service.esi_client.get_contract_items.await_count == after_first_run
-    # The count is the boundary evidence: a read that stopped after the first chunk
-    # reports 2 skipped, not 3, while still looking like the skip works.
+    # The count is the evidence: a read that missed part of the set reports fewer
+    # than 3 skipped, while still looking like the skip works.
     assert any(
         "Fetched items for 0 contracts (3 skipped as already enriched)."
         in rec.getMessage()
@@ -1292,7 +1415,7 @@ async def test_run_aggregation_reuses_app_session_factory_and_never_logs_databas
     caplog, monkeypatch: pytest.MonkeyPatch
 ):
     """Secret-hygiene + single-engine contract (M4 spec §2/§6): run_aggregation must
-    source its session from fastapi_app.db.AsyncSessionLocal (no per-run engine) and
+    source its session from fastapi_app.db.IngestSessionLocal (no per-run engine) and
     no log line may carry any fragment of DATABASE_URL (a real managed-PG URL prefix
     can include username and password)."""
     import fastapi_app.db as app_db
@@ -1306,13 +1429,13 @@ async def test_run_aggregation_reuses_app_session_factory_and_never_logs_databas
     service.esi_client.get_public_contracts = AsyncMock(return_value=[])
 
     entered = {"count": 0}
-    real_factory = app_db.AsyncSessionLocal
+    real_factory = app_db.IngestSessionLocal
 
     def recording_factory():
         entered["count"] += 1
         return real_factory()
 
-    monkeypatch.setattr(bg_agg, "AsyncSessionLocal", recording_factory, raising=False)
+    monkeypatch.setattr(bg_agg, "IngestSessionLocal", recording_factory, raising=False)
 
     store: dict = {}
     with patch.object(bg_agg.aioredis, "from_url", return_value=_FakeLockRedis(store)):
@@ -1320,7 +1443,7 @@ async def test_run_aggregation_reuses_app_session_factory_and_never_logs_databas
             await service.run_aggregation()
 
     assert entered["count"] == 1, (
-        "run_aggregation must obtain its session from fastapi_app.db.AsyncSessionLocal"
+        "run_aggregation must obtain its session from fastapi_app.db.IngestSessionLocal"
     )
     for rec in caplog.records:
         msg = rec.getMessage()
@@ -1364,7 +1487,7 @@ async def test_freshness_success_when_all_regions_fetch_ok(
 
     engine = create_async_engine(TEST_DATABASE_URL)
     maker = async_sessionmaker(engine, expire_on_commit=False)
-    monkeypatch.setattr(bg_agg, "AsyncSessionLocal", maker, raising=False)
+    monkeypatch.setattr(bg_agg, "IngestSessionLocal", maker, raising=False)
 
     service = _freshness_service([10000002])
     service.esi_client.get_public_contracts = AsyncMock(
@@ -1451,7 +1574,7 @@ async def test_freshness_failure_when_commit_raises(
         session.commit = boom
         return session
 
-    monkeypatch.setattr(bg_agg, "AsyncSessionLocal", boom_factory, raising=False)
+    monkeypatch.setattr(bg_agg, "IngestSessionLocal", boom_factory, raising=False)
 
     service = _freshness_service([10000002])
     service.esi_client.get_public_contracts = AsyncMock(
@@ -1735,60 +1858,46 @@ async def test_player_structure_contract_keeps_a_null_system_and_is_never_reques
 async def test_a_known_station_survives_an_esi_outage_and_is_not_refetched(
     db_session: AsyncSession,
 ):
-    """Station→system is static, so an already-resolved pair is read back from the
-    contracts table instead of ESI.
+    """Station data is static, so a station already in universe_locations is read
+    from there instead of ESI.
 
     Two properties in one, because they are the same mechanism: the lookup is skipped
     (steady state costs zero requests) and the stored system survives a total ESI
-    failure. Without the read-back, the upsert — which copies every supplied column on
-    conflict — would write NULL over every resolved system the moment
-    /universe/stations/ went down, blanking the filter site-wide for a full cycle.
+    failure. Without the dimension, the upsert — which copies every supplied column on
+    conflict — would have nothing but NULL to write for every contract first seen
+    while /universe/stations/ was down.
     """
     service = _make_service()
     service.esi_client.get_universe_station = AsyncMock(
         side_effect=RuntimeError("ESI is down")
     )
     # A prior run already resolved this station.
-    seed = dict(_ship_contract_dict(910103))
-    seed["start_location_id"] = 60008494
-    seed["type"] = "courier"
     db_session.add(
-        Contract(
-            contract_id=910103,
-            title="Seed",
-            price=1,
-            collateral=0,
-            status="outstanding",
-            type="courier",
-            issuer_id=1,
-            issuer_corporation_id=1,
-            start_location_id=60008494,
-            start_location_system_id=30002187,
-            start_location_region_id=10000020,
-            for_corporation=False,
-            date_issued=datetime.now(timezone.utc) - timedelta(days=1),
-            date_expired=datetime.now(timezone.utc) + timedelta(days=7),
+        UniverseLocation(
+            location_id=60008494,
+            name="Amarr VIII (Oris) - Emperor Family Academy",
+            system_id=30002187,
+            region_id=10000043,
+            security_status=1.0,
+            fetched_at=datetime.now(timezone.utc) - timedelta(days=30),
         )
     )
     await db_session.flush()
 
-    # A NEW contract in the SAME station, re-ingested alongside the existing one.
+    # A NEW contract in the SAME station.
     fresh = dict(_ship_contract_dict(910104))
     fresh["start_location_id"] = 60008494
     fresh["type"] = "courier"
 
-    await service._process_contracts(db_session, [seed, fresh])
+    await service._process_contracts(db_session, [fresh])
 
-    rows = (
-        await db_session.execute(
-            select(Contract).where(Contract.contract_id.in_([910103, 910104]))
-        )
-    ).scalars().all()
-    assert {r.contract_id: r.start_location_system_id for r in rows} == {
-        910103: 30002187,
-        910104: 30002187,
-    }
+    row = (
+        await db_session.execute(select(Contract).where(Contract.contract_id == 910104))
+    ).scalar_one()
+    assert row.start_location_system_id == 30002187
+    assert row.start_location_name == "Amarr VIII (Oris) - Emperor Family Academy"
     service.esi_client.get_universe_station.assert_not_awaited()
+    service.esi_client.get_universe_system.assert_not_awaited()
 
 
 async def test_station_resolution_failure_leaves_the_system_null_without_aborting(
@@ -1953,6 +2062,132 @@ async def test_a_known_end_station_survives_an_esi_outage(db_session: AsyncSessi
     assert row.end_location_system_id == 30002187
 
 
+async def test_courier_destination_region_comes_from_the_location_dimension(
+    db_session: AsyncSession,
+):
+    """The payload says nothing about where a courier is going; the destination's
+    universe_locations row does. The first sighting resolves station, system and
+    constellation once; a second batch to the same station makes no ESI lookups and
+    asks /universe/names only for the parties, not the station."""
+    service = _make_service()
+    service.esi_client.get_universe_station = AsyncMock(
+        side_effect=lambda sid: {
+            60003760: {"system_id": 30000142, "name": "Jita IV - Moon 4"},
+            60008494: {"system_id": 30002187, "name": "Amarr VIII (Oris)"},
+        }[sid]
+    )
+    service.esi_client.get_universe_system = AsyncMock(
+        side_effect=lambda sid: {
+            30000142: {"name": "Jita", "security_status": 0.946, "constellation_id": 20000020},
+            30002187: {"name": "Amarr", "security_status": 1.0, "constellation_id": 20000322},
+        }[sid]
+    )
+    service.esi_client.get_universe_constellation = AsyncMock(
+        side_effect=lambda cid: {20000020: {"region_id": 10000002}, 20000322: {"region_id": 10000043}}[cid]
+    )
+    first = _ship_contract_dict(816)
+    first["type"] = "courier"
+    first["end_location_id"] = 60008494
+    await service._process_contracts(db_session, [first])
+
+    assert service.esi_client.get_universe_constellation.await_count == 2
+    for mock in (
+        service.esi_client.get_universe_station,
+        service.esi_client.get_universe_system,
+        service.esi_client.get_universe_constellation,
+        service.esi_client.resolve_ids_to_names,
+    ):
+        mock.reset_mock()
+    second = _ship_contract_dict(817)
+    second["type"] = "courier"
+    second["end_location_id"] = 60008494
+    await service._process_contracts(db_session, [second])
+
+    rows = (
+        await db_session.execute(select(Contract).where(Contract.contract_id.in_([816, 817])))
+    ).scalars().all()
+    assert {
+        (r.end_location_system_id, r.end_location_region_id, r.end_location_name) for r in rows
+    } == {(30002187, 10000043, "Amarr VIII (Oris)")}
+    service.esi_client.get_universe_station.assert_not_awaited()
+    service.esi_client.get_universe_system.assert_not_awaited()
+    service.esi_client.get_universe_constellation.assert_not_awaited()
+    assert set(service.esi_client.resolve_ids_to_names.await_args.args[0]) == {1}
+    station = await db_session.get(UniverseLocation, 60008494)
+    assert (station.system_id, station.region_id, station.security_status) == (
+        30002187, 10000043, 1.0,
+    )
+
+
+async def test_a_new_system_is_seeded_from_the_sde_without_esi(db_session: AsyncSession):
+    """With the SDE loaded, a station's system gets its name, region and security from
+    the graph's own rows: no system or constellation lookup, and the security stored
+    is the one the route's high-sec flag was judged by."""
+    service = _make_service()
+    service.route_graph = StargateGraph(
+        [(30000142, 30000144)],
+        {30000142: 0.946, 30000144: 0.9},
+        {30000142: SolarSystem("Jita", 10000002, 0.946)},
+    )
+    service.esi_client.get_universe_station = AsyncMock(
+        return_value={"system_id": 30000142, "name": "Jita IV - Moon 4"}
+    )
+
+    await service._process_contracts(db_session, [_ship_contract_dict(820)])
+
+    service.esi_client.get_universe_system.assert_not_awaited()
+    service.esi_client.get_universe_constellation.assert_not_awaited()
+    system = await db_session.get(UniverseLocation, 30000142)
+    assert (system.name, system.region_id, system.security_status) == ("Jita", 10000002, 0.946)
+    station = await db_session.get(UniverseLocation, 60003760)
+    assert (station.system_id, station.region_id) == (30000142, 10000002)
+
+
+async def test_a_courier_is_stamped_with_its_route_from_the_stargate_graph(
+    db_session: AsyncSession,
+):
+    """Ingestion routes a courier between the systems its stations resolve to, and
+    stores the jumps, whether the route stays in high-sec, and reward per jump — so
+    the list sorts on columns rather than searching the graph per request. A
+    non-courier gets no route even though both its ends resolve."""
+    service = _make_service()
+    service.settings.COURIER_ROUTE_PREFER_HIGHSEC = True
+    # Jita -> Perimeter -> Amarr-side high-sec, and a low-sec shortcut through Ahbazon.
+    service.route_graph = StargateGraph(
+        [(30000142, 30000144), (30000144, 30002187), (30000142, 30005196), (30005196, 30002187)],
+        {30000142: 0.946, 30000144: 0.9, 30002187: 1.0, 30005196: 0.421},
+    )
+    service.esi_client.get_universe_station = AsyncMock(
+        side_effect=lambda sid: {
+            60003760: {"system_id": 30000142},
+            60008494: {"system_id": 30002187},
+        }[sid]
+    )
+    courier = _ship_contract_dict(818)
+    courier["type"] = "courier"
+    courier["end_location_id"] = 60008494
+    courier["reward"] = 10_000_000.0
+    exchange = _ship_contract_dict(819)
+    exchange["type"] = "item_exchange"
+    exchange["end_location_id"] = 60008494
+    service.esi_client.get_contract_items = AsyncMock(return_value=[])
+
+    await service._process_contracts(db_session, [courier, exchange])
+
+    rows = {
+        row.contract_id: row
+        for row in (
+            await db_session.execute(select(Contract).where(Contract.contract_id.in_([818, 819])))
+        ).scalars()
+    }
+    assert (rows[818].route_jumps, rows[818].route_highsec, rows[818].reward_per_jump) == (
+        2, True, 5_000_000.0,
+    )
+    assert (rows[819].route_jumps, rows[819].route_highsec, rows[819].reward_per_jump) == (
+        None, None, None,
+    )
+
+
 async def test_resolved_names_survive_a_degraded_name_resolution_run(
     db_session: AsyncSession,
 ):
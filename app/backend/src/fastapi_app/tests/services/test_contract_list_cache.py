@@ -0,0 +1,343 @@
+# ABOUTME: GET /contracts cache-aside — generation-keyed hits, invalidation on a bump,
+# ABOUTME: canonical filter hashing, single-flight misses, post-ingest warming, and fail-open behaviour.
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import fastapi_app.services.contract_list_cache as list_cache
+from fastapi_app.core.conditional_get import strong_etag
+from fastapi_app.schemas.contracts import ContractFilters, ContractListResponse
+from fastapi_app.services.background_aggregation import (
+    INGEST_GENERATION_KEY,
+    ContractAggregationService,
+)
+from fastapi_app.tests.fake_redis import FakePipeline, FakeRedis
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def counted_get_contracts(monkeypatch: pytest.MonkeyPatch):
+    """Wrap the real service so a test can tell a database pass from a cache hit."""
+    calls = {"count": 0}
+    real = list_cache.get_contracts
+
+    async def counting(db, filters, **dataset):
+        calls["count"] += 1
+        return await real(db=db, filters=filters, **dataset)
+
+    monkeypatch.setattr(list_cache, "get_contracts", counting)
+    return calls
+
+
+async def test_a_repeated_request_is_served_from_the_cache(
+    db_session: AsyncSession, setup_contracts, counted_get_contracts
+):
+    redis = FakeRedis()
+    filters = ContractFilters(region_ids=[10000002])
+
+    first, _ = await list_cache.get_contracts_cached(db_session, redis, filters)
+    second, _ = await list_cache.get_contracts_cached(db_session, redis, filters)
+
+    assert counted_get_contracts["count"] == 1
+    assert second == first
+    assert json.loads(second.body)["total"] == 3
+
+
+async def test_a_generation_bump_invalidates_every_entry(
+    db_session: AsyncSession, setup_contracts, counted_get_contracts
+):
+    """The bump is the whole invalidation story: nothing is deleted, the readers
+    simply start asking for keys the previous generation never wrote."""
+    redis = FakeRedis()
+    filters = ContractFilters()
+    await list_cache.get_contracts_cached(db_session, redis, filters)
+
+    service = ContractAggregationService(esi_client=MagicMock(), settings=MagicMock())
+    assert await service._publish_generation(redis) is not None
+    await list_cache.get_contracts_cached(db_session, redis, filters)
+
+    assert counted_get_contracts["count"] == 2
+
+
+async def test_entries_never_outlive_the_soonest_expiring_row(
+    db_session: AsyncSession, setup_contracts
+):
+    """Contract 102 expires in three days — well past the one-hour ceiling — so the
+    ceiling wins here; the clamp only bites when a row expires inside the window."""
+    redis = FakeRedis()
+    filters = ContractFilters()
+
+    await list_cache.get_contracts_cached(db_session, redis, filters)
+
+    key = list_cache.list_cache_key(0, filters)
+    assert redis.ttl_for(key) == list_cache.get_settings().CONTRACT_LIST_CACHE_TTL_SECONDS
+
+
+async def test_generation_is_strictly_increasing_even_after_eviction():
+    """An evicted key must not restart the sequence where live entries may still sit."""
+    redis = FakeRedis()
+    service = ContractAggregationService(esi_client=MagicMock(), settings=MagicMock())
+
+    first = await service._publish_generation(redis)
+    second = await service._publish_generation(redis)
+    await redis.delete(INGEST_GENERATION_KEY)
+    after_eviction = await service._publish_generation(redis)
+
+    assert first < second
+    assert after_eviction > 1
+    assert await list_cache.read_generation(redis) == after_eviction
+
+
+def test_fingerprint_ignores_list_order_and_repeats():
+    assert list_cache.filters_fingerprint(
+        ContractFilters(region_ids=[10000043, 10000002])
+    ) == list_cache.filters_fingerprint(
+        ContractFilters(region_ids=[10000002, 10000043, 10000002])
+    )
+    assert list_cache.filters_fingerprint(
+        ContractFilters(region_ids=[10000002])
+    ) != list_cache.filters_fingerprint(ContractFilters(region_ids=[10000043]))
+    assert list_cache.filters_fingerprint(
+        ContractFilters(page=1)
+    ) != list_cache.filters_fingerprint(ContractFilters(page=2))
+
+
+async def test_a_failing_cache_falls_through_to_the_database(
+    db_session: AsyncSession, setup_contracts, counted_get_contracts
+):
+    class _BrokenRedis:
+        async def get(self, key):
+            raise ConnectionError("valkey down")
+
+        async def set(self, *args, **kwargs):
+            raise ConnectionError("valkey down")
+
+    result, generation = await list_cache.get_contracts_cached(
+        db_session, _BrokenRedis(), ContractFilters()
+    )
+
+    assert json.loads(result.body)["total"] == 4
+    assert generation == 0
+    assert counted_get_contracts["count"] == 1
+
+
+async def test_no_client_means_no_caching(
+    db_session: AsyncSession, setup_contracts, counted_get_contracts
+):
+    await list_cache.get_contracts_cached(db_session, None, ContractFilters())
+    await list_cache.get_contracts_cached(db_session, None, ContractFilters())
+
+    assert counted_get_contracts["count"] == 2
+
+
+async def test_a_hit_serves_the_stored_bytes_as_rendered(
+    db_session: AsyncSession, setup_contracts
+):
+    """The rendered body is the wire format; a hit must not re-encode it, and the
+    page's expiry bound must survive the round trip through Valkey."""
+    redis = FakeRedis()
+    filters = ContractFilters()
+
+    miss, _ = await list_cache.get_contracts_cached(db_session, redis, filters)
+    hit, _ = await list_cache.get_contracts_cached(db_session, redis, filters)
+
+    assert hit.body == miss.body
+    assert miss.fresh_until is not None
+    assert hit.fresh_until == miss.fresh_until
+    assert hit.etag == miss.etag == strong_etag(miss.body)
+    assert ContractListResponse.model_validate_json(hit.body).total == 4
+
+
+async def test_concurrent_identical_misses_share_one_computation(
+    db_session: AsyncSession, setup_contracts, monkeypatch: pytest.MonkeyPatch
+):
+    """A burst for one page runs the list queries once; every request gets its bytes."""
+    calls = {"count": 0}
+    entered = asyncio.Event()
+    release = asyncio.Event()
+    real = list_cache.get_contracts
+
+    async def gated(db, filters, **dataset):
+        calls["count"] += 1
+        entered.set()
+        await release.wait()
+        return await real(db=db, filters=filters, **dataset)
+
+    monkeypatch.setattr(list_cache, "get_contracts", gated)
+    redis = FakeRedis()
+    filters = ContractFilters()
+
+    requests = [
+        asyncio.create_task(list_cache.get_contracts_cached(db_session, redis, filters))
+        for _ in range(5)
+    ]
+    await entered.wait()
+    release.set()
+    pages = await asyncio.gather(*requests)
+
+    assert calls["count"] == 1
+    assert all(page == pages[0] for page in pages)
+    assert not list_cache._in_flight
+
+
+async def test_a_page_another_process_is_filling_is_awaited_not_recomputed(
+    db_session: AsyncSession, setup_contracts, counted_get_contracts
+):
+    redis = FakeRedis()
+    filters = ContractFilters()
+    key = list_cache.list_cache_key(0, filters)
+    await redis.set(list_cache._fill_lock_key(key), "another-process", ex=10)
+    filled = list_cache.RenderedPage(
+        body=b'{"total":99}', fresh_until=None, etag=strong_etag(b'{"total":99}')
+    )
+
+    async def other_process():
+        await asyncio.sleep(0.1)
+        await redis.set(key, list_cache._encode_entry(filled))
+        await redis.delete(list_cache._fill_lock_key(key))
+
+    writer = asyncio.create_task(other_process())
+    page, _ = await list_cache.get_contracts_cached(db_session, redis, filters)
+    await writer
+
+    assert page == filled
+    assert counted_get_contracts["count"] == 0
+
+
+async def test_a_fill_abandoned_by_its_holder_is_computed_here(
+    db_session: AsyncSession, setup_contracts, counted_get_contracts
+):
+    """A holder that lets go without writing (it failed) stops the wait at once."""
+    redis = FakeRedis()
+    filters = ContractFilters()
+    key = list_cache.list_cache_key(0, filters)
+    await redis.set(list_cache._fill_lock_key(key), "another-process", ex=10)
+
+    async def other_process_fails():
+        await asyncio.sleep(0.1)
+        await redis.delete(list_cache._fill_lock_key(key))
+
+    abandoner = asyncio.create_task(other_process_fails())
+    page, _ = await list_cache.get_contracts_cached(db_session, redis, filters)
+    await abandoner
+
+    assert json.loads(page.body)["total"] == 4
+    assert counted_get_contracts["count"] == 1
+    assert await redis.get(key) is not None
+
+
+@asynccontextmanager
+async def _borrowed(session: AsyncSession):
+    yield session
+
+
+async def test_the_most_requested_pages_are_warmed_under_the_next_generation(
+    db_session: AsyncSession, setup_contracts, counted_get_contracts, monkeypatch: pytest.MonkeyPatch
+):
+    """Warming reads the tally of the generation readers are on and writes the pages
+    under the one about to be published, where those readers' next requests hit."""
+    monkeypatch.setattr(list_cache.get_settings(), "CONTRACT_LIST_WARM_TOP_N", 2)
+    redis = FakeRedis()
+    popular = ContractFilters(region_ids=[10000002, 10000043])
+    runner_up = ContractFilters(is_ship_contract=True)
+    for filters in (
+        popular,
+        ContractFilters(region_ids=[10000043, 10000002]),  # the same filter set
+        runner_up,
+        runner_up,
+        ContractFilters(page=2),
+        # Never tallied, however often asked: free text stays out of the tally.
+        ContractFilters(search="Rifter"),
+        ContractFilters(search="Rifter"),
+        ContractFilters(search="Rifter"),
+    ):
+        await list_cache.get_contracts_cached(db_session, redis, filters)
+    await list_cache.drain_tallies()
+
+    warmed = await list_cache.warm_popular_pages(redis, 42, lambda: _borrowed(db_session))
+
+    assert warmed == 2
+    await redis.set(INGEST_GENERATION_KEY, "42")
+    counted_get_contracts["count"] = 0
+    for filters in (popular, runner_up):
+        await list_cache.get_contracts_cached(db_session, redis, filters)
+    assert counted_get_contracts["count"] == 0
+    await list_cache.get_contracts_cached(db_session, redis, ContractFilters(page=2))
+    assert counted_get_contracts["count"] == 1
+
+
+async def test_a_hit_does_not_wait_for_its_popularity_tally(
+    db_session: AsyncSession, setup_contracts, monkeypatch: pytest.MonkeyPatch
+):
+    """The tally is one pipelined round trip run beside the response, so a hit costs
+    the GET alone however slow the tally is."""
+    monkeypatch.setattr(list_cache.get_settings(), "CONTRACT_LIST_WARM_TOP_N", 2)
+    redis = FakeRedis()
+    filters = ContractFilters(region_ids=[10000002])
+    await list_cache.get_contracts_cached(db_session, redis, filters)
+    await list_cache.drain_tallies()
+
+    released = asyncio.Event()
+    execute = FakePipeline.execute
+
+    async def stalled(pipeline):
+        await released.wait()
+        return await execute(pipeline)
+
+    monkeypatch.setattr(FakePipeline, "execute", stalled)
+    hit, _ = await asyncio.wait_for(
+        list_cache.get_contracts_cached(db_session, redis, filters), timeout=5
+    )
+    assert json.loads(hit.body)["total"] == 3
+
+    released.set()
+    await list_cache.drain_tallies()
+    popular = await redis.zrevrange(list_cache._popularity_key(0), 0, -1)
+    assert popular == [list_cache._canonical_filters(filters)]
+    assert redis.store[list_cache._popularity_key(0)][popular[0]] == 2
+    assert redis.ttl_for(list_cache._popularity_key(0)) == list_cache.POPULAR_FILTERS_TTL_SECONDS
+
+
+async def test_a_failed_warming_still_publishes_the_generation():
+    async def broken_warmer(redis, generation, session_factory):
+        raise ConnectionError("database went away")
+
+    redis = FakeRedis()
+    service = ContractAggregationService(
+        esi_client=MagicMock(), settings=MagicMock(), cache_warmer=broken_warmer
+    )
+
+    generation = await service._next_generation(redis)
+    await service._warm_caches(redis, generation)
+
+    assert await service._publish_generation(redis, generation) == generation
+    assert await list_cache.read_generation(redis) == generation
+
+
+async def test_the_tally_keeps_newcomers_until_it_outgrows_twice_its_limit(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Trimming on every request would evict each new filter set the moment it arrived;
+    the tally is trimmed back to the limit only once it holds twice that."""
+    monkeypatch.setattr(list_cache, "POPULAR_FILTERS_LIMIT", 2)
+    redis = FakeRedis()
+    key = list_cache._popularity_key(0)
+    favourite = ContractFilters(region_ids=[10000002])
+    for _ in range(3):
+        await list_cache._tally_request(redis, 0, favourite)
+    newcomers = [ContractFilters(page=page) for page in range(2, 5)]
+    for filters in newcomers:
+        await list_cache._tally_request(redis, 0, filters)
+
+    assert await redis.zcard(key) == 4  # one favourite and three newcomers, all kept
+
+    await list_cache._tally_request(redis, 0, ContractFilters(page=5))
+
+    popular = await redis.zrevrange(key, 0, -1)
+    assert len(popular) == 2
+    assert popular[0] == list_cache._canonical_filters(favourite)
@@ -0,0 +1,249 @@
+# ABOUTME: Differential tests for the in-memory contract read model — every list page, count,
+# ABOUTME: cursor and facet it serves must equal what the SQL path computes for the same filters.
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fastapi_app.models.contracts import Contract, ContractItem
+from fastapi_app.schemas.contracts import (
+    ContractCursor,
+    ContractFilters,
+    ContractType,
+    CountMode,
+    SortableContractFields,
+    SortDirection,
+)
+from fastapi_app.services.contract_read_model import (
+    ContractReadModelCache,
+    build_contract_read_model,
+)
+from fastapi_app.services.contract_service import get_contract_facets, get_contracts
+
+pytestmark = pytest.mark.asyncio
+
+READ_MODEL_REGION_A = 99999991
+READ_MODEL_REGION_B = 99999992
+
+# (category, group) pairs the corpus's items are drawn from, None standing for an item
+# enrichment has not reached. Group 25 appears under two categories on purpose, so a
+# category + group filter has to land both on one item.
+_TAXONOMY = [(6, 25), (6, 26), (7, 25), (7, 53), (9, 105), (None, None)]
+_STORED_TYPES = ["item_exchange", "auction", "courier", "loan", "unknown", "somenewtype"]
+_NAMES = ["Rifter", "rifter", "Caracal", "Vexor", "Ägir", "Warp Scrambler II", "Zealot"]
+
+
+def _corpus() -> list[Contract]:
+    """A seeded, deliberately lumpy corpus: tied prices, dates and names, NULLs in every
+    nullable sort, unresolved systems, want-to-buy items, delisted and expired rows."""
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    issued = [now - timedelta(hours=hours) for hours in (1, 2, 2, 5, 9)]
+    contracts = []
+    for n in range(80):
+        contract_id = 970000 + n
+        stored_type = rng.choice(_STORED_TYPES)
+        items = []
+        if stored_type in ("item_exchange", "auction") or rng.random() < 0.1:
+            for k in range(rng.randint(0, 3)):
+                category_id, group_id = rng.choice(_TAXONOMY)
+                is_copy = rng.random() < 0.3
+                items.append(
+                    ContractItem(
+                        record_id=contract_id * 10 + k,
+                        type_id=rng.choice([587, 621, 448, 626]),
+                        type_name=rng.choice(_NAMES),
+                        quantity=1,
+                        is_included=rng.random() < 0.85,
+                        is_singleton=False,
+                        is_blueprint_copy=True if is_copy else None,
+                        category_id=category_id,
+                        group_id=group_id,
+                        runs=rng.choice([None, 1, 10, 20]) if is_copy else None,
+                        material_efficiency=rng.choice([None, 0, 5, 10]) if is_copy else None,
+                        time_efficiency=rng.choice([None, 0, 10, 20]) if is_copy else None,
+                    )
+                )
+        region = rng.choice([READ_MODEL_REGION_A, READ_MODEL_REGION_B])
+        # Routes only on couriers, as ingestion stamps them; some unrouted, one same-system.
+        route_jumps = None
+        if stored_type == "courier":
+            route_jumps = rng.choice([None, 0, 4, 4, 11, 45])
+        reward = rng.choice([None, 0.0, 250_000.0, 1_000_000.0])
+        contracts.append(
+            Contract(
+                contract_id=contract_id,
+                title=rng.choice(["Rifter deal", "cheap stuff", "Bundle", None]),
+                price=rng.choice([0, 1_000_000, 1_500_000.5, 2_000_000, 75_000_000]),
+                collateral=rng.choice([0, 0, 5_000_000, 90_000_000]),
+                reward=reward,
+                route_jumps=route_jumps,
+                route_highsec=None if route_jumps is None else route_jumps < 11,
+                reward_per_jump=(
+                    reward / route_jumps if reward is not None and route_jumps else None
+                ),
+                volume=rng.choice([None, 0.0, 2_500.0, 27_289.5]),
+                buyout=rng.choice([None, 3_000_000, 9_000_000]),
+                days_to_complete=rng.choice([None, 3, 7]),
+                status="outstanding",
+                type=stored_type,
+                issuer_id=970,
+                issuer_corporation_id=970,
+                start_location_id=rng.choice([60003760, 60008494, 1_035_466_617_946]),
+                start_location_system_id=rng.choice([30000142, 30002187, None]),
+                start_location_region_id=region,
+                for_corporation=False,
+                date_issued=rng.choice(issued),
+                date_expired=now + timedelta(days=rng.choice([1, 3, 3, 14])),
+                last_seen_at=now - timedelta(hours=2) if n % 17 == 0 else now,
+                is_ship_contract=rng.random() < 0.4,
+                items=items,
+            )
+        )
+    # Already expired, so live in neither path.
+    contracts[5].date_expired = now - timedelta(hours=1)
+    return contracts
+
+
+@pytest_asyncio.fixture(scope="function")
+async def read_model(db_session: AsyncSession):
+    db_session.add_all(_corpus())
+    await db_session.flush()
+    return await build_contract_read_model(db_session, generation=1)
+
+
+# Filter sets covering every predicate the model mirrors, alone and combined.
+_DIFFERENTIAL_CASES = {
+    "unfiltered": {},
+    "search": {"search": "rifter"},
+    "price-bounds": {"min_price": 1_000_000, "max_price": 2_000_000},
+    "price-at-a-fraction": {"min_price": 1_500_000.5},
+    "collateral": {"max_collateral": 5_000_000},
+    "jumps": {"max_jumps": 4},
+    "reward-per-jump": {"min_reward_per_jump": 50_000},
+    "ships": {"is_ship_contract": True},
+    "not-ships": {"is_ship_contract": False},
+    "one-type": {"contract_type": [ContractType.courier]},
+    "unknown-folds-new-types": {"contract_type": [ContractType.unknown]},
+    "types-with-ships": {
+        "contract_type": [ContractType.item_exchange, ContractType.auction],
+        "is_ship_contract": True,
+    },
+    "bpc": {"is_bpc": True},
+    "not-bpc": {"is_bpc": False},
+    "region": {"region_ids": [READ_MODEL_REGION_A]},
+    "systems": {"system_ids": [30000142]},
+    "systems-with-types": {"system_ids": [30002187], "contract_type": [ContractType.auction]},
+    "station": {"station_ids": [1_035_466_617_946]},
+    "item-type": {"type_ids": [621]},
+    "runs": {"min_runs": 10},
+    "me-window": {"min_me": 5, "max_me": 10},
+    "runs-and-te": {"max_runs": 10, "min_te": 10},
+    "category": {"category_id": [6]},
+    "group": {"group_id": [25]},
+    "category-and-group": {"category_id": [7], "group_id": [25]},
+    "everything-at-once": {
+        "region_ids": [READ_MODEL_REGION_A, READ_MODEL_REGION_B],
+        "is_bpc": False,
+        "max_price": 75_000_000,
+        "category_id": [6, 7],
+    },
+}
+
+_SORTS = [
+    (SortableContractFields.date_issued, SortDirection.desc),
+    (SortableContractFields.price, SortDirection.asc),
+    (SortableContractFields.ship_name, SortDirection.desc),
+    (SortableContractFields.reward_per_volume, SortDirection.desc),
+    (SortableContractFields.reward_per_jump, SortDirection.desc),
+    (SortableContractFields.route_jumps, SortDirection.asc),
+    (SortableContractFields.buyout, SortDirection.asc),
+]
+
+
+@pytest.mark.parametrize("case", sorted(_DIFFERENTIAL_CASES), ids=sorted(_DIFFERENTIAL_CASES))
+async def test_every_page_matches_the_sql_path(
+    db_session: AsyncSession, read_model, case
+):
+    for sort_by, sort_direction in _SORTS:
+        for page in (1, 2):
+            filters = ContractFilters(
+                sort_by=sort_by,
+                sort_direction=sort_direction,
+                size=7,
+                page=page,
+                **_DIFFERENTIAL_CASES[case],
+            )
+            expected = await get_contracts(db_session, filters)
+            served = await get_contracts(db_session, filters, read_model=read_model)
+
+            assert served.model_dump() == expected.model_dump(), (case, sort_by, page)
+            assert served.count_mode is CountMode.exact
+
+
+@pytest.mark.parametrize("case", ["unfiltered", "search", "ships", "category-and-group"])
+async def test_a_cursor_walk_matches_the_sql_path(db_session: AsyncSession, read_model, case):
+    """Both walks yield the same rows and hand out the same cursors, and a cursor either
+    one issued resumes identically on the other."""
+    for sort_by in (SortableContractFields.buyout, SortableContractFields.ship_name):
+        filters = ContractFilters(
+            sort_by=sort_by, sort_direction=SortDirection.asc, size=6, **_DIFFERENTIAL_CASES[case]
+        )
+        steps = 0
+        while True:
+            expected = await get_contracts(db_session, filters)
+            served = await get_contracts(db_session, filters, read_model=read_model)
+            assert served.model_dump() == expected.model_dump(), (case, sort_by, steps)
+            if expected.next_cursor is None:
+                break
+            steps += 1
+            assert steps < 20, "cursor walk did not terminate"
+            filters = filters.model_copy(update={"cursor": expected.next_cursor})
+
+
+async def test_a_cursor_the_model_cannot_place_falls_back_to_sql(
+    db_session: AsyncSession, read_model
+):
+    """A position between two stored keys came from some other corpus; the seek still
+    answers it, so the model declines rather than guessing a rank."""
+    cursor = ContractCursor.after(
+        SortableContractFields.price, SortDirection.asc, 1_750_000, 970001
+    ).encode()
+    filters = ContractFilters(
+        sort_by=SortableContractFields.price, sort_direction=SortDirection.asc, cursor=cursor
+    )
+
+    assert await read_model.list_page(db_session, filters) is None
+    served = await get_contracts(db_session, filters, read_model=read_model)
+    assert served.model_dump() == (await get_contracts(db_session, filters)).model_dump()
+
+
+@pytest.mark.parametrize("case", sorted(_DIFFERENTIAL_CASES), ids=sorted(_DIFFERENTIAL_CASES))
+async def test_facets_match_the_sql_path(db_session: AsyncSession, read_model, case):
+    filters = ContractFilters(**_DIFFERENTIAL_CASES[case])
+
+    expected = await get_contract_facets(db_session, filters)
+    served = await get_contract_facets(db_session, filters, read_model=read_model)
+
+    assert served == expected
+
+
+async def test_the_cache_serves_a_model_only_for_its_own_generation(db_session: AsyncSession):
+    """The first request at a generation is answered by SQL and starts the build; later
+    ones get the model. An older generation never gets a newer model, nor replaces it."""
+    async with AsyncSession(db_session.bind) as writer:
+        writer.add_all(_corpus()[:10])
+        await writer.commit()
+    read_models = ContractReadModelCache(lambda: AsyncSession(db_session.bind))
+
+    assert read_models.current(7) is None
+    await read_models._rebuild
+    model = read_models.current(7)
+
+    assert model is not None and model.generation == 7
+    assert sorted(model.contract_ids) == sorted(model.row_of)
+    assert read_models.current(6) is None
+    assert read_models._rebuild.done()
+    await read_models.close()
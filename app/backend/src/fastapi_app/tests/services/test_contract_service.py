@@ -21,21 +21,28 @@
 # Do NOT use `await db_session.commit()`, as the fixture manages the
 # transaction lifecycle.
 
+from collections import OrderedDict
+
 import pytest
 import pytest_asyncio
+from pydantic import ValidationError
 from sqlalchemy.exc import StatementError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import func
 from sqlalchemy.future import select
 
 from datetime import datetime, timedelta, timezone
 from fastapi_app.models.contracts import Contract, ContractItem
 from fastapi_app.schemas.contracts import (
+    ContractCursor,
     ContractFilters,
     ContractType,
+    CountMode,
     SortableContractFields,
     SortDirection,
 )
 import fastapi_app.services.contract_service as contract_service
+from fastapi_app.services.background_aggregation import ITEM_SUMMARY_VERSION
 from fastapi_app.services.contract_service import get_contracts
 
 # Mark all tests in this file as asyncio
@@ -69,6 +76,41 @@ async def test_search_by_contract_title(db_session: AsyncSession, setup_contract
     assert result.items[0].contract_id == 103
 
 
+async def test_search_counts_a_contract_once_however_many_places_it_matches(
+    db_session: AsyncSession,
+):
+    """Search resolves to contract ids through a semi-join, so a contract matching on
+    its title AND on several items is still one result — without the item join or a
+    DISTINCT count behind it."""
+    now = datetime.now(timezone.utc)
+    db_session.add(
+        Contract(
+            contract_id=946001, title="Vexor bundle", price=1_000_000, collateral=0,
+            status="outstanding", type="item_exchange", issuer_id=946,
+            issuer_corporation_id=946, start_location_id=60003760,
+            start_location_region_id=10000002, for_corporation=False,
+            date_issued=now, date_expired=now + timedelta(days=5),
+            items=[
+                ContractItem(
+                    record_id=9460011, type_id=626, type_name="Vexor", quantity=1,
+                    is_included=True, is_singleton=False,
+                ),
+                ContractItem(
+                    record_id=9460012, type_id=17843, type_name="Vexor Navy Issue",
+                    quantity=1, is_included=True, is_singleton=False,
+                ),
+            ],
+        )
+    )
+    await db_session.flush()
+    filters = ContractFilters(search="vexor")
+
+    result = await get_contracts(db=db_session, filters=filters)
+
+    assert result.total == 1
+    assert [c.contract_id for c in result.items] == [946001]
+
+
 async def test_filter_by_min_price(db_session: AsyncSession, setup_contracts):
     """Test filtering contracts by a minimum price."""
     filters = ContractFilters(min_price=10_000_000)
@@ -1083,7 +1125,7 @@ async def segment_corpus(db_session: AsyncSession):
 
 
 # Each case is the filter set a caller could actually send. They cover the
-# unjoined path, both joined paths (search and type_ids), the EXISTS path
+# unfiltered list, both item-name semi-joins (search and type_ids), the EXISTS path
 # (is_bpc), both values of the ships-only flag, contract_type alone and combined,
 # and a value outside the corpus's designed types.
 _EQUIVALENCE_CASES = {
@@ -1115,11 +1157,12 @@ async def test_the_derived_total_equals_the_flat_count_for_the_same_filters(
     """`total` is now derived from the grouped statement, so it must still agree
     with counting the filtered query directly.
 
-    The reference is built here rather than borrowed from the service, the way the
-    list path built it before this change: base select, the item join iff the
-    filters need one, both filter helpers, count DISTINCT contract ids. A
-    derivation that lifts the wrong predicate, folds the wrong bucket, or picks the
-    wrong aggregate under the ships-only flag disagrees with it.
+    The reference is built here rather than borrowed from the service: base
+    select, both filter helpers, count DISTINCT contract ids — DISTINCT kept in the
+    reference on purpose, so an item predicate that regressed into a fan-out shows
+    up as a total the reference disagrees with. A derivation that lifts the wrong
+    predicate, folds the wrong bucket, or picks the wrong aggregate under the
+    ships-only flag disagrees with it too.
     """
     overrides = _EQUIVALENCE_CASES[case]
     filters = ContractFilters(
@@ -1127,11 +1170,12 @@ async def test_the_derived_total_equals_the_flat_count_for_the_same_filters(
     )
 
     reference = select(Contract)
-    if contract_service._needs_item_join(filters):
-        reference = reference.outerjoin(ContractItem)
     reference = contract_service._apply_contract_filters(reference, filters)
     reference = contract_service._apply_item_filters(reference, filters)
-    expected = await contract_service._count_distinct_contracts(db_session, reference)
+    matched_ids = reference.with_only_columns(Contract.contract_id).distinct().subquery()
+    expected = (
+        await db_session.execute(select(func.count()).select_from(matched_ids))
+    ).scalar_one()
 
     # A case matching nothing would satisfy the equality vacuously.
     assert expected > 0, f"{case} selects no contracts; the corpus no longer covers it"
@@ -1322,3 +1366,405 @@ async def test_a_region_whose_rows_are_all_unstamped_still_counts_as_covered(
         OBSERVED_REGION_UNSTAMPED,
     ]
     assert result.coverage.as_of == stamped
+
+
+# --- Keyset pagination ------------------------------------------------------
+#
+# A cursor must walk exactly the rows the offset pages do, in the same order —
+# across ties broken on contract_id, into the NULL tail of a nullable sort, and on
+# the ship_name sort whose key is derived from the items. Region 99999903 isolates
+# the rows.
+
+KEYSET_REGION_ID = 99999903
+
+
+def _keyset_contract(
+    contract_id: int, *, buyout: float | None, item_name: str = "Keyset Hull"
+) -> Contract:
+    now = datetime.now(timezone.utc)
+    return Contract(
+        contract_id=contract_id,
+        title=f"Keyset Case {contract_id}",
+        price=1_000_000,
+        collateral=0,
+        buyout=buyout,
+        status="outstanding",
+        type="auction",
+        issuer_id=942,
+        issuer_corporation_id=942,
+        start_location_id=60003760,
+        start_location_region_id=KEYSET_REGION_ID,
+        for_corporation=False,
+        date_issued=now,
+        date_expired=now + timedelta(days=5),
+        items=[
+            ContractItem(
+                record_id=contract_id * 10 + 1, type_id=587, type_name=item_name,
+                quantity=1, is_included=True, is_singleton=False,
+            )
+        ],
+    )
+
+
+async def _walk(db_session: AsyncSession, filters: ContractFilters, *, by_cursor: bool):
+    """Every contract id the listing yields, one page at a time."""
+    seen = []
+    page = await get_contracts(db_session, filters)
+    while True:
+        seen.extend(c.contract_id for c in page.items)
+        if page.next_cursor is None:
+            return seen
+        assert len(seen) < 50, "cursor walk did not terminate"
+        following = (
+            {"cursor": page.next_cursor}
+            if by_cursor
+            else {"page": len(seen) // filters.size + 1}
+        )
+        page = await get_contracts(db_session, filters.model_copy(update=following))
+
+
+@pytest.mark.parametrize("direction", [SortDirection.desc, SortDirection.asc])
+async def test_a_cursor_walk_matches_the_offset_walk_into_the_null_tail(
+    db_session: AsyncSession, direction
+):
+    """buyout is nullable and sorts NULL last both ways; equal keys and equal NULLs
+    both tie-break on contract_id, so pages of two straddle every boundary kind."""
+    buyouts = {
+        943001: 5.0, 943002: None, 943003: 5.0, 943004: 9.5,
+        943005: None, 943006: 1.25, 943007: None,
+    }
+    db_session.add_all(
+        _keyset_contract(cid, buyout=buyout) for cid, buyout in buyouts.items()
+    )
+    await db_session.flush()
+
+    filters = ContractFilters(
+        region_ids=[KEYSET_REGION_ID], sort_by=SortableContractFields.buyout,
+        sort_direction=direction, size=2,
+    )
+    by_cursor = await _walk(db_session, filters, by_cursor=True)
+    by_offset = await _walk(db_session, filters, by_cursor=False)
+
+    assert by_cursor == by_offset
+    assert sorted(by_cursor) == sorted(buyouts)
+    assert by_cursor[-3:] == [943002, 943005, 943007]
+
+
+async def test_a_cursor_walk_seeks_on_the_item_name_key(db_session: AsyncSession):
+    names = {944001: "Bantam", 944002: "Atron", 944003: "Atron", 944004: "Condor"}
+    db_session.add_all(
+        _keyset_contract(cid, buyout=None, item_name=name) for cid, name in names.items()
+    )
+    await db_session.flush()
+
+    filters = ContractFilters(
+        region_ids=[KEYSET_REGION_ID], sort_by=SortableContractFields.ship_name,
+        sort_direction=SortDirection.asc, size=1,
+    )
+
+    assert await _walk(db_session, filters, by_cursor=True) == [
+        944002, 944003, 944001, 944004,
+    ]
+
+
+async def test_the_last_page_carries_no_cursor(db_session: AsyncSession):
+    db_session.add_all(_keyset_contract(cid, buyout=1.0) for cid in (945001, 945002))
+    await db_session.flush()
+
+    result = await get_contracts(
+        db_session, ContractFilters(region_ids=[KEYSET_REGION_ID], size=2)
+    )
+
+    assert len(result.items) == 2
+    assert result.next_cursor is None
+
+
+def test_a_cursor_is_rejected_under_another_sort_or_beside_a_page():
+    issued = ContractCursor.after(
+        SortableContractFields.price, SortDirection.asc, 10, 1
+    ).encode()
+
+    with pytest.raises(ValidationError):
+        ContractFilters(cursor=issued, sort_by=SortableContractFields.price)
+    with pytest.raises(ValidationError):
+        ContractFilters(
+            cursor=issued, sort_by=SortableContractFields.price,
+            sort_direction=SortDirection.asc, page=2,
+        )
+    with pytest.raises(ValidationError):
+        ContractFilters(cursor="not-a-cursor")
+    assert ContractFilters(
+        cursor=issued, sort_by=SortableContractFields.price,
+        sort_direction=SortDirection.asc,
+    ).cursor == issued
+
+
+# --- ship_name sort key -------------------------------------------------------
+#
+# The sort reads the contract-level item-name summary ingestion writes, and derives
+# the key from the items for any row whose summary is not current. Both halves must
+# give the same order, so a corpus caught mid-convergence still sorts correctly.
+
+
+async def test_ship_name_sort_reads_a_current_summary_and_derives_a_stale_one(
+    db_session: AsyncSession,
+):
+    """947001's summary is current and deliberately disagrees with its lone item, so
+    only a sort that reads the column can place it first; 947002 is unsummarized
+    and must still sort by its items, between the two ends of 947003's bundle."""
+    current = _keyset_contract(947001, buyout=None, item_name="Zealot")
+    current.item_name_first = "Abaddon"
+    current.item_name_last = "Abaddon"
+    current.item_summary_version = ITEM_SUMMARY_VERSION
+    unsummarized = _keyset_contract(947002, buyout=None, item_name="Merlin")
+    bundle = _keyset_contract(947003, buyout=None, item_name="Bantam")
+    bundle.items.append(
+        ContractItem(
+            record_id=9470032, type_id=12003, type_name="Vengeance", quantity=1,
+            is_included=True, is_singleton=False,
+        )
+    )
+    db_session.add_all([current, unsummarized, bundle])
+    await db_session.flush()
+
+    def _ids(direction):
+        return ContractFilters(
+            region_ids=[KEYSET_REGION_ID], sort_by=SortableContractFields.ship_name,
+            sort_direction=direction,
+        )
+
+    ascending = await get_contracts(db_session, _ids(SortDirection.asc))
+    descending = await get_contracts(db_session, _ids(SortDirection.desc))
+
+    assert [c.contract_id for c in ascending.items] == [947001, 947003, 947002]
+    assert [c.contract_id for c in descending.items] == [947003, 947002, 947001]
+
+
+async def test_list_rows_serve_a_stored_summary_and_summarize_a_stale_row(
+    db_session: AsyncSession,
+):
+    """948001's stored summary is current and deliberately disagrees with its items,
+    so only a row built from the summary heads it "Abaddon"; 948002 has none and
+    must still be summarized from its items."""
+    current = _keyset_contract(948001, buyout=None, item_name="Zealot")
+    current.item_summary_version = ITEM_SUMMARY_VERSION
+    current.list_summary = {
+        "headline": "Abaddon",
+        "item_rows": 1,
+        "categories": [[None, 1]],
+        "blueprint": {"copy_count": 2},
+    }
+    unsummarized = _keyset_contract(948002, buyout=None, item_name="Merlin")
+    db_session.add_all([current, unsummarized])
+    await db_session.flush()
+
+    page = await get_contracts(
+        db_session,
+        ContractFilters(region_ids=[KEYSET_REGION_ID]),
+    )
+    rows = {row.contract_id: row for row in page.items}
+
+    assert rows[948001].primary_label == "Abaddon"
+    assert rows[948001].is_blueprint_copy_contract is True
+    assert rows[948001].blueprint_summary.copy_count == 2
+    assert rows[948002].primary_label == "Merlin"
+    assert rows[948002].is_blueprint_copy_contract is False
+    assert rows[948002].blueprint_summary is None
+
+
+async def test_the_export_streams_every_row_in_list_order_across_batches(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    """Five rows through a two-row cursor: three fetches, no row lost or repeated at a
+    batch boundary, and the order the list itself would serve."""
+    monkeypatch.setattr(contract_service, "EXPORT_BATCH_SIZE", 2)
+    db_session.add_all(
+        _keyset_contract(949000 + n, buyout=float(n % 3) * 1_000_000) for n in range(1, 6)
+    )
+    await db_session.flush()
+    filters = ContractFilters(
+        region_ids=[KEYSET_REGION_ID], sort_by=SortableContractFields.buyout,
+        sort_direction=SortDirection.desc, size=100,
+    )
+
+    exported = [
+        row.contract_id async for row in contract_service.stream_contracts(db_session, filters)
+    ]
+
+    listed = await get_contracts(db_session, filters)
+    assert exported == [row.contract_id for row in listed.items]
+    assert len(exported) == 5
+
+
+async def _commit_contracts(db_session: AsyncSession, contracts: list[Contract]) -> None:
+    """Write through a session of its own and commit: the fanned-out queries run on
+    other connections, which cannot see the test session's uncommitted flush."""
+    async with AsyncSession(db_session.bind) as writer:
+        writer.add_all(contracts)
+        await writer.commit()
+
+
+async def test_fanned_out_queries_serve_the_sequential_response(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    await _commit_contracts(
+        db_session,
+        [_keyset_contract(950000 + n, buyout=float(n) * 1_000_000) for n in range(1, 6)],
+    )
+    filters = ContractFilters(
+        region_ids=[KEYSET_REGION_ID], sort_by=SortableContractFields.buyout, size=2
+    )
+    sequential = await get_contracts(db_session, filters)
+
+    monkeypatch.setattr(contract_service.get_settings(), "CONTRACT_LIST_QUERY_FANOUT", 3)
+    fanned_out = await get_contracts(db_session, filters)
+
+    assert fanned_out.model_dump() == sequential.model_dump()
+    assert fanned_out.total == 5
+
+
+async def test_a_fanout_takes_only_the_connections_its_pool_has_spare(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    """Requests holding part of a fanout while waiting for the rest can wait on each
+    other until the checkout times out; a grant is decided up front instead."""
+    engine = create_async_engine(db_session.bind.url, pool_size=2, max_overflow=1)
+    engine.pool.metrics_name = "test_fanout"  # as instrument_pool names a workload's pool
+    monkeypatch.setitem(contract_service.pool_max_overflow, "test_fanout", 1)
+    try:
+        with contract_service._fanout_grant(engine, 5) as first:
+            assert first == 3
+            with contract_service._fanout_grant(engine, 3) as second:
+                assert second == 0  # none spare: this request runs in order
+        with contract_service._fanout_grant(engine, 3) as again:
+            assert again == 3  # the first grant was handed back
+    finally:
+        await engine.dispose()
+
+
+async def test_fanned_out_sessions_share_one_snapshot(db_session: AsyncSession):
+    """A commit landing after the snapshot was exported is invisible to every session,
+    so a count and a page read side by side cannot disagree about it."""
+    count = select(func.count(Contract.contract_id))
+
+    async with contract_service._snapshot_sessions(db_session.bind, 2) as sessions:
+        await _commit_contracts(db_session, [_keyset_contract(950101, buyout=None)])
+        seen = [(await session.execute(count)).scalar_one() for session in sessions]
+
+    assert seen == [0, 0]
+    assert (await db_session.execute(count)).scalar_one() == 1
+
+
+@pytest.mark.parametrize("case", sorted(_EQUIVALENCE_CASES), ids=sorted(_EQUIVALENCE_CASES))
+async def test_every_count_strategy_agrees_with_the_exact_count(
+    db_session: AsyncSession, segment_corpus, monkeypatch: pytest.MonkeyPatch, case
+):
+    """Precomputed totals and capped counts that reach no cap are the exact figures,
+    not approximations of them — whichever strategy a request is routed to."""
+    filters = ContractFilters(
+        region_ids=[DELISTED_REGION_A, DELISTED_REGION_B], **_EQUIVALENCE_CASES[case]
+    )
+    exact = await get_contracts(db_session, filters)
+    assert exact.count_mode is CountMode.exact
+
+    totals = await contract_service._live_segment_totals(db_session)
+    precomputed = await get_contracts(db_session, filters, segment_totals=totals)
+    assert (precomputed.total, precomputed.segment_counts) == (
+        exact.total, exact.segment_counts
+    )
+    # Only the filters the totals are split by can be answered from them.
+    eligible = set(_EQUIVALENCE_CASES[case]) <= {"contract_type", "is_ship_contract"}
+    assert (precomputed.count_mode is CountMode.precomputed) == eligible
+
+    async def broad(db, query):
+        return 1_000_000
+
+    monkeypatch.setattr(contract_service, "_estimated_rows", broad)
+    monkeypatch.setattr(contract_service, "_count_estimates", OrderedDict())
+    capped = await get_contracts(db_session, filters)
+    assert (capped.total, capped.segment_counts, capped.count_mode) == (
+        exact.total, exact.segment_counts, CountMode.exact
+    )
+
+
+async def test_a_broad_request_is_counted_up_to_the_cap(
+    db_session: AsyncSession, segment_corpus, monkeypatch: pytest.MonkeyPatch
+):
+    async def broad(db, query):
+        return 1_000_000
+
+    monkeypatch.setattr(contract_service, "_estimated_rows", broad)
+    monkeypatch.setattr(contract_service, "_count_estimates", OrderedDict())
+    monkeypatch.setattr(contract_service.get_settings(), "CONTRACT_COUNT_CAP", 2)
+
+    result = await get_contracts(
+        db_session, ContractFilters(region_ids=[DELISTED_REGION_A, DELISTED_REGION_B])
+    )
+
+    assert result.count_mode is CountMode.capped
+    assert result.count_cap == 2
+    assert result.total == 2
+    # Below the cap a segment is still its exact figure: one live loan contract.
+    assert result.segment_counts["loan"] == 1
+    assert result.segment_counts["item_exchange"] == 2
+
+
+async def test_the_planner_estimate_is_taken_once_per_filter_set(
+    db_session: AsyncSession, segment_corpus, monkeypatch: pytest.MonkeyPatch
+):
+    """A counted request does not pay an EXPLAIN round trip each time: the segments,
+    ships flag and paging of one filter set share the estimate."""
+    estimated = []
+
+    async def narrow(db, query):
+        estimated.append(query)
+        return 1
+
+    monkeypatch.setattr(contract_service, "_estimated_rows", narrow)
+    monkeypatch.setattr(contract_service, "_count_estimates", OrderedDict())
+    regions = [DELISTED_REGION_A, DELISTED_REGION_B]
+
+    first = await get_contracts(db_session, ContractFilters(region_ids=regions))
+    await get_contracts(
+        db_session,
+        ContractFilters(region_ids=regions, contract_type=[ContractType.loan], page=2),
+    )
+    assert first.count_mode is CountMode.exact
+    assert len(estimated) == 1
+
+    await get_contracts(db_session, ContractFilters(region_ids=regions, min_price=1))
+    assert len(estimated) == 2
+
+
+async def test_the_planner_estimate_plans_without_reading_rows(
+    db_session: AsyncSession, segment_corpus
+):
+    """The EXPLAIN wrapper compiles an ORM select with its binds — the search text
+    among them — and returns the planner's figure."""
+    filters = ContractFilters(search="Rifter")
+    estimate = await contract_service._estimated_rows(
+        db_session, contract_service._segment_query(filters)
+    )
+    assert estimate >= 0
+
+
+async def test_facet_counts_are_the_totals_their_options_would_show(
+    db_session: AsyncSession, segment_corpus
+):
+    """Every facet figure equals the total of the list with that option chosen, so the
+    rail and the page agree — here with the ships flag set, which the ship facet lifts
+    and every other facet applies."""
+    base = {"region_ids": [DELISTED_REGION_A, DELISTED_REGION_B], "is_ship_contract": True}
+    facets = await contract_service.get_contract_facets(db_session, ContractFilters(**base))
+
+    async def total(**overrides) -> int:
+        return (await get_contracts(db_session, ContractFilters(**{**base, **overrides}))).total
+
+    for region_id, count in facets.regions.items():
+        if region_id in base["region_ids"]:
+            assert count == await total(region_ids=[region_id])
+    assert facets.is_ship_contract.yes == await total(is_ship_contract=True)
+    assert facets.is_ship_contract.no == await total(is_ship_contract=False)
+    assert facets.is_bpc.yes == await total(is_bpc=True)
+    assert facets.is_bpc.no == await total(is_bpc=False)
+    assert facets.is_bpc.yes > 0 and facets.is_bpc.no > 0
@@ -0,0 +1,147 @@
+# ABOUTME: Process-local dataset snapshot — served without rebuilding while fresh, dropped by a
+# ABOUTME: commit announcement, and never keeping a rebuild that an announcement overtook.
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import fastapi_app.services.dataset_snapshot as dataset_snapshot
+from fastapi_app.services.background_aggregation import (
+    INGEST_GENERATION_CHANNEL,
+    ContractAggregationService,
+)
+from fastapi_app.services.contract_service import _observed_coverage, get_taxonomy
+from fastapi_app.tests.fake_redis import FakeRedis
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def counted_builds(monkeypatch: pytest.MonkeyPatch):
+    """Wrap the real builder so a test can tell a rebuild from a served snapshot."""
+    calls = {"count": 0}
+    real = dataset_snapshot.build_dataset_snapshot
+
+    async def counting(db):
+        calls["count"] += 1
+        return await real(db)
+
+    monkeypatch.setattr(dataset_snapshot, "build_dataset_snapshot", counting)
+    return calls
+
+
+async def test_the_snapshot_matches_the_per_request_queries(
+    db_session: AsyncSession, setup_contracts
+):
+    snapshot = await dataset_snapshot.build_dataset_snapshot(db_session)
+
+    assert snapshot.coverage == await _observed_coverage(db_session)
+    assert snapshot.taxonomy == await get_taxonomy(db_session)
+    assert snapshot.category_names == {
+        entry.category_id: entry.name for entry in snapshot.taxonomy.categories
+    }
+
+
+async def test_a_fresh_snapshot_is_served_without_rebuilding(
+    db_session: AsyncSession, counted_builds
+):
+    snapshots = dataset_snapshot.DatasetSnapshotCache(max_age_seconds=300)
+
+    first = await snapshots.get(db_session)
+    second = await snapshots.get(db_session)
+
+    assert second is first
+    assert counted_builds["count"] == 1
+
+
+async def test_an_invalidation_forces_one_rebuild(db_session: AsyncSession, counted_builds):
+    snapshots = dataset_snapshot.DatasetSnapshotCache(max_age_seconds=300)
+    await snapshots.get(db_session)
+
+    snapshots.invalidate()
+    await snapshots.get(db_session)
+    await snapshots.get(db_session)
+
+    assert counted_builds["count"] == 2
+
+
+async def test_a_rebuild_overtaken_by_an_invalidation_is_not_kept(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    """The rebuild read the corpus before the commit it was told about; serving it to
+    its own request is fine, keeping it for the next one is not."""
+    snapshots = dataset_snapshot.DatasetSnapshotCache(max_age_seconds=300)
+    real = dataset_snapshot.build_dataset_snapshot
+
+    async def overtaken(db):
+        snapshot = await real(db)
+        snapshots.invalidate()
+        return snapshot
+
+    monkeypatch.setattr(dataset_snapshot, "build_dataset_snapshot", overtaken)
+    served = await snapshots.get(db_session)
+    monkeypatch.setattr(dataset_snapshot, "build_dataset_snapshot", real)
+
+    assert await snapshots.get(db_session) is not served
+
+
+async def test_a_snapshot_past_its_max_age_is_rebuilt(db_session: AsyncSession, counted_builds):
+    snapshots = dataset_snapshot.DatasetSnapshotCache(max_age_seconds=0)
+
+    await snapshots.get(db_session)
+    await snapshots.get(db_session)
+
+    assert counted_builds["count"] == 2
+
+
+async def test_publishing_a_generation_announces_it():
+    redis = FakeRedis()
+    service = ContractAggregationService(esi_client=MagicMock(), settings=MagicMock())
+
+    generation = await service._publish_generation(redis)
+
+    assert redis.published == [(INGEST_GENERATION_CHANNEL, str(generation))]
+
+
+class _FakePubSub:
+    """Delivers the queued messages to listen(), then waits like an idle subscription."""
+
+    def __init__(self, messages: list[dict]):
+        self.channels: list[str] = []
+        self._messages = messages
+
+    async def subscribe(self, channel: str):
+        self.channels.append(channel)
+
+    async def listen(self):
+        for message in self._messages:
+            yield message
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        pass
+
+
+async def test_the_listener_drops_the_snapshot_on_an_announcement(
+    db_session: AsyncSession,
+):
+    snapshots = dataset_snapshot.DatasetSnapshotCache(max_age_seconds=300)
+    held = await snapshots.get(db_session)
+    pubsub = _FakePubSub(
+        [
+            {"type": "subscribe", "channel": INGEST_GENERATION_CHANNEL, "data": 1},
+            {"type": "message", "channel": INGEST_GENERATION_CHANNEL, "data": "2"},
+        ]
+    )
+    redis = MagicMock()
+    redis.pubsub.return_value = pubsub
+
+    listener = asyncio.create_task(snapshots.listen(redis))
+    await asyncio.sleep(0.01)
+    listener.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await listener
+
+    assert pubsub.channels == [INGEST_GENERATION_CHANNEL]
+    assert await snapshots.get(db_session) is not held
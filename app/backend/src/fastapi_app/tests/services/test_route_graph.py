@@ -0,0 +1,146 @@
+"""ABOUTME: Tests for the stargate graph: courier jump counts, the high-sec preference and its
+ABOUTME: fallback, the proximity neighbourhood index, and loading from the JSONL SDE.
+"""
+
+import json
+
+import pytest
+
+import fastapi_app.services.route_graph as route_graph
+from fastapi_app.services.route_graph import (
+    CourierRoute,
+    SolarSystem,
+    StargateGraph,
+    StargateGraphUnavailableError,
+    load_stargate_graph,
+)
+
+# A small map with the shape that makes the preference matter, modelled on Jita ->
+# Amarr through Ahbazon: the short way (1-2-3) crosses a low-sec system, the high-sec
+# way (1-4-5-3) is a jump longer. 7 is a low-sec dead end off 3, and 6 sits in a
+# component of its own, like Pochven or the Jove pockets.
+_SECURITY = {1: 0.946, 2: 0.421, 3: 0.9, 4: 0.8, 5: 0.45, 6: 1.0, 7: 0.2}
+_GATES = [(1, 2), (2, 3), (1, 4), (4, 5), (5, 3), (3, 7)]
+
+
+def _graph() -> StargateGraph:
+    return StargateGraph(_GATES, _SECURITY)
+
+
+def test_jumps_count_the_shortest_path_and_the_shortest_high_sec_one():
+    graph = _graph()
+
+    assert graph.jumps(1, 3) == 2
+    assert graph.jumps(1, 3, highsec_only=True) == 3
+    assert graph.jumps(3, 1) == 2  # gates run both ways, even from a one-sided dump
+    assert graph.jumps(1, 1) == 0
+
+
+def test_no_path_is_none_not_an_error():
+    graph = _graph()
+
+    assert graph.jumps(1, 6) is None
+    assert graph.jumps(1, 30000142) is None  # not in the dump at all
+    # A low-sec end has no all-high-sec path to it, however close it is.
+    assert graph.jumps(1, 7, highsec_only=True) is None
+    assert graph.courier_route(1, 6) is None
+
+
+def test_a_courier_takes_the_high_sec_route_and_falls_back_to_the_shortest():
+    """The preferred route is disclosed per row: a route that had to leave high-sec
+    says so instead of borrowing the high-sec label."""
+    graph = _graph()
+
+    assert graph.courier_route(1, 3) == CourierRoute(jumps=3, highsec=True)
+    assert graph.courier_route(1, 7) == CourierRoute(jumps=3, highsec=False)
+    assert graph.courier_route(1, 3, prefer_highsec=False) == CourierRoute(jumps=2, highsec=False)
+    # Shortest-only still reports a shortest route that happens to stay in high-sec.
+    assert graph.courier_route(4, 3, prefer_highsec=False) == CourierRoute(jumps=2, highsec=True)
+
+
+def test_one_search_per_origin_serves_every_destination(monkeypatch):
+    monkeypatch.setattr(route_graph, "BFS_CACHE_SOURCES", 1)
+    graph = _graph()
+    searches = []
+    search = graph._search
+    monkeypatch.setattr(
+        graph, "_search", lambda source, highsec: searches.append(source) or search(source, highsec)
+    )
+
+    for destination in (2, 3, 5, 7):
+        graph.jumps(1, destination)
+    graph.jumps(4, 3)  # evicts origin 1
+    graph.jumps(1, 3)
+
+    assert len(searches) == 3
+
+
+def test_systems_within_is_the_shortest_path_neighbourhood_whatever_its_security():
+    graph = _graph()
+
+    assert graph.systems_within(1, 0) == [1]
+    assert sorted(graph.systems_within(1, 1)) == [1, 2, 4]
+    assert sorted(graph.systems_within(1, 2)) == [1, 2, 3, 4, 5]
+    # A radius past the component's edge is the whole component, never the island 6.
+    assert sorted(graph.systems_within(1, 20)) == [1, 2, 3, 4, 5, 7]
+    assert graph.systems_within(30000142, 5) == []
+
+
+def test_every_radius_around_an_origin_comes_from_one_search(monkeypatch):
+    graph = _graph()
+    searches = []
+    search = graph._search
+    monkeypatch.setattr(
+        graph, "_search", lambda source, highsec: searches.append(source) or search(source, highsec)
+    )
+
+    for max_jumps in (0, 1, 2, 3, 1):
+        graph.systems_within(1, max_jumps)
+
+    assert searches == [0]
+
+
+def test_the_proximity_filter_refuses_to_run_without_a_graph(monkeypatch):
+    monkeypatch.setattr(route_graph, "_installed_graph", None)
+    with pytest.raises(StargateGraphUnavailableError):
+        route_graph.systems_within(1, 2)
+
+    route_graph.install_stargate_graph(_graph())
+    assert sorted(route_graph.systems_within(1, 1)) == [1, 2, 4]
+
+
+def test_the_graph_loads_from_the_jsonl_sde(tmp_path):
+    with (tmp_path / "mapSolarSystems.jsonl").open("w") as systems:
+        for system_id, security in _SECURITY.items():
+            systems.write(
+                json.dumps(
+                    {
+                        "_key": system_id,
+                        "name": {"en": f"System {system_id}", "de": f"System {system_id}"},
+                        "regionID": 10000000 + system_id,
+                        "securityStatus": security,
+                    }
+                )
+                + "\n"
+            )
+    with (tmp_path / "mapStargates.jsonl").open("w") as gates:
+        for gate_id, (origin, destination) in enumerate(_GATES):
+            gates.write(
+                json.dumps(
+                    {
+                        "_key": 50000000 + gate_id,
+                        "solarSystemID": origin,
+                        "destination": {"solarSystemID": destination, "stargateID": 0},
+                    }
+                )
+                + "\n"
+            )
+
+    graph = load_stargate_graph(tmp_path)
+
+    assert len(graph) == len(_SECURITY)
+    assert graph.courier_route(1, 3) == CourierRoute(jumps=3, highsec=True)
+    # The rows ingestion seeds universe_locations from, read from the same file.
+    assert graph.solar_systems[2] == SolarSystem(
+        name="System 2", region_id=10000002, security_status=0.421
+    )
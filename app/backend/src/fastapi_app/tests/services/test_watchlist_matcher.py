@@ -12,6 +12,8 @@ import fastapi_app.services.watchlist_matcher as wm
 from fastapi_app.models import Contract, ContractItem, Notification, User, WatchlistItem
 from fastapi_app.services.watchlist_matcher import (
     ConcurrencyLockError,
+    MatchMarks,
+    MatchWindow,
     WatchlistMatcherService,
 )
 from fastapi_app.tests.lock_double import FakeLockRedis
@@ -27,6 +29,7 @@ def _settings():
     # A real int, not the MagicMock default: the lock TTL derives from this, and a
     # Mock would make any TTL comparison pass vacuously (TEST-12).
     s.WATCHLIST_MATCH_INTERVAL_SECONDS = 900
+    s.WATCHLIST_FULL_MATCH_INTERVAL_SECONDS = 21600
     s.DATABASE_URL = "postgresql+asyncpg://unused/unused"
     s.CACHE_URL = "redis://unused"
     return s
@@ -45,7 +48,8 @@ async def _user(db, *, enabled=True, cid=91000001):
 
 
 async def _contract(db, *, cid, price, ctype="auction", expired_in_days=7, completed=False,
-                    location="Jita IV - Moon 4", region_id=10000002, last_seen_at=None):
+                    location="Jita IV - Moon 4", region_id=10000002, last_seen_at=None,
+                    items_fetched_at=None):
     c = Contract(
         contract_id=cid, title="t", price=price, collateral=0, status="unknown", type=ctype,
         issuer_id=1, issuer_corporation_id=1, start_location_id=60003760,
@@ -55,6 +59,7 @@ async def _contract(db, *, cid, price, ctype="auction", expired_in_days=7, compl
         date_completed=(datetime.now(timezone.utc) if completed else None),
         start_location_name=location,
         last_seen_at=last_seen_at,
+        items_last_fetched_at=items_fetched_at,
     )
     db.add(c)
     await db.flush()
@@ -324,6 +329,97 @@ async def test_prune_keeps_recent(db_session: AsyncSession):
     assert pruned == 0
 
 
+# ---------- incremental matching: a high-water mark over items_last_fetched_at ----------
+
+async def test_a_window_matches_only_contracts_whose_items_arrived_inside_it(
+    db_session: AsyncSession,
+):
+    """The watch predates the window, so only the new-contracts leg can match: the
+    contract fetched before the mark was notified about by an earlier run."""
+    u = await _user(db_session)
+    await _watch(db_session, u, type_id=621)
+    await _contract(db_session, cid=5101, price=1_000_000, items_fetched_at=NOW - timedelta(minutes=30))
+    await _item(db_session, cid=5101, type_id=621)
+    await _contract(db_session, cid=5102, price=1_000_000, items_fetched_at=NOW - timedelta(minutes=10))
+    await _item(db_session, cid=5102, type_id=621)
+    window = MatchWindow(
+        fetched_after=NOW - timedelta(minutes=20),
+        fetched_until=NOW - timedelta(minutes=10),
+        watches_edited_after=datetime.now(timezone.utc) + timedelta(hours=1),
+    )
+
+    matched, created = await _service()._match_and_notify(db_session, window)
+
+    assert (matched, created) == (1, 1)
+    assert (await db_session.execute(select(Notification.contract_id))).scalars().all() == [5102]
+
+
+async def test_an_edited_watch_is_matched_against_the_whole_corpus(db_session: AsyncSession):
+    """A new watch must alert on contracts already listed, not only on ones arriving
+    after it — and a contract both legs find is notified once."""
+    u = await _user(db_session)
+    await _watch(db_session, u, type_id=621)
+    await _contract(db_session, cid=5103, price=1_000_000)  # predates the stamp
+    await _item(db_session, cid=5103, type_id=621)
+    await _contract(db_session, cid=5104, price=1_000_000, items_fetched_at=NOW)
+    await _item(db_session, cid=5104, type_id=621)
+    window = MatchWindow(
+        fetched_after=NOW - timedelta(minutes=15),
+        fetched_until=NOW,
+        watches_edited_after=datetime.now(timezone.utc) - timedelta(hours=1),
+    )
+
+    matched, created = await _service()._match_and_notify(db_session, window)
+
+    assert (matched, created) == (2, 2)
+
+
+async def test_plan_matches_fully_without_marks_and_when_reconciliation_is_due(
+    db_session: AsyncSession,
+):
+    await _contract(db_session, cid=5105, price=1_000_000, items_fetched_at=NOW - timedelta(minutes=5))
+    svc = _service(now=NOW)
+
+    window, marks = await svc._plan(db_session, None)
+    assert window is None
+    assert marks.full_match_at == NOW
+    assert marks.items_fetched_at == NOW - timedelta(minutes=5)
+
+    recent = MatchMarks(
+        items_fetched_at=NOW - timedelta(hours=1),
+        watches_at=NOW - timedelta(minutes=15),
+        full_match_at=NOW - timedelta(hours=1),
+    )
+    window, marks = await svc._plan(db_session, recent)
+    assert window == MatchWindow(
+        fetched_after=NOW - timedelta(hours=1),
+        fetched_until=NOW - timedelta(minutes=5),
+        watches_edited_after=NOW - timedelta(minutes=15, seconds=wm.WATCHLIST_EDIT_GRACE_SECONDS),
+    )
+    assert marks.full_match_at == recent.full_match_at  # an incremental run keeps it
+
+    due = MatchMarks(
+        items_fetched_at=recent.items_fetched_at,
+        watches_at=recent.watches_at,
+        full_match_at=NOW - timedelta(hours=6),
+    )
+    window, _ = await svc._plan(db_session, due)
+    assert window is None
+
+
+async def test_marks_round_trip_and_an_unreadable_record_means_a_full_match():
+    store: dict = {}
+    redis = FakeLockRedis(store)
+    svc = _service()
+    marks = MatchMarks(items_fetched_at=None, watches_at=NOW, full_match_at=NOW)
+
+    await svc._write_marks(redis, marks)
+    assert await svc._read_marks(redis) == marks
+
+    store[wm.WATCHLIST_MATCH_MARKS_KEY] = '{"watches_at": "yesterday"}'
+    assert await svc._read_marks(redis) is None
+
+
 # ---------- lock behavior (via the shared FakeLockRedis double) ----------
 
 async def test_run_matching_skips_when_lock_held():
@@ -387,8 +483,9 @@ async def test_lock_ttl_follows_a_reconfigured_interval():
 @pytest.mark.asyncio
 async def test_run_matching_reuses_app_session_factory(monkeypatch: pytest.MonkeyPatch):
     """Pool-policy coverage (M4 spec §5): the matcher must source its session from
-    fastapi_app.db.AsyncSessionLocal — a per-run create_async_engine() would sit outside
-    the tuned pre-ping/bounded pool and multiply connections against Render Basic's budget."""
+    fastapi_app.db.MatcherSessionLocal — a per-run create_async_engine() would sit outside
+    the matcher's own pre-ping/bounded pool and multiply connections against Render Basic's
+    budget."""
     import fastapi_app.db as app_db
 
     service = wm.WatchlistMatcherService(settings=MagicMock())
@@ -397,15 +494,15 @@ async def test_run_matching_reuses_app_session_factory(monkeypatch: pytest.Monke
     service.settings.NOTIFICATION_RETENTION_DAYS = 90
 
     entered = {"count": 0}
-    real_factory = app_db.AsyncSessionLocal
+    real_factory = app_db.MatcherSessionLocal
 
     def recording_factory():
         entered["count"] += 1
         return real_factory()
 
-    monkeypatch.setattr(wm, "AsyncSessionLocal", recording_factory, raising=False)
+    monkeypatch.setattr(wm, "MatcherSessionLocal", recording_factory, raising=False)
 
-    async def _no_match(self_, db_session):
+    async def _no_match(self_, db_session, window=None):
         return 0, 0
 
     async def _no_prune(self_, db_session):
@@ -419,5 +516,5 @@ async def test_run_matching_reuses_app_session_factory(monkeypatch: pytest.Monke
         await service.run_matching()
 
     assert entered["count"] == 1, (
-        "run_matching must obtain its session from fastapi_app.db.AsyncSessionLocal"
+        "run_matching must obtain its session from fastapi_app.db.MatcherSessionLocal"
     )
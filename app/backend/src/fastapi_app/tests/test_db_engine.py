@@ -34,3 +34,38 @@ def test_engine_errors_never_render_bound_parameter_values():
     rendered = str(error)
     assert secret not in rendered
     assert "hide_parameters=True" in rendered
+
+
+def test_each_workload_checks_out_of_its_own_pool():
+    """Requests, ingestion, the matcher and the background reads never share
+    connections, and every one of their engines hides bind values like the request
+    engine does."""
+    from fastapi_app import db
+
+    engines = {
+        "api": db.async_engine,
+        "ingest": db.ingest_engine,
+        "matcher": db.matcher_engine,
+        "background": db.background_engine,
+    }
+    pools = {name: engine.sync_engine.pool for name, engine in engines.items()}
+
+    assert len({id(pool) for pool in pools.values()}) == 4
+    assert pools["api"].size() == db.settings.DB_POOL_API_SIZE
+    assert pools["ingest"].size() == db.settings.DB_POOL_INGEST_SIZE
+    assert pools["matcher"].size() == db.settings.DB_POOL_MATCHER_SIZE
+    assert pools["background"].size() == db.settings.DB_POOL_BACKGROUND_SIZE
+    for name, pool in pools.items():
+        assert pool.metrics_name == name
+    for engine in engines.values():
+        assert engine.sync_engine.hide_parameters
+
+
+def test_plan_captures_never_take_a_workload_connection():
+    """A slow statement's EXPLAIN ANALYZE re-runs it; on the primary that second run
+    comes out of the background pool, not the pool the statement ran on."""
+    from fastapi_app import db
+    from fastapi_app.core.query_metrics import slow_query_logs
+
+    for name in ("api", "ingest", "matcher"):
+        assert slow_query_logs[name]._engine is db.background_engine
@@ -30,11 +30,13 @@ def test_export_openapi_writes_usable_schema(tmp_path):
     # plus unknown_system_excluded, the figure that makes the partial reach of
     # system_ids readable instead of silent; segment_counts, the per-type counts the
     # segment controls are labelled from; and coverage, the regions the corpus
-    # actually holds, which is what stops the client embedding a region literal.
+    # actually holds, which is what stops the client embedding a region literal;
+    # and next_cursor, the keyset token deep pages resume from; and count_mode /
+    # count_cap, without which a capped "10,000" reads as an exact one.
     envelope = schema["components"]["schemas"]["ContractListResponse"]
     assert {
         "total", "page", "size", "items", "unknown_system_excluded", "segment_counts",
-        "coverage",
+        "coverage", "next_cursor", "count_mode", "count_cap",
     } <= set(envelope["properties"])
     assert {"ingested_region_ids", "as_of"} <= set(
         schema["components"]["schemas"]["CoverageInfo"]["properties"]
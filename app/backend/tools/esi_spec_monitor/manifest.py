@@ -188,7 +188,29 @@ MANIFEST: tuple[Endpoint, ...] = (
             # carries a location id and no system id, so without this the system_ids
             # filter has nothing to match — its disappearance would leave every
             # start_location_system_id NULL while the ingestion kept reporting success.
-            "system_id": "background_aggregation._resolve_station_systems -> Contract.start_location_system_id, which backs the system_ids filter, and Contract.end_location_system_id, the courier destination",
+            "system_id": "background_aggregation._resolve_locations -> UniverseLocation.system_id, copied to Contract.start_location_system_id, which backs the system_ids filter, and Contract.end_location_system_id, the courier destination",
+            "name": "background_aggregation._resolve_locations -> UniverseLocation.name, the contract's start/end_location_name in place of a per-run /universe/names lookup (which remains the fallback when absent)",
+        },
+    ),
+    Endpoint(
+        spec_path="/universe/systems/{system_id}",
+        method="get",
+        call_path="/v4/universe/systems/{system_id}/",
+        caller="core/esi_client_class.py ESIClient.get_universe_system",
+        consumed_fields={
+            # The system payload names no region; the constellation hop is what finds it.
+            "constellation_id": "background_aggregation._resolve_systems -> the /universe/constellations fan-out that finds the system's region; without it no station row ever gains a region and Contract.end_location_region_id stays NULL",
+            "security_status": "background_aggregation._resolve_systems -> UniverseLocation.security_status on the system row and the stations copied from it",
+            "name": "background_aggregation._resolve_systems -> UniverseLocation.name on the system row",
+        },
+    ),
+    Endpoint(
+        spec_path="/universe/constellations/{constellation_id}",
+        method="get",
+        call_path="/v1/universe/constellations/{constellation_id}/",
+        caller="core/esi_client_class.py ESIClient.get_universe_constellation",
+        consumed_fields={
+            "region_id": "background_aggregation._resolve_systems -> UniverseLocation.region_id, copied to Contract.end_location_region_id, the courier destination's region",
         },
     ),
     Endpoint(
@@ -0,0 +1,2 @@
+# ABOUTME: Package marker for the list-page serialization microbenchmark — per-page CPU time
+# ABOUTME: of building and encoding a GET /contracts page, validated versus trusted. No database.
@@ -0,0 +1,150 @@
+# ABOUTME: Times the CPU cost of turning one page of Contract rows into response bytes, the way
+# ABOUTME: the list route did before single-pass rendering and the way it does now.
+"""Per-page CPU time of list-response serialization, before and after.
+
+Both paths start from the same in-memory Contract rows and stored summaries, so
+the figures isolate what the request spends on Python objects and JSON — no
+database, no network. "validated" is the old route: every row validated into
+ContractListItemSchema, the page validated once more against the route's
+response_model, dumped to JSON-mode dicts and encoded by the JSON response.
+"trusted" is the current one: rows built with model_construct and the page
+dumped straight to bytes (contract_list_cache.render_list_page).
+
+Imports the backend, so it needs the backend's environment (src/.env):
+
+    pdm run bench-list-page --rows 100 --repeat 200
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Sequence
+
+from pydantic import TypeAdapter
+
+from fastapi_app.models.contracts import Contract
+from fastapi_app.schemas.contracts import (
+    ContractListItemSchema,
+    ContractListResponse,
+    CoverageInfo,
+)
+from fastapi_app.services.contract_list_cache import render_list_page
+from fastapi_app.services.contract_service import _contract_fields, _list_item
+
+CATEGORY_NAMES = {6: "Ship", 7: "Module", 8: "Charge", 9: "Blueprint", 18: "Drone"}
+
+
+def synthetic_page(rows: int) -> tuple[list[Contract], dict[int, dict]]:
+    """`rows` item exchanges shaped like a busy marketplace page: most carry a
+    composition, every fifth offers a blueprint copy."""
+    now = datetime.now(timezone.utc)
+    contracts, summaries = [], {}
+    for n in range(rows):
+        contract_id = 200_000_000 + n
+        contracts.append(
+            Contract(
+                contract_id=contract_id,
+                title=f"Fitted hull {n}" if n % 3 else "",
+                price=Decimal("125000000.00") + n,
+                collateral=Decimal("0"),
+                buyout=None,
+                status="outstanding",
+                type="item_exchange",
+                issuer_id=90_000_000 + n,
+                issuer_corporation_id=98_000_000,
+                start_location_id=60_003_760,
+                start_location_system_id=30_000_142,
+                for_corporation=False,
+                date_issued=now - timedelta(days=1),
+                date_expired=now + timedelta(days=13, minutes=n),
+                volume=2500.0 + n,
+                start_location_name="Jita IV - Moon 4 - Caldari Navy Assembly Plant",
+                issuer_name=f"Capsuleer {n}",
+                issuer_corporation_name="Hangar Bay Traders",
+                is_ship_contract=n % 2 == 0,
+                last_seen_at=now,
+            )
+        )
+        summaries[contract_id] = {
+            "headline": "Raven" if n % 2 == 0 else None,
+            "item_rows": 1 + n % 9,
+            "categories": [[6, 1], [7, n % 6], [8, n % 3], [None, n % 2]],
+            "blueprint": (
+                {"runs": 10, "material_efficiency": 10, "time_efficiency": 20, "copy_count": 1}
+                if n % 5 == 0
+                else None
+            ),
+        }
+    return contracts, summaries
+
+
+def _page(items: list) -> ContractListResponse:
+    return ContractListResponse(
+        total=len(items),
+        page=1,
+        size=len(items),
+        items=items,
+        segment_counts={"item_exchange": len(items)},
+        coverage=CoverageInfo(ingested_region_ids=[10000002]),
+    )
+
+
+def validated_path(contracts: list[Contract], summaries: dict[int, dict]) -> bytes:
+    items = [
+        ContractListItemSchema(**_contract_fields(c, CATEGORY_NAMES, summaries[c.contract_id]))
+        for c in contracts
+    ]
+    # What FastAPI does with a returned model: validate it against response_model,
+    # serialize to JSON-mode Python, and let JSONResponse encode that.
+    adapter = TypeAdapter(ContractListResponse)
+    checked = adapter.validate_python(_page(items), from_attributes=True)
+    content = adapter.dump_python(checked, mode="json")
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def trusted_path(contracts: list[Contract], summaries: dict[int, dict]) -> bytes:
+    items = [_list_item(c, CATEGORY_NAMES, summaries[c.contract_id]) for c in contracts]
+    return render_list_page(_page(items)).body
+
+
+def per_page_ms(path: Callable, contracts, summaries, repeat: int) -> float:
+    """Best-of-three mean CPU milliseconds per page; process time, so a busy machine
+    inflates the figures less than wall time would."""
+    path(contracts, summaries)  # warm the schema caches
+    best = float("inf")
+    for _ in range(3):
+        started = time.process_time()
+        for _ in range(repeat):
+            path(contracts, summaries)
+        best = min(best, (time.process_time() - started) / repeat)
+    return best * 1000
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=200, help="pages per timing run")
+    args = parser.parse_args(argv)
+
+    contracts, summaries = synthetic_page(args.rows)
+    # The comparison only means something if both paths serve the same document.
+    if json.loads(validated_path(contracts, summaries)) != json.loads(
+        trusted_path(contracts, summaries)
+    ):
+        print("the two paths disagree on the page; not timing them")
+        return 1
+
+    before = per_page_ms(validated_path, contracts, summaries, args.repeat)
+    after = per_page_ms(trusted_path, contracts, summaries, args.repeat)
+    print(f"{args.rows}-row page, CPU ms per page")
+    print(f"  validated + response_model + json.dumps: {before:8.3f}")
+    print(f"  trusted + dump_json:                     {after:8.3f}")
+    print(f"  speedup:                                 {before / after:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())